@@ -0,0 +1,14 @@
+"""
+Configuração do Gunicorn (carregada automaticamente a partir do diretório atual).
+
+Com PROMETHEUS_MULTIPROC_DIR definido, remove as séries "live" dos workers
+encerrados, para que os gauges de trabalho em curso não somem workers mortos.
+"""
+import os
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,3 @@
+"""
+Scripts utilitários (benchmarks, geração de dados de exemplo).
+"""
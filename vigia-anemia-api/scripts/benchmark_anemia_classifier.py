@@ -0,0 +1,135 @@
+"""
+Benchmark: classificação de anemia (OMS) por exame em Python puro versus
+lote vetorizado com NumPy (src.services.anemia_classifier).
+
+Mede separadamente o caminho completo (extração do Bundle + classificação) e
+apenas a classificação sobre arrays já extraídos.
+
+Uso:
+    python -m scripts.benchmark_anemia_classifier [--exams 50000]
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from scripts.sample_bundles import build_sample_bundle
+from src.domain.models import LoincCode
+from src.services.anemia_classifier import classify_anemia, classify_messages
+
+# Limiares (sem anemia >=, leve >=, moderada >=) por faixa, como em um
+# classificador escrito exame a exame
+_BANDS = [
+    (6, 60, (11.0, 10.0, 7.0)),
+    (60, 144, (11.5, 11.0, 8.0)),
+    (144, 180, (12.0, 11.0, 8.0)),
+]
+_ADULT = {"female": (12.0, 11.0, 8.0), "male": (13.0, 11.0, 8.0)}
+_FACTORS = {"g/dl": 1.0, "g/l": 0.1, "mmol/l": 1.611}
+
+
+def classify_one(message: Dict[str, Any]) -> str:
+    """Classificação por exame: percorre o Bundle e aplica os limiares com if/else."""
+    bundle = message["fhir_bundle"]
+    patient: Dict[str, Any] = {}
+    observation: Optional[Dict[str, Any]] = None
+    for entry in bundle["entry"]:
+        resource = entry["resource"]
+        for item in resource.get("contained", []):
+            if item.get("resourceType") == "Patient":
+                patient = item
+        if resource["code"]["coding"][0]["code"] == LoincCode.HEMOGLOBINA.value:
+            observation = resource
+
+    if observation is None or "birthDate" not in patient:
+        return "not_applicable"
+    quantity = observation["valueQuantity"]
+    factor = _FACTORS.get(quantity["unit"].lower())
+    if factor is None:
+        return "not_applicable"
+    hemoglobin = quantity["value"] * factor
+
+    collected = date.fromisoformat(observation["effectiveDateTime"][:10])
+    born = date.fromisoformat(patient["birthDate"])
+    age_months = (collected - born).days / (365.25 / 12)
+
+    thresholds = None
+    for low, high, band in _BANDS:
+        if low <= age_months < high:
+            thresholds = band
+    if age_months >= 180:
+        thresholds = _ADULT.get(patient.get("gender"))
+    if thresholds is None:
+        return "not_applicable"
+
+    if hemoglobin >= thresholds[0]:
+        return "none"
+    if hemoglobin >= thresholds[1]:
+        return "mild"
+    if hemoglobin >= thresholds[2]:
+        return "moderate"
+    return "severe"
+
+
+def build_messages(count: int, templates: int = 500) -> List[Dict[str, Any]]:
+    """Gera `templates` Bundles variados e os repete até `count` mensagens."""
+    rng = random.Random(7)
+    collected = date(2024, 11, 27)
+    distinct = []
+    for seed in range(templates):
+        age_days = rng.randint(30, 16 * 365)
+        unit, scale = rng.choice([("g/dL", 1.0), ("g/L", 10.0)])
+        bundle = build_sample_bundle(
+            seed=seed,
+            birth_date=(collected - timedelta(days=age_days)).isoformat(),
+            gender=rng.choice(["female", "male"]),
+            values={LoincCode.HEMOGLOBINA.value: round(rng.uniform(6.0, 15.0) * scale, 1)},
+        )
+        for entry in bundle["entry"]:
+            quantity = entry["resource"].get("valueQuantity")
+            if quantity and entry["resource"]["code"]["coding"][0]["code"] == LoincCode.HEMOGLOBINA.value:
+                quantity["unit"] = quantity["code"] = unit
+        distinct.append({"tracking_id": str(seed), "fhir_bundle": bundle})
+    return [distinct[position % templates] for position in range(count)]
+
+
+def timed(label: str, count: int, func) -> float:
+    """Executa `func` uma vez e imprime a vazão em exames/s."""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed * 1000:9.1f} ms  {count / elapsed:12.0f} exames/s")
+    return result
+
+
+def main() -> None:
+    """Ponto de entrada do benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--exams", type=int, default=50000)
+    args = parser.parse_args()
+
+    messages = build_messages(args.exams)
+    print(f"exames: {args.exams}")
+
+    scalar = timed("por exame (Python puro)", args.exams, lambda: [classify_one(m) for m in messages])
+    vectorized = timed("lote NumPy (extração + classificação)", args.exams, lambda: classify_messages(messages))
+    assert scalar == [item["severity"] for item in vectorized], "classificações divergentes"
+
+    rng = np.random.default_rng(7)
+    size = 1_000_000
+    age = rng.uniform(0, 200, size)
+    sex = rng.integers(0, 3, size).astype(np.int8)
+    hemoglobin = rng.uniform(5, 16, size)
+    timed("lote NumPy (só classificação, 1M)", size, lambda: classify_anemia(age, sex, hemoglobin))
+
+    counts = {}
+    for item in vectorized:
+        counts[item["severity"]] = counts.get(item["severity"], 0) + 1
+    print("distribuição:", ", ".join(f"{label}={count}" for label, count in sorted(counts.items())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark: validação de token JWT com verificação de assinatura a cada
+requisição versus cache de verificações (LRU local e, com --redis, o nível
+compartilhado no Redis das settings, como visto por um segundo worker).
+
+Uso:
+    python -m scripts.benchmark_auth_cache [--requests 20000] [--redis]
+"""
+import argparse
+import asyncio
+import logging
+import time
+from datetime import timedelta
+
+import structlog
+
+structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL))
+
+from src.core.config import settings  # noqa: E402
+from src.infrastructure.auth_service import AuthService  # noqa: E402
+from src.infrastructure.redis_client import close_async_redis  # noqa: E402
+
+
+async def measure(label: str, service: AuthService, token: str, requests: int) -> float:
+    """Valida o mesmo token `requests` vezes e imprime o custo por requisição."""
+    start = time.perf_counter()
+    for _ in range(requests):
+        is_valid, _ = await service.validate_token(token)
+        assert is_valid
+    elapsed = time.perf_counter() - start
+    per_request_us = elapsed / requests * 1e6
+    print(f"{label:<36} {per_request_us:9.1f} µs/req  {requests / elapsed:10.0f} req/s")
+    return per_request_us
+
+
+async def run(requests: int, use_redis: bool) -> None:
+    """Executa as medições."""
+    settings.auth_cache_enabled = False
+    uncached = AuthService()
+    token = uncached.create_access_token({"sub": "lab-2338424"}, expires_delta=timedelta(minutes=55))
+    before = await measure("sem cache (jwt.decode)", uncached, token, requests)
+
+    settings.auth_cache_enabled = True
+    settings.auth_cache_redis_enabled = False
+    local = AuthService()
+    after = await measure("LRU local", local, token, requests)
+    print(f"speedup: {before / after:.1f}x")
+
+    if use_redis:
+        settings.auth_cache_redis_enabled = True
+        writer = AuthService()
+        await writer.validate_token(token)
+        # Outro "worker": LRU vazio, verificação já presente no Redis
+        reader = AuthService()
+        start = time.perf_counter()
+        for _ in range(requests // 100 or 1):
+            reader.local_cache.clear()
+            assert (await reader.validate_token(token))[0]
+        elapsed = time.perf_counter() - start
+        print(f"{'Redis (LRU frio)':<36} {elapsed / (requests // 100 or 1) * 1e6:9.1f} µs/req")
+        await writer.close()
+        await reader.close()
+        await close_async_redis()
+
+
+def main() -> None:
+    """Ponto de entrada do benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--redis", action="store_true", help="Mede também o nível Redis (REDIS_HOST)")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.redis))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Microbenchmark: validação + extração de metadados com múltiplas passagens
+(implementação anterior) versus índice de passagem única (BundleIndex).
+
+Uso:
+    python -m scripts.benchmark_bundle_index [--iterations N]
+"""
+import argparse
+import logging
+import time
+from typing import Any, Callable, Dict, Tuple
+
+import structlog
+
+# Silencia logs INFO para medir apenas o custo de CPU da validação
+structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+from scripts.sample_bundles import build_sample_bundle  # noqa: E402
+from src.core.config import settings  # noqa: E402
+from src.domain.models import LoincCode  # noqa: E402
+from src.validators.cpf_validator import CPFValidator  # noqa: E402
+from src.validators.fhir_validator import FHIRValidator  # noqa: E402
+
+CPF_SYSTEM = "https://fhir.saude.go.gov.br/sid/cpf"
+CNES_SYSTEM = "https://fhir.saude.go.gov.br/sid/cnes"
+
+
+def legacy_validate_and_extract(bundle: Dict[str, Any]) -> Tuple[bool, str, str]:
+    """Réplica das quatro passagens sobre `entry` feitas antes do BundleIndex."""
+    if bundle.get("resourceType") != "Bundle":
+        return False, "", ""
+    if settings.fhir_profile_url not in bundle.get("meta", {}).get("profile", []):
+        return False, "", ""
+    if bundle.get("type") != "collection" or not bundle.get("entry", []):
+        return False, "", ""
+
+    entries = bundle.get("entry", [])
+
+    # Passagem 1: exames simples
+    found = set()
+    for entry in entries:
+        resource = entry.get("resource", {})
+        if resource.get("resourceType") != "Observation":
+            continue
+        for coding in resource.get("code", {}).get("coding", []):
+            if coding.get("system") == "http://loinc.org":
+                if coding.get("code") in FHIRValidator.REQUIRED_LOINC_CODES:
+                    found.add(coding.get("code"))
+    if FHIRValidator.REQUIRED_LOINC_CODES - found:
+        return False, "", ""
+
+    # Passagem 2: identificadores
+    for entry in entries:
+        resource = entry.get("resource", {})
+        if resource.get("resourceType") != "Observation":
+            continue
+        identifier = resource.get("subject", {}).get("identifier", {})
+        if identifier.get("system") == CPF_SYSTEM:
+            if not CPFValidator.validate(identifier.get("value", ""))[0]:
+                return False, "", ""
+        for performer in resource.get("performer", []):
+            if performer.get("id") == "laboratorio":
+                lab_identifier = performer.get("identifier", {})
+                if lab_identifier.get("system") == CNES_SYSTEM:
+                    cnes = lab_identifier.get("value", "")
+                    if not cnes.isdigit() or len(cnes) != 7:
+                        return False, "", ""
+
+    # Passagem 3: exame composto e amostras
+    composite_found = False
+    for entry in entries:
+        resource = entry.get("resource", {})
+        if resource.get("resourceType") != "Observation":
+            continue
+        codings = resource.get("code", {}).get("coding", [])
+        if codings and codings[0].get("code") == LoincCode.CBC_PANEL.value:
+            composite_found = True
+            if len(resource.get("hasMember", [])) != settings.fhir_required_exams_count:
+                return False, "", ""
+        reference = resource.get("specimen", {}).get("reference")
+        if not reference or not reference.startswith("#"):
+            return False, "", ""
+        specimen_found = False
+        for item in resource.get("contained", []):
+            if item.get("resourceType") == "Specimen":
+                specimen_found = True
+                type_codings = item.get("type", {}).get("coding", [])
+                if type_codings and type_codings[0].get("code") != "BLD":
+                    return False, "", ""
+                if not item.get("collection", {}).get("collectedDateTime"):
+                    return False, "", ""
+        if not specimen_found:
+            return False, "", ""
+    if not composite_found:
+        return False, "", ""
+
+    # Passagem 4: extração de metadados
+    laboratory_cnes, patient_cpf = "0000000", "00000000000"
+    for entry in entries:
+        resource = entry.get("resource", {})
+        if resource.get("resourceType") != "Observation":
+            continue
+        identifier = resource.get("subject", {}).get("identifier", {})
+        if identifier.get("system") == CPF_SYSTEM:
+            patient_cpf = identifier.get("value", patient_cpf)
+        for performer in resource.get("performer", []):
+            if performer.get("id") == "laboratorio":
+                lab_identifier = performer.get("identifier", {})
+                if lab_identifier.get("system") == CNES_SYSTEM:
+                    laboratory_cnes = lab_identifier.get("value", laboratory_cnes)
+        if laboratory_cnes != "0000000" and patient_cpf != "00000000000":
+            break
+
+    return True, laboratory_cnes, patient_cpf
+
+
+def indexed_validate_and_extract(
+    validator: FHIRValidator,
+    bundle: Dict[str, Any]
+) -> Tuple[bool, str, str]:
+    """Caminho atual: índice único consumido pela validação e pelos metadados."""
+    result = validator.validate(bundle)
+    return result.is_valid, result.index.laboratory_cnes, result.index.patient_cpf
+
+
+def measure(label: str, func: Callable[[], Any], iterations: int) -> float:
+    """Executa `func` N vezes e imprime o tempo médio por chamada."""
+    for _ in range(min(iterations, 200)):
+        func()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    per_call_us = elapsed / iterations * 1e6
+    print(f"{label:<32} {per_call_us:10.1f} µs/bundle  {iterations / elapsed:12.0f} bundles/s")
+    return per_call_us
+
+
+def main() -> None:
+    """Ponto de entrada do benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    bundle = build_sample_bundle(seed=42)
+    validator = FHIRValidator()
+
+    assert legacy_validate_and_extract(bundle)[0]
+    assert indexed_validate_and_extract(validator, bundle)[0]
+
+    before = measure("antes (4 passagens)", lambda: legacy_validate_and_extract(bundle), args.iterations)
+    after = measure(
+        "depois (BundleIndex)",
+        lambda: indexed_validate_and_extract(validator, bundle),
+        args.iterations
+    )
+    print(f"speedup: {before / after:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Microbenchmark: decodificação + validação do Bundle.
+
+Compara json.loads da stdlib com o caminho de dicionários (msgspec/orjson) e
+com o caminho tipado (Structs msgspec), todos seguidos da validação completa.
+
+Uso:
+    python -m scripts.benchmark_decoding [--iterations N]
+"""
+import argparse
+import json
+import logging
+
+import structlog
+
+# Silencia logs INFO para medir apenas o custo de CPU
+structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+from scripts.benchmark_bundle_index import legacy_validate_and_extract, measure  # noqa: E402
+from scripts.sample_bundles import build_sample_bundle  # noqa: E402
+from src.domain.fhir_structs import FAST_DECODING_AVAILABLE, decode_bundle  # noqa: E402
+from src.validators.fhir_validator import FHIRValidator  # noqa: E402
+
+
+def main() -> None:
+    """Ponto de entrada do benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    body = json.dumps(build_sample_bundle(seed=42)).encode()
+    validator = FHIRValidator()
+
+    def parse_and_validate(bundle) -> bool:
+        return validator.validate(bundle).is_valid
+
+    print(f"payload: {len(body)} bytes, msgspec disponível: {FAST_DECODING_AVAILABLE}")
+
+    baseline = measure(
+        "json.loads + 4 passagens",
+        lambda: legacy_validate_and_extract(json.loads(body)),
+        args.iterations
+    )
+    measure(
+        "json.loads + BundleIndex",
+        lambda: parse_and_validate(json.loads(body)),
+        args.iterations
+    )
+    measure(
+        "dict rápido + BundleIndex",
+        lambda: parse_and_validate(decode_bundle(body, typed=False)),
+        args.iterations
+    )
+    if FAST_DECODING_AVAILABLE:
+        assert parse_and_validate(decode_bundle(body))
+        typed = measure(
+            "Structs + BundleIndex",
+            lambda: parse_and_validate(decode_bundle(body)),
+            args.iterations
+        )
+        print(f"speedup (tipado vs. json.loads + 4 passagens): {baseline / typed:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark: memória e tamanho serializado de um hemograma no worker como
+QueueMessage decodificada (dicionários aninhados com o Bundle FHIR) versus
+registro compacto de layout fixo (src.domain.hemograma_record).
+
+Mede também o custo de construir os registros a partir dos Bundles e de
+montar a matriz de resultados (lote x 24) usada pelas análises vetorizadas.
+
+Uso:
+    python -m scripts.benchmark_hemograma_record [--exams 5000]
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, List
+from uuid import uuid4
+
+import msgspec
+import numpy as np
+
+from scripts.sample_bundles import build_sample_bundle
+from src.domain.hemograma_record import (
+    RECORD_SIZE,
+    HemogramaRecord,
+    read_record_batch,
+    records_to_matrix,
+)
+
+
+def build_bodies(count: int) -> List[bytes]:
+    """Gera `count` corpos de QueueMessage (JSON) com Bundles distintos."""
+    return [
+        json.dumps({
+            "tracking_id": str(uuid4()),
+            "patient_cpf": f"{seed:011d}",
+            "laboratory_cnes": "2338424",
+            "received_at": "2024-11-27T12:00:00+00:00",
+            "fhir_bundle": build_sample_bundle(seed=seed, birth_date="1990-05-17", gender="female"),
+        }).encode()
+        for seed in range(count)
+    ]
+
+
+def allocated(build: Callable[[], Any]) -> tuple:
+    """Executa `build` e retorna (resultado, bytes alocados que permanecem vivos)."""
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def timed(label: str, count: int, func: Callable[[], Any]) -> Any:
+    """Executa `func` uma vez e imprime a vazão em exames/s."""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed * 1000:9.1f} ms  {count / elapsed:12.0f} exames/s")
+    return result
+
+
+def main() -> None:
+    """Ponto de entrada do benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--exams", type=int, default=5000)
+    args = parser.parse_args()
+
+    bodies = build_bodies(args.exams)
+    decoder = msgspec.json.Decoder()
+    print(f"exames: {args.exams}")
+
+    messages, message_bytes = allocated(lambda: [decoder.decode(body) for body in bodies])
+    records, record_bytes = allocated(lambda: [HemogramaRecord.from_message(message) for message in messages])
+    print(f"memória por exame (QueueMessage dict)    {message_bytes / args.exams:9.0f} bytes")
+    print(f"memória por exame (HemogramaRecord)      {record_bytes / args.exams:9.0f} bytes"
+          f"  ({message_bytes / record_bytes:.0f}x menor)")
+
+    json_size = sum(len(body) for body in bodies) / args.exams
+    print(f"serializado (JSON da QueueMessage)       {json_size:9.0f} bytes")
+    print(f"serializado (layout fixo)                {RECORD_SIZE:9d} bytes  ({json_size / RECORD_SIZE:.0f}x menor)")
+
+    timed("Bundle -> HemogramaRecord", args.exams, lambda: [HemogramaRecord.from_message(m) for m in messages])
+    timed("registros -> matriz (n x 24)", args.exams, lambda: records_to_matrix(records))
+    buffer = timed("to_bytes (lote)", args.exams, lambda: b"".join(record.to_bytes() for record in records))
+    batch = timed("read_record_batch (lote)", args.exams, lambda: read_record_batch(buffer))
+
+    restored = HemogramaRecord.from_bytes(buffer[:RECORD_SIZE])
+    assert restored.results() == records[0].results(), "registro divergente após serialização"
+    assert np.array_equal(batch["values"], records_to_matrix(records), equal_nan=True), "lote divergente"
+
+
+if __name__ == "__main__":
+    main()
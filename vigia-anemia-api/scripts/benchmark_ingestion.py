@@ -0,0 +1,123 @@
+"""
+Benchmark: vazão de ingestão (decodificação + validação + enfileiramento)
+com cada backend de fila, sem depender de AWS.
+
+Backends: memory, file, sqs (stand-in local em scripts/local_sqs.py) e redis
+(se houver um Redis acessível em REDIS_HOST:REDIS_PORT).
+
+Uso:
+    python -m scripts.benchmark_ingestion [--requests 2000] [--concurrency 32]
+    python -m scripts.benchmark_ingestion --backends memory file
+"""
+import argparse
+import asyncio
+import json
+import logging
+import shutil
+import tempfile
+import time
+from uuid import uuid4
+
+import structlog
+
+structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL))
+
+from scripts.local_sqs import LocalSQSProcess  # noqa: E402
+from scripts.sample_bundles import build_sample_bundle  # noqa: E402
+from src.core.config import settings  # noqa: E402
+from src.domain.fhir_structs import decode_bundle  # noqa: E402
+from src.infrastructure.queue_backends import (  # noqa: E402
+    FileLogQueueBackend,
+    InMemoryQueueBackend,
+    QueueBackend,
+    RedisStreamsQueueBackend,
+    SQSQueueBackend,
+)
+from src.infrastructure.queue_service import QueueService  # noqa: E402
+from src.services.hemograma_service import HemogramaService  # noqa: E402
+
+
+async def ingest(service: HemogramaService, bodies: list, concurrency: int) -> float:
+    """Processa todos os bodies com no máximo `concurrency` requisições em voo; retorna req/s."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def handle(body: bytes) -> None:
+        async with semaphore:
+            bundle = decode_bundle(body)
+            success, _ = await service.process_hemograma(bundle, str(uuid4()), raw_body=body)
+            assert success
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handle(body) for body in bodies))
+    return len(bodies) / (time.perf_counter() - start)
+
+
+def drain(backend: QueueBackend) -> int:
+    """Consome e confirma todas as mensagens; retorna quantas foram recebidas."""
+    received = 0
+    while True:
+        messages = backend.receive(10, 0, 30)
+        if not messages:
+            return received
+        backend.delete_batch([message.receipt_handle for message in messages])
+        received += len(messages)
+
+
+def build_backend(name: str, workdir: str):
+    """Cria o backend e, para sqs, o stand-in local correspondente."""
+    if name == "memory":
+        return InMemoryQueueBackend(), None
+    if name == "file":
+        return FileLogQueueBackend(f"{workdir}/queue-log"), None
+    if name == "sqs":
+        server = LocalSQSProcess()
+        settings.sqs_endpoint_url = server.endpoint_url
+        settings.aws_access_key_id = settings.aws_access_key_id or "test"
+        settings.aws_secret_access_key = settings.aws_secret_access_key or "test"
+        return SQSQueueBackend(queue_url=server.queue_url), server
+    backend = RedisStreamsQueueBackend(stream_key=f"vigia:benchmark:{uuid4()}")
+    backend.client.ping()
+    return backend, None
+
+
+async def main_async(backends: list, requests: int, concurrency: int) -> None:
+    bodies = [json.dumps(build_sample_bundle(seed=seed)).encode() for seed in range(200)]
+    bodies = [bodies[position % len(bodies)] for position in range(requests)]
+    workdir = tempfile.mkdtemp(prefix="vigia-ingestion-")
+
+    print(f"requisições: {requests}, concorrência: {concurrency}")
+    print(f"{'backend':<10} {'req/s':>10} {'recebidas':>10}")
+    for name in backends:
+        try:
+            backend, server = build_backend(name, workdir)
+        except Exception as e:
+            print(f"{name:<10} indisponível: {e}")
+            continue
+
+        queue_service = QueueService(backend=backend)
+        rate = await ingest(HemogramaService(queue_service), bodies, concurrency)
+        await queue_service.flush()
+        received = drain(backend)
+        print(f"{name:<10} {rate:>10.0f} {received:>10}")
+
+        if name == "redis":
+            backend.client.delete(backend.stream_key)
+        queue_service.close()
+        if server is not None:
+            server.shutdown()
+
+    shutil.rmtree(workdir)
+
+
+def main() -> None:
+    """Ponto de entrada do benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backends", nargs="+", default=["memory", "file", "sqs", "redis"])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.backends, args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: N hemogramas enviados um a um (uma requisição por hemograma) versus
+um único malote com os N hemogramas, particionado e validado em lotes no
+executor padrão ou em um pool de processos (MALOTE_VALIDATION_PROCESSES).
+
+Mede o caminho do serviço (decodificação + validação + enfileiramento em
+memória); a economia de conexões, TLS e autenticação de uma única requisição
+HTTP vem por cima destes números.
+
+Uso:
+    python -m scripts.benchmark_malote [--exams 500] [--processes 0 2 4]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from uuid import uuid4
+
+import structlog
+
+structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL))
+
+from scripts.sample_bundles import build_sample_bundle, build_sample_malote  # noqa: E402
+from src.core.config import settings  # noqa: E402
+from src.domain.fhir_structs import decode_bundle  # noqa: E402
+from src.infrastructure.queue_backends import InMemoryQueueBackend  # noqa: E402
+from src.infrastructure.queue_service import QueueService  # noqa: E402
+from src.services.hemograma_service import HemogramaService  # noqa: E402
+from src.validators.malote import close_validation_executor, get_validation_executor  # noqa: E402
+
+
+async def one_by_one(bodies: list) -> float:
+    """Processa um hemograma por chamada (como uma requisição por exame); retorna exames/s."""
+    service = HemogramaService(QueueService(backend=InMemoryQueueBackend()))
+    start = time.perf_counter()
+    for body in bodies:
+        success, _ = await service.process_hemograma(decode_bundle(body), str(uuid4()), raw_body=body)
+        assert success
+    return len(bodies) / (time.perf_counter() - start)
+
+
+async def as_malote(body: bytes, exams: int) -> float:
+    """Processa o malote inteiro em uma chamada; retorna exames/s."""
+    service = HemogramaService(QueueService(backend=InMemoryQueueBackend()))
+    start = time.perf_counter()
+    response = await service.process_malote(body, str(uuid4()))
+    elapsed = time.perf_counter() - start
+    assert response.accepted == exams, response.exams[0]
+    return exams / elapsed
+
+
+def main() -> None:
+    """Ponto de entrada do benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--exams", type=int, default=500)
+    parser.add_argument("--processes", type=int, nargs="+", default=[0, 2])
+    args = parser.parse_args()
+
+    bodies = [json.dumps(build_sample_bundle(seed=seed)).encode() for seed in range(args.exams)]
+    malote = json.dumps(build_sample_malote(args.exams)).encode()
+    print(f"exames: {args.exams}, malote: {len(malote) / 1024 / 1024:.1f} MB")
+
+    rate = asyncio.run(one_by_one(bodies))
+    print(f"{'um hemograma por chamada':<36} {rate:10.0f} exames/s  ({args.exams} chamadas)")
+
+    for processes in args.processes:
+        settings.malote_validation_processes = processes
+        # Sobe o pool antes de medir (custo de inicialização fora da medição)
+        get_validation_executor()
+        asyncio.run(as_malote(json.dumps(build_sample_malote(2, seed=10_000)).encode(), 2))
+        rate = asyncio.run(as_malote(malote, args.exams))
+        label = f"malote ({processes} processos)" if processes else "malote (executor padrão)"
+        print(f"{label:<36} {rate:10.0f} exames/s  (1 chamada)")
+        close_validation_executor()
+
+
+if __name__ == "__main__":
+    main()
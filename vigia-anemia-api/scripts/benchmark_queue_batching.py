@@ -0,0 +1,105 @@
+"""
+Benchmark: publicação individual (SendMessage) versus micro-batching
+(SendMessageBatch) contra o stand-in local do SQS.
+
+Conta as chamadas de API feitas pelo cliente e verifica que falhas de
+entradas individuais do lote chegam apenas às requisições afetadas.
+
+Uso:
+    python -m scripts.benchmark_queue_batching [--latency-ms 20] [--concurrency 64]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+from uuid import uuid4
+
+import structlog
+
+structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL))
+
+from scripts.local_sqs import LocalSQSProcess  # noqa: E402
+from scripts.sample_bundles import build_sample_bundle  # noqa: E402
+from src.core.config import settings  # noqa: E402
+from src.domain.models import QueueMessage  # noqa: E402
+from src.infrastructure.queue_service import QueueService  # noqa: E402
+
+FAIL_MARKER = "REJEITAR-NO-LOTE"
+
+
+def make_message(raw: bytes, correlation_id: str) -> QueueMessage:
+    """Cria uma mensagem com o Bundle de exemplo."""
+    return QueueMessage(
+        tracking_id=uuid4(),
+        fhir_bundle_raw=raw,
+        received_at=datetime.utcnow(),
+        laboratory_cnes="2338424",
+        patient_cpf="52998224725",
+        correlation_id=correlation_id,
+    )
+
+
+async def run(service: QueueService, raw: bytes, concurrency: int, total: int) -> tuple:
+    """Publica `total` mensagens com no máximo `concurrency` em voo."""
+    semaphore = asyncio.Semaphore(concurrency)
+    api_calls = 0
+
+    def count_call(**kwargs) -> None:
+        nonlocal api_calls
+        api_calls += 1
+
+    service.backend.client.meta.events.register("before-call.sqs", count_call)
+
+    async def publish(position: int) -> tuple:
+        # Uma em cada 50 mensagens é rejeitada pelo stand-in no SendMessageBatch
+        correlation_id = FAIL_MARKER if position % 50 == 49 else str(uuid4())
+        async with semaphore:
+            return await service.send_message_async(make_message(raw, correlation_id))
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(publish(position) for position in range(total)))
+    elapsed = time.perf_counter() - start
+    await service.flush()
+
+    service.backend.client.meta.events.unregister("before-call.sqs", count_call)
+    failures = sum(1 for success, _ in results if not success)
+    return total / elapsed, api_calls, failures
+
+
+async def main_async(latency_ms: float, concurrency: int, total: int) -> None:
+    server = LocalSQSProcess(latency_ms=latency_ms, fail_marker=FAIL_MARKER)
+    settings.sqs_endpoint_url = server.endpoint_url
+    settings.sqs_queue_url = server.queue_url
+    settings.aws_access_key_id = settings.aws_access_key_id or "test"
+    settings.aws_secret_access_key = settings.aws_secret_access_key or "test"
+
+    # Bundle de ~32 KB: o limite de 256 KB fecha os lotes com 7-8 entradas
+    raw = json.dumps(build_sample_bundle(seed=42)).encode()
+
+    print(f"latência simulada do SQS: {latency_ms} ms, concorrência: {concurrency}, mensagens: {total}")
+    print(f"{'modo':<22} {'req/s':>8} {'chamadas API':>14} {'falhas':>8}")
+    for label, batching in (("SendMessage", False), ("SendMessageBatch", True)):
+        settings.sqs_batching_enabled = batching
+        service = QueueService()
+        rate, api_calls, failures = await run(service, raw, concurrency, total)
+        print(f"{label:<22} {rate:>8.0f} {api_calls:>14} {failures:>8}")
+        await service.flush()
+        service.close()
+
+    server.shutdown()
+
+
+def main() -> None:
+    """Ponto de entrada do benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--total", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.latency_ms, args.concurrency, args.total))
+
+
+if __name__ == "__main__":
+    main()
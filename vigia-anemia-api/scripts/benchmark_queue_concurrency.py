@@ -0,0 +1,92 @@
+"""
+Benchmark: publicações por segundo com concorrência crescente.
+
+Usa o stand-in local do SQS (scripts/local_sqs.py) com latência artificial e
+compara a chamada boto3 síncrona dentro da coroutine (bloqueia o event loop)
+com QueueService.send_message_async (executor dedicado + pool de conexões).
+
+Uso:
+    python -m scripts.benchmark_queue_concurrency [--latency-ms 20]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+from uuid import uuid4
+
+import structlog
+
+structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+from scripts.local_sqs import LocalSQSProcess  # noqa: E402
+from scripts.sample_bundles import build_sample_bundle  # noqa: E402
+from src.core.config import settings  # noqa: E402
+from src.domain.models import QueueMessage  # noqa: E402
+from src.infrastructure.queue_service import QueueService  # noqa: E402
+
+
+def make_message(raw: bytes) -> QueueMessage:
+    """Cria uma mensagem com o Bundle de exemplo."""
+    return QueueMessage(
+        tracking_id=uuid4(),
+        fhir_bundle_raw=raw,
+        received_at=datetime.utcnow(),
+        laboratory_cnes="2338424",
+        patient_cpf="52998224725",
+        correlation_id=str(uuid4()),
+    )
+
+
+async def run(service: QueueService, raw: bytes, concurrency: int, total: int, blocking: bool) -> float:
+    """Dispara `total` publicações com no máximo `concurrency` em voo; retorna publicações/s."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def publish() -> None:
+        async with semaphore:
+            message = make_message(raw)
+            if blocking:
+                success, _ = service.send_message(message)
+            else:
+                success, _ = await service.send_message_async(message)
+            assert success
+
+    start = time.perf_counter()
+    await asyncio.gather(*(publish() for _ in range(total)))
+    return total / (time.perf_counter() - start)
+
+
+async def main_async(latency_ms: float, levels: list) -> None:
+    server = LocalSQSProcess(latency_ms=latency_ms)
+    settings.sqs_endpoint_url = server.endpoint_url
+    settings.sqs_queue_url = server.queue_url
+    settings.aws_access_key_id = settings.aws_access_key_id or "test"
+    settings.aws_secret_access_key = settings.aws_secret_access_key or "test"
+
+    service = QueueService()
+    raw = json.dumps(build_sample_bundle(seed=42)).encode()
+
+    print(f"latência simulada do SQS: {latency_ms} ms, workers: {settings.sqs_publisher_max_workers}")
+    print(f"{'concorrência':>12} {'bloqueante req/s':>18} {'assíncrono req/s':>18}")
+    for concurrency in levels:
+        total = max(100, concurrency * 10)
+        blocking = await run(service, raw, concurrency, min(total, 200), blocking=True)
+        non_blocking = await run(service, raw, concurrency, total, blocking=False)
+        print(f"{concurrency:>12} {blocking:>18.0f} {non_blocking:>18.0f}")
+
+    service.close()
+    server.shutdown()
+
+
+def main() -> None:
+    """Ponto de entrada do benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16, 32, 64])
+    args = parser.parse_args()
+    asyncio.run(main_async(args.latency_ms, args.levels))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Microbenchmark: serialização do corpo da mensagem de fila.
+
+Compara a re-serialização do Bundle decodificado (model_dump_json) com o
+repasse dos bytes originais da requisição (QueueMessage.to_json).
+
+Uso:
+    python -m scripts.benchmark_queue_message [--iterations N]
+"""
+import argparse
+import json
+from datetime import datetime
+from uuid import uuid4
+
+from scripts.benchmark_bundle_index import measure
+from scripts.sample_bundles import build_sample_bundle
+from src.domain.models import QueueMessage
+
+
+def main() -> None:
+    """Ponto de entrada do benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    bundle = build_sample_bundle(seed=42)
+    raw = json.dumps(bundle).encode()
+    metadata = dict(
+        tracking_id=uuid4(),
+        received_at=datetime.utcnow(),
+        laboratory_cnes="2338424",
+        patient_cpf="52998224725",
+        correlation_id="benchmark",
+    )
+    decoded = QueueMessage(fhir_bundle=bundle, **metadata)
+    passthrough = QueueMessage(fhir_bundle_raw=raw, **metadata)
+
+    assert json.loads(passthrough.to_json())["fhir_bundle"] == bundle
+
+    before = measure("model_dump_json (dict)", decoded.model_dump_json, args.iterations)
+    after = measure("to_json (bytes originais)", passthrough.to_json, args.iterations)
+    print(f"speedup: {before / after:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
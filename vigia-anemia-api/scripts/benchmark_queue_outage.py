@@ -0,0 +1,128 @@
+"""
+Cenário de indisponibilidade do SQS com spool local e circuit breaker.
+
+1. SQS disponível: publicações normais.
+2. SQS derrubado: as primeiras falhas abrem o circuito e as mensagens seguintes
+   vão direto para o spool (latência de gravação local).
+3. Reinício do processo: um novo QueueService reabre o spool do disco.
+4. SQS de volta: o drenador reenvia o spool e confere se nada se perdeu.
+
+Uso:
+    python -m scripts.benchmark_queue_outage [--messages 300]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import shutil
+import socket
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from uuid import uuid4
+
+import structlog
+
+structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL))
+
+from scripts.local_sqs import LocalSQSProcess  # noqa: E402
+from scripts.sample_bundles import build_sample_bundle  # noqa: E402
+from src.core.config import settings  # noqa: E402
+from src.domain.models import QueueMessage  # noqa: E402
+from src.infrastructure.queue_service import QueueService  # noqa: E402
+
+
+def free_port() -> int:
+    """Reserva uma porta local livre."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def publish(service: QueueService, raw: bytes, count: int) -> list:
+    """Publica `count` mensagens em sequência; retorna latências em ms e resultados."""
+    latencies, results = [], []
+    for _ in range(count):
+        message = QueueMessage(
+            tracking_id=uuid4(),
+            fhir_bundle_raw=raw,
+            received_at=datetime.utcnow(),
+            laboratory_cnes="2338424",
+            patient_cpf="52998224725",
+            correlation_id=str(uuid4()),
+        )
+        start = time.perf_counter()
+        results.append(await service.send_message_async(message))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies, results
+
+
+def summary(label: str, latencies: list, results: list) -> None:
+    """Imprime latência mediana/p99 e quantas mensagens foram para o spool."""
+    ordered = sorted(latencies)
+    spooled = sum(1 for _, result in results if str(result).startswith("spool:"))
+    accepted = sum(1 for success, _ in results if success)
+    print(
+        f"{label:<28} p50 {statistics.median(ordered):7.2f} ms  "
+        f"p99 {ordered[int(len(ordered) * 0.99) - 1]:7.2f} ms  "
+        f"aceitas {accepted}/{len(results)}  spool {spooled}"
+    )
+
+
+async def main_async(messages: int) -> None:
+    port = free_port()
+    spool_dir = tempfile.mkdtemp(prefix="vigia-spool-")
+    settings.sqs_endpoint_url = f"http://127.0.0.1:{port}"
+    settings.sqs_queue_url = f"{settings.sqs_endpoint_url}/000000000000/hemograma-queue"
+    settings.aws_access_key_id = settings.aws_access_key_id or "test"
+    settings.aws_secret_access_key = settings.aws_secret_access_key or "test"
+    settings.queue_spool_enabled = True
+    settings.queue_spool_dir = spool_dir
+    settings.sqs_circuit_reset_timeout_s = 0.5
+    settings.queue_spool_drain_interval_ms = 50
+
+    raw = json.dumps(build_sample_bundle(seed=42)).encode()
+
+    server = LocalSQSProcess(latency_ms=5, port=port)
+    service = QueueService()
+    service.start_spool_drainer()
+    summary("SQS disponível", *await publish(service, raw, messages))
+
+    server.shutdown()
+    latencies, results = await publish(service, raw, messages)
+    summary("SQS indisponível", latencies, results)
+    spooled = sum(1 for _, result in results if str(result).startswith("spool:"))
+
+    # Reinício: o spool sobrevive ao processo e é reaberto a partir do disco
+    await service.flush()
+    service.close()
+    service = QueueService()
+
+    server = LocalSQSProcess(latency_ms=5, port=port)
+    service.start_spool_drainer()
+    start = time.perf_counter()
+    while service.spool_pending:
+        await asyncio.sleep(0.05)
+    print(f"{'spool drenado após retorno':<28} {time.perf_counter() - start:7.2f} s")
+
+    # O stand-in reiniciado começa vazio: a fila deve conter exatamente o spool
+    attributes = service.get_queue_attributes()
+    print(f"mensagens reenviadas: {attributes['ApproximateNumberOfMessages']} (no spool: {spooled})")
+
+    await service.flush()
+    service.close()
+    server.shutdown()
+    shutil.rmtree(spool_dir)
+
+
+def main() -> None:
+    """Ponto de entrada do cenário."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=300)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.messages))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark: custo por requisição do rate limit por laboratório (token bucket),
+no modo em processo e, com --redis, no modo Redis (script Lua atômico, uma
+ida ao Redis de REDIS_HOST por requisição).
+
+Uso:
+    python -m scripts.benchmark_rate_limiter [--requests 200000] [--labs 500] [--redis]
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+import structlog
+
+structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL))
+
+from src.infrastructure.rate_limiter import InMemoryRateLimiter, RateLimiter, RedisRateLimiter  # noqa: E402
+from src.infrastructure.redis_client import close_async_redis  # noqa: E402
+
+
+async def measure(label: str, limiter: RateLimiter, requests: int, labs: int) -> None:
+    """Distribui `requests` entre `labs` chaves e imprime o custo médio e a fração negada."""
+    keys = [f"cnes:{2000000 + lab}" for lab in range(labs)]
+    denied = 0
+    start = time.perf_counter()
+    for position in range(requests):
+        decision = await limiter.acquire(keys[position % labs])
+        denied += not decision.allowed
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed / requests * 1e6:8.2f} µs/req  negadas: {denied / requests:6.1%}")
+
+
+async def run(requests: int, labs: int, use_redis: bool) -> None:
+    """Executa as medições."""
+    await measure("em processo (memory)", InMemoryRateLimiter(100, 20), requests, labs)
+    if use_redis:
+        await measure("Redis (script Lua)", RedisRateLimiter(100, 20), requests // 20 or 1, labs)
+        await close_async_redis()
+
+
+def main() -> None:
+    """Ponto de entrada do benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200000)
+    parser.add_argument("--labs", type=int, default=500)
+    parser.add_argument("--redis", action="store_true", help="Mede também o modo Redis (REDIS_HOST)")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.labs, args.redis))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark: triagem hematológica exame a exame (Python puro) versus por lote
+com máscaras NumPy (src.services.triage_engine), e estimativa do tempo de um
+reprocessamento (backfill) de milhões de exames.
+
+Uso:
+    python -m scripts.benchmark_triage [--exams 50000] [--backfill 2000000]
+"""
+import argparse
+import logging
+import random
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+import structlog
+
+structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+from scripts.sample_bundles import build_sample_bundle  # noqa: E402
+from src.domain.models import LoincCode  # noqa: E402
+from src.services.triage_engine import DEFAULT_TRIAGE_RULES, triage_engine  # noqa: E402
+
+_FACTORS = {"g/dL": 1.0, "/uL": 1.0, "10*3/uL": 1000.0, "%": 1.0}
+_PRIORITY_ORDER = {"elective": 0, "priority": 1, "urgent": 2}
+
+
+def triage_one(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Triagem por exame: lê os analitos do Bundle e aplica as regras com if/else."""
+    analytes: Dict[str, float] = {}
+    for entry in message["fhir_bundle"]["entry"]:
+        resource = entry["resource"]
+        quantity = resource.get("valueQuantity")
+        if quantity:
+            analytes[resource["code"]["coding"][0]["code"]] = quantity["value"] * _FACTORS.get(quantity["unit"], 1.0)
+
+    leukocytes = analytes.get(LoincCode.LEUCOCITOS.value)
+    segmented = analytes.get(LoincCode.SEGMENTADOS.value)
+    columns = {
+        "hemoglobin_g_dl": analytes.get(LoincCode.HEMOGLOBINA.value),
+        "platelets_per_mm3": analytes.get(LoincCode.PLAQUETAS.value),
+        "blasts_percent": analytes.get(LoincCode.BLASTOS.value),
+        "neutrophils_per_mm3": (
+            leukocytes * (segmented + analytes.get(LoincCode.BASTONETES.value, 0.0)) / 100.0
+            if leukocytes is not None and segmented is not None else None
+        ),
+    }
+
+    priority, reasons = "elective", []
+    for rule in DEFAULT_TRIAGE_RULES:
+        value = columns.get(rule.column)
+        if value is None:
+            continue
+        if (rule.operator == "lt" and value < rule.threshold) or (rule.operator == "gt" and value > rule.threshold):
+            reasons.append(rule.name)
+            if _PRIORITY_ORDER[rule.priority.value] > _PRIORITY_ORDER[priority]:
+                priority = rule.priority.value
+    return {"priority": priority, "reasons": reasons}
+
+
+def build_messages(count: int, templates: int = 500) -> List[Dict[str, Any]]:
+    """Gera `templates` Bundles com analitos variados e os repete até `count` mensagens."""
+    rng = random.Random(11)
+    distinct = []
+    for seed in range(templates):
+        values = {}
+        if rng.random() < 0.1:
+            values[LoincCode.HEMOGLOBINA.value] = round(rng.uniform(5.0, 10.0), 1)
+        if rng.random() < 0.05:
+            values[LoincCode.PLAQUETAS.value] = round(rng.uniform(5.0, 120.0), 1)
+        if rng.random() < 0.05:
+            values[LoincCode.LEUCOCITOS.value] = round(rng.uniform(800.0, 2500.0))
+        if rng.random() < 0.02:
+            values[LoincCode.BLASTOS.value] = round(rng.uniform(1.0, 30.0), 1)
+        distinct.append({"tracking_id": str(seed), "fhir_bundle": build_sample_bundle(seed=seed, values=values)})
+    return [distinct[position % templates] for position in range(count)]
+
+
+def timed(label: str, count: int, func):
+    """Executa `func` uma vez e imprime a vazão em exames/s; retorna (resultado, exames/s)."""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed * 1000:9.1f} ms  {count / elapsed:12.0f} exames/s")
+    return result, count / elapsed
+
+
+def main() -> None:
+    """Ponto de entrada do benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--exams", type=int, default=50000)
+    parser.add_argument("--backfill", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    messages = build_messages(args.exams)
+    print(f"exames: {args.exams}, regras: {len(DEFAULT_TRIAGE_RULES)}")
+
+    scalar, _ = timed("por exame (Python puro)", args.exams, lambda: [triage_one(m) for m in messages])
+    batched, rate = timed("lote NumPy (extração + regras)", args.exams, lambda: triage_engine.triage_messages(messages))
+    assert scalar == batched, "triagens divergentes"
+
+    rng = np.random.default_rng(11)
+    size = 1_000_000
+    columns = {
+        "hemoglobin_g_dl": rng.uniform(5, 16, size),
+        "leukocytes_per_mm3": rng.uniform(500, 12000, size),
+        "segmented_percent": rng.uniform(20, 70, size),
+        "band_percent": rng.uniform(0, 6, size),
+        "platelets_per_mm3": rng.uniform(5000, 400000, size),
+        "blasts_percent": np.where(rng.random(size) < 0.01, 5.0, 0.0),
+    }
+    columns["neutrophils_per_mm3"] = columns["leukocytes_per_mm3"] * columns["segmented_percent"] / 100.0
+    timed("lote NumPy (só regras, 1M)", size, lambda: triage_engine.score(columns))
+
+    counts: Dict[str, int] = {}
+    for item in batched:
+        counts[item["priority"]] = counts.get(item["priority"], 0) + 1
+    print("distribuição:", ", ".join(f"{label}={count}" for label, count in sorted(counts.items())))
+    print(f"backfill de {args.backfill} exames (1 núcleo, Bundles já decodificados): {args.backfill / rate / 60:.1f} min")
+
+
+if __name__ == "__main__":
+    main()
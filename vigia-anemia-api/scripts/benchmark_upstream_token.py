@@ -0,0 +1,91 @@
+"""
+Benchmark: obtenção do token do serviço de autorização com um cliente HTTP
+novo por chamada versus UpstreamTokenProvider (cliente com pool, single-flight
+e renovação antecipada), contra o stand-in local (scripts/local_auth.py).
+
+Mede, para rajadas de chamadores concorrentes, quantas buscas chegam ao
+upstream e a latência vista pelos chamadores; depois mantém chamadas
+contínuas por alguns ciclos de `expires_in` curto para verificar que a
+renovação nunca aparece no caminho dos chamadores.
+
+Uso:
+    python -m scripts.benchmark_upstream_token [--callers 200] [--latency-ms 50]
+"""
+import argparse
+import asyncio
+import logging
+import time
+from typing import List
+
+import httpx
+import structlog
+
+structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL))
+
+from scripts.local_auth import LocalAuthServer  # noqa: E402
+from src.infrastructure.upstream_token import UpstreamTokenProvider  # noqa: E402
+
+
+async def fetch_with_new_client(url: str) -> str:
+    """Caminho anterior: um AsyncClient (conexão e handshake) por chamada."""
+    async with httpx.AsyncClient() as client:
+        response = await client.get(url, timeout=10.0)
+        return response.json()["access_token"]
+
+
+def summarize(label: str, latencies: List[float], fetches: int) -> None:
+    """Imprime latência p50/máxima dos chamadores e buscas no upstream."""
+    latencies = sorted(latencies)
+    p50 = latencies[len(latencies) // 2] * 1000
+    worst = latencies[-1] * 1000
+    print(f"{label:<34} p50 {p50:8.2f} ms  máx {worst:8.2f} ms  buscas no upstream: {fetches}")
+
+
+async def timed_call(call) -> float:
+    """Executa `call` e retorna a duração em segundos."""
+    start = time.perf_counter()
+    assert await call()
+    return time.perf_counter() - start
+
+
+async def run(callers: int, latency_ms: float) -> None:
+    """Executa as medições."""
+    server = LocalAuthServer(latency_ms=latency_ms, expires_in=3600).start()
+
+    latencies = await asyncio.gather(*(
+        timed_call(lambda: fetch_with_new_client(server.url)) for _ in range(callers)
+    ))
+    summarize("cliente novo por chamada", latencies, server.issued)
+
+    server.issued = 0
+    provider = UpstreamTokenProvider(server.url)
+    latencies = await asyncio.gather(*(timed_call(provider.get_token) for _ in range(callers)))
+    summarize("single-flight (sem token)", latencies, server.issued)
+    await provider.close()
+
+    # Renovação antecipada: expires_in curto, token obtido na inicialização
+    server.issued = 0
+    server.expires_in = 1.0
+    provider = UpstreamTokenProvider(server.url, refresh_margin_s=0.3)
+    await provider.start()
+    latencies = []
+    deadline = time.monotonic() + 3.5
+    while time.monotonic() < deadline:
+        latencies.extend(await asyncio.gather(*(timed_call(provider.get_token) for _ in range(20))))
+        await asyncio.sleep(0.005)
+    summarize("renovação antecipada (3,5 s)", latencies, server.issued)
+    await provider.close()
+    server.shutdown()
+
+
+def main() -> None:
+    """Ponto de entrada do benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--callers", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.callers, args.latency_ms))
+
+
+if __name__ == "__main__":
+    main()
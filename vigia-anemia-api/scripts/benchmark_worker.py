@@ -0,0 +1,122 @@
+"""
+Benchmark: vazão do worker (mensagens processadas por segundo).
+
+Enfileira N mensagens no backend em memória (via QueueService, com ou sem
+envelope zstd) e mede o tempo do worker para consumir, processar e remover
+todas, com processamento em threads ou em um pool de processos. Ao final
+estima quantos workers atendem a carga diária de hemogramas com folga.
+
+Uso:
+    python -m scripts.benchmark_worker [--messages 2000] [--concurrency 32]
+    python -m scripts.benchmark_worker --processes 0 2 4 --compressed
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from uuid import uuid4
+
+import structlog
+
+structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+from scripts.sample_bundles import build_sample_bundle  # noqa: E402
+from src.core.config import settings  # noqa: E402
+from src.domain.models import QueueMessage  # noqa: E402
+from src.infrastructure.queue_backends import InMemoryQueueBackend  # noqa: E402
+from src.infrastructure.queue_service import QueueService  # noqa: E402
+from src.worker.consumer import HemogramaWorker  # noqa: E402
+from src.worker.results import MemoryResultSink  # noqa: E402
+
+
+async def fill(backend: InMemoryQueueBackend, bodies: list, messages: int) -> None:
+    """Enfileira `messages` mensagens pelo QueueService (mesmo formato da API)."""
+    service = QueueService(backend=backend)
+    for position in range(messages):
+        success, _ = await service.send_message_async(QueueMessage(
+            tracking_id=uuid4(),
+            fhir_bundle_raw=bodies[position % len(bodies)],
+            received_at=datetime.utcnow(),
+            laboratory_cnes="2338424",
+            patient_cpf="52998224725",
+            correlation_id=str(uuid4()),
+        ))
+        assert success
+    await service.flush()
+
+
+async def consume(backend: InMemoryQueueBackend, messages: int, concurrency: int, processes: int) -> float:
+    """Executa o worker até processar todas as mensagens; retorna mensagens/s."""
+    pool = ProcessPoolExecutor(max_workers=processes) if processes else None
+    if pool is not None:
+        # Sobe os processos antes da medição
+        list(pool.map(abs, range(processes)))
+
+    worker = HemogramaWorker(
+        backend,
+        MemoryResultSink(),
+        process_executor=pool,
+        concurrency=concurrency,
+        wait_time_s=0.5,
+        delete_interval_ms=100.0,
+        report_interval_s=3600.0,
+    )
+
+    async def stop_when_done() -> None:
+        while worker.stats.processed + worker.stats.failed < messages:
+            await asyncio.sleep(0.01)
+        worker.stop()
+
+    start = time.perf_counter()
+    await asyncio.gather(worker.run(), stop_when_done())
+    elapsed = time.perf_counter() - start
+
+    if pool is not None:
+        pool.shutdown()
+    assert worker.stats.failed == 0, f"{worker.stats.failed} mensagens falharam"
+    return messages / elapsed
+
+
+async def main_async(messages: int, concurrency: int, process_levels: list, compressed: bool, daily: int) -> None:
+    settings.queue_envelope_compression = compressed
+    bodies = [json.dumps(build_sample_bundle(seed=seed)).encode() for seed in range(200)]
+
+    print(f"mensagens: {messages}, concorrência: {concurrency}, envelope zstd: {compressed}, CPUs: {os.cpu_count()}")
+    print(f"{'processamento':<16} {'msgs/s':>10}")
+    best = 0.0
+    for processes in process_levels:
+        backend = InMemoryQueueBackend()
+        await fill(backend, bodies, messages)
+        rate = await consume(backend, messages, concurrency, processes)
+        remaining = int(backend.get_attributes()['ApproximateNumberOfMessages'])
+        assert remaining == 0, f"{remaining} mensagens ainda na fila"
+        label = f"{processes} processos" if processes else "threads"
+        print(f"{label:<16} {rate:>10.0f}")
+        best = max(best, rate)
+
+    # Dimensionamento: carga diária concentrada no horário comercial (10 h),
+    # pico de 3x a média desse período e folga de 2x sobre o pico
+    peak = daily / (10 * 3600) * 3
+    print(f"carga: {daily}/dia -> pico estimado {peak:.1f} msgs/s, com folga 2x {2 * peak:.1f} msgs/s")
+    print(f"workers necessários (melhor configuração): {max(1, math.ceil(2 * peak / best))}")
+
+
+def main() -> None:
+    """Ponto de entrada do benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--processes", type=int, nargs="+", default=[0, os.cpu_count() or 1])
+    parser.add_argument("--compressed", action="store_true")
+    parser.add_argument("--daily", type=int, default=65000)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.messages, args.concurrency, args.processes, args.compressed, args.daily))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Stand-in local do serviço de autorização da SES-GO para benchmarks.
+
+Responde a qualquer GET com um token novo (`access_token`, `expires_in`),
+após uma latência artificial que simula o round trip e o handshake até o
+serviço real. Conta os tokens emitidos, para medir quantas buscas chegam ao
+upstream.
+
+Uso isolado:
+    python -m scripts.local_auth --port 9400 --latency-ms 50 --expires-in 3600
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from uuid import uuid4
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "LocalAuthServer"
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):  # noqa: A002 - assinatura da stdlib
+        pass
+
+    def do_GET(self):  # noqa: N802 - nome exigido pela stdlib
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        with self.server.lock:
+            self.server.issued += 1
+            failing = self.server.failing
+        if failing:
+            self._reply(503, {"error": "indisponível"})
+            return
+        self._reply(200, {
+            "access_token": f"token-{uuid4()}",
+            "token_type": "Bearer",
+            "expires_in": self.server.expires_in,
+        })
+
+    def _reply(self, status: int, payload: dict) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class LocalAuthServer(ThreadingHTTPServer):
+    """Servidor HTTP multi-thread que emite tokens como o serviço de autorização."""
+
+    daemon_threads = True
+    # Rajadas de conexões novas (um cliente por chamada) além do backlog padrão de 5
+    request_queue_size = 1024
+
+    def __init__(self, port: int = 0, latency_ms: float = 0.0, expires_in: float = 3600):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency = latency_ms / 1000.0
+        self.expires_in = expires_in
+        self.lock = threading.Lock()
+        self.issued = 0
+        self.failing = False
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/api/token"
+
+    def start(self) -> "LocalAuthServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main() -> None:
+    """Executa o stand-in até Ctrl+C."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=9400)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--expires-in", type=float, default=3600)
+    args = parser.parse_args()
+
+    server = LocalAuthServer(args.port, args.latency_ms, args.expires_in)
+    print(f"Serviço de autorização local em {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Stand-in local do AWS SQS (protocolo query/XML) para benchmarks.
+
+Implementa em memória as ações usadas pela API e pelos workers:
+SendMessage, SendMessageBatch, ReceiveMessage, DeleteMessage,
+DeleteMessageBatch, ChangeMessageVisibility(Batch) e GetQueueAttributes.
+Uma latência artificial por chamada simula o round trip até a AWS.
+
+Uso isolado:
+    python -m scripts.local_sqs --port 9324 --latency-ms 20
+"""
+import argparse
+import hashlib
+import multiprocessing
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+from uuid import uuid4
+from xml.sax.saxutils import escape
+
+NAMESPACE = "http://queue.amazonaws.com/doc/2012-11-05/"
+
+
+class InMemoryQueue:
+    """Fila em memória com visibilidade temporária de mensagens recebidas."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.available: deque = deque()
+        self.in_flight: Dict[str, Tuple[float, str, str]] = {}
+        self.sent_requests = 0
+        self.sent_messages = 0
+
+    def send(self, body: str) -> str:
+        message_id = str(uuid4())
+        with self.lock:
+            self.available.append((message_id, body))
+            self.sent_messages += 1
+        return message_id
+
+    def receive(self, max_messages: int, visibility_timeout: float) -> List[Tuple[str, str, str]]:
+        now = time.monotonic()
+        received = []
+        with self.lock:
+            # Mensagens cuja visibilidade expirou voltam para a fila
+            for handle, (deadline, message_id, body) in list(self.in_flight.items()):
+                if deadline <= now:
+                    del self.in_flight[handle]
+                    self.available.append((message_id, body))
+            while self.available and len(received) < max_messages:
+                message_id, body = self.available.popleft()
+                handle = str(uuid4())
+                self.in_flight[handle] = (now + visibility_timeout, message_id, body)
+                received.append((message_id, handle, body))
+        return received
+
+    def delete(self, handle: str) -> bool:
+        with self.lock:
+            return self.in_flight.pop(handle, None) is not None
+
+    def change_visibility(self, handle: str, timeout: float) -> bool:
+        with self.lock:
+            item = self.in_flight.get(handle)
+            if item is None:
+                return False
+            self.in_flight[handle] = (time.monotonic() + timeout, item[1], item[2])
+            return True
+
+
+def _md5(value: str) -> str:
+    return hashlib.md5(value.encode("utf-8")).hexdigest()
+
+
+def _entries(params: Dict[str, str], prefix: str) -> List[Dict[str, str]]:
+    """Agrupa parâmetros `Prefix.N.Campo` em uma lista de dicionários."""
+    grouped: Dict[int, Dict[str, str]] = {}
+    for key, value in params.items():
+        if not key.startswith(prefix + "."):
+            continue
+        parts = key[len(prefix) + 1:].split(".", 1)
+        if len(parts) == 2 and parts[0].isdigit():
+            grouped.setdefault(int(parts[0]), {})[parts[1]] = value
+    return [grouped[position] for position in sorted(grouped)]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "LocalSQSServer"
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):  # noqa: A002 - assinatura da stdlib
+        pass
+
+    def do_POST(self):  # noqa: N802 - nome exigido pela stdlib
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length).decode("utf-8")
+        params = {key: values[0] for key, values in parse_qs(raw, keep_blank_values=True).items()}
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        action = params.get("Action", "")
+        handler = getattr(self, f"_action_{action}", None)
+        if handler is None:
+            self._reply(400, f"<ErrorResponse><Error><Code>InvalidAction</Code>"
+                             f"<Message>{escape(action)}</Message></Error></ErrorResponse>")
+            return
+        result = handler(params)
+        self._reply(200, (
+            f'<{action}Response xmlns="{NAMESPACE}">'
+            f"<{action}Result>{result}</{action}Result>"
+            f"<ResponseMetadata><RequestId>{uuid4()}</RequestId></ResponseMetadata>"
+            f"</{action}Response>"
+        ))
+
+    def _reply(self, status: int, payload: str) -> None:
+        data = payload.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/xml")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _action_SendMessage(self, params: Dict[str, str]) -> str:  # noqa: N802
+        queue = self.server.queue
+        queue.sent_requests += 1
+        body = params.get("MessageBody", "")
+        message_id = queue.send(body)
+        return f"<MessageId>{message_id}</MessageId><MD5OfMessageBody>{_md5(body)}</MD5OfMessageBody>"
+
+    def _action_SendMessageBatch(self, params: Dict[str, str]) -> str:  # noqa: N802
+        queue = self.server.queue
+        queue.sent_requests += 1
+        results = []
+        for entry in _entries(params, "SendMessageBatchRequestEntry"):
+            body = entry.get("MessageBody", "")
+            if self.server.fail_marker and self.server.fail_marker in body:
+                results.append(
+                    f"<BatchResultErrorEntry><Id>{entry['Id']}</Id><Code>InvalidMessageContents</Code>"
+                    f"<SenderFault>true</SenderFault><Message>rejeitada</Message></BatchResultErrorEntry>"
+                )
+                continue
+            message_id = queue.send(body)
+            results.append(
+                f"<SendMessageBatchResultEntry><Id>{entry['Id']}</Id><MessageId>{message_id}</MessageId>"
+                f"<MD5OfMessageBody>{_md5(body)}</MD5OfMessageBody></SendMessageBatchResultEntry>"
+            )
+        return "".join(results)
+
+    def _action_ReceiveMessage(self, params: Dict[str, str]) -> str:  # noqa: N802
+        max_messages = int(params.get("MaxNumberOfMessages", 1))
+        visibility = float(params.get("VisibilityTimeout", 30))
+        wait = float(params.get("WaitTimeSeconds", 0))
+        deadline = time.monotonic() + wait
+        received = self.server.queue.receive(max_messages, visibility)
+        while not received and time.monotonic() < deadline:
+            time.sleep(0.01)
+            received = self.server.queue.receive(max_messages, visibility)
+        return "".join(
+            f"<Message><MessageId>{message_id}</MessageId><ReceiptHandle>{handle}</ReceiptHandle>"
+            f"<MD5OfBody>{_md5(body)}</MD5OfBody><Body>{escape(body)}</Body></Message>"
+            for message_id, handle, body in received
+        )
+
+    def _action_DeleteMessage(self, params: Dict[str, str]) -> str:  # noqa: N802
+        self.server.queue.delete(params.get("ReceiptHandle", ""))
+        return ""
+
+    def _action_DeleteMessageBatch(self, params: Dict[str, str]) -> str:  # noqa: N802
+        results = []
+        for entry in _entries(params, "DeleteMessageBatchRequestEntry"):
+            self.server.queue.delete(entry.get("ReceiptHandle", ""))
+            results.append(f"<DeleteMessageBatchResultEntry><Id>{entry['Id']}</Id></DeleteMessageBatchResultEntry>")
+        return "".join(results)
+
+    def _action_ChangeMessageVisibility(self, params: Dict[str, str]) -> str:  # noqa: N802
+        self.server.queue.change_visibility(
+            params.get("ReceiptHandle", ""), float(params.get("VisibilityTimeout", 30))
+        )
+        return ""
+
+    def _action_ChangeMessageVisibilityBatch(self, params: Dict[str, str]) -> str:  # noqa: N802
+        results = []
+        for entry in _entries(params, "ChangeMessageVisibilityBatchRequestEntry"):
+            self.server.queue.change_visibility(
+                entry.get("ReceiptHandle", ""), float(entry.get("VisibilityTimeout", 30))
+            )
+            results.append(
+                f"<ChangeMessageVisibilityBatchResultEntry><Id>{entry['Id']}</Id>"
+                f"</ChangeMessageVisibilityBatchResultEntry>"
+            )
+        return "".join(results)
+
+    def _action_GetQueueAttributes(self, params: Dict[str, str]) -> str:  # noqa: N802
+        queue = self.server.queue
+        with queue.lock:
+            attributes = {
+                "ApproximateNumberOfMessages": len(queue.available),
+                "ApproximateNumberOfMessagesNotVisible": len(queue.in_flight),
+                "ApproximateNumberOfMessagesDelayed": 0,
+            }
+        return "".join(
+            f"<Attribute><Name>{name}</Name><Value>{value}</Value></Attribute>"
+            for name, value in attributes.items()
+        )
+
+
+class LocalSQSServer(ThreadingHTTPServer):
+    """Servidor HTTP multi-thread que responde como o SQS."""
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency_ms: float = 0.0, fail_marker: Optional[str] = None):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency = latency_ms / 1000.0
+        self.fail_marker = fail_marker
+        self.queue = InMemoryQueue()
+
+    @property
+    def endpoint_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    @property
+    def queue_url(self) -> str:
+        return f"{self.endpoint_url}/000000000000/hemograma-queue"
+
+    def start(self) -> "LocalSQSServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def _serve(port_queue, port: int, latency_ms: float, fail_marker: Optional[str]) -> None:
+    server = LocalSQSServer(port, latency_ms, fail_marker)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+class LocalSQSProcess:
+    """
+    Executa o stand-in em um processo separado, para que o parsing do lado
+    "servidor" não dispute o GIL com o cliente medido.
+    """
+
+    def __init__(self, latency_ms: float = 0.0, fail_marker: Optional[str] = None, port: int = 0):
+        port_queue = multiprocessing.Queue()
+        self.process = multiprocessing.Process(
+            target=_serve, args=(port_queue, port, latency_ms, fail_marker), daemon=True
+        )
+        self.process.start()
+        self.port = port_queue.get(timeout=10)
+
+    @property
+    def endpoint_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def queue_url(self) -> str:
+        return f"{self.endpoint_url}/000000000000/hemograma-queue"
+
+    def shutdown(self) -> None:
+        self.process.terminate()
+        self.process.join()
+
+
+def main() -> None:
+    """Executa o stand-in em primeiro plano."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=9324)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    server = LocalSQSServer(args.port, args.latency_ms)
+    print(f"SQS local em {server.endpoint_url} (fila: {server.queue_url})")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Geração de Bundles FHIR de exemplo conforme o perfil da SES-GO.
+Usado pelos benchmarks para produzir payloads realistas (~25 KB por hemograma).
+"""
+import random
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+from src.core.config import settings
+from src.domain.models import LoincCode
+
+# Unidade UCUM e valor típico de cada exame simples
+SAMPLE_RESULTS = {
+    LoincCode.HEMACEAS.value: ("10*12/L", 4.5),
+    LoincCode.HEMOGLOBINA.value: ("g/dL", 12.5),
+    LoincCode.HEMATOCRITO.value: ("%", 38.0),
+    LoincCode.VCM.value: ("fL", 85.0),
+    LoincCode.HCM.value: ("pg", 28.0),
+    LoincCode.CHCM.value: ("g/dL", 33.0),
+    LoincCode.RDW.value: ("%", 13.0),
+    LoincCode.LEUCOCITOS.value: ("/uL", 7500.0),
+    LoincCode.PROMIELOCITOS.value: ("%", 0.0),
+    LoincCode.MIELOCITOS.value: ("%", 0.0),
+    LoincCode.METAMIELOCITOS.value: ("%", 0.0),
+    LoincCode.BASTONETES.value: ("%", 3.0),
+    LoincCode.SEGMENTADOS.value: ("%", 55.0),
+    LoincCode.MONOCITOS.value: ("%", 6.0),
+    LoincCode.EOSINOFILOS.value: ("%", 3.0),
+    LoincCode.BASOFILOS.value: ("%", 1.0),
+    LoincCode.LINFOCITOS.value: ("%", 32.0),
+    LoincCode.LINFOCITOS_ATIPICOS.value: ("%", 0.0),
+    LoincCode.PRO_LINFOCITOS.value: ("%", 0.0),
+    LoincCode.BLASTOS.value: ("%", 0.0),
+    LoincCode.PLAQUETAS.value: ("10*3/uL", 250.0),
+    LoincCode.PLAQUETOCRITO.value: ("%", 0.25),
+    LoincCode.VPM.value: ("fL", 9.5),
+    LoincCode.PDW.value: ("fL", 12.0),
+}
+
+
+def generate_cpf(rng: random.Random) -> str:
+    """Gera um CPF válido (com dígitos verificadores corretos)."""
+    digits = [rng.randint(0, 9) for _ in range(9)]
+    while len(set(digits)) == 1:
+        digits = [rng.randint(0, 9) for _ in range(9)]
+    for weight_start in (10, 11):
+        total = sum(d * w for d, w in zip(digits, range(weight_start, 1, -1)))
+        remainder = total % 11
+        digits.append(0 if remainder < 2 else 11 - remainder)
+    return "".join(map(str, digits))
+
+
+def _observation(
+    code: str,
+    display: str,
+    cpf: str,
+    cnes: str,
+    collected_at: str,
+    value: Optional[float] = None,
+    unit: Optional[str] = None,
+    has_member: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """Monta uma Observation no formato do perfil SES-GO."""
+    resource: Dict[str, Any] = {
+        "resourceType": "Observation",
+        "contained": [{
+            "resourceType": "Specimen",
+            "id": "amostra",
+            "type": {"coding": [{
+                "system": "http://terminology.hl7.org/CodeSystem/v2-0487",
+                "code": "BLD",
+                "display": "Whole blood"
+            }]},
+            "collection": {"collectedDateTime": collected_at},
+        }],
+        "status": "final",
+        "code": {"coding": [{"system": "http://loinc.org", "code": code, "display": display}]},
+        "subject": {"identifier": {"system": "https://fhir.saude.go.gov.br/sid/cpf", "value": cpf}},
+        "effectiveDateTime": collected_at,
+        "performer": [
+            {
+                "id": "laboratorio",
+                "identifier": {"system": "https://fhir.saude.go.gov.br/sid/cnes", "value": cnes}
+            },
+            {
+                "id": "responsavel-tecnico",
+                "identifier": {"system": "https://fhir.saude.go.gov.br/sid/cpf", "value": "52998224725"}
+            },
+            {
+                "id": "responsavel-resultado",
+                "identifier": {"system": "https://fhir.saude.go.gov.br/sid/cpf", "value": "52998224725"}
+            },
+        ],
+        "specimen": {"reference": "#amostra"},
+    }
+    if value is not None:
+        resource["valueQuantity"] = {
+            "value": value,
+            "unit": unit,
+            "system": "http://unitsofmeasure.org",
+            "code": unit,
+        }
+        resource["referenceRange"] = [{
+            "low": {"value": round(value * 0.8, 2), "unit": unit},
+            "high": {"value": round(value * 1.2, 2), "unit": unit},
+        }]
+    if has_member is not None:
+        resource["hasMember"] = [{"reference": reference} for reference in has_member]
+    return resource
+
+
+def build_sample_bundle(
+    seed: Optional[int] = None,
+    cnes: str = "2338424",
+    cpf: Optional[str] = None,
+    collected_at: str = "2024-11-27T08:30:00-03:00",
+    birth_date: Optional[str] = None,
+    gender: Optional[str] = None,
+    values: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """
+    Monta um Bundle de hemograma completo válido (1 composto + 24 simples).
+
+    Args:
+        seed: Semente para gerar CPF e pequenas variações de valores
+        cnes: CNES do laboratório
+        cpf: CPF do paciente (gerado se omitido)
+        collected_at: Data/hora de coleta da amostra
+        birth_date: Data de nascimento do paciente (inclui um Patient contido no exame composto)
+        gender: Sexo do paciente (female/male; inclui o Patient contido)
+        values: Valores fixos por código LOINC (os demais variam em torno do típico)
+
+    Returns:
+        Bundle FHIR como dicionário
+    """
+    rng = random.Random(seed)
+    cpf = cpf or generate_cpf(rng)
+    names = {member.value: member.name for member in LoincCode}
+
+    simple_entries = []
+    for code, (unit, typical) in SAMPLE_RESULTS.items():
+        value = round(typical * rng.uniform(0.9, 1.1), 2)
+        if values and code in values:
+            value = values[code]
+        simple_entries.append({
+            "fullUrl": f"urn:uuid:{uuid4()}",
+            "resource": _observation(code, names[code], cpf, cnes, collected_at, value, unit),
+        })
+
+    composite = {
+        "fullUrl": f"urn:uuid:{uuid4()}",
+        "resource": _observation(
+            LoincCode.CBC_PANEL.value,
+            "CBC panel - Blood by Automated count",
+            cpf,
+            cnes,
+            collected_at,
+            has_member=[entry["fullUrl"] for entry in simple_entries],
+        ),
+    }
+
+    if birth_date is not None or gender is not None:
+        patient: Dict[str, Any] = {"resourceType": "Patient", "id": "paciente"}
+        if birth_date is not None:
+            patient["birthDate"] = birth_date
+        if gender is not None:
+            patient["gender"] = gender
+        composite["resource"]["contained"].append(patient)
+
+    return {
+        "resourceType": "Bundle",
+        "meta": {"profile": [settings.fhir_profile_url]},
+        "type": "collection",
+        "timestamp": collected_at,
+        "entry": [composite] + simple_entries,
+    }
+
+
+def build_sample_malote(exams: int, seed: int = 0, cnes: str = "2338424") -> Dict[str, Any]:
+    """
+    Monta um malote com vários hemogramas (um paciente por hemograma).
+
+    Args:
+        exams: Número de hemogramas do malote
+        seed: Semente do primeiro hemograma (os demais usam as seguintes)
+        cnes: CNES do laboratório
+
+    Returns:
+        Bundle FHIR como dicionário
+    """
+    malote = build_sample_bundle(seed=seed, cnes=cnes)
+    for offset in range(1, exams):
+        malote["entry"].extend(build_sample_bundle(seed=seed + offset, cnes=cnes)["entry"])
+    return malote
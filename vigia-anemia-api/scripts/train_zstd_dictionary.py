@@ -0,0 +1,67 @@
+"""
+Treina o dicionário zstd usado nos envelopes de mensagens de fila.
+
+Por padrão usa Bundles sintéticos (scripts/sample_bundles.py); em produção,
+treine com um diretório de mensagens reais (um JSON por arquivo) e publique o
+novo dicionário mantendo o anterior entre os aceitos pelos consumidores.
+
+Uso:
+    python -m scripts.train_zstd_dictionary [--samples 500] [--size 65536]
+    python -m scripts.train_zstd_dictionary --from-dir amostras/ --output novo.zdict
+"""
+import argparse
+import random
+from datetime import datetime
+from pathlib import Path
+from typing import List
+from uuid import uuid4
+
+import zstandard
+
+from scripts.sample_bundles import build_sample_bundle, generate_cpf
+from src.domain.models import QueueMessage
+from src.infrastructure.message_envelope import DEFAULT_DICTIONARY_PATH
+
+
+def synthetic_samples(count: int, seed: int = 0) -> List[bytes]:
+    """Gera corpos de QueueMessage com Bundles sintéticos variados."""
+    rng = random.Random(seed)
+    samples = []
+    for position in range(count):
+        cnes = str(rng.randint(2000000, 9999999))
+        cpf = generate_cpf(rng)
+        bundle = build_sample_bundle(seed=seed + position, cnes=cnes, cpf=cpf)
+        message = QueueMessage(
+            tracking_id=uuid4(),
+            fhir_bundle=bundle,
+            received_at=datetime.utcnow(),
+            laboratory_cnes=cnes,
+            patient_cpf=cpf,
+            correlation_id=str(uuid4()),
+        )
+        samples.append(message.to_json().encode("utf-8"))
+    return samples
+
+
+def main() -> None:
+    """Ponto de entrada do treinamento."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--size", type=int, default=65536, help="Tamanho do dicionário em bytes")
+    parser.add_argument("--from-dir", type=Path, help="Diretório com corpos de mensagens reais")
+    parser.add_argument("--output", type=Path, default=DEFAULT_DICTIONARY_PATH)
+    args = parser.parse_args()
+
+    if args.from_dir:
+        samples = [path.read_bytes() for path in sorted(args.from_dir.iterdir()) if path.is_file()]
+    else:
+        samples = synthetic_samples(args.samples)
+
+    dictionary = zstandard.train_dictionary(args.size, samples)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_bytes(dictionary.as_bytes())
+    print(f"{len(samples)} amostras -> {args.output} (dict_id={dictionary.dict_id()}, {len(dictionary)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
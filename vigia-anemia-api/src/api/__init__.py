@@ -1,7 +1,7 @@
 """
 API module - Camada de apresentação (controllers e rotas).
 """
-from src.api.routes import hemograma_router
+from src.api.routes import fila_router, hemograma_router
 
-__all__ = ["hemograma_router"]
+__all__ = ["hemograma_router", "fila_router"]
 
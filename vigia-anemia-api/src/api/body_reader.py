@@ -0,0 +1,98 @@
+"""
+Leitura limitada e incremental do body das requisições de ingestão.
+Aplica o tamanho máximo configurado e, no modo streaming, valida o cabeçalho
+do Bundle à medida que os bytes chegam para rejeitar payloads inválidos cedo.
+"""
+from typing import List, Optional
+
+from fastapi import Request, status
+
+from src.core.config import settings
+from src.domain.models import ValidationError
+from src.validators.bundle_stream import BundleHeaderScanner
+from src.validators.profiles import profile_registry
+
+
+class BodyRejectedError(Exception):
+    """Body rejeitado antes da decodificação completa do JSON."""
+
+    def __init__(
+        self,
+        status_code: int,
+        code: str,
+        message: str,
+        errors: Optional[List[ValidationError]] = None
+    ):
+        """
+        Args:
+            status_code: Código HTTP da resposta
+            code: Código do erro (ErrorResponse.code)
+            message: Mensagem de erro
+            errors: Erros de validação detalhados
+        """
+        super().__init__(message)
+        self.status_code = status_code
+        self.code = code
+        self.message = message
+        self.errors = errors
+
+
+def _too_large(limit: int) -> BodyRejectedError:
+    return BodyRejectedError(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        code="PAYLOAD_TOO_LARGE",
+        message=f"Payload excede o tamanho máximo de {limit} bytes",
+    )
+
+
+async def read_bundle_body(request: Request, limit: Optional[int] = None) -> bytes:
+    """
+    Lê o body da requisição respeitando o limite de tamanho configurado.
+
+    Args:
+        request: Requisição HTTP
+        limit: Tamanho máximo em bytes (padrão: MAX_REQUEST_BODY_BYTES)
+
+    Returns:
+        Body completo em bytes
+
+    Raises:
+        BodyRejectedError: Se o body exceder o limite ou o cabeçalho do Bundle for inválido
+        ValueError: Se o início do payload não for um objeto JSON
+    """
+    if limit is None:
+        limit = settings.max_request_body_bytes
+
+    # Rejeita pelo Content-Length declarado antes de ler qualquer byte
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > limit:
+        raise _too_large(limit)
+
+    scanner = None
+    if settings.fhir_streaming_parse:
+        scanner = BundleHeaderScanner(
+            is_known_profile=lambda reference: profile_registry.get(reference) is not None,
+            expected_profile=settings.fhir_profile_url,
+        )
+
+    chunks = []
+    received = 0
+    async for chunk in request.stream():
+        if not chunk:
+            continue
+        received += len(chunk)
+        if received > limit:
+            raise _too_large(limit)
+        chunks.append(chunk)
+
+        if scanner is not None and scanner.active:
+            errors = scanner.feed(chunk)
+            if errors:
+                raise BodyRejectedError(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    code="INVALID_FHIR_STRUCTURE",
+                    message="Estrutura FHIR inválida ou dados inconsistentes",
+                    errors=errors,
+                )
+
+    return b"".join(chunks)
@@ -1,17 +1,22 @@
 """
 Dependências do FastAPI para injeção de dependências.
 """
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import Depends, Header, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Request, status
 
+from src.core.config import settings
 from src.core.logging import CorrelationContext, get_logger
 from src.infrastructure.auth_service import AuthService, get_auth_service
+from src.infrastructure.rate_limiter import RateLimiter, get_rate_limiter, retry_after_header
 from src.infrastructure.queue_service import QueueService, get_queue_service
 from src.services.hemograma_service import HemogramaService
 
 logger = get_logger(__name__)
 
+# Serviço compartilhado entre requisições (o validador FHIR não guarda estado)
+_hemograma_service: Optional[HemogramaService] = None
+
 
 async def verify_token(
     authorization: Annotated[str, Header()],
@@ -56,11 +61,67 @@ async def verify_token(
     return payload
 
 
+def rate_limit_key(payload: dict, client_host: Optional[str] = None) -> str:
+    """
+    Chave de rate limit da requisição autenticada.
+    
+    Args:
+        payload: Payload do token JWT
+        client_host: Endereço IP do cliente (balde dos tokens sem `cnes` nem `sub`)
+    
+    Returns:
+        CNES do laboratório (claim `cnes`), na falta dele o sujeito do token e,
+        sem nenhum dos dois, o IP do cliente
+    """
+    cnes = payload.get("cnes")
+    if cnes:
+        return f"cnes:{cnes}"
+    sub = payload.get("sub")
+    if sub:
+        return f"sub:{sub}"
+    # Sem identificação no token: um balde por cliente, não um balde comum a todos
+    return f"ip:{client_host or 'desconhecido'}"
+
+
+async def enforce_rate_limit(
+    request: Request,
+    payload: Annotated[dict, Depends(verify_token)]
+) -> None:
+    """
+    Aplica o rate limit por laboratório antes da leitura do body.
+    
+    Args:
+        request: Requisição HTTP (IP do cliente para tokens sem `cnes`/`sub`)
+        payload: Payload do token já validado (mesma instância de verify_token)
+    
+    Raises:
+        HTTPException: 429 com Retry-After quando o balde do laboratório está vazio
+    """
+    if not settings.rate_limit_enabled:
+        return
+    
+    key = rate_limit_key(payload, request.client.host if request.client else None)
+    limiter: RateLimiter = get_rate_limiter()
+    decision = await limiter.acquire(key)
+    if decision.allowed:
+        return
+    
+    logger.warning("Rate limit excedido", key=key, retry_after_s=round(decision.retry_after_s, 3))
+    raise HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Limite de requisições excedido para o laboratório",
+        headers={"Retry-After": retry_after_header(decision.retry_after_s)},
+    )
+
+
 def get_hemograma_service(
     queue_service: Annotated[QueueService, Depends(get_queue_service)]
 ) -> HemogramaService:
     """
-    Retorna uma instância do HemogramaService.
+    Retorna a instância compartilhada do HemogramaService.
+    
+    A instância é recriada apenas se o serviço de fila injetado mudar
+    (ex.: override de dependência em testes).
     
     Args:
         queue_service: Serviço de fila injetado
@@ -68,7 +129,12 @@ def get_hemograma_service(
     Returns:
         Instância do HemogramaService
     """
-    return HemogramaService(queue_service=queue_service)
+    global _hemograma_service
+    
+    if _hemograma_service is None or _hemograma_service.queue_service is not queue_service:
+        _hemograma_service = HemogramaService(queue_service=queue_service)
+    
+    return _hemograma_service
 
 
 async def get_correlation_id(
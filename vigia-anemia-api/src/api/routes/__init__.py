@@ -1,7 +1,7 @@
 """
 API Routes module.
 """
+from src.api.routes.fila import router as fila_router
 from src.api.routes.hemograma import router as hemograma_router
 
-__all__ = ["hemograma_router"]
-
+__all__ = ["hemograma_router", "fila_router"]
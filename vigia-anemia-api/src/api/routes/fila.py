@@ -0,0 +1,78 @@
+"""
+Rotas operacionais da fila de hemogramas (dimensionamento dos workers).
+"""
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse
+
+from src.core.config import settings
+from src.domain.models import ErrorResponse, QueueScalingResponse
+from src.infrastructure.queue_monitor import QueueMonitor, get_queue_monitor
+
+router = APIRouter(
+    prefix="/fila",
+    tags=["Fila"]
+)
+
+
+@router.get(
+    "/dimensionamento",
+    response_model=QueueScalingResponse,
+    responses={
+        200: {
+            "description": "Retrato da fila e workers recomendados",
+            "model": QueueScalingResponse
+        },
+        503: {
+            "description": "Monitor da fila desabilitado ou sem amostras",
+            "model": ErrorResponse
+        }
+    },
+    summary="Recomenda o número de workers pelo tamanho da fila",
+    description="""
+    Retorna o último retrato da fila amostrado em background (sem consultar o
+    SQS na requisição): mensagens por estado, vazão de entrada e de saída,
+    tempo estimado para esvaziar o backlog e o número de workers que acompanha
+    a entrada e esvazia o backlog em QUEUE_TARGET_DRAIN_S.
+
+    Destinado ao autoscaler dos workers; não requer token de laboratório.
+    """
+)
+async def queue_scaling(
+    monitor: Annotated[QueueMonitor, Depends(get_queue_monitor)],
+) -> QueueScalingResponse | JSONResponse:
+    """
+    Retorna o dimensionamento recomendado dos workers.
+
+    Args:
+        monitor: Monitor da fila
+
+    Returns:
+        QueueScalingResponse com o último retrato da fila
+        ErrorResponse (503) se ainda não houver amostra
+    """
+    snapshot = monitor.snapshot
+    if snapshot is None:
+        error_response = ErrorResponse(
+            status="error",
+            code="QUEUE_MONITOR_UNAVAILABLE",
+            message="Atributos da fila ainda não amostrados"
+        )
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content=error_response.model_dump()
+        )
+
+    return QueueScalingResponse(
+        sampled_at=snapshot.sampled_at,
+        messages_visible=snapshot.visible,
+        messages_in_flight=snapshot.in_flight,
+        messages_delayed=snapshot.delayed,
+        inflow_per_second=round(snapshot.inflow_per_s, 3),
+        outflow_per_second=round(snapshot.outflow_per_s, 3),
+        estimated_drain_time_s=None if snapshot.drain_time_s is None else round(snapshot.drain_time_s, 1),
+        recommended_workers=snapshot.recommended_workers,
+        worker_throughput_per_second=settings.worker_throughput_per_s,
+        target_drain_time_s=settings.queue_target_drain_s
+    )
@@ -1,18 +1,24 @@
 """
 Rotas da API para ingestão de hemogramas FHIR.
 """
-from typing import Annotated, Any, Dict
+import time
+from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.responses import JSONResponse
 
+from src.api.body_reader import BodyRejectedError, read_bundle_body
 from src.api.dependencies import (
+    enforce_rate_limit,
     get_correlation_id,
     get_hemograma_service,
     verify_token,
 )
+from src.core import metrics
+from src.core.config import settings
 from src.core.logging import get_logger
-from src.domain.models import ErrorResponse, HemogramaResponse
+from src.domain.fhir_structs import decode_bundle
+from src.domain.models import ErrorResponse, HemogramaResponse, MaloteResponse
 from src.services.hemograma_service import HemogramaService
 
 logger = get_logger(__name__)
@@ -20,7 +26,7 @@ logger = get_logger(__name__)
 router = APIRouter(
     prefix="/exames",
     tags=["Hemogramas"],
-    dependencies=[Depends(verify_token)]
+    dependencies=[Depends(verify_token), Depends(enforce_rate_limit)]
 )
 
 
@@ -41,10 +47,18 @@ router = APIRouter(
             "description": "Token de acesso ausente ou inválido",
             "model": ErrorResponse
         },
+        413: {
+            "description": "Payload excede o tamanho máximo permitido",
+            "model": ErrorResponse
+        },
         422: {
             "description": "Dados inconsistentes (CPF/CNES inválidos)",
             "model": ErrorResponse
         },
+        429: {
+            "description": "Limite de requisições do laboratório excedido (ver Retry-After)",
+            "model": ErrorResponse
+        },
         500: {
             "description": "Erro interno do servidor",
             "model": ErrorResponse
@@ -65,12 +79,16 @@ router = APIRouter(
     - Responsável técnico e responsável pelo resultado
     
     **Processamento:**
+    O cabeçalho do Bundle (resourceType, meta.profile, type) é validado durante
+    a leitura do body; payloads inválidos ou acima do limite são rejeitados
+    sem decodificação completa.
     O hemograma é validado e enfileirado para processamento assíncrono.
     Um tracking ID é retornado para rastreamento do processamento.
     
     **Tempo estimado de processamento:** 5 minutos
     """
 )
+@metrics.track_in_flight("hemograma")
 async def receive_hemograma(
     request: Request,
     hemograma_service: Annotated[HemogramaService, Depends(get_hemograma_service)],
@@ -89,20 +107,28 @@ async def receive_hemograma(
         ErrorResponse em caso de erro
     """
     try:
-        # Extrai o Bundle FHIR do body
-        bundle: Dict[str, Any] = await request.json()
+        # Lê o body com limite de tamanho e validação incremental do cabeçalho
+        start = time.perf_counter()
+        body = await read_bundle_body(request)
+        parse_start = time.perf_counter()
+        metrics.observe_stage("body_read", parse_start - start)
+        
+        # Extrai o Bundle FHIR do body (Structs tipados ou dicionário como fallback)
+        bundle = decode_bundle(body, typed=settings.fhir_fast_decoding)
+        metrics.observe_stage("json_parse", time.perf_counter() - parse_start)
         
         logger.info(
             "Hemograma recebido",
             correlation_id=correlation_id,
-            bundle_type=bundle.get("type"),
-            entries_count=len(bundle.get("entry", []))
+            body_bytes=len(body),
+            typed_decoding=not isinstance(bundle, dict)
         )
         
         # Processa o hemograma
         success, result = await hemograma_service.process_hemograma(
             bundle=bundle,
-            correlation_id=correlation_id
+            correlation_id=correlation_id,
+            raw_body=body
         )
         
         if success:
@@ -123,6 +149,30 @@ async def receive_hemograma(
                 content=error_response.model_dump()
             )
     
+    except BodyRejectedError as e:
+        # Body rejeitado antes da decodificação completa
+        logger.warning(
+            "Hemograma rejeitado durante a leitura do body",
+            correlation_id=correlation_id,
+            code=e.code,
+            error=e.message
+        )
+        if e.errors:
+            metrics.count_validation_errors(e.errors)
+        
+        error_response = ErrorResponse(
+            status="error",
+            code=e.code,
+            message=e.message,
+            errors=e.errors,
+            correlation_id=correlation_id
+        )
+        
+        return JSONResponse(
+            status_code=e.status_code,
+            content=error_response.model_dump()
+        )
+    
     except ValueError as e:
         # Erro de parsing JSON
         logger.error(
@@ -165,6 +215,157 @@ async def receive_hemograma(
         )
 
 
+@router.post(
+    "/malote",
+    response_model=MaloteResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={
+        202: {
+            "description": "Malote aceito (total ou parcialmente); tracking ID por hemograma aceito",
+            "model": MaloteResponse
+        },
+        400: {
+            "description": "Nenhum hemograma do malote é válido",
+            "model": MaloteResponse
+        },
+        401: {
+            "description": "Token de acesso ausente ou inválido",
+            "model": ErrorResponse
+        },
+        413: {
+            "description": "Payload excede o tamanho máximo permitido",
+            "model": ErrorResponse
+        },
+        429: {
+            "description": "Limite de requisições do laboratório excedido (ver Retry-After)",
+            "model": ErrorResponse
+        },
+        500: {
+            "description": "Erro interno do servidor",
+            "model": ErrorResponse
+        }
+    },
+    summary="Recebe um malote com vários hemogramas em formato FHIR R4",
+    description="""
+    Endpoint para ingestão de vários hemogramas (de um ou mais pacientes) em
+    um único Bundle FHIR R4 do perfil malote da SES-GO.
+    
+    **Requisitos:**
+    - Bundle FHIR tipo "collection"
+    - 1 exame composto (LOINC 58410-2) por hemograma, referenciando os seus
+      24 exames simples por `fullUrl` em `hasMember`
+    - Cada hemograma segue os mesmos requisitos de `POST /exames/hemograma`
+    
+    **Processamento:**
+    O malote é dividido em um Bundle por exame composto; os hemogramas são
+    validados em paralelo e os válidos são enfileirados individualmente.
+    A resposta traz, na ordem do malote, o tracking ID de cada hemograma
+    aceito ou os erros de cada hemograma rejeitado.
+    """
+)
+@metrics.track_in_flight("malote")
+async def receive_malote(
+    request: Request,
+    hemograma_service: Annotated[HemogramaService, Depends(get_hemograma_service)],
+    correlation_id: Annotated[str, Depends(get_correlation_id)],
+) -> JSONResponse:
+    """
+    Recebe e processa um malote com vários hemogramas.
+    
+    Args:
+        request: Requisição HTTP com o malote no body
+        hemograma_service: Serviço de processamento de hemogramas
+        correlation_id: ID de correlação para rastreamento
+    
+    Returns:
+        MaloteResponse (202 se algum hemograma foi aceito, 400 caso contrário)
+        ErrorResponse em caso de erro
+    """
+    try:
+        start = time.perf_counter()
+        body = await read_bundle_body(request, limit=settings.malote_max_request_body_bytes)
+        metrics.observe_stage("body_read", time.perf_counter() - start)
+        
+        logger.info(
+            "Malote recebido",
+            correlation_id=correlation_id,
+            body_bytes=len(body)
+        )
+        
+        # Particiona, valida e enfileira cada hemograma do malote
+        response = await hemograma_service.process_malote(
+            body=body,
+            correlation_id=correlation_id
+        )
+        
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED if response.accepted else status.HTTP_400_BAD_REQUEST,
+            content=response.model_dump(mode="json")
+        )
+    
+    except BodyRejectedError as e:
+        logger.warning(
+            "Malote rejeitado durante a leitura do body",
+            correlation_id=correlation_id,
+            code=e.code,
+            error=e.message
+        )
+        if e.errors:
+            metrics.count_validation_errors(e.errors)
+        
+        error_response = ErrorResponse(
+            status="error",
+            code=e.code,
+            message=e.message,
+            errors=e.errors,
+            correlation_id=correlation_id
+        )
+        
+        return JSONResponse(
+            status_code=e.status_code,
+            content=error_response.model_dump()
+        )
+    
+    except ValueError as e:
+        logger.error(
+            "JSON malformado",
+            correlation_id=correlation_id,
+            error=str(e)
+        )
+        
+        error_response = ErrorResponse(
+            status="error",
+            code="INVALID_JSON",
+            message="JSON malformado",
+            correlation_id=correlation_id
+        )
+        
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content=error_response.model_dump()
+        )
+    
+    except Exception as e:
+        logger.error(
+            "Erro inesperado ao processar malote",
+            correlation_id=correlation_id,
+            error=str(e),
+            exc_info=True
+        )
+        
+        error_response = ErrorResponse(
+            status="error",
+            code="INTERNAL_SERVER_ERROR",
+            message="Erro interno do servidor",
+            correlation_id=correlation_id
+        )
+        
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content=error_response.model_dump()
+        )
+
+
 @router.get(
     "/health",
     tags=["Health"],
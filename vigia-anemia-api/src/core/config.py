@@ -27,6 +27,32 @@ class Settings(BaseSettings):
         default="API de ingestão de hemogramas FHIR R4 para vigilância nutricional infantil"
     )
     
+    # Queue Backend Configuration
+    queue_backend: str = Field(
+        default="sqs",
+        description="Backend de fila: sqs, memory (em processo), file (log local) ou redis (Streams)"
+    )
+    queue_memory_max_messages: int = Field(
+        default=0,
+        description="Capacidade do backend em memória (0 = ilimitada)"
+    )
+    queue_file_log_dir: str = Field(
+        default="./queue-log",
+        description="Diretório do log local do backend file"
+    )
+    redis_stream_key: str = Field(
+        default="vigia:hemogramas",
+        description="Chave do Redis Stream do backend redis"
+    )
+    redis_stream_group: str = Field(
+        default="hemograma-workers",
+        description="Consumer group dos workers no Redis Stream"
+    )
+    redis_stream_maxlen: int = Field(
+        default=0,
+        description="Tamanho máximo aproximado do Redis Stream (0 = ilimitado)"
+    )
+    
     # AWS SQS Configuration
     aws_region: str = Field(default="us-east-1", description="Região AWS")
     aws_access_key_id: str = Field(default="", description="AWS Access Key ID")
@@ -37,20 +63,232 @@ class Settings(BaseSettings):
     )
     sqs_message_group_id: str = Field(
         default="hemograma-processing",
-        description="Group ID para FIFO queue"
+        description="Group ID para FIFO queue (prefixo dos grupos quando há sharding)"
+    )
+    sqs_message_group_strategy: str = Field(
+        default="static",
+        description="Distribuição de MessageGroupId em filas FIFO: static, cnes ou cpf_hash"
+    )
+    sqs_message_group_shards: int = Field(
+        default=16,
+        ge=1,
+        description="Número de grupos FIFO na estratégia cpf_hash"
+    )
+    sqs_endpoint_url: str = Field(
+        default="",
+        description="Endpoint SQS customizado (LocalStack/testes); vazio usa o padrão AWS"
+    )
+    sqs_publisher_max_workers: int = Field(
+        default=32,
+        description="Threads dedicadas à publicação no SQS (publicações simultâneas em voo)"
+    )
+    sqs_max_pool_connections: int = Field(
+        default=32,
+        description="Tamanho do pool de conexões HTTP do cliente SQS"
+    )
+    sqs_batching_enabled: bool = Field(
+        default=False,
+        description="Agrupa publicações em chamadas SendMessageBatch"
+    )
+    sqs_batch_max_entries: int = Field(
+        default=10,
+        ge=1,
+        le=10,
+        description="Máximo de mensagens por SendMessageBatch (limite do SQS: 10)"
+    )
+    sqs_batch_max_bytes: int = Field(
+        default=262144,
+        description="Tamanho máximo somado das mensagens de um lote (limite do SQS: 256 KB)"
+    )
+    sqs_batch_linger_ms: float = Field(
+        default=10.0,
+        description="Tempo máximo de espera por novas mensagens antes de enviar um lote incompleto"
+    )
+    queue_envelope_compression: bool = Field(
+        default=False,
+        description="Comprime o corpo das mensagens (zstd com dicionário), se zstandard disponível"
+    )
+    queue_envelope_dictionary_path: str = Field(
+        default="",
+        description="Dicionário zstd do envelope; vazio usa o dicionário distribuído com a API"
+    )
+    queue_envelope_compression_level: int = Field(
+        default=3,
+        description="Nível de compressão zstd do envelope"
+    )
+    queue_spool_enabled: bool = Field(
+        default=False,
+        description="Desvia mensagens para um spool local em disco quando o SQS falha"
+    )
+    queue_spool_dir: str = Field(
+        default="./spool",
+        description=(
+            "Diretório raiz do spool local (persistente entre reinícios); cada processo "
+            "usa um subdiretório próprio e spools de processos encerrados são adotados"
+        )
+    )
+    queue_spool_segment_bytes: int = Field(
+        default=64 * 1024 * 1024,
+        description="Tamanho máximo de cada segmento do spool"
+    )
+    queue_spool_fsync_interval_ms: float = Field(
+        default=50.0,
+        description="Intervalo do fsync em grupo do spool"
+    )
+    queue_spool_drain_interval_ms: float = Field(
+        default=1000.0,
+        description="Espera entre tentativas de reenvio quando o spool está vazio ou o SQS indisponível"
+    )
+    sqs_circuit_failure_threshold: int = Field(
+        default=5,
+        description="Falhas consecutivas no SQS que abrem o circuit breaker"
+    )
+    sqs_circuit_reset_timeout_s: float = Field(
+        default=30.0,
+        description="Tempo com o circuito aberto antes de testar o SQS novamente"
+    )
+    
+    # Worker Configuration (consumo da fila)
+    worker_concurrency: int = Field(
+        default=32,
+        ge=1,
+        description="Máximo de mensagens em processamento simultâneo por worker"
+    )
+    worker_processes: int = Field(
+        default=0,
+        ge=0,
+        description="Processos do pool de processamento do worker (0 = número de CPUs)"
+    )
+    worker_receive_batch_size: int = Field(
+        default=10,
+        ge=1,
+        le=10,
+        description="Mensagens por chamada de recebimento (limite do SQS: 10)"
+    )
+    worker_wait_time_s: int = Field(
+        default=20,
+        ge=0,
+        le=20,
+        description="Espera do long polling por mensagens (limite do SQS: 20 s)"
+    )
+    worker_visibility_timeout_s: int = Field(
+        default=60,
+        ge=1,
+        description="Visibility timeout das mensagens recebidas; estendido enquanto processam"
+    )
+    worker_delete_interval_ms: float = Field(
+        default=500.0,
+        description="Espera máxima para agrupar remoções de mensagens processadas"
+    )
+    worker_report_interval_s: float = Field(
+        default=30.0,
+        description="Intervalo do log de vazão do worker (mensagens/segundo)"
+    )
+    worker_results_dir: str = Field(
+        default="./resultados",
+        description="Diretório dos resultados do worker (JSON Lines por dia e processo)"
+    )
+    
+    # Queue Monitor (dimensionamento dos workers pelo tamanho da fila)
+    queue_monitor_enabled: bool = Field(
+        default=True,
+        description="Amostra os atributos da fila em background para métricas e dimensionamento"
+    )
+    queue_monitor_interval_s: float = Field(
+        default=15.0,
+        ge=1.0,
+        description="Intervalo entre consultas aos atributos da fila"
+    )
+    queue_monitor_window_s: float = Field(
+        default=300.0,
+        gt=0,
+        description="Janela das amostras usadas nas taxas de entrada e saída"
+    )
+    queue_monitor_shared_counter: bool = Field(
+        default=True,
+        description=(
+            "Soma no Redis as mensagens aceitas por todos os processos da API "
+            "(vazão de entrada quando a fila não a informa, ex.: SQS)"
+        )
     )
+    queue_monitor_redis_key: str = Field(
+        default="vigia:queue:sent",
+        description="Chave do contador compartilhado de mensagens aceitas no Redis"
+    )
+    queue_target_drain_s: float = Field(
+        default=300.0,
+        gt=0,
+        description="Tempo alvo para esvaziar o backlog ao dimensionar os workers"
+    )
+    worker_throughput_per_s: float = Field(
+        default=100.0,
+        gt=0,
+        description="Mensagens por segundo processadas por worker (ver scripts.benchmark_worker)"
+    )
+    worker_min_replicas: int = Field(default=1, ge=0, description="Mínimo de workers recomendados")
+    worker_max_replicas: int = Field(default=20, ge=1, description="Máximo de workers recomendados")
     
     # Auth Service Configuration
     auth_service_url: str = Field(
         default="https://fhir.saude.go.gov.br/api/token",
         description="URL do serviço de autenticação"
     )
+    auth_client_certificate_path: str = Field(
+        default="",
+        description="Certificado do cliente (mTLS) para o serviço de autorização (vazio = sem mTLS)"
+    )
+    auth_token_prefetch: bool = Field(
+        default=False,
+        description="Obtém o token do serviço de autorização na inicialização e o renova em background"
+    )
+    auth_token_timeout_s: float = Field(
+        default=10.0,
+        gt=0.0,
+        description="Timeout das chamadas ao serviço de autorização (segundos)"
+    )
+    auth_token_refresh_margin_s: float = Field(
+        default=60.0,
+        ge=0.0,
+        description="Antecedência da renovação do token em relação ao fim de expires_in (segundos)"
+    )
+    auth_token_retry_interval_s: float = Field(
+        default=1.0,
+        gt=0.0,
+        description="Intervalo inicial entre tentativas de renovação do token após falha (segundos)"
+    )
+    auth_token_retry_max_s: float = Field(
+        default=30.0,
+        gt=0.0,
+        description="Intervalo máximo entre tentativas de renovação do token (segundos)"
+    )
     jwt_secret_key: str = Field(
         default="change-me-in-production",
         description="Chave secreta para JWT"
     )
     jwt_algorithm: str = Field(default="HS256", description="Algoritmo JWT")
     token_expire_minutes: int = Field(default=60, description="Tempo de expiração do token")
+    auth_cache_enabled: bool = Field(
+        default=True,
+        description="Reutiliza verificações de tokens JWT (LRU local e, se habilitado, Redis)"
+    )
+    auth_cache_max_entries: int = Field(
+        default=10000,
+        ge=0,
+        description="Máximo de tokens no LRU local de verificações"
+    )
+    auth_cache_negative_ttl_s: float = Field(
+        default=30.0,
+        ge=0.0,
+        description="Segundos em que um token rejeitado permanece em cache"
+    )
+    auth_cache_redis_enabled: bool = Field(
+        default=False,
+        description="Compartilha as verificações de tokens entre processos via Redis"
+    )
+    auth_cache_redis_prefix: str = Field(
+        default="vigia:jwt:",
+        description="Prefixo das chaves de verificações de tokens no Redis"
+    )
     
     # Redis Cache Configuration
     redis_host: str = Field(default="localhost", description="Host do Redis")
@@ -58,6 +296,16 @@ class Settings(BaseSettings):
     redis_db: int = Field(default=0, description="Database do Redis")
     redis_password: str = Field(default="", description="Senha do Redis")
     redis_ttl: int = Field(default=3300, description="TTL do cache em segundos (55 min)")
+    redis_max_connections: int = Field(
+        default=50,
+        ge=1,
+        description="Máximo de conexões do pool do cliente Redis assíncrono"
+    )
+    redis_socket_timeout_s: float = Field(
+        default=0.05,
+        gt=0.0,
+        description="Timeout das operações do cliente Redis assíncrono da API (segundos)"
+    )
     
     # Logging Configuration
     log_level: str = Field(default="INFO", description="Nível de log")
@@ -86,14 +334,57 @@ class Settings(BaseSettings):
         default=24,
         description="Número de exames simples obrigatórios"
     )
+    fhir_streaming_parse: bool = Field(
+        default=True,
+        description="Valida o cabeçalho do Bundle durante a leitura do body"
+    )
+    fhir_fast_decoding: bool = Field(
+        default=True,
+        description="Decodifica o Bundle em Structs tipados (msgspec), se disponível"
+    )
+    max_request_body_bytes: int = Field(
+        default=5 * 1024 * 1024,
+        description="Tamanho máximo do body de ingestão em bytes"
+    )
+    malote_max_request_body_bytes: int = Field(
+        default=64 * 1024 * 1024,
+        description="Tamanho máximo do body de um malote (vários hemogramas) em bytes"
+    )
+    malote_max_exams: int = Field(
+        default=2000,
+        ge=1,
+        description="Número máximo de exames compostos por malote"
+    )
+    malote_validation_processes: int = Field(
+        default=0,
+        ge=0,
+        description="Processos do pool de validação de malotes (0 = threads do event loop, sem pool de processos)"
+    )
+    malote_validation_chunk_size: int = Field(
+        default=50,
+        ge=1,
+        description="Exames por tarefa enviada ao pool de validação de malotes"
+    )
     
     # Rate Limiting
-    rate_limit_per_minute: int = Field(default=100, description="Limite de requisições por minuto")
-    rate_limit_burst: int = Field(default=20, description="Burst de requisições")
+    rate_limit_enabled: bool = Field(
+        default=True,
+        description="Limita requisições por laboratório (CNES, sujeito do token ou IP do cliente)"
+    )
+    rate_limit_backend: str = Field(
+        default="memory",
+        description="Backend do rate limit: memory (por processo) ou redis (compartilhado)"
+    )
+    rate_limit_per_minute: int = Field(default=100, ge=1, description="Limite de requisições por minuto")
+    rate_limit_burst: int = Field(default=20, ge=1, description="Burst de requisições")
+    rate_limit_redis_prefix: str = Field(
+        default="vigia:ratelimit:",
+        description="Prefixo das chaves dos baldes de rate limit no Redis"
+    )
     
     # Monitoring
     enable_metrics: bool = Field(default=True, description="Habilitar métricas Prometheus")
-    metrics_port: int = Field(default=9090, description="Porta para métricas")
+    metrics_port: int = Field(default=9090, ge=1, le=65535, description="Porta para métricas")
     
     @field_validator("environment")
     @classmethod
@@ -104,6 +395,33 @@ class Settings(BaseSettings):
             raise ValueError(f"Environment deve ser um de: {allowed}")
         return v
     
+    @field_validator("queue_backend")
+    @classmethod
+    def validate_queue_backend(cls, v: str) -> str:
+        """Valida o backend de fila."""
+        allowed = ["sqs", "memory", "file", "redis"]
+        if v not in allowed:
+            raise ValueError(f"Backend de fila deve ser um de: {allowed}")
+        return v
+    
+    @field_validator("rate_limit_backend")
+    @classmethod
+    def validate_rate_limit_backend(cls, v: str) -> str:
+        """Valida o backend de rate limit."""
+        allowed = ["memory", "redis"]
+        if v not in allowed:
+            raise ValueError(f"Backend de rate limit deve ser um de: {allowed}")
+        return v
+    
+    @field_validator("sqs_message_group_strategy")
+    @classmethod
+    def validate_message_group_strategy(cls, v: str) -> str:
+        """Valida a estratégia de MessageGroupId."""
+        allowed = ["static", "cnes", "cpf_hash"]
+        if v not in allowed:
+            raise ValueError(f"Estratégia de MessageGroupId deve ser uma de: {allowed}")
+        return v
+    
     @field_validator("log_level")
     @classmethod
     def validate_log_level(cls, v: str) -> str:
@@ -0,0 +1,301 @@
+"""
+Métricas Prometheus da ingestão de hemogramas.
+
+- vigia_ingestion_stage_seconds{stage}: latência de cada etapa da requisição
+  (body_read, json_parse, index, rule.<verificação>, metadata, malote_split,
+  malote_validation)
+- vigia_queue_send_seconds{backend, outcome}: latência de QueueService.send_message_async
+- vigia_validation_errors_total{field}: erros de validação por ValidationError.field
+- vigia_hemogramas_total{cnes, outcome}: hemogramas por laboratório e desfecho
+- vigia_requests_in_flight{endpoint} / vigia_queue_sends_in_flight: trabalho em curso
+- vigia_queue_messages{state}, vigia_queue_inflow_per_second,
+  vigia_queue_outflow_per_second, vigia_queue_drain_seconds e
+  vigia_queue_recommended_workers: último retrato do monitor da fila
+
+Com ENABLE_METRICS=false (ou sem prometheus-client) todas as funções deste
+módulo são no-ops e as regras de validação não são instrumentadas.
+
+Com vários workers (gunicorn -w N), defina PROMETHEUS_MULTIPROC_DIR: cada
+worker grava suas séries no diretório e o servidor de métricas, aberto pelo
+primeiro worker que obtiver a porta, agrega todos os processos.
+"""
+import functools
+import math
+import os
+import time
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Dict, Iterable, Optional
+
+from src.core.config import settings
+from src.core.logging import get_logger
+
+try:
+    from prometheus_client import (
+        REGISTRY,
+        CollectorRegistry,
+        Counter,
+        Gauge,
+        Histogram,
+        multiprocess,
+        start_http_server,
+    )
+except ImportError:  # pragma: no cover - dependência opcional
+    Histogram = None
+
+logger = get_logger(__name__)
+
+ENABLED = settings.enable_metrics and Histogram is not None
+
+# De 10 µs (uma regra de validação) a 5 s (envio à fila com retentativas)
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025,
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+# Rótulo de laboratório para CNES ausente ou malformado (limita a cardinalidade)
+UNKNOWN_CNES = "desconhecido"
+
+if ENABLED:
+    STAGE_SECONDS = Histogram(
+        "vigia_ingestion_stage_seconds",
+        "Latência das etapas de ingestão",
+        ["stage"],
+        buckets=LATENCY_BUCKETS,
+    )
+    QUEUE_SEND_SECONDS = Histogram(
+        "vigia_queue_send_seconds",
+        "Latência do envio de uma mensagem à fila",
+        ["backend", "outcome"],
+        buckets=LATENCY_BUCKETS,
+    )
+    VALIDATION_ERRORS = Counter(
+        "vigia_validation_errors",
+        "Erros de validação por campo",
+        ["field"],
+    )
+    HEMOGRAMAS = Counter(
+        "vigia_hemogramas",
+        "Hemogramas recebidos por laboratório (CNES) e desfecho",
+        ["cnes", "outcome"],
+    )
+    REQUESTS_IN_FLIGHT = Gauge(
+        "vigia_requests_in_flight",
+        "Requisições de ingestão em processamento",
+        ["endpoint"],
+        multiprocess_mode="livesum",
+    )
+    QUEUE_SENDS_IN_FLIGHT = Gauge(
+        "vigia_queue_sends_in_flight",
+        "Envios à fila aguardando resposta",
+        multiprocess_mode="livesum",
+    )
+    # Retrato da fila: o mesmo em todos os processos, vale o mais recente
+    QUEUE_MESSAGES = Gauge(
+        "vigia_queue_messages",
+        "Mensagens na fila por estado (visible, in_flight, delayed)",
+        ["state"],
+        multiprocess_mode="livemostrecent",
+    )
+    QUEUE_INFLOW = Gauge(
+        "vigia_queue_inflow_per_second",
+        "Mensagens publicadas na fila por segundo (estimativa)",
+        multiprocess_mode="livemostrecent",
+    )
+    QUEUE_OUTFLOW = Gauge(
+        "vigia_queue_outflow_per_second",
+        "Mensagens removidas da fila por segundo (estimativa)",
+        multiprocess_mode="livemostrecent",
+    )
+    QUEUE_DRAIN_SECONDS = Gauge(
+        "vigia_queue_drain_seconds",
+        "Tempo estimado para esvaziar o backlog (+Inf se não está diminuindo)",
+        multiprocess_mode="livemostrecent",
+    )
+    QUEUE_RECOMMENDED_WORKERS = Gauge(
+        "vigia_queue_recommended_workers",
+        "Workers recomendados para o backlog e a vazão de entrada",
+        multiprocess_mode="livemostrecent",
+    )
+
+# Séries por etapa resolvidas uma única vez (evita `labels()` por observação)
+_stage_series: Dict[str, Any] = {}
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    """
+    Registra a duração de uma etapa da ingestão.
+
+    Args:
+        stage: Nome da etapa
+        seconds: Duração em segundos
+    """
+    if not ENABLED:
+        return
+    series = _stage_series.get(stage)
+    if series is None:
+        series = _stage_series[stage] = STAGE_SECONDS.labels(stage)
+    series.observe(seconds)
+
+
+def timed_check(stage: str, check: Callable[..., bool]) -> Callable[..., bool]:
+    """
+    Envolve uma regra de validação compilada com a medição da sua duração.
+
+    Args:
+        stage: Nome da etapa (ex.: "rule.required_codes")
+        check: Regra compilada
+
+    Returns:
+        A própria regra, se as métricas estiverem desabilitadas
+    """
+    if not ENABLED:
+        return check
+    series = STAGE_SECONDS.labels(stage)
+    perf_counter = time.perf_counter
+
+    def timed(index, errors):
+        start = perf_counter()
+        try:
+            return check(index, errors)
+        finally:
+            series.observe(perf_counter() - start)
+
+    return timed
+
+
+def queue_sends_in_flight() -> ContextManager:
+    """
+    Mantém o gauge de envios à fila em curso durante o bloco.
+
+    Returns:
+        Context manager (nulo, se as métricas estiverem desabilitadas)
+    """
+    if not ENABLED:
+        return nullcontext()
+    return QUEUE_SENDS_IN_FLIGHT.track_inprogress()
+
+
+def observe_queue_send(backend: str, success: bool, seconds: float) -> None:
+    """
+    Registra a duração de um envio à fila.
+
+    Args:
+        backend: Nome do backend de fila
+        success: Se o envio (ou o desvio para o spool) teve sucesso
+        seconds: Duração em segundos
+    """
+    if not ENABLED:
+        return
+    QUEUE_SEND_SECONDS.labels(backend, "success" if success else "error").observe(seconds)
+
+
+def set_queue_snapshot(snapshot: Any) -> None:
+    """
+    Publica o retrato mais recente da fila nos gauges.
+
+    Args:
+        snapshot: Retrato do monitor da fila (QueueSnapshot)
+    """
+    if not ENABLED:
+        return
+    QUEUE_MESSAGES.labels("visible").set(snapshot.visible)
+    QUEUE_MESSAGES.labels("in_flight").set(snapshot.in_flight)
+    QUEUE_MESSAGES.labels("delayed").set(snapshot.delayed)
+    QUEUE_INFLOW.set(snapshot.inflow_per_s)
+    QUEUE_OUTFLOW.set(snapshot.outflow_per_s)
+    QUEUE_DRAIN_SECONDS.set(math.inf if snapshot.drain_time_s is None else snapshot.drain_time_s)
+    QUEUE_RECOMMENDED_WORKERS.set(snapshot.recommended_workers)
+
+
+def track_in_flight(endpoint: str) -> Callable:
+    """
+    Decorator de endpoint assíncrono: mantém o gauge de requisições em curso.
+
+    Args:
+        endpoint: Rótulo do endpoint
+
+    Returns:
+        Decorator (identidade, se as métricas estiverem desabilitadas)
+    """
+    def decorator(func: Callable) -> Callable:
+        if not ENABLED:
+            return func
+        gauge = REQUESTS_IN_FLIGHT.labels(endpoint)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            gauge.inc()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                gauge.dec()
+
+        return wrapper
+
+    return decorator
+
+
+def count_validation_errors(errors: Iterable[Any]) -> None:
+    """
+    Conta erros de validação por campo.
+
+    Args:
+        errors: ValidationErrors (ou objetos com `field`)
+    """
+    if not ENABLED:
+        return
+    for error in errors:
+        VALIDATION_ERRORS.labels(error.field).inc()
+
+
+def count_hemograma(laboratory_cnes: Optional[str], outcome: str) -> None:
+    """
+    Conta um hemograma pelo laboratório de origem.
+
+    Args:
+        laboratory_cnes: CNES do laboratório (ausente ou malformado vira UNKNOWN_CNES)
+        outcome: Desfecho (accepted, rejected ou queue_error)
+    """
+    if not ENABLED:
+        return
+    if not laboratory_cnes or len(laboratory_cnes) != 7 or not laboratory_cnes.isdigit():
+        laboratory_cnes = UNKNOWN_CNES
+    HEMOGRAMAS.labels(laboratory_cnes, outcome).inc()
+
+
+def start_metrics_server() -> bool:
+    """
+    Expõe as métricas em HTTP na porta METRICS_PORT.
+
+    Com PROMETHEUS_MULTIPROC_DIR, o servidor agrega as séries de todos os
+    workers; apenas o primeiro worker obtém a porta, os demais seguem sem
+    servidor próprio.
+
+    Returns:
+        True se este processo passou a servir as métricas
+    """
+    if not ENABLED:
+        return False
+
+    multiprocess_mode = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+    registry = REGISTRY
+    if multiprocess_mode:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+
+    try:
+        start_http_server(settings.metrics_port, registry=registry)
+    except OSError as e:
+        logger.info(
+            "Porta de métricas já em uso; servidor não iniciado neste processo",
+            port=settings.metrics_port,
+            error=str(e)
+        )
+        return False
+
+    logger.info(
+        "Servidor de métricas iniciado",
+        port=settings.metrics_port,
+        multiprocess=multiprocess_mode
+    )
+    return True
@@ -1,21 +1,43 @@
 """
 Domain module - Modelos de domínio e entidades de negócio.
 """
+from src.domain.hemograma_record import (
+    RECORD_SIZE,
+    RESULT_CODES,
+    HemogramaRecord,
+    read_record_batch,
+    records_to_matrix,
+)
 from src.domain.models import (
+    AnemiaSeverity,
     ExamStatus,
     LoincCode,
     ValidationError,
     HemogramaResponse,
     ErrorResponse,
+    MaloteExamResult,
+    MaloteResponse,
     QueueMessage,
+    QueueScalingResponse,
+    TriagePriority,
 )
 
 __all__ = [
+    "AnemiaSeverity",
     "ExamStatus",
     "LoincCode",
     "ValidationError",
     "HemogramaResponse",
     "ErrorResponse",
+    "MaloteExamResult",
+    "MaloteResponse",
     "QueueMessage",
+    "QueueScalingResponse",
+    "TriagePriority",
+    "HemogramaRecord",
+    "RECORD_SIZE",
+    "RESULT_CODES",
+    "read_record_batch",
+    "records_to_matrix",
 ]
 
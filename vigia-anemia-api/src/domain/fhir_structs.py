@@ -0,0 +1,238 @@
+"""
+Estruturas tipadas compactas para decodificação rápida de Bundles FHIR.
+Usa msgspec (opcional) para decodificar o body diretamente em Structs com
+apenas os campos consumidos pela validação; campos desconhecidos são ignorados.
+Sem msgspec instalado, a decodificação recai no caminho de dicionários.
+"""
+import json
+from typing import Any, Dict, List, Optional, Union
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - dependência opcional
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+
+FAST_DECODING_AVAILABLE = msgspec is not None
+
+
+if msgspec is not None:
+
+    # gc=False: as Structs formam uma árvore sem ciclos (decodificada de JSON),
+    # então podem ficar fora do coletor de ciclos, reduzindo o custo de alocação.
+
+    class Coding(msgspec.Struct, rename="camel", gc=False):
+        """Coding FHIR (system + code)."""
+        system: Optional[str] = None
+        code: Optional[str] = None
+
+    class CodeableConcept(msgspec.Struct, rename="camel", gc=False):
+        """CodeableConcept FHIR."""
+        coding: List[Coding] = []
+
+    class Identifier(msgspec.Struct, rename="camel", gc=False):
+        """Identifier FHIR (CPF, CNES)."""
+        system: Optional[str] = None
+        value: Optional[str] = None
+
+    class Reference(msgspec.Struct, rename="camel", gc=False):
+        """Reference FHIR (por referência literal ou identificador)."""
+        reference: Optional[str] = None
+        identifier: Optional[Identifier] = None
+
+    class Performer(msgspec.Struct, rename="camel", gc=False):
+        """Performer de uma Observation (laboratório e responsáveis)."""
+        id: Optional[str] = None
+        identifier: Optional[Identifier] = None
+
+    class SpecimenCollection(msgspec.Struct, rename="camel", gc=False):
+        """Dados de coleta da amostra."""
+        collected_date_time: Optional[str] = None
+
+    class Specimen(msgspec.Struct, rename="camel", gc=False):
+        """Recurso contido em `contained[]` (tipicamente Specimen)."""
+        resource_type: Optional[str] = None
+        id: Optional[str] = None
+        type: Optional[CodeableConcept] = None
+        collection: Optional[SpecimenCollection] = None
+
+    class Quantity(msgspec.Struct, rename="camel", gc=False):
+        """valueQuantity de uma Observation (valor e unidade UCUM)."""
+        value: Optional[float] = None
+        unit: Optional[str] = None
+        code: Optional[str] = None
+
+    class Observation(msgspec.Struct, rename="camel", gc=False):
+        """Recurso de uma entry; campos de Observation, demais tipos são tolerados."""
+        resource_type: Optional[str] = None
+        code: Optional[CodeableConcept] = None
+        subject: Optional[Reference] = None
+        performer: List[Performer] = []
+        specimen: Optional[Reference] = None
+        contained: List[Specimen] = []
+        has_member: List[Reference] = []
+        value_quantity: Optional[Quantity] = None
+
+    class Entry(msgspec.Struct, rename="camel", gc=False):
+        """Entry do Bundle."""
+        full_url: Optional[str] = None
+        resource: Optional[Observation] = None
+
+    class Meta(msgspec.Struct, rename="camel", gc=False):
+        """Meta do Bundle."""
+        profile: List[str] = []
+
+    class Bundle(msgspec.Struct, rename="camel", gc=False):
+        """Bundle FHIR (perfil malote)."""
+        resource_type: Optional[str] = None
+        type: Optional[str] = None
+        meta: Optional[Meta] = None
+        entry: List[Entry] = []
+
+    # Malote (vários hemogramas): as entries ficam como JSON bruto para que
+    # cada hemograma seja remontado concatenando bytes, sem re-serialização
+
+    class MaloteResource(msgspec.Struct, rename="camel", gc=False):
+        """Campos de uma entry do malote usados no particionamento."""
+        resource_type: Optional[str] = None
+        code: Optional[CodeableConcept] = None
+        has_member: List[Reference] = []
+
+    class MaloteEntry(msgspec.Struct, rename="camel", gc=False):
+        """Entry do malote (fullUrl e recurso resumido)."""
+        full_url: Optional[str] = None
+        resource: Optional[MaloteResource] = None
+
+    class Malote(msgspec.Struct, rename="camel", gc=False):
+        """Bundle malote: cabeçalho decodificado e entries em JSON bruto."""
+        resource_type: Optional[str] = None
+        id: Optional[str] = None
+        # Raw vazio quando ausente (Raw não pode ser combinado com None)
+        meta: msgspec.Raw = msgspec.Raw()
+        identifier: msgspec.Raw = msgspec.Raw()
+        type: Optional[str] = None
+        timestamp: Optional[str] = None
+        entry: List[msgspec.Raw] = []
+
+    _bundle_decoder = msgspec.json.Decoder(Bundle)
+    _malote_decoder = msgspec.json.Decoder(Malote)
+    _malote_entry_decoder = msgspec.json.Decoder(MaloteEntry)
+    _generic_decoder = msgspec.json.Decoder()
+    _generic_encoder = msgspec.json.Encoder()
+
+else:  # pragma: no cover - dependência opcional
+    Bundle = None
+    Malote = None
+    _bundle_decoder = None
+    _malote_decoder = None
+    _malote_entry_decoder = None
+    _generic_decoder = None
+    _generic_encoder = None
+
+
+def loads(body: bytes) -> Any:
+    """
+    Decodifica JSON genérico (dicionários/listas) com o decodificador mais rápido disponível.
+
+    Args:
+        body: Bytes JSON
+
+    Returns:
+        Valor decodificado
+
+    Raises:
+        ValueError: Se o JSON for malformado
+    """
+    # msgspec.DecodeError e orjson.JSONDecodeError são subclasses de ValueError
+    if _generic_decoder is not None:
+        return _generic_decoder.decode(body)
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Codifica um valor JSON (dicionários/listas) com o codificador mais rápido disponível.
+
+    Args:
+        value: Valor a codificar
+
+    Returns:
+        Bytes JSON compactos
+    """
+    if _generic_encoder is not None:
+        return _generic_encoder.encode(value)
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def decode_bundle(body: bytes, typed: bool = True) -> Union["Bundle", Dict[str, Any]]:
+    """
+    Decodifica o body em um Bundle tipado ou, como fallback, em dicionário.
+
+    O caminho tipado é usado quando msgspec está disponível e o payload
+    respeita os tipos esperados; divergências de tipo (ex.: `coding` que não é
+    array) recaem no caminho de dicionários para que o FHIRValidator reporte
+    o erro com detalhes.
+
+    Args:
+        body: Bytes JSON do Bundle
+        typed: Se False, força o caminho de dicionários
+
+    Returns:
+        Bundle tipado ou dicionário
+
+    Raises:
+        ValueError: Se o JSON for malformado
+    """
+    if typed and _bundle_decoder is not None:
+        try:
+            return _bundle_decoder.decode(body)
+        except msgspec.ValidationError:
+            pass
+    return loads(body)
+
+
+def decode_malote(body: bytes) -> Optional["Malote"]:
+    """
+    Decodifica um malote mantendo cada entry como JSON bruto.
+
+    Args:
+        body: Bytes JSON do malote
+
+    Returns:
+        Malote tipado, ou None se msgspec não estiver disponível ou o payload
+        divergir dos tipos esperados (o chamador recai no caminho de dicionários)
+
+    Raises:
+        ValueError: Se o JSON for malformado
+    """
+    if _malote_decoder is None:
+        return None
+    try:
+        return _malote_decoder.decode(body)
+    except msgspec.ValidationError:
+        return None
+
+
+def decode_malote_entry(raw: bytes) -> Optional["MaloteEntry"]:
+    """
+    Decodifica os campos de particionamento de uma entry bruta do malote.
+
+    Args:
+        raw: JSON bruto da entry (ver `decode_malote`)
+
+    Returns:
+        Entry resumida, ou None se divergir dos tipos esperados
+    """
+    try:
+        return _malote_entry_decoder.decode(raw)
+    except msgspec.ValidationError:
+        return None
@@ -0,0 +1,330 @@
+"""
+Registro compacto de hemograma para o processamento após a API.
+
+Em vez do Bundle FHIR completo (dezenas de KB em dicionários aninhados), o
+worker carrega apenas os 24 resultados numéricos em posições fixas de um
+`array('d')`, já nas unidades canônicas, mais identificadores, sexo e datas
+(necessários para a classificação da OMS). O registro serializa para um
+layout binário fixo, que pode ser lido em lote como array estruturado NumPy.
+"""
+import math
+import struct
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Sequence, Union
+from uuid import UUID
+
+import numpy as np
+
+from src.domain.models import LoincCode
+from src.domain.units import CANONICAL_UNITS, UNIT_FACTORS
+
+# Ordem fixa dos 24 exames simples (ordem de declaração em LoincCode, sem o composto)
+RESULT_CODES = tuple(code.value for code in LoincCode if code is not LoincCode.CBC_PANEL)
+RESULT_INDEX = {code: index for index, code in enumerate(RESULT_CODES)}
+
+# Códigos de sexo (Patient.gender)
+SEX_FEMALE = 0
+SEX_MALE = 1
+SEX_UNKNOWN = 2
+_SEX_CODES = {"female": SEX_FEMALE, "male": SEX_MALE}
+
+# Layout binário v1 (little-endian, sem alinhamento): versão, tracking_id,
+# CPF, CNES, sexo, coleta, recebimento e nascimento (epoch UTC em segundos,
+# NaN se ausente) e os 24 resultados
+FORMAT_VERSION = 1
+_LAYOUT = struct.Struct(f"<B16s11s7sbddd{len(RESULT_CODES)}d")
+RECORD_SIZE = _LAYOUT.size
+
+# Mesmo layout como dtype estruturado, para ler lotes serializados sem cópia
+RECORD_DTYPE = np.dtype([
+    ("version", "u1"),
+    ("tracking_id", "V16"),
+    ("patient_cpf", "S11"),
+    ("laboratory_cnes", "S7"),
+    ("sex", "i1"),
+    ("collected_at", "<f8"),
+    ("received_at", "<f8"),
+    ("birth_date", "<f8"),
+    ("values", "<f8", (len(RESULT_CODES),)),
+])
+
+_NAN_VALUES = array("d", [math.nan]) * len(RESULT_CODES)
+
+
+def parse_timestamp(value: Union[str, float, None]) -> float:
+    """
+    Converte uma data/data-hora FHIR em epoch UTC.
+
+    Args:
+        value: AAAA, AAAA-MM, AAAA-MM-DD ou data-hora ISO 8601 (sem fuso: UTC);
+            números são tratados como epoch
+
+    Returns:
+        Segundos desde a epoch (NaN se ausente ou inválido)
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not value:
+        return math.nan
+    # Datas parciais do FHIR: completadas com o primeiro dia do período
+    if len(value) == 4:
+        value += "-01-01"
+    elif len(value) == 7:
+        value += "-01"
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return math.nan
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class HemogramaRecord:
+    """
+    Hemograma em layout fixo: 24 resultados normalizados e metadados mínimos.
+
+    `values[RESULT_INDEX[código]]` contém o resultado na unidade canônica de
+    `CANONICAL_UNITS` (NaN se ausente ou em unidade não reconhecida).
+    """
+
+    __slots__ = (
+        "tracking_id",
+        "patient_cpf",
+        "laboratory_cnes",
+        "sex",
+        "collected_at",
+        "received_at",
+        "birth_date",
+        "values",
+    )
+
+    def __init__(
+        self,
+        tracking_id: str,
+        patient_cpf: str,
+        laboratory_cnes: str,
+        values: Optional[array] = None,
+        sex: int = SEX_UNKNOWN,
+        collected_at: float = math.nan,
+        received_at: float = math.nan,
+        birth_date: float = math.nan,
+    ):
+        """
+        Args:
+            tracking_id: Tracking ID do hemograma (UUID)
+            patient_cpf: CPF do paciente (11 dígitos)
+            laboratory_cnes: CNES do laboratório (7 dígitos)
+            values: 24 resultados em ordem de RESULT_CODES (padrão: todos NaN)
+            sex: Código de sexo (SEX_*)
+            collected_at: Data/hora da coleta (epoch UTC)
+            received_at: Data/hora de recebimento pela API (epoch UTC)
+            birth_date: Data de nascimento do paciente (epoch UTC)
+        """
+        self.tracking_id = tracking_id
+        self.patient_cpf = patient_cpf
+        self.laboratory_cnes = laboratory_cnes
+        self.values = values if values is not None else array("d", _NAN_VALUES)
+        self.sex = sex
+        self.collected_at = collected_at
+        self.received_at = received_at
+        self.birth_date = birth_date
+
+    @classmethod
+    def from_bundle(
+        cls,
+        bundle: Dict[str, Any],
+        tracking_id: str,
+        patient_cpf: str,
+        laboratory_cnes: str,
+        received_at: Union[str, float, None] = None,
+    ) -> "HemogramaRecord":
+        """
+        Constrói o registro a partir de um Bundle já validado, em uma passagem.
+
+        Args:
+            bundle: Bundle FHIR como dicionário
+            tracking_id: Tracking ID do hemograma
+            patient_cpf: CPF do paciente (extraído na validação)
+            laboratory_cnes: CNES do laboratório (extraído na validação)
+            received_at: Data/hora de recebimento (ISO 8601 ou epoch)
+
+        Returns:
+            Registro com os resultados normalizados
+        """
+        values = array("d", _NAN_VALUES)
+        patient: Optional[Dict[str, Any]] = None
+        effective_at: Optional[str] = None
+        specimen_collected_at: Optional[str] = None
+
+        for entry in bundle.get("entry") or []:
+            resource = entry.get("resource") or {}
+            if resource.get("resourceType") == "Patient":
+                patient = patient or resource
+                continue
+
+            if effective_at is None:
+                effective_at = resource.get("effectiveDateTime")
+            # Recursos contidos só até achar o paciente (e a coleta da amostra,
+            # enquanto não houver effectiveDateTime)
+            if patient is None or (effective_at is None and specimen_collected_at is None):
+                for item in resource.get("contained") or ():
+                    item_type = item.get("resourceType")
+                    if item_type == "Patient" and patient is None:
+                        patient = item
+                    elif item_type == "Specimen" and specimen_collected_at is None:
+                        specimen_collected_at = (item.get("collection") or {}).get("collectedDateTime")
+
+            codings = (resource.get("code") or {}).get("coding")
+            code = codings[0].get("code") if codings else None
+            index = RESULT_INDEX.get(code)
+            if index is None:
+                continue
+            quantity = resource.get("valueQuantity") or {}
+            value = quantity.get("value")
+            unit = quantity.get("code") or quantity.get("unit")
+            factor = UNIT_FACTORS[code].get(unit.lower()) if unit else None
+            if isinstance(value, (int, float)) and factor is not None:
+                values[index] = value * factor
+
+        patient = patient or {}
+        collected_at = effective_at or specimen_collected_at or bundle.get("timestamp")
+        return cls(
+            tracking_id=str(tracking_id),
+            patient_cpf=patient_cpf,
+            laboratory_cnes=laboratory_cnes,
+            values=values,
+            sex=_SEX_CODES.get(patient.get("gender"), SEX_UNKNOWN),
+            collected_at=parse_timestamp(collected_at),
+            received_at=parse_timestamp(received_at),
+            birth_date=parse_timestamp(patient.get("birthDate")),
+        )
+
+    @classmethod
+    def from_message(cls, message: Dict[str, Any]) -> "HemogramaRecord":
+        """
+        Constrói o registro a partir de uma QueueMessage decodificada.
+
+        Args:
+            message: QueueMessage como dicionário (com `fhir_bundle`)
+
+        Returns:
+            Registro com os resultados normalizados
+        """
+        return cls.from_bundle(
+            message.get("fhir_bundle") or {},
+            tracking_id=message.get("tracking_id", ""),
+            patient_cpf=message.get("patient_cpf", ""),
+            laboratory_cnes=message.get("laboratory_cnes", ""),
+            received_at=message.get("received_at"),
+        )
+
+    def value(self, code: str) -> float:
+        """
+        Retorna o resultado de um exame na unidade canônica.
+
+        Args:
+            code: Código LOINC do exame simples
+
+        Returns:
+            Valor (NaN se ausente)
+        """
+        return self.values[RESULT_INDEX[code]]
+
+    def results(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Lista os resultados presentes.
+
+        Returns:
+            Dicionário código LOINC -> {"value", "unit"} (unidade canônica)
+        """
+        return {
+            code: {"value": value, "unit": CANONICAL_UNITS[code]}
+            for code, value in zip(RESULT_CODES, self.values)
+            if not math.isnan(value)
+        }
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializa o registro no layout binário fixo (RECORD_SIZE bytes).
+
+        Returns:
+            Bytes do registro
+        """
+        return _LAYOUT.pack(
+            FORMAT_VERSION,
+            UUID(self.tracking_id).bytes if self.tracking_id else bytes(16),
+            self.patient_cpf.encode("ascii"),
+            self.laboratory_cnes.encode("ascii"),
+            self.sex,
+            self.collected_at,
+            self.received_at,
+            self.birth_date,
+            *self.values,
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HemogramaRecord":
+        """
+        Reconstrói um registro serializado por `to_bytes()`.
+
+        Args:
+            data: Bytes do registro
+
+        Returns:
+            Registro
+
+        Raises:
+            ValueError: Se o tamanho ou a versão do layout forem inválidos
+        """
+        if len(data) != RECORD_SIZE:
+            raise ValueError(f"Registro deve ter {RECORD_SIZE} bytes, recebido {len(data)}")
+        version, tracking_id, cpf, cnes, sex, collected_at, received_at, birth_date, *values = _LAYOUT.unpack(data)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Versão de registro não suportada: {version}")
+        return cls(
+            tracking_id=str(UUID(bytes=tracking_id)) if any(tracking_id) else "",
+            patient_cpf=cpf.rstrip(b"\0").decode("ascii"),
+            laboratory_cnes=cnes.rstrip(b"\0").decode("ascii"),
+            values=array("d", values),
+            sex=sex,
+            collected_at=collected_at,
+            received_at=received_at,
+            birth_date=birth_date,
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"HemogramaRecord(tracking_id={self.tracking_id!r}, laboratory_cnes={self.laboratory_cnes!r}, "
+            f"results={sum(1 for value in self.values if not math.isnan(value))})"
+        )
+
+
+def records_to_matrix(records: Sequence[HemogramaRecord]) -> np.ndarray:
+    """
+    Empilha os resultados de um lote em uma matriz (uma linha por registro).
+
+    Args:
+        records: Registros do lote
+
+    Returns:
+        Matriz float64 (len(records) x 24), colunas em ordem de RESULT_CODES
+    """
+    if not records:
+        return np.empty((0, len(RESULT_CODES)))
+    buffer = b"".join(record.values.tobytes() for record in records)
+    return np.frombuffer(buffer, dtype=np.float64).reshape(len(records), len(RESULT_CODES))
+
+
+def read_record_batch(buffer: bytes) -> np.ndarray:
+    """
+    Lê registros serializados em sequência como array estruturado, sem cópia.
+
+    Args:
+        buffer: Concatenação de saídas de `to_bytes()`
+
+    Returns:
+        Array com dtype RECORD_DTYPE (campo `values` com shape (n, 24))
+    """
+    return np.frombuffer(buffer, dtype=RECORD_DTYPE)
@@ -7,7 +7,7 @@ from enum import Enum
 from typing import List, Optional
 from uuid import UUID, uuid4
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 
 class ExamStatus(str, Enum):
@@ -19,6 +19,23 @@ class ExamStatus(str, Enum):
     FAILED = "failed"
 
 
+class AnemiaSeverity(str, Enum):
+    """Gravidade da anemia pelos limiares de hemoglobina da OMS."""
+    NONE = "none"
+    MILD = "mild"
+    MODERATE = "moderate"
+    SEVERE = "severe"
+    # Idade fora das faixas da OMS (< 6 meses), sexo necessário e ausente ou Hb ausente
+    NOT_APPLICABLE = "not_applicable"
+
+
+class TriagePriority(str, Enum):
+    """Prioridade de atendimento do hemograma pela triagem hematológica."""
+    URGENT = "urgent"
+    PRIORITY = "priority"
+    ELECTIVE = "elective"
+
+
 class LoincCode(str, Enum):
     """Códigos LOINC dos exames obrigatórios do hemograma."""
     # Exame composto
@@ -123,10 +140,66 @@ class ErrorResponse(BaseModel):
         }
 
 
+class MaloteExamResult(BaseModel):
+    """Resultado de um exame (hemograma) de um malote."""
+    index: int = Field(..., description="Posição do exame composto no malote (a partir de 0)")
+    composite_full_url: Optional[str] = Field(default=None, description="fullUrl do exame composto")
+    status: str = Field(..., description="accepted ou rejected")
+    tracking_id: Optional[UUID] = Field(default=None, description="ID de rastreamento (se aceito)")
+    errors: Optional[List[ValidationError]] = Field(default=None, description="Erros do exame (se rejeitado)")
+
+
+class MaloteResponse(BaseModel):
+    """Resposta ao receber um malote com vários hemogramas."""
+    status: str = Field(..., description="accepted, partially_accepted ou rejected")
+    received_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        description="Data/hora de recebimento"
+    )
+    total_exams: int = Field(..., description="Exames compostos encontrados no malote")
+    accepted: int = Field(..., description="Exames aceitos e enfileirados")
+    rejected: int = Field(..., description="Exames rejeitados")
+    exams: List[MaloteExamResult] = Field(default_factory=list, description="Resultado por exame, na ordem do malote")
+    errors: Optional[List[ValidationError]] = Field(
+        default=None,
+        description="Erros do malote que não pertencem a um exame (ex.: entries órfãs)"
+    )
+    correlation_id: Optional[str] = Field(default=None, description="ID de correlação para rastreamento")
+
+
+class QueueScalingResponse(BaseModel):
+    """Retrato da fila e dimensionamento recomendado dos workers."""
+    sampled_at: datetime = Field(..., description="Data/hora da última amostra da fila")
+    messages_visible: int = Field(..., description="Mensagens aguardando um worker")
+    messages_in_flight: int = Field(..., description="Mensagens em processamento (invisíveis)")
+    messages_delayed: int = Field(..., description="Mensagens atrasadas")
+    inflow_per_second: float = Field(..., description="Mensagens publicadas por segundo (estimativa)")
+    outflow_per_second: float = Field(..., description="Mensagens removidas por segundo (estimativa)")
+    estimated_drain_time_s: Optional[float] = Field(
+        default=None,
+        description="Tempo estimado para esvaziar o backlog (nulo se não está diminuindo)"
+    )
+    recommended_workers: int = Field(..., description="Workers recomendados")
+    worker_throughput_per_second: float = Field(..., description="Vazão por worker usada no cálculo")
+    target_drain_time_s: float = Field(..., description="Prazo alvo para esvaziar o backlog")
+
+
 class QueueMessage(BaseModel):
-    """Mensagem a ser enfileirada para processamento assíncrono."""
+    """
+    Mensagem a ser enfileirada para processamento assíncrono.
+    
+    O Bundle pode ser informado já decodificado (`fhir_bundle`) ou como os
+    bytes originais da requisição (`fhir_bundle_raw`); no segundo caso os
+    bytes são embutidos literalmente no envelope JSON, sem re-serialização.
+    """
     tracking_id: UUID = Field(..., description="ID de rastreamento do hemograma")
-    fhir_bundle: dict = Field(..., description="Bundle FHIR completo")
+    fhir_bundle: Optional[dict] = Field(default=None, description="Bundle FHIR completo")
+    fhir_bundle_raw: Optional[bytes] = Field(
+        default=None,
+        exclude=True,
+        repr=False,
+        description="Bytes JSON originais do Bundle FHIR"
+    )
     received_at: datetime = Field(..., description="Data/hora de recebimento")
     laboratory_cnes: str = Field(..., description="CNES do laboratório")
     patient_cpf: str = Field(..., description="CPF do paciente")
@@ -148,4 +221,28 @@ class QueueMessage(BaseModel):
         if len(cpf_digits) != 11:
             raise ValueError("CPF deve conter exatamente 11 dígitos")
         return cpf_digits
+    
+    @model_validator(mode="after")
+    def validate_bundle_present(self) -> "QueueMessage":
+        """Exige o Bundle decodificado ou os bytes originais."""
+        if self.fhir_bundle is None and self.fhir_bundle_raw is None:
+            raise ValueError("fhir_bundle ou fhir_bundle_raw deve ser informado")
+        return self
+    
+    def to_json(self) -> str:
+        """
+        Serializa a mensagem para o corpo da fila.
+        
+        Com `fhir_bundle_raw`, apenas os metadados são serializados e os bytes
+        originais do Bundle são anexados como o campo `fhir_bundle`.
+        
+        Returns:
+            JSON da mensagem
+        """
+        if self.fhir_bundle_raw is None:
+            return self.model_dump_json()
+        
+        metadata = self.model_dump_json(exclude={"fhir_bundle"})
+        return f'{metadata[:-1]},"fhir_bundle":{self.fhir_bundle_raw.decode("utf-8")}}}'
+
 
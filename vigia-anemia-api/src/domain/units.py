@@ -0,0 +1,63 @@
+"""
+Unidades dos exames do hemograma.
+Define a unidade canônica de cada código LOINC e os fatores de conversão das
+unidades UCUM aceitas (comparadas em minúsculas) para a canônica.
+"""
+import math
+from typing import Dict, Optional
+
+from src.domain.models import LoincCode
+
+# Contagens celulares: canônica em células/mm³ (= /µL)
+_CELLS_PER_MM3 = {"/ul": 1.0, "/mm3": 1.0, "10*3/ul": 1000.0, "10*3/mm3": 1000.0, "10*9/l": 1000.0}
+_PERCENT = {"%": 1.0}
+_FEMTOLITERS = {"fl": 1.0}
+_GRAMS_PER_DL = {"g/dl": 1.0, "g/l": 0.1}
+
+# Código LOINC -> (unidade canônica, fatores por unidade aceita)
+UNITS: Dict[str, tuple] = {
+    LoincCode.HEMACEAS.value: ("10*6/uL", {"10*6/ul": 1.0, "10*6/mm3": 1.0, "10*12/l": 1.0}),
+    LoincCode.HEMOGLOBINA.value: ("g/dL", {**_GRAMS_PER_DL, "mmol/l": 1.611}),
+    LoincCode.HEMATOCRITO.value: ("%", {"%": 1.0, "l/l": 100.0}),
+    LoincCode.VCM.value: ("fL", _FEMTOLITERS),
+    LoincCode.HCM.value: ("pg", {"pg": 1.0}),
+    LoincCode.CHCM.value: ("g/dL", {**_GRAMS_PER_DL, "%": 1.0}),
+    LoincCode.RDW.value: ("%", _PERCENT),
+    LoincCode.LEUCOCITOS.value: ("/mm3", _CELLS_PER_MM3),
+    LoincCode.PROMIELOCITOS.value: ("%", _PERCENT),
+    LoincCode.MIELOCITOS.value: ("%", _PERCENT),
+    LoincCode.METAMIELOCITOS.value: ("%", _PERCENT),
+    LoincCode.BASTONETES.value: ("%", _PERCENT),
+    LoincCode.SEGMENTADOS.value: ("%", _PERCENT),
+    LoincCode.MONOCITOS.value: ("%", _PERCENT),
+    LoincCode.EOSINOFILOS.value: ("%", _PERCENT),
+    LoincCode.BASOFILOS.value: ("%", _PERCENT),
+    LoincCode.LINFOCITOS.value: ("%", _PERCENT),
+    LoincCode.LINFOCITOS_ATIPICOS.value: ("%", _PERCENT),
+    LoincCode.PRO_LINFOCITOS.value: ("%", _PERCENT),
+    LoincCode.BLASTOS.value: ("%", _PERCENT),
+    LoincCode.PLAQUETAS.value: ("/mm3", _CELLS_PER_MM3),
+    LoincCode.PLAQUETOCRITO.value: ("%", _PERCENT),
+    LoincCode.VPM.value: ("fL", _FEMTOLITERS),
+    LoincCode.PDW.value: ("fL", _FEMTOLITERS),
+}
+
+# Atalhos: unidade canônica e fatores por código
+CANONICAL_UNITS = {code: unit for code, (unit, _) in UNITS.items()}
+UNIT_FACTORS = {code: factors for code, (_, factors) in UNITS.items()}
+
+
+def normalize_value(code: str, value: float, unit: Optional[str]) -> float:
+    """
+    Converte um resultado para a unidade canônica do exame.
+
+    Args:
+        code: Código LOINC do exame
+        value: Valor como recebido
+        unit: Unidade UCUM recebida
+
+    Returns:
+        Valor na unidade canônica (NaN se exame ou unidade desconhecidos)
+    """
+    factor = UNIT_FACTORS.get(code, {}).get(unit.lower()) if unit else None
+    return value * factor if factor is not None else math.nan
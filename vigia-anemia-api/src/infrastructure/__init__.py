@@ -1,13 +1,53 @@
 """
 Infrastructure module - Integrações com serviços externos (SQS, Auth, Redis).
 """
-from src.infrastructure.auth_service import AuthService, get_auth_service
-from src.infrastructure.queue_service import QueueService, get_queue_service
+from src.infrastructure.auth_service import AuthService, close_auth_service, get_auth_service
+from src.infrastructure.batch_publisher import BatchPublisher
+from src.infrastructure.circuit_breaker import CircuitBreaker, CircuitState
+from src.infrastructure.message_envelope import EnvelopeCodec, decode_message_body
+from src.infrastructure.queue_backends import (
+    QueueBackend,
+    QueueBackendError,
+    ReceivedMessage,
+    create_queue_backend,
+)
+from src.infrastructure.queue_monitor import (
+    QueueMonitor,
+    QueueSnapshot,
+    close_queue_monitor,
+    get_queue_monitor,
+)
+from src.infrastructure.queue_service import (
+    QueueService,
+    close_queue_service,
+    get_queue_service,
+    message_group_id,
+)
+from src.infrastructure.spool import SegmentSpool, SpoolDrainer, SpoolLockedError
 
 __all__ = [
     "AuthService",
     "get_auth_service",
+    "close_auth_service",
+    "BatchPublisher",
+    "CircuitBreaker",
+    "CircuitState",
+    "EnvelopeCodec",
+    "decode_message_body",
+    "QueueBackend",
+    "QueueBackendError",
+    "ReceivedMessage",
+    "create_queue_backend",
     "QueueService",
     "get_queue_service",
+    "close_queue_service",
+    "message_group_id",
+    "QueueMonitor",
+    "QueueSnapshot",
+    "get_queue_monitor",
+    "close_queue_monitor",
+    "SegmentSpool",
+    "SpoolDrainer",
+    "SpoolLockedError",
 ]
 
@@ -1,15 +1,21 @@
 """
 Serviço de autenticação e validação de tokens JWT.
 Integra com o serviço de autorização da SES-GO.
+
+Os laboratórios reutilizam o mesmo token em milhares de envios: a verificação
+de assinatura é feita uma vez por token e reaproveitada a partir de um LRU em
+processo e, opcionalmente, do Redis compartilhado entre os workers.
 """
+import time
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
-import httpx
 from jose import JWTError, jwt
 
 from src.core.config import settings
 from src.core.logging import get_logger
+from src.infrastructure.token_cache import LocalTokenCache, RedisTokenCache, entry_expiration, token_key
+from src.infrastructure.upstream_token import UpstreamTokenProvider
 
 logger = get_logger(__name__)
 
@@ -17,17 +23,41 @@ logger = get_logger(__name__)
 class AuthService:
     """Serviço de autenticação e validação de tokens."""
     
-    def __init__(self):
-        """Inicializa o serviço de autenticação."""
+    def __init__(self, shared_cache: Optional[RedisTokenCache] = None):
+        """
+        Inicializa o serviço de autenticação.
+        
+        Args:
+            shared_cache: Cache de verificações no Redis (padrão: criado se
+                AUTH_CACHE_REDIS_ENABLED)
+        """
         self.auth_service_url = settings.auth_service_url
         self.secret_key = settings.jwt_secret_key
         self.algorithm = settings.jwt_algorithm
-        logger.info("AuthService inicializado", auth_url=self.auth_service_url)
+        self.token_provider = UpstreamTokenProvider(self.auth_service_url)
+        
+        self.local_cache: Optional[LocalTokenCache] = None
+        self.shared_cache: Optional[RedisTokenCache] = None
+        if settings.auth_cache_enabled:
+            self.local_cache = LocalTokenCache(settings.auth_cache_max_entries)
+            if shared_cache is not None or settings.auth_cache_redis_enabled:
+                self.shared_cache = shared_cache or RedisTokenCache()
+        
+        logger.info(
+            "AuthService inicializado",
+            auth_url=self.auth_service_url,
+            token_cache=self.local_cache is not None,
+            shared_token_cache=self.shared_cache is not None
+        )
     
     async def validate_token(self, token: str) -> tuple[bool, Optional[dict]]:
         """
         Valida um token JWT.
         
+        Consulta, em ordem, o LRU local, o Redis compartilhado e só então
+        verifica a assinatura; o resultado (inclusive rejeição, por
+        AUTH_CACHE_NEGATIVE_TTL_S) é gravado nos dois níveis.
+        
         Args:
             token: Token JWT a ser validado
         
@@ -35,30 +65,57 @@ class AuthService:
             Tupla (is_valid, payload ou None)
         """
         try:
-            # Decodifica e valida o token
+            if self.local_cache is None:
+                return self._verify(token)
+            
+            now = time.time()
+            key = token_key(token)
+            cached = self.local_cache.get(key, now)
+            if cached is not None:
+                return cached
+            
+            if self.shared_cache is not None:
+                cached = await self.shared_cache.get(key)
+                if cached is not None:
+                    self.local_cache.put(key, cached[1], entry_expiration(cached[1], now))
+                    return cached
+            
+            is_valid, payload = self._verify(token)
+            expires_at = entry_expiration(payload, now)
+            self.local_cache.put(key, payload, expires_at)
+            if self.shared_cache is not None:
+                await self.shared_cache.put(key, payload, int(expires_at - now))
+            return is_valid, payload
+            
+        except Exception as e:
+            # Falhas inesperadas não entram em cache
+            logger.error("Erro ao validar token", error=str(e))
+            return False, None
+    
+    def _verify(self, token: str) -> Tuple[bool, Optional[dict]]:
+        """Verifica assinatura e expiração do token (sem cache)."""
+        try:
             payload = jwt.decode(
                 token,
                 self.secret_key,
                 algorithms=[self.algorithm]
             )
-            
-            # Verifica expiração
-            exp = payload.get("exp")
-            if exp:
-                exp_datetime = datetime.fromtimestamp(exp)
-                if exp_datetime < datetime.utcnow():
-                    logger.warning("Token expirado", exp=exp_datetime)
-                    return False, None
-            
-            logger.info("Token validado com sucesso", sub=payload.get("sub"))
-            return True, payload
-            
         except JWTError as e:
             logger.warning("Token inválido", error=str(e))
             return False, None
-        except Exception as e:
-            logger.error("Erro ao validar token", error=str(e))
+        
+        # Verifica expiração
+        exp = payload.get("exp")
+        if exp and exp < time.time():
+            logger.warning("Token expirado", exp=datetime.utcfromtimestamp(exp))
             return False, None
+        
+        logger.debug("Token validado com sucesso", sub=payload.get("sub"))
+        return True, payload
+    
+    async def close(self) -> None:
+        """Interrompe a renovação do token e fecha o cliente HTTP."""
+        await self.token_provider.close()
     
     async def get_token_from_auth_service(
         self,
@@ -67,44 +124,17 @@ class AuthService:
         """
         Obtém um token do serviço de autorização da SES-GO.
         
+        O token fica em memória e é renovado em background antes de expirar;
+        chamadas concorrentes sem token compartilham uma única busca.
+        
         Args:
-            certificate_path: Caminho para o certificado digital (mTLS)
+            certificate_path: Mantido por compatibilidade; o certificado do mTLS
+                é configurado no cliente compartilhado (AUTH_CLIENT_CERTIFICATE_PATH)
         
         Returns:
             Token de acesso ou None em caso de erro
         """
-        try:
-            async with httpx.AsyncClient() as client:
-                # Em produção, usar mTLS com certificado digital
-                response = await client.get(
-                    self.auth_service_url,
-                    timeout=10.0
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    token = data.get("access_token")
-                    
-                    logger.info(
-                        "Token obtido do serviço de autorização",
-                        expires_in=data.get("expires_in")
-                    )
-                    
-                    return token
-                else:
-                    logger.error(
-                        "Erro ao obter token",
-                        status_code=response.status_code,
-                        response=response.text
-                    )
-                    return None
-                    
-        except httpx.RequestError as e:
-            logger.error("Erro de rede ao obter token", error=str(e))
-            return None
-        except Exception as e:
-            logger.error("Erro inesperado ao obter token", error=str(e))
-            return None
+        return await self.token_provider.get_token()
     
     def create_access_token(
         self,
@@ -160,3 +190,12 @@ def get_auth_service() -> AuthService:
     
     return _auth_service_instance
 
+
+async def close_auth_service() -> None:
+    """Encerra a instância singleton do AuthService, se existir."""
+    global _auth_service_instance
+    
+    if _auth_service_instance is not None:
+        await _auth_service_instance.close()
+        _auth_service_instance = None
+
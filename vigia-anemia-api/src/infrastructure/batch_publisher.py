@@ -0,0 +1,190 @@
+"""
+Agrupamento de publicações em lotes (SendMessageBatch ou equivalente do backend).
+Acumula as mensagens publicadas pelas requisições e as envia em lotes de até
+10 entradas (limite de 256 KB somados), por tamanho ou após o tempo de espera.
+Cada requisição recebe o resultado da sua própria entrada do lote.
+"""
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set
+
+from src.core.logging import get_logger
+from src.infrastructure.queue_backends.base import QueueBackendError
+
+logger = get_logger(__name__)
+
+# Resultado de uma publicação: (success, message_id ou error_message)
+PublishResult = tuple[bool, Optional[str]]
+
+
+def entry_size(entry: Dict[str, Any]) -> int:
+    """
+    Calcula o tamanho de uma entrada como o SQS contabiliza no limite do lote.
+
+    Args:
+        entry: Parâmetros da mensagem (MessageBody e MessageAttributes)
+
+    Returns:
+        Tamanho em bytes (body + nome, tipo e valor de cada atributo)
+    """
+    size = len(entry['MessageBody'].encode('utf-8'))
+    for name, attribute in entry.get('MessageAttributes', {}).items():
+        size += len(name) + len(attribute['DataType']) + len(attribute['StringValue'].encode('utf-8'))
+    return size
+
+
+class _PendingEntry(NamedTuple):
+    entry: Dict[str, Any]
+    size: int
+    tracking_id: str
+    future: asyncio.Future
+
+
+class BatchPublisher:
+    """
+    Acumulador de mensagens para SendMessageBatch.
+
+    Roda no event loop: `submit()` apenas enfileira a entrada e devolve um
+    future; o lote é enviado no executor quando atinge o número máximo de
+    entradas, quando a próxima entrada estouraria o limite de bytes ou quando
+    o tempo de espera (linger) da primeira entrada expira.
+    """
+
+    def __init__(
+        self,
+        send_batch: Callable[[List[Dict[str, Any]]], Dict[str, Any]],
+        executor: Optional[Executor],
+        max_entries: int = 10,
+        max_bytes: int = 262144,
+        linger_ms: float = 10.0,
+    ):
+        """
+        Args:
+            send_batch: Função bloqueante que envia as entradas (SendMessageBatch)
+            executor: Executor onde `send_batch` é executada (None: direto no event loop)
+            max_entries: Máximo de entradas por lote
+            max_bytes: Tamanho máximo somado das entradas de um lote
+            linger_ms: Espera máxima por novas entradas antes de enviar o lote
+        """
+        self.send_batch = send_batch
+        self.executor = executor
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.linger = linger_ms / 1000.0
+
+        self._pending: List[_PendingEntry] = []
+        self._pending_bytes = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight: Set[asyncio.Task] = set()
+
+    def submit(self, entry: Dict[str, Any], tracking_id: str) -> "asyncio.Future[PublishResult]":
+        """
+        Adiciona uma entrada ao lote corrente.
+
+        Args:
+            entry: Parâmetros da mensagem (sem QueueUrl e Id)
+            tracking_id: Tracking ID da mensagem (para logs)
+
+        Returns:
+            Future resolvido com (success, message_id ou error_message)
+        """
+        loop = asyncio.get_running_loop()
+        size = entry_size(entry)
+
+        # A nova entrada não cabe no lote corrente: envia o que já foi acumulado
+        if self._pending and self._pending_bytes + size > self.max_bytes:
+            self.flush()
+
+        future = loop.create_future()
+        self._pending.append(_PendingEntry(entry, size, tracking_id, future))
+        self._pending_bytes += size
+
+        if len(self._pending) >= self.max_entries or self._pending_bytes >= self.max_bytes:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.linger, self.flush)
+
+        return future
+
+    def flush(self) -> None:
+        """Envia imediatamente as entradas acumuladas, se houver."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending, self._pending_bytes = self._pending, [], 0
+        task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def drain(self) -> None:
+        """Envia as entradas acumuladas e aguarda todos os lotes em voo."""
+        self.flush()
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    async def _dispatch(self, batch: List[_PendingEntry]) -> None:
+        # Id posicional: único no lote e usado para casar a resposta com o future
+        entries = [dict(pending.entry, Id=str(position)) for position, pending in enumerate(batch)]
+        loop = asyncio.get_running_loop()
+
+        try:
+            if self.executor is None:
+                response = self.send_batch(entries)
+            else:
+                response = await loop.run_in_executor(self.executor, self.send_batch, entries)
+        except QueueBackendError as e:
+            logger.error(
+                "Erro ao enfileirar lote",
+                error_code=e.code,
+                error_message=e.message,
+                batch_size=len(batch)
+            )
+            self._fail_all(batch, f"{e.code}: {e.message}")
+            return
+        except Exception as e:
+            logger.error(
+                "Erro inesperado ao enfileirar lote",
+                error=str(e),
+                batch_size=len(batch)
+            )
+            self._fail_all(batch, str(e))
+            return
+
+        for result in response.get('Successful', []):
+            self._resolve(batch[int(result['Id'])], (True, result.get('MessageId')))
+
+        failed = response.get('Failed', [])
+        for result in failed:
+            pending = batch[int(result['Id'])]
+            logger.error(
+                "Erro ao enfileirar mensagem do lote",
+                error_code=result.get('Code'),
+                error_message=result.get('Message'),
+                sender_fault=result.get('SenderFault'),
+                tracking_id=pending.tracking_id
+            )
+            self._resolve(pending, (False, f"{result.get('Code')}: {result.get('Message')}"))
+
+        # Entradas ausentes da resposta não podem ficar pendentes
+        self._fail_all(batch, "Entrada sem resultado na resposta do SendMessageBatch")
+
+        logger.info(
+            "Lote enfileirado",
+            batch_size=len(batch),
+            batch_bytes=sum(pending.size for pending in batch),
+            failed_count=len(failed)
+        )
+
+    @staticmethod
+    def _resolve(pending: _PendingEntry, result: PublishResult) -> None:
+        # O chamador pode ter sido cancelado (ex.: cliente desconectou)
+        if not pending.future.done():
+            pending.future.set_result(result)
+
+    @classmethod
+    def _fail_all(cls, batch: List[_PendingEntry], error: str) -> None:
+        for pending in batch:
+            cls._resolve(pending, (False, error))
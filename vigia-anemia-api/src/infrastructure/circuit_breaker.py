@@ -0,0 +1,96 @@
+"""
+Circuit breaker para chamadas a serviços externos (SQS).
+Após falhas consecutivas o circuito abre e as chamadas são evitadas até o
+tempo de recuperação; depois disso uma única chamada de teste (half-open)
+decide se o circuito fecha novamente.
+"""
+import threading
+import time
+from enum import Enum
+
+from src.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class CircuitState(str, Enum):
+    """Estados do circuit breaker."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Circuit breaker por contagem de falhas consecutivas (thread-safe)."""
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout_s: float = 30.0):
+        """
+        Args:
+            name: Nome do recurso protegido (para logs)
+            failure_threshold: Falhas consecutivas que abrem o circuito
+            reset_timeout_s: Tempo em aberto antes de permitir uma chamada de teste
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        """Estado atual do circuito."""
+        return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Indica se uma chamada pode ser feita agora.
+
+        Returns:
+            True com o circuito fechado, ou para a única chamada de teste em half-open
+        """
+        with self._lock:
+            if self._state == CircuitState.CLOSED:
+                return True
+
+            if self._state == CircuitState.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout_s:
+                    return False
+                self._transition(CircuitState.HALF_OPEN)
+
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        """Registra uma chamada bem-sucedida (fecha o circuito)."""
+        with self._lock:
+            self._failures = 0
+            self._probe_in_flight = False
+            if self._state != CircuitState.CLOSED:
+                self._transition(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        """Registra uma chamada com falha (pode abrir o circuito)."""
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == CircuitState.HALF_OPEN or (
+                self._state == CircuitState.CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._opened_at = time.monotonic()
+                self._transition(CircuitState.OPEN)
+
+    def _transition(self, state: CircuitState) -> None:
+        logger.warning(
+            "Circuit breaker mudou de estado",
+            circuit=self.name,
+            previous_state=self._state.value,
+            state=state.value,
+            consecutive_failures=self._failures
+        )
+        self._state = state
@@ -0,0 +1,192 @@
+"""
+Envelope comprimido para o corpo das mensagens de fila.
+Comprime o JSON da QueueMessage com zstd e um dicionário pré-treinado em
+Bundles representativos (mesmos 25 códigos LOINC, systems e perfil em toda
+mensagem). O cabeçalho versionado permite ao consumidor escolher o decodificador.
+
+Formato (texto, compatível com o corpo de mensagens do SQS):
+    zstd:<versão>:<dict_id>:<base64 do frame zstd>
+
+Corpos que não começam com o prefixo são JSON puro e passam direto.
+"""
+import base64
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from src.core.logging import get_logger
+from src.domain.fhir_structs import loads
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dependência opcional
+    zstandard = None
+
+logger = get_logger(__name__)
+
+COMPRESSION_AVAILABLE = zstandard is not None
+
+ENVELOPE_PREFIX = "zstd"
+ENVELOPE_VERSION = 1
+CONTENT_ENCODING = f"{ENVELOPE_PREFIX}/{ENVELOPE_VERSION}"
+
+# Dicionário treinado por scripts/train_zstd_dictionary.py, distribuído com o código
+DEFAULT_DICTIONARY_PATH = Path(__file__).parent / "dictionaries" / "hemograma-v1.zdict"
+
+
+def load_dictionary(path: Path) -> "zstandard.ZstdCompressionDict":
+    """
+    Carrega um dicionário zstd treinado.
+
+    Args:
+        path: Caminho do arquivo do dicionário
+
+    Returns:
+        Dicionário zstd
+
+    Raises:
+        RuntimeError: Se o pacote zstandard não estiver instalado
+        OSError: Se o arquivo não puder ser lido
+    """
+    if zstandard is None:
+        raise RuntimeError("Pacote zstandard não instalado")
+    return zstandard.ZstdCompressionDict(Path(path).read_bytes())
+
+
+class EnvelopeCodec:
+    """
+    Codificador/decodificador de envelopes zstd com dicionário.
+
+    O primeiro dicionário é usado na compressão; todos são aceitos na
+    descompressão (indexados pelo dict_id do cabeçalho), o que permite trocar
+    o dicionário sem descartar mensagens já enfileiradas.
+    Compressores zstd não são thread-safe: cada thread mantém os seus.
+    """
+
+    def __init__(self, dictionaries: Iterable["zstandard.ZstdCompressionDict"], level: int = 3):
+        """
+        Args:
+            dictionaries: Dicionários aceitos; o primeiro é o de compressão
+            level: Nível de compressão zstd
+
+        Raises:
+            RuntimeError: Se o pacote zstandard não estiver instalado
+        """
+        if zstandard is None:
+            raise RuntimeError("Pacote zstandard não instalado")
+
+        self.level = level
+        self._dictionaries: Dict[int, "zstandard.ZstdCompressionDict"] = {}
+        self._compression_dict: Optional["zstandard.ZstdCompressionDict"] = None
+        for dictionary in dictionaries:
+            self._dictionaries[dictionary.dict_id()] = dictionary
+            if self._compression_dict is None:
+                # Pré-computa as tabelas do dicionário uma única vez
+                dictionary.precompute_compress(level=level)
+                self._compression_dict = dictionary
+
+        self.dict_id = self._compression_dict.dict_id() if self._compression_dict is not None else 0
+        self._header = f"{ENVELOPE_PREFIX}:{ENVELOPE_VERSION}:{self.dict_id}:"
+        self._local = threading.local()
+
+    def _compressor(self) -> "zstandard.ZstdCompressor":
+        compressor = getattr(self._local, "compressor", None)
+        if compressor is None:
+            compressor = zstandard.ZstdCompressor(level=self.level, dict_data=self._compression_dict)
+            self._local.compressor = compressor
+        return compressor
+
+    def _decompressor(self, dict_id: int) -> "zstandard.ZstdDecompressor":
+        decompressors = getattr(self._local, "decompressors", None)
+        if decompressors is None:
+            decompressors = self._local.decompressors = {}
+        decompressor = decompressors.get(dict_id)
+        if decompressor is None:
+            if dict_id and dict_id not in self._dictionaries:
+                raise ValueError(f"Dicionário zstd desconhecido: {dict_id}")
+            decompressor = zstandard.ZstdDecompressor(dict_data=self._dictionaries.get(dict_id))
+            decompressors[dict_id] = decompressor
+        return decompressor
+
+    def encode(self, body: str) -> str:
+        """
+        Comprime o corpo JSON em um envelope.
+
+        Args:
+            body: JSON da mensagem
+
+        Returns:
+            Envelope `zstd:<versão>:<dict_id>:<base64>`
+        """
+        frame = self._compressor().compress(body.encode("utf-8"))
+        return self._header + base64.b64encode(frame).decode("ascii")
+
+    def decode(self, body: str) -> str:
+        """
+        Recupera o JSON original de um corpo de mensagem.
+
+        Args:
+            body: Envelope ou JSON puro
+
+        Returns:
+            JSON da mensagem
+
+        Raises:
+            ValueError: Se a versão do envelope ou o dicionário forem desconhecidos
+        """
+        if not body.startswith(ENVELOPE_PREFIX + ":"):
+            return body
+
+        _, version, dict_id, payload = body.split(":", 3)
+        if int(version) != ENVELOPE_VERSION:
+            raise ValueError(f"Versão de envelope não suportada: {version}")
+
+        frame = base64.b64decode(payload)
+        return self._decompressor(int(dict_id)).decompress(frame).decode("utf-8")
+
+
+def build_envelope_codec(dictionary_path: str = "", level: int = 3) -> Optional[EnvelopeCodec]:
+    """
+    Cria o codec a partir do dicionário configurado.
+
+    Args:
+        dictionary_path: Caminho do dicionário (vazio usa o dicionário distribuído)
+        level: Nível de compressão zstd
+
+    Returns:
+        Codec pronto ou None se o zstandard não estiver disponível
+    """
+    if zstandard is None:
+        logger.warning("Compressão de envelopes indisponível: pacote zstandard não instalado")
+        return None
+
+    path = Path(dictionary_path) if dictionary_path else DEFAULT_DICTIONARY_PATH
+    dictionary = load_dictionary(path)
+    logger.info(
+        "Dicionário zstd carregado",
+        path=str(path),
+        dict_id=dictionary.dict_id(),
+        dict_bytes=len(dictionary)
+    )
+    return EnvelopeCodec([dictionary], level=level)
+
+
+def decode_message_body(body: str, codec: Optional[EnvelopeCodec] = None) -> Dict[str, Any]:
+    """
+    Decodifica o corpo de uma mensagem da fila (lado consumidor).
+
+    Args:
+        body: Corpo recebido do SQS (envelope zstd ou JSON puro)
+        codec: Codec com os dicionários aceitos; obrigatório para envelopes
+
+    Returns:
+        QueueMessage serializada como dicionário
+
+    Raises:
+        ValueError: Se o corpo for um envelope e não houver codec, ou se o JSON for inválido
+    """
+    if body.startswith(ENVELOPE_PREFIX + ":"):
+        if codec is None:
+            raise ValueError("Mensagem comprimida recebida sem codec de envelope configurado")
+        body = codec.decode(body)
+    return loads(body)
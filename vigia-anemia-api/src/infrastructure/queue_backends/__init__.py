@@ -0,0 +1,67 @@
+"""
+Backends de fila selecionáveis por configuração (`QUEUE_BACKEND`):
+sqs (padrão), memory, file e redis.
+"""
+from typing import Optional
+
+from src.core.config import settings
+from src.infrastructure.queue_backends.base import (
+    QueueBackend,
+    QueueBackendError,
+    ReceivedMessage,
+    attribute_values,
+)
+from src.infrastructure.queue_backends.file_log import FileLogQueueBackend
+from src.infrastructure.queue_backends.memory import InMemoryQueueBackend
+from src.infrastructure.queue_backends.redis_streams import RedisStreamsQueueBackend
+from src.infrastructure.queue_backends.sqs import SQSQueueBackend
+
+# Backends visíveis só ao próprio processo: consumidos pelo worker embutido na API
+IN_PROCESS_BACKENDS = frozenset(
+    backend.name
+    for backend in (SQSQueueBackend, InMemoryQueueBackend, FileLogQueueBackend, RedisStreamsQueueBackend)
+    if backend.in_process
+)
+
+
+def create_queue_backend(name: Optional[str] = None) -> QueueBackend:
+    """
+    Cria o backend de fila configurado.
+
+    Args:
+        name: Nome do backend (padrão: settings.queue_backend)
+
+    Returns:
+        Backend de fila
+
+    Raises:
+        ValueError: Se o backend for desconhecido
+    """
+    name = name or settings.queue_backend
+    if name == "sqs":
+        return SQSQueueBackend()
+    if name == "memory":
+        return InMemoryQueueBackend(settings.queue_memory_max_messages)
+    if name == "file":
+        return FileLogQueueBackend(
+            settings.queue_file_log_dir,
+            settings.queue_spool_segment_bytes,
+            settings.queue_spool_fsync_interval_ms,
+        )
+    if name == "redis":
+        return RedisStreamsQueueBackend()
+    raise ValueError(f"Backend de fila desconhecido: {name}")
+
+
+__all__ = [
+    "QueueBackend",
+    "QueueBackendError",
+    "ReceivedMessage",
+    "attribute_values",
+    "create_queue_backend",
+    "IN_PROCESS_BACKENDS",
+    "FileLogQueueBackend",
+    "InMemoryQueueBackend",
+    "RedisStreamsQueueBackend",
+    "SQSQueueBackend",
+]
@@ -0,0 +1,161 @@
+"""
+Interface comum dos backends de fila.
+
+Os backends recebem entradas no formato do SQS (MessageBody, MessageAttributes
+e, opcionalmente, MessageGroupId/MessageDeduplicationId) e respondem lotes no
+formato do SendMessageBatch (listas Successful e Failed), de modo que
+QueueService, micro-batching e spool funcionam igualmente com qualquer backend.
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, NamedTuple
+
+
+class QueueBackendError(Exception):
+    """Falha de uma operação no backend de fila."""
+
+    def __init__(self, code: str, message: str, sender_fault: bool = False):
+        """
+        Args:
+            code: Código do erro (ex.: código do SQS)
+            message: Descrição do erro
+            sender_fault: True se o erro é da mensagem enviada (não adianta reenviar)
+        """
+        super().__init__(f"{code}: {message}")
+        self.code = code
+        self.message = message
+        self.sender_fault = sender_fault
+
+
+class ReceivedMessage(NamedTuple):
+    """Mensagem recebida da fila."""
+    message_id: str
+    receipt_handle: str
+    body: str
+    attributes: Dict[str, str]
+
+
+def attribute_values(entry: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Extrai os valores dos MessageAttributes de uma entrada.
+
+    Args:
+        entry: Entrada no formato do SQS
+
+    Returns:
+        Dicionário nome -> valor
+    """
+    return {name: attribute['StringValue'] for name, attribute in entry.get('MessageAttributes', {}).items()}
+
+
+class QueueBackend(ABC):
+    """
+    Backend de fila (produção e consumo).
+
+    Os métodos são síncronos. Backends com `blocking = True` (rede, disco) são
+    chamados pelo QueueService no executor dedicado; os demais são chamados
+    diretamente no event loop, sem o custo da troca de thread.
+
+    Backends com `in_process = True` só são visíveis ao processo que os abriu:
+    a API consome a fila com o worker embutido (src.worker.embedded), e não
+    com `python -m src.worker`.
+    """
+
+    name: str = "base"
+    blocking: bool = True
+    fifo: bool = False
+    in_process: bool = False
+
+    @abstractmethod
+    def send(self, entry: Dict[str, Any]) -> str:
+        """
+        Enfileira uma entrada.
+
+        Args:
+            entry: Entrada no formato do SQS
+
+        Returns:
+            ID da mensagem
+
+        Raises:
+            QueueBackendError: Se a mensagem não puder ser enfileirada
+        """
+
+    @abstractmethod
+    def send_batch(self, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Enfileira um lote de entradas.
+
+        Args:
+            entries: Entradas no formato do SQS, cada uma com `Id` único no lote
+
+        Returns:
+            Resposta no formato do SendMessageBatch (Successful e Failed)
+
+        Raises:
+            QueueBackendError: Se o lote inteiro falhar
+        """
+
+    @abstractmethod
+    def receive(
+        self,
+        max_messages: int,
+        wait_time_s: float,
+        visibility_timeout_s: float
+    ) -> List[ReceivedMessage]:
+        """
+        Recebe mensagens, ocultando-as dos demais consumidores até o timeout.
+
+        Args:
+            max_messages: Máximo de mensagens
+            wait_time_s: Espera máxima por mensagens (long polling)
+            visibility_timeout_s: Tempo até a mensagem voltar a ficar visível
+
+        Returns:
+            Mensagens recebidas (possivelmente vazia)
+
+        Raises:
+            QueueBackendError: Se a fila não puder ser consultada
+        """
+
+    @abstractmethod
+    def delete_batch(self, receipt_handles: List[str]) -> None:
+        """
+        Remove mensagens processadas.
+
+        Args:
+            receipt_handles: Receipt handles das mensagens
+
+        Raises:
+            QueueBackendError: Se a remoção falhar
+        """
+
+    @abstractmethod
+    def change_visibility_batch(self, receipt_handles: List[str], visibility_timeout_s: float) -> None:
+        """
+        Estende a invisibilidade de mensagens ainda em processamento.
+
+        Args:
+            receipt_handles: Receipt handles das mensagens
+            visibility_timeout_s: Novo timeout, contado a partir de agora
+
+        Raises:
+            QueueBackendError: Se a operação falhar
+        """
+
+    @abstractmethod
+    def get_attributes(self) -> Dict[str, str]:
+        """
+        Retorna atributos da fila nos nomes do SQS.
+
+        Returns:
+            ApproximateNumberOfMessages, ApproximateNumberOfMessagesNotVisible
+            e ApproximateNumberOfMessagesDelayed; backends que contam as
+            mensagens enfileiradas por todos os produtores incluem também
+            NumberOfMessagesAdded (total acumulado, base da vazão de entrada)
+
+        Raises:
+            QueueBackendError: Se a fila não puder ser consultada
+        """
+
+    def close(self) -> None:
+        """Libera conexões e arquivos do backend."""
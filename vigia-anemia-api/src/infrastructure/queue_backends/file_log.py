@@ -0,0 +1,186 @@
+"""
+Backend de fila em log local append-only (sem dependências externas).
+Reaproveita o SegmentSpool: cada mensagem é um registro com CRC, o fsync é
+feito em grupo por uma thread de fundo e a posição confirmada é persistida
+em `cursor`. Para implantações de nó único sem conectividade com a AWS.
+
+O log pertence a um único processo (flock no diretório, posições de leitura em
+memória): a API roda com um só processo e consome a fila com o worker embutido.
+"""
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.core.logging import get_logger
+from src.infrastructure.queue_backends.base import (
+    QueueBackend,
+    QueueBackendError,
+    ReceivedMessage,
+    attribute_values,
+)
+from src.infrastructure.spool import SegmentSpool, SpoolLockedError, SpoolPosition
+
+logger = get_logger(__name__)
+
+
+def _message_id(position: SpoolPosition) -> str:
+    return f"{position.segment}-{position.offset}"
+
+
+class FileLogQueueBackend(QueueBackend):
+    """
+    Fila sobre um log de segmentos em disco.
+
+    Mensagens recebidas ficam invisíveis até o timeout; a posição confirmada
+    só avança sobre o prefixo contínuo de mensagens removidas, então após um
+    reinício tudo que não foi confirmado é entregue de novo (at-least-once).
+    """
+
+    name = "file"
+    # send grava no disco: chamado no executor do QueueService, fora do event loop
+    blocking = True
+    in_process = True
+
+    def __init__(
+        self,
+        directory: str,
+        segment_max_bytes: int = 64 * 1024 * 1024,
+        fsync_interval_ms: float = 50.0,
+    ):
+        """
+        Args:
+            directory: Diretório do log
+            segment_max_bytes: Tamanho máximo de cada segmento
+            fsync_interval_ms: Intervalo do fsync em grupo
+        """
+        try:
+            self._log = SegmentSpool(directory, segment_max_bytes)
+        except SpoolLockedError as e:
+            raise SpoolLockedError(
+                f"{e}. QUEUE_BACKEND=file admite um único processo (API com o worker "
+                f"embutido, sem gunicorn -w N nem python -m src.worker); use sqs ou redis"
+            ) from None
+        self._condition = threading.Condition()
+        self._read_position = self._log.cursor
+        self._available = self._log.count_records()
+        # Mensagens enfileiradas desde a abertura (vazão de entrada do monitor)
+        self._added = 0
+
+        # Entregas em ordem de leitura: [receipt_handle, posição final, removida?]
+        self._deliveries: deque = deque()
+        self._in_flight: Dict[str, Tuple[float, ReceivedMessage, list]] = {}
+        self._redeliver: deque = deque()
+
+        self._stopped = threading.Event()
+        self._fsync_interval = fsync_interval_ms / 1000.0
+        self._sync_thread = threading.Thread(target=self._sync_loop, name="queue-log-fsync", daemon=True)
+        self._sync_thread.start()
+
+    def _sync_loop(self) -> None:
+        while not self._stopped.wait(self._fsync_interval):
+            try:
+                self._log.sync()
+            except OSError as e:
+                logger.error("Erro no fsync do log da fila", error=str(e))
+
+    def send(self, entry: Dict[str, Any]) -> str:
+        try:
+            position = self._log.append(json.dumps(entry).encode("utf-8"))
+        except OSError as e:
+            raise QueueBackendError("LogWriteError", str(e)) from e
+        with self._condition:
+            self._available += 1
+            self._added += 1
+            self._condition.notify()
+        return _message_id(position)
+
+    def send_batch(self, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        successful, failed = [], []
+        for entry in entries:
+            try:
+                successful.append({'Id': entry['Id'], 'MessageId': self.send(entry)})
+            except QueueBackendError as e:
+                failed.append({'Id': entry['Id'], 'Code': e.code, 'Message': e.message, 'SenderFault': False})
+        return {'Successful': successful, 'Failed': failed}
+
+    def _requeue_expired(self, now: float) -> None:
+        for handle, (deadline, message, delivery) in list(self._in_flight.items()):
+            if deadline <= now:
+                del self._in_flight[handle]
+                self._redeliver.append((message, delivery))
+
+    def _take(self, max_messages: int, deadline: float) -> List[ReceivedMessage]:
+        received: List[ReceivedMessage] = []
+
+        while self._redeliver and len(received) < max_messages:
+            message, delivery = self._redeliver.popleft()
+            self._in_flight[message.receipt_handle] = (deadline, message, delivery)
+            received.append(message)
+
+        if len(received) < max_messages:
+            records, _ = self._log.read_records(self._read_position, max_messages - len(received), 1 << 30)
+            for payload, end in records:
+                entry = json.loads(payload)
+                handle = _message_id(end)
+                message = ReceivedMessage(handle, handle, entry['MessageBody'], attribute_values(entry))
+                delivery = [handle, end, False]
+                self._deliveries.append(delivery)
+                self._in_flight[handle] = (deadline, message, delivery)
+                self._read_position = end
+                self._available -= 1
+                received.append(message)
+
+        return received
+
+    def receive(
+        self,
+        max_messages: int,
+        wait_time_s: float,
+        visibility_timeout_s: float
+    ) -> List[ReceivedMessage]:
+        wait_deadline = time.monotonic() + wait_time_s
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._requeue_expired(now)
+                received = self._take(max_messages, now + visibility_timeout_s)
+                if received or now >= wait_deadline:
+                    return received
+                self._condition.wait(wait_deadline - now)
+
+    def delete_batch(self, receipt_handles: List[str]) -> None:
+        commit: Optional[SpoolPosition] = None
+        with self._condition:
+            for handle in receipt_handles:
+                item = self._in_flight.pop(handle, None)
+                if item is not None:
+                    item[2][2] = True
+            # Confirma o prefixo contínuo de entregas já removidas
+            while self._deliveries and self._deliveries[0][2]:
+                commit = self._deliveries.popleft()[1]
+        if commit is not None:
+            self._log.commit(commit)
+
+    def change_visibility_batch(self, receipt_handles: List[str], visibility_timeout_s: float) -> None:
+        deadline = time.monotonic() + visibility_timeout_s
+        with self._condition:
+            for handle in receipt_handles:
+                item = self._in_flight.get(handle)
+                if item is not None:
+                    self._in_flight[handle] = (deadline, item[1], item[2])
+
+    def get_attributes(self) -> Dict[str, str]:
+        with self._condition:
+            return {
+                'ApproximateNumberOfMessages': str(self._available + len(self._redeliver)),
+                'ApproximateNumberOfMessagesNotVisible': str(len(self._in_flight)),
+                'ApproximateNumberOfMessagesDelayed': '0',
+                'NumberOfMessagesAdded': str(self._added),
+            }
+
+    def close(self) -> None:
+        self._stopped.set()
+        self._sync_thread.join()
+        self._log.close()
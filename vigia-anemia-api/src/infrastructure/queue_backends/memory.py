@@ -0,0 +1,111 @@
+"""
+Backend em memória, no próprio processo.
+Para benchmarks de ingestão isolados e implantações de nó único com o worker
+rodando no mesmo processo. As mensagens não sobrevivem a um reinício.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Tuple
+from uuid import uuid4
+
+from src.infrastructure.queue_backends.base import (
+    QueueBackend,
+    QueueBackendError,
+    ReceivedMessage,
+    attribute_values,
+)
+
+
+class InMemoryQueueBackend(QueueBackend):
+    """
+    Fila em memória com semântica de visibilidade do SQS.
+
+    O envio só adquire um lock e não bloqueia o event loop; o recebimento
+    com long polling espera em uma Condition e deve rodar fora do loop.
+    """
+
+    name = "memory"
+    blocking = False
+    in_process = True
+
+    def __init__(self, max_messages: int = 0):
+        """
+        Args:
+            max_messages: Capacidade máxima (0 = ilimitada)
+        """
+        self.max_messages = max_messages
+        self._condition = threading.Condition()
+        self._available: deque = deque()
+        self._in_flight: Dict[str, Tuple[float, ReceivedMessage]] = {}
+        self._added = 0
+
+    def send(self, entry: Dict[str, Any]) -> str:
+        message_id = str(uuid4())
+        with self._condition:
+            if self.max_messages and len(self._available) + len(self._in_flight) >= self.max_messages:
+                raise QueueBackendError("QueueFull", "Fila em memória cheia")
+            self._available.append((message_id, entry['MessageBody'], attribute_values(entry)))
+            self._added += 1
+            self._condition.notify()
+        return message_id
+
+    def send_batch(self, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        successful, failed = [], []
+        for entry in entries:
+            try:
+                successful.append({'Id': entry['Id'], 'MessageId': self.send(entry)})
+            except QueueBackendError as e:
+                failed.append({'Id': entry['Id'], 'Code': e.code, 'Message': e.message, 'SenderFault': False})
+        return {'Successful': successful, 'Failed': failed}
+
+    def _requeue_expired(self, now: float) -> None:
+        for handle, (deadline, message) in list(self._in_flight.items()):
+            if deadline <= now:
+                del self._in_flight[handle]
+                self._available.appendleft((message.message_id, message.body, message.attributes))
+
+    def receive(
+        self,
+        max_messages: int,
+        wait_time_s: float,
+        visibility_timeout_s: float
+    ) -> List[ReceivedMessage]:
+        deadline = time.monotonic() + wait_time_s
+        received = []
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._requeue_expired(now)
+                if self._available or now >= deadline:
+                    break
+                self._condition.wait(deadline - now)
+
+            while self._available and len(received) < max_messages:
+                message_id, body, attributes = self._available.popleft()
+                message = ReceivedMessage(message_id, str(uuid4()), body, attributes)
+                self._in_flight[message.receipt_handle] = (now + visibility_timeout_s, message)
+                received.append(message)
+        return received
+
+    def delete_batch(self, receipt_handles: List[str]) -> None:
+        with self._condition:
+            for handle in receipt_handles:
+                self._in_flight.pop(handle, None)
+
+    def change_visibility_batch(self, receipt_handles: List[str], visibility_timeout_s: float) -> None:
+        deadline = time.monotonic() + visibility_timeout_s
+        with self._condition:
+            for handle in receipt_handles:
+                item = self._in_flight.get(handle)
+                if item is not None:
+                    self._in_flight[handle] = (deadline, item[1])
+
+    def get_attributes(self) -> Dict[str, str]:
+        with self._condition:
+            return {
+                'ApproximateNumberOfMessages': str(len(self._available)),
+                'ApproximateNumberOfMessagesNotVisible': str(len(self._in_flight)),
+                'ApproximateNumberOfMessagesDelayed': '0',
+                'NumberOfMessagesAdded': str(self._added),
+            }
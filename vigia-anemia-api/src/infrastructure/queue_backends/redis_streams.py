@@ -0,0 +1,203 @@
+"""
+Backend Redis Streams (XADD / XREADGROUP / XAUTOCLAIM).
+Usa as configurações de Redis já existentes; requer Redis >= 6.2.
+"""
+import json
+import os
+import socket
+from typing import Any, Dict, List, Optional
+
+from src.core.config import settings
+from src.core.logging import get_logger
+from src.infrastructure.queue_backends.base import (
+    QueueBackend,
+    QueueBackendError,
+    ReceivedMessage,
+    attribute_values,
+)
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - dependência opcional
+    redis = None
+
+logger = get_logger(__name__)
+
+
+class RedisStreamsQueueBackend(QueueBackend):
+    """
+    Fila sobre um Redis Stream com consumer group.
+
+    A visibilidade é emulada pelo tempo ocioso das entradas pendentes: uma
+    mensagem recebida e não confirmada há mais que o visibility timeout é
+    reivindicada (XAUTOCLAIM) pelo próximo consumidor que chamar `receive`.
+    """
+
+    name = "redis"
+    blocking = True
+
+    def __init__(
+        self,
+        client: Any = None,
+        stream_key: Optional[str] = None,
+        group: Optional[str] = None,
+        consumer: Optional[str] = None,
+        maxlen: Optional[int] = None,
+    ):
+        """
+        Args:
+            client: Cliente redis síncrono (padrão: criado a partir das settings)
+            stream_key: Chave do stream
+            group: Consumer group dos workers
+            consumer: Nome deste consumidor no grupo (padrão: host-pid)
+            maxlen: Tamanho máximo aproximado do stream (0 = ilimitado)
+
+        Raises:
+            RuntimeError: Se o pacote redis não estiver instalado
+        """
+        if redis is None:
+            raise RuntimeError("Pacote redis não instalado")
+
+        self.client = client or redis.Redis(
+            host=settings.redis_host,
+            port=settings.redis_port,
+            db=settings.redis_db,
+            password=settings.redis_password or None,
+            decode_responses=True,
+        )
+        self.stream_key = stream_key or settings.redis_stream_key
+        self.group = group or settings.redis_stream_group
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.maxlen = (settings.redis_stream_maxlen if maxlen is None else maxlen) or None
+
+        try:
+            self.client.xgroup_create(self.stream_key, self.group, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        except redis.RedisError as e:
+            # Redis indisponível na inicialização: as operações reportam o erro
+            logger.error("Erro ao criar consumer group no Redis", error=str(e))
+
+    @staticmethod
+    def _fields(entry: Dict[str, Any]) -> Dict[str, str]:
+        fields = {
+            "body": entry['MessageBody'],
+            "attributes": json.dumps(attribute_values(entry)),
+        }
+        if 'MessageGroupId' in entry:
+            fields["group"] = entry['MessageGroupId']
+        return fields
+
+    def send(self, entry: Dict[str, Any]) -> str:
+        try:
+            return self.client.xadd(self.stream_key, self._fields(entry), maxlen=self.maxlen, approximate=True)
+        except redis.RedisError as e:
+            raise QueueBackendError(type(e).__name__, str(e)) from e
+
+    def send_batch(self, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        # Pipeline sem transação: um round trip para o lote inteiro
+        pipeline = self.client.pipeline(transaction=False)
+        for entry in entries:
+            pipeline.xadd(self.stream_key, self._fields(entry), maxlen=self.maxlen, approximate=True)
+        try:
+            results = pipeline.execute(raise_on_error=False)
+        except redis.RedisError as e:
+            raise QueueBackendError(type(e).__name__, str(e)) from e
+
+        successful, failed = [], []
+        for entry, result in zip(entries, results):
+            if isinstance(result, Exception):
+                failed.append({'Id': entry['Id'], 'Code': type(result).__name__,
+                               'Message': str(result), 'SenderFault': False})
+            else:
+                successful.append({'Id': entry['Id'], 'MessageId': result})
+        return {'Successful': successful, 'Failed': failed}
+
+    @staticmethod
+    def _message(message_id: str, fields: Dict[str, str]) -> ReceivedMessage:
+        return ReceivedMessage(
+            message_id=message_id,
+            receipt_handle=message_id,
+            body=fields.get("body", ""),
+            attributes=json.loads(fields.get("attributes") or "{}"),
+        )
+
+    def receive(
+        self,
+        max_messages: int,
+        wait_time_s: float,
+        visibility_timeout_s: float
+    ) -> List[ReceivedMessage]:
+        try:
+            # Primeiro, mensagens de consumidores que excederam o visibility timeout
+            _, claimed, *_ = self.client.xautoclaim(
+                self.stream_key,
+                self.group,
+                self.consumer,
+                min_idle_time=int(visibility_timeout_s * 1000),
+                start_id="0-0",
+                count=max_messages,
+            )
+            received = [self._message(message_id, fields) for message_id, fields in claimed if fields]
+            if len(received) >= max_messages:
+                return received
+
+            # BLOCK 0 espera indefinidamente no Redis: sem espera, omite o BLOCK
+            block = int(wait_time_s * 1000) if wait_time_s > 0 and not received else None
+            response = self.client.xreadgroup(
+                self.group,
+                self.consumer,
+                {self.stream_key: ">"},
+                count=max_messages - len(received),
+                block=block,
+            )
+        except redis.RedisError as e:
+            raise QueueBackendError(type(e).__name__, str(e)) from e
+
+        for _, messages in response or []:
+            received.extend(self._message(message_id, fields) for message_id, fields in messages)
+        return received
+
+    def delete_batch(self, receipt_handles: List[str]) -> None:
+        if not receipt_handles:
+            return
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.xack(self.stream_key, self.group, *receipt_handles)
+        pipeline.xdel(self.stream_key, *receipt_handles)
+        try:
+            pipeline.execute()
+        except redis.RedisError as e:
+            raise QueueBackendError(type(e).__name__, str(e)) from e
+
+    def change_visibility_batch(self, receipt_handles: List[str], visibility_timeout_s: float) -> None:
+        # XCLAIM para o próprio consumidor zera o tempo ocioso das entradas,
+        # adiando a reivindicação por outro worker por mais um visibility timeout
+        if not receipt_handles:
+            return
+        try:
+            self.client.xclaim(
+                self.stream_key, self.group, self.consumer, min_idle_time=0,
+                message_ids=receipt_handles, justid=True,
+            )
+        except redis.RedisError as e:
+            raise QueueBackendError(type(e).__name__, str(e)) from e
+
+    def get_attributes(self) -> Dict[str, str]:
+        try:
+            info = self.client.xinfo_stream(self.stream_key)
+            pending = self.client.xpending(self.stream_key, self.group)["pending"]
+        except redis.RedisError as e:
+            raise QueueBackendError(type(e).__name__, str(e)) from e
+        attributes = {
+            'ApproximateNumberOfMessages': str(max(info["length"] - pending, 0)),
+            'ApproximateNumberOfMessagesNotVisible': str(pending),
+            'ApproximateNumberOfMessagesDelayed': '0',
+        }
+        # entries-added (Redis 7+): XADDs de todos os produtores desde a criação do stream
+        if info.get("entries-added") is not None:
+            attributes['NumberOfMessagesAdded'] = str(info["entries-added"])
+        return attributes
+
+    def close(self) -> None:
+        self.client.close()
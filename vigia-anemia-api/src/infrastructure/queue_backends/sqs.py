@@ -0,0 +1,142 @@
+"""
+Backend AWS SQS (boto3).
+"""
+from typing import Any, Dict, List, Optional
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+
+from src.core.config import settings
+from src.core.logging import get_logger
+from src.infrastructure.queue_backends.base import QueueBackend, QueueBackendError, ReceivedMessage
+
+logger = get_logger(__name__)
+
+# Limite de entradas por chamada *Batch do SQS
+_SQS_BATCH_LIMIT = 10
+
+
+def _backend_error(error: Exception) -> QueueBackendError:
+    """Converte exceções do boto3 em QueueBackendError."""
+    if isinstance(error, ClientError):
+        details = error.response['Error']
+        return QueueBackendError(
+            details.get('Code', 'ClientError'),
+            details.get('Message', str(error)),
+            sender_fault=details.get('Type') == 'Sender',
+        )
+    return QueueBackendError(type(error).__name__, str(error))
+
+
+class SQSQueueBackend(QueueBackend):
+    """Fila AWS SQS (padrão ou FIFO)."""
+
+    name = "sqs"
+    blocking = True
+
+    def __init__(self, queue_url: Optional[str] = None, client: Any = None):
+        """
+        Args:
+            queue_url: URL da fila (padrão: settings.sqs_queue_url)
+            client: Cliente boto3 já configurado (padrão: criado a partir das settings)
+        """
+        self.client = client or boto3.client(
+            'sqs',
+            region_name=settings.aws_region,
+            endpoint_url=settings.sqs_endpoint_url or None,
+            aws_access_key_id=settings.aws_access_key_id or None,
+            aws_secret_access_key=settings.aws_secret_access_key or None,
+            # O pool de conexões HTTP acompanha o nº de threads do executor
+            config=Config(max_pool_connections=settings.sqs_max_pool_connections),
+        )
+        self.queue_url = queue_url or settings.sqs_queue_url
+        self.fifo = self.queue_url.endswith('.fifo')
+
+    def send(self, entry: Dict[str, Any]) -> str:
+        try:
+            response = self.client.send_message(QueueUrl=self.queue_url, **entry)
+        except (ClientError, BotoCoreError) as e:
+            raise _backend_error(e) from e
+        return response.get('MessageId')
+
+    def send_batch(self, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        try:
+            return self.client.send_message_batch(QueueUrl=self.queue_url, Entries=entries)
+        except (ClientError, BotoCoreError) as e:
+            raise _backend_error(e) from e
+
+    def receive(
+        self,
+        max_messages: int,
+        wait_time_s: float,
+        visibility_timeout_s: float
+    ) -> List[ReceivedMessage]:
+        try:
+            response = self.client.receive_message(
+                QueueUrl=self.queue_url,
+                MaxNumberOfMessages=min(max_messages, _SQS_BATCH_LIMIT),
+                WaitTimeSeconds=int(wait_time_s),
+                VisibilityTimeout=int(visibility_timeout_s),
+                MessageAttributeNames=['All'],
+            )
+        except (ClientError, BotoCoreError) as e:
+            raise _backend_error(e) from e
+
+        return [
+            ReceivedMessage(
+                message_id=message['MessageId'],
+                receipt_handle=message['ReceiptHandle'],
+                body=message['Body'],
+                attributes={
+                    name: attribute.get('StringValue', '')
+                    for name, attribute in message.get('MessageAttributes', {}).items()
+                },
+            )
+            for message in response.get('Messages', [])
+        ]
+
+    def delete_batch(self, receipt_handles: List[str]) -> None:
+        for start in range(0, len(receipt_handles), _SQS_BATCH_LIMIT):
+            chunk = receipt_handles[start:start + _SQS_BATCH_LIMIT]
+            try:
+                response = self.client.delete_message_batch(
+                    QueueUrl=self.queue_url,
+                    Entries=[{'Id': str(index), 'ReceiptHandle': handle} for index, handle in enumerate(chunk)],
+                )
+            except (ClientError, BotoCoreError) as e:
+                raise _backend_error(e) from e
+            for failed in response.get('Failed', []):
+                logger.error(
+                    "Erro ao remover mensagem da fila",
+                    error_code=failed.get('Code'),
+                    error_message=failed.get('Message')
+                )
+
+    def change_visibility_batch(self, receipt_handles: List[str], visibility_timeout_s: float) -> None:
+        for start in range(0, len(receipt_handles), _SQS_BATCH_LIMIT):
+            chunk = receipt_handles[start:start + _SQS_BATCH_LIMIT]
+            try:
+                self.client.change_message_visibility_batch(
+                    QueueUrl=self.queue_url,
+                    Entries=[
+                        {'Id': str(index), 'ReceiptHandle': handle, 'VisibilityTimeout': int(visibility_timeout_s)}
+                        for index, handle in enumerate(chunk)
+                    ],
+                )
+            except (ClientError, BotoCoreError) as e:
+                raise _backend_error(e) from e
+
+    def get_attributes(self) -> Dict[str, str]:
+        try:
+            response = self.client.get_queue_attributes(
+                QueueUrl=self.queue_url,
+                AttributeNames=[
+                    'ApproximateNumberOfMessages',
+                    'ApproximateNumberOfMessagesNotVisible',
+                    'ApproximateNumberOfMessagesDelayed'
+                ]
+            )
+        except (ClientError, BotoCoreError) as e:
+            raise _backend_error(e) from e
+        return response.get('Attributes', {})
@@ -0,0 +1,296 @@
+"""
+Monitor da fila para o autoscaling dos workers pelo tamanho da fila (RNF05.1).
+
+Uma tarefa em background consulta `QueueService.get_queue_attributes` a cada
+QUEUE_MONITOR_INTERVAL_S e guarda o último retrato em memória; métricas e o
+endpoint de dimensionamento leem esse retrato, nunca o SQS.
+
+Sobre as amostras da janela QUEUE_MONITOR_WINDOW_S:
+- entrada: variação, por segundo, do total de mensagens enfileiradas. O total
+  vem do contador da própria fila (NumberOfMessagesAdded) quando o backend o
+  informa; senão (SQS), de um contador no Redis em que cada processo da API
+  soma as mensagens que aceitou (QUEUE_MONITOR_SHARED_COUNTER), ou, sem ele,
+  das mensagens aceitas por este processo
+- saída: entrada menos a variação do total na fila (visíveis, em
+  processamento e atrasadas)
+- tempo para esvaziar: backlog / (saída - entrada), se o backlog diminui
+- workers: ceil((entrada + backlog / QUEUE_TARGET_DRAIN_S) / WORKER_THROUGHPUT_PER_S),
+  entre WORKER_MIN_REPLICAS e WORKER_MAX_REPLICAS
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, NamedTuple, Optional
+
+from src.core import metrics
+from src.core.config import settings
+from src.core.logging import get_logger
+from src.infrastructure.queue_service import QueueService, get_queue_service
+from src.infrastructure.redis_client import get_async_redis
+
+try:
+    from redis.exceptions import RedisError
+except ImportError:  # pragma: no cover - dependência opcional
+    RedisError = Exception
+
+logger = get_logger(__name__)
+
+
+class QueueSample(NamedTuple):
+    """Amostra dos atributos da fila."""
+    at: float
+    visible: int
+    in_flight: int
+    delayed: int
+    # Total acumulado de mensagens enfileiradas (todos os produtores)
+    sent: int
+
+    @property
+    def total(self) -> int:
+        """Mensagens na fila em qualquer estado."""
+        return self.visible + self.in_flight + self.delayed
+
+
+class QueueSnapshot(NamedTuple):
+    """Retrato da fila derivado da janela de amostras."""
+    sampled_at: datetime
+    visible: int
+    in_flight: int
+    delayed: int
+    inflow_per_s: float
+    outflow_per_s: float
+    drain_time_s: Optional[float]
+    recommended_workers: int
+
+    @property
+    def backlog(self) -> int:
+        """Mensagens aguardando um worker (visíveis e atrasadas)."""
+        return self.visible + self.delayed
+
+
+def recommend_workers(
+    inflow_per_s: float,
+    backlog: int,
+    throughput_per_worker: float,
+    target_drain_s: float,
+    min_workers: int,
+    max_workers: int
+) -> int:
+    """
+    Calcula os workers que acompanham a entrada e esvaziam o backlog no prazo alvo.
+
+    Args:
+        inflow_per_s: Mensagens publicadas por segundo
+        backlog: Mensagens aguardando um worker
+        throughput_per_worker: Mensagens por segundo de um worker
+        target_drain_s: Prazo alvo para esvaziar o backlog
+        min_workers: Mínimo de workers
+        max_workers: Máximo de workers
+
+    Returns:
+        Número de workers, entre min_workers e max_workers
+    """
+    required = (inflow_per_s + backlog / target_drain_s) / throughput_per_worker
+    return max(min_workers, min(max_workers, math.ceil(required)))
+
+
+def summarize(oldest: QueueSample, newest: QueueSample) -> QueueSnapshot:
+    """
+    Deriva taxas, tempo para esvaziar e workers recomendados de duas amostras.
+
+    Args:
+        oldest: Amostra mais antiga da janela
+        newest: Amostra mais recente
+
+    Returns:
+        Retrato da fila (taxas zeradas com uma única amostra)
+    """
+    elapsed = newest.at - oldest.at
+    inflow = outflow = 0.0
+    if elapsed > 0:
+        # Contador reiniciado (ex.: fila recriada) conta como entrada nula
+        inflow = max(0, newest.sent - oldest.sent) / elapsed
+        outflow = max(0.0, inflow - (newest.total - oldest.total) / elapsed)
+
+    backlog = newest.visible + newest.delayed
+    drain_time: Optional[float] = 0.0
+    if backlog:
+        drain_time = backlog / (outflow - inflow) if outflow > inflow else None
+
+    return QueueSnapshot(
+        sampled_at=datetime.utcnow(),
+        visible=newest.visible,
+        in_flight=newest.in_flight,
+        delayed=newest.delayed,
+        inflow_per_s=inflow,
+        outflow_per_s=outflow,
+        drain_time_s=drain_time,
+        recommended_workers=recommend_workers(
+            inflow,
+            backlog,
+            settings.worker_throughput_per_s,
+            settings.queue_target_drain_s,
+            settings.worker_min_replicas,
+            settings.worker_max_replicas,
+        ),
+    )
+
+
+class QueueMonitor:
+    """Amostragem periódica dos atributos da fila com o último retrato em cache."""
+
+    def __init__(
+        self,
+        queue_service: QueueService,
+        interval_s: Optional[float] = None,
+        window_s: Optional[float] = None,
+        shared_counter: Any = None,
+        counter_key: Optional[str] = None
+    ):
+        """
+        Args:
+            queue_service: Serviço de fila consultado (e contador de mensagens aceitas)
+            interval_s: Intervalo entre consultas (padrão: QUEUE_MONITOR_INTERVAL_S)
+            window_s: Janela das taxas (padrão: QUEUE_MONITOR_WINDOW_S)
+            shared_counter: Cliente redis.asyncio do contador compartilhado entre
+                processos (None: só as mensagens aceitas por este processo)
+            counter_key: Chave do contador (padrão: QUEUE_MONITOR_REDIS_KEY)
+        """
+        self.queue_service = queue_service
+        self.interval_s = interval_s or settings.queue_monitor_interval_s
+        self.window_s = window_s or settings.queue_monitor_window_s
+        self.shared_counter = shared_counter
+        self.counter_key = counter_key or settings.queue_monitor_redis_key
+        # Mensagens deste processo já somadas ao contador compartilhado
+        self._published = 0
+        self.snapshot: Optional[QueueSnapshot] = None
+        self._samples: Deque[QueueSample] = deque()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Inicia a amostragem em background no event loop corrente."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._poll_loop())
+            logger.info(
+                "Monitor da fila iniciado",
+                interval_s=self.interval_s,
+                window_s=self.window_s
+            )
+
+    async def close(self) -> None:
+        """Interrompe a amostragem."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def sample(self) -> Optional[QueueSnapshot]:
+        """
+        Consulta os atributos da fila (fora do event loop) e atualiza o retrato.
+
+        Returns:
+            Retrato atualizado, ou o anterior se a consulta falhar
+        """
+        loop = asyncio.get_running_loop()
+        attributes = await loop.run_in_executor(None, self.queue_service.get_queue_attributes)
+        if attributes is None:
+            return self.snapshot
+        sent = await self._sent_total(attributes)
+        if sent is None:
+            return self.snapshot
+
+        sample = QueueSample(
+            at=time.monotonic(),
+            visible=int(attributes.get("ApproximateNumberOfMessages", 0)),
+            in_flight=int(attributes.get("ApproximateNumberOfMessagesNotVisible", 0)),
+            delayed=int(attributes.get("ApproximateNumberOfMessagesDelayed", 0)),
+            sent=sent,
+        )
+        self._samples.append(sample)
+        while len(self._samples) > 2 and sample.at - self._samples[1].at >= self.window_s:
+            self._samples.popleft()
+
+        self.snapshot = summarize(self._samples[0], sample)
+        metrics.set_queue_snapshot(self.snapshot)
+        return self.snapshot
+
+    async def _sent_total(self, attributes: dict) -> Optional[int]:
+        """
+        Total acumulado de mensagens enfileiradas por todos os processos.
+
+        Args:
+            attributes: Atributos da fila recém-consultados
+
+        Returns:
+            Contador da fila, contador compartilhado ou contador local; None se
+            o contador compartilhado não puder ser atualizado (amostra descartada)
+        """
+        added = attributes.get("NumberOfMessagesAdded")
+        if added is not None:
+            return int(added)
+
+        local = self.queue_service.sent_count
+        if self.shared_counter is None:
+            return local
+        try:
+            # INCRBY 0 também serve de leitura quando nada foi aceito desde a última amostra
+            total = await self.shared_counter.incrby(self.counter_key, local - self._published)
+        except RedisError as e:
+            # O delta não somado segue pendente e entra na próxima amostra
+            logger.warning("Erro ao atualizar o contador compartilhado da fila", error=str(e))
+            return None
+        self._published = local
+        return int(total)
+
+    async def _poll_loop(self) -> None:
+        while True:
+            try:
+                snapshot = await self.sample()
+                if snapshot is not None:
+                    logger.debug(
+                        "Fila amostrada",
+                        visible=snapshot.visible,
+                        in_flight=snapshot.in_flight,
+                        inflow_per_s=round(snapshot.inflow_per_s, 2),
+                        outflow_per_s=round(snapshot.outflow_per_s, 2),
+                        recommended_workers=snapshot.recommended_workers
+                    )
+            except Exception as e:
+                logger.error("Erro inesperado na amostragem da fila", error=str(e))
+            await asyncio.sleep(self.interval_s)
+
+
+# Instância singleton do monitor
+_queue_monitor: Optional[QueueMonitor] = None
+
+
+def get_queue_monitor() -> QueueMonitor:
+    """
+    Retorna o monitor da fila do serviço de fila compartilhado.
+
+    Returns:
+        Instância singleton do QueueMonitor
+    """
+    global _queue_monitor
+
+    if _queue_monitor is None:
+        shared_counter = None
+        if settings.queue_monitor_shared_counter:
+            try:
+                shared_counter = get_async_redis()
+            except RuntimeError as e:
+                logger.warning("Contador compartilhado da fila indisponível", error=str(e))
+        _queue_monitor = QueueMonitor(get_queue_service(), shared_counter=shared_counter)
+
+    return _queue_monitor
+
+
+async def close_queue_monitor() -> None:
+    """Interrompe o monitor singleton, se existir."""
+    global _queue_monitor
+
+    if _queue_monitor is not None:
+        await _queue_monitor.close()
+        _queue_monitor = None
@@ -1,38 +1,269 @@
 """
-Serviço de enfileiramento de mensagens usando AWS SQS.
+Serviço de enfileiramento de mensagens (AWS SQS ou backend configurado).
 Responsável por enviar hemogramas validados para processamento assíncrono.
 """
+import asyncio
 import json
-from typing import Optional
-from uuid import UUID
-
-import boto3
-from botocore.exceptions import ClientError
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
 
+from src.core import metrics
 from src.core.config import settings
 from src.core.logging import get_logger
 from src.domain.models import QueueMessage
+from src.infrastructure.batch_publisher import BatchPublisher
+from src.infrastructure.circuit_breaker import CircuitBreaker
+from src.infrastructure.message_envelope import (
+    CONTENT_ENCODING,
+    EnvelopeCodec,
+    build_envelope_codec,
+)
+from src.infrastructure.queue_backends import QueueBackend, QueueBackendError, create_queue_backend
+from src.infrastructure.spool import SegmentSpool, SpoolDrainer, SpoolPosition, process_spool_dir
 
 logger = get_logger(__name__)
 
 
 class QueueService:
-    """Serviço para enfileiramento de mensagens no AWS SQS."""
-    
-    def __init__(self):
-        """Inicializa o cliente SQS."""
-        self.sqs_client = boto3.client(
-            'sqs',
-            region_name=settings.aws_region,
-            aws_access_key_id=settings.aws_access_key_id or None,
-            aws_secret_access_key=settings.aws_secret_access_key or None,
+    """Serviço para enfileiramento de mensagens no backend de fila (padrão: AWS SQS)."""
+    
+    def __init__(self, backend: Optional[QueueBackend] = None):
+        """
+        Inicializa o backend de fila e o executor dedicado de publicação.
+        
+        Args:
+            backend: Backend de fila (padrão: definido por settings.queue_backend)
+        """
+        self.backend = backend or create_queue_backend()
+        
+        # Mensagens aceitas por este processo (vazão de entrada do monitor da fila)
+        self.sent_count = 0
+        
+        # Executor limitado: chamadas bloqueantes (boto3, Redis) não podem
+        # rodar no event loop; backends não bloqueantes são chamados direto
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.sqs_publisher_max_workers,
+            thread_name_prefix="queue-publisher",
         )
-        self.queue_url = settings.sqs_queue_url
-        logger.info("QueueService inicializado", queue_url=self.queue_url)
+        blocking_executor = self._executor if self.backend.blocking else None
+        
+        # Envelope comprimido opcional (zstd com dicionário)
+        self._envelope: Optional[EnvelopeCodec] = None
+        if settings.queue_envelope_compression:
+            self._envelope = build_envelope_codec(
+                settings.queue_envelope_dictionary_path,
+                settings.queue_envelope_compression_level,
+            )
+        
+        # Modo opcional de micro-batching (SendMessageBatch)
+        self._batcher: Optional[BatchPublisher] = None
+        if settings.sqs_batching_enabled:
+            self._batcher = BatchPublisher(
+                send_batch=self.backend.send_batch,
+                executor=blocking_executor,
+                max_entries=settings.sqs_batch_max_entries,
+                max_bytes=settings.sqs_batch_max_bytes,
+                linger_ms=settings.sqs_batch_linger_ms,
+            )
+        
+        # Spool local + circuit breaker: mensagens seguem aceitas durante falhas do SQS
+        self._spool: Optional[SegmentSpool] = None
+        self._breaker: Optional[CircuitBreaker] = None
+        self._drainer: Optional[SpoolDrainer] = None
+        self._spool_executor: Optional[ThreadPoolExecutor] = None
+        self._spool_writes = 0
+        if settings.queue_spool_enabled:
+            # Subdiretório próprio: vários workers podem compartilhar QUEUE_SPOOL_DIR
+            self._spool = SegmentSpool(
+                process_spool_dir(settings.queue_spool_dir),
+                settings.queue_spool_segment_bytes
+            )
+            # Thread única e separada do publicador: gravações no spool não
+            # esperam por chamadas ao SQS travadas e mantêm a ordem de chegada
+            self._spool_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="queue-spool")
+            self._breaker = CircuitBreaker(
+                self.backend.name,
+                failure_threshold=settings.sqs_circuit_failure_threshold,
+                reset_timeout_s=settings.sqs_circuit_reset_timeout_s,
+            )
+        
+        logger.info(
+            "QueueService inicializado",
+            backend=self.backend.name,
+            publisher_workers=settings.sqs_publisher_max_workers,
+            batching_enabled=self._batcher is not None,
+            envelope_compression=self._envelope is not None,
+            spool_enabled=self._spool is not None
+        )
+    
+    async def send_message_async(self, message: QueueMessage) -> tuple[bool, Optional[str]]:
+        """
+        Envia uma mensagem para a fila sem bloquear o event loop.
+        
+        A chamada síncrona ao SQS roda no executor dedicado, permitindo
+        várias publicações simultâneas em voo. Com o micro-batching ativo, a
+        mensagem entra no lote corrente e o resultado é o da sua própria
+        entrada no SendMessageBatch. Com o spool ativo, falhas do SQS (ou o
+        circuito aberto) gravam a mensagem no disco para reenvio posterior e
+        o resultado é de sucesso, com a posição no spool como identificador.
+        
+        Args:
+            message: Mensagem a ser enfileirada
+        
+        Returns:
+            Tupla (success, message_id ou error_message)
+        """
+        start = time.perf_counter()
+        with metrics.queue_sends_in_flight():
+            success, result = await self._send(message)
+        metrics.observe_queue_send(self.backend.name, success, time.perf_counter() - start)
+        self.sent_count += success
+        return success, result
+    
+    async def _send(self, message: QueueMessage) -> tuple[bool, Optional[str]]:
+        """Publica a mensagem, desviando para o spool (se habilitado) em caso de falha."""
+        if self._spool is None:
+            return await self._publish(message)
+        
+        # Fila FIFO: enquanto o spool tem backlog, novas mensagens entram atrás
+        # dele, para que o reenvio não chegue depois de envios diretos mais novos
+        if self.backend.fifo and self._spool_backlog:
+            return await self._spool_message(message, "spool com mensagens pendentes", backlog=True)
+        
+        if not self._breaker.allow_request():
+            return await self._spool_message(message, "circuito aberto")
+        
+        success, result = await self._publish(message)
+        if success:
+            self._breaker.record_success()
+            return success, result
+        
+        self._breaker.record_failure()
+        return await self._spool_message(message, result)
+    
+    async def _publish(self, message: QueueMessage) -> tuple[bool, Optional[str]]:
+        """Publica no backend pelo executor (ou direto, se não bloqueante) ou pelo lote corrente."""
+        if self._batcher is None:
+            if not self.backend.blocking:
+                return self.send_message(message)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self.send_message, message)
+        
+        try:
+            entry = self._build_entry(message)
+        except Exception as e:
+            logger.error(
+                "Erro inesperado ao enfileirar mensagem",
+                error=str(e),
+                tracking_id=str(message.tracking_id),
+                correlation_id=message.correlation_id
+            )
+            return False, str(e)
+        
+        return await self._batcher.submit(entry, str(message.tracking_id))
+    
+    async def _spool_message(
+        self,
+        message: QueueMessage,
+        reason: Optional[str],
+        backlog: bool = False
+    ) -> tuple[bool, Optional[str]]:
+        """
+        Grava a mensagem no spool local para reenvio pelo drenador.
+        
+        Serialização e gravação rodam na thread do spool, fora do event loop;
+        por ser uma única thread, os registros entram na ordem de chegada.
+        
+        Args:
+            message: Mensagem não enviada
+            reason: Motivo do desvio (erro do SQS, circuito aberto ou backlog FIFO)
+            backlog: True se o desvio apenas preserva a ordem FIFO (log em debug)
+        
+        Returns:
+            Tupla (success, posição no spool ou error_message)
+        """
+        loop = asyncio.get_running_loop()
+        self._spool_writes += 1
+        try:
+            position = await loop.run_in_executor(self._spool_executor, self._append_to_spool, message)
+        except Exception as e:
+            logger.error(
+                "Erro ao gravar mensagem no spool local",
+                error=str(e),
+                tracking_id=str(message.tracking_id),
+                correlation_id=message.correlation_id
+            )
+            return False, f"{reason}; spool: {e}"
+        finally:
+            self._spool_writes -= 1
+        
+        # Desvio por backlog é esperado durante a drenagem: não é uma falha
+        log = logger.debug if backlog else logger.warning
+        log(
+            "Mensagem desviada para o spool local",
+            reason=reason,
+            circuit_state=self._breaker.state.value,
+            tracking_id=str(message.tracking_id),
+            correlation_id=message.correlation_id
+        )
+        return True, f"spool:{position.segment}:{position.offset}"
+    
+    def _append_to_spool(self, message: QueueMessage) -> SpoolPosition:
+        """Serializa a mensagem e a acrescenta ao spool (chamada bloqueante)."""
+        entry = self._build_entry(message)
+        return self._spool.append(json.dumps(entry).encode("utf-8"))
+    
+    @property
+    def _spool_backlog(self) -> bool:
+        """True se há registros no spool ou gravações ainda em andamento."""
+        return self._spool_writes > 0 or self._spool.pending
+    
+    @property
+    def spool_pending(self) -> bool:
+        """True se há mensagens no spool local aguardando reenvio."""
+        return self._spool is not None and self._spool.pending
+    
+    def start_spool_drainer(self) -> None:
+        """Inicia o fsync em grupo e o reenvio do spool (chamado no startup)."""
+        if self._spool is None or self._drainer is not None:
+            return
+        self._drainer = SpoolDrainer(
+            spool=self._spool,
+            send_batch=self.backend.send_batch,
+            executor=self._executor,
+            breaker=self._breaker,
+            max_entries=settings.sqs_batch_max_entries,
+            max_bytes=settings.sqs_batch_max_bytes,
+            idle_interval_ms=settings.queue_spool_drain_interval_ms,
+            fsync_interval_ms=settings.queue_spool_fsync_interval_ms,
+            orphans_root=settings.queue_spool_dir,
+            preserve_order=self.backend.fifo,
+        )
+        self._drainer.start()
+    
+    async def flush(self) -> None:
+        """Envia os lotes pendentes do micro-batching e interrompe o drenador do spool."""
+        if self._batcher is not None:
+            await self._batcher.drain()
+        if self._drainer is not None:
+            await self._drainer.stop()
+            self._drainer = None
+    
+    def close(self) -> None:
+        """Aguarda as publicações em andamento e libera o executor, o spool e o backend."""
+        self._executor.shutdown(wait=True)
+        if self._spool_executor is not None:
+            self._spool_executor.shutdown(wait=True)
+        if self._spool is not None:
+            self._spool.close()
+        self.backend.close()
+        logger.info("QueueService encerrado")
     
     def send_message(self, message: QueueMessage) -> tuple[bool, Optional[str]]:
         """
-        Envia uma mensagem para a fila SQS.
+        Envia uma mensagem para a fila (chamada bloqueante para backends de rede).
         
         Args:
             message: Mensagem a ser enfileirada
@@ -41,42 +272,10 @@ class QueueService:
             Tupla (success, message_id ou error_message)
         """
         try:
-            # Serializa a mensagem para JSON
-            message_body = message.model_dump_json()
-            
-            # Prepara parâmetros da mensagem
-            send_params = {
-                'QueueUrl': self.queue_url,
-                'MessageBody': message_body,
-                'MessageAttributes': {
-                    'TrackingId': {
-                        'StringValue': str(message.tracking_id),
-                        'DataType': 'String'
-                    },
-                    'LaboratoryCNES': {
-                        'StringValue': message.laboratory_cnes,
-                        'DataType': 'String'
-                    },
-                    'PatientCPF': {
-                        'StringValue': message.patient_cpf,
-                        'DataType': 'String'
-                    },
-                    'CorrelationId': {
-                        'StringValue': message.correlation_id,
-                        'DataType': 'String'
-                    }
-                }
-            }
-            
-            # Se for FIFO queue, adiciona MessageGroupId e MessageDeduplicationId
-            if self.queue_url.endswith('.fifo'):
-                send_params['MessageGroupId'] = settings.sqs_message_group_id
-                send_params['MessageDeduplicationId'] = str(message.tracking_id)
+            entry = self._build_entry(message)
             
             # Envia mensagem
-            response = self.sqs_client.send_message(**send_params)
-            
-            message_id = response.get('MessageId')
+            message_id = self.backend.send(entry)
             
             logger.info(
                 "Mensagem enfileirada com sucesso",
@@ -87,19 +286,16 @@ class QueueService:
             
             return True, message_id
             
-        except ClientError as e:
-            error_code = e.response['Error']['Code']
-            error_message = e.response['Error']['Message']
-            
+        except QueueBackendError as e:
             logger.error(
                 "Erro ao enfileirar mensagem",
-                error_code=error_code,
-                error_message=error_message,
+                error_code=e.code,
+                error_message=e.message,
                 tracking_id=str(message.tracking_id),
                 correlation_id=message.correlation_id
             )
             
-            return False, f"{error_code}: {error_message}"
+            return False, f"{e.code}: {e.message}"
             
         except Exception as e:
             logger.error(
@@ -111,6 +307,55 @@ class QueueService:
             
             return False, str(e)
     
+    def _build_entry(self, message: QueueMessage) -> Dict[str, Any]:
+        """
+        Monta os parâmetros de uma mensagem no formato do SQS (comuns a todos os backends).
+        
+        Args:
+            message: Mensagem a ser enfileirada
+        
+        Returns:
+            Dicionário com MessageBody, MessageAttributes e, em filas FIFO,
+            MessageGroupId e MessageDeduplicationId
+        """
+        # Serializa a mensagem para JSON (Bundle original embutido sem re-serialização)
+        entry = {
+            'MessageBody': message.to_json(),
+            'MessageAttributes': {
+                'TrackingId': {
+                    'StringValue': str(message.tracking_id),
+                    'DataType': 'String'
+                },
+                'LaboratoryCNES': {
+                    'StringValue': message.laboratory_cnes,
+                    'DataType': 'String'
+                },
+                'PatientCPF': {
+                    'StringValue': message.patient_cpf,
+                    'DataType': 'String'
+                },
+                'CorrelationId': {
+                    'StringValue': message.correlation_id,
+                    'DataType': 'String'
+                }
+            }
+        }
+        
+        # Envelope comprimido: o cabeçalho do corpo identifica versão e dicionário
+        if self._envelope is not None:
+            entry['MessageBody'] = self._envelope.encode(entry['MessageBody'])
+            entry['MessageAttributes']['ContentEncoding'] = {
+                'StringValue': CONTENT_ENCODING,
+                'DataType': 'String'
+            }
+        
+        # Se for FIFO queue, adiciona MessageGroupId e MessageDeduplicationId
+        if self.backend.fifo:
+            entry['MessageGroupId'] = message_group_id(message)
+            entry['MessageDeduplicationId'] = str(message.tracking_id)
+        
+        return entry
+    
     def get_queue_attributes(self) -> Optional[dict]:
         """
         Obtém atributos da fila (tamanho, mensagens em voo, etc.).
@@ -119,26 +364,49 @@ class QueueService:
             Dicionário com atributos da fila ou None em caso de erro
         """
         try:
-            response = self.sqs_client.get_queue_attributes(
-                QueueUrl=self.queue_url,
-                AttributeNames=[
-                    'ApproximateNumberOfMessages',
-                    'ApproximateNumberOfMessagesNotVisible',
-                    'ApproximateNumberOfMessagesDelayed'
-                ]
-            )
+            return self.backend.get_attributes()
             
-            return response.get('Attributes', {})
-            
-        except ClientError as e:
+        except QueueBackendError as e:
             logger.error(
                 "Erro ao obter atributos da fila",
-                error_code=e.response['Error']['Code'],
-                error_message=e.response['Error']['Message']
+                error_code=e.code,
+                error_message=e.message
             )
             return None
 
 
+def message_group_id(message: QueueMessage) -> str:
+    """
+    Define o MessageGroupId FIFO da mensagem conforme `sqs_message_group_strategy`.
+    
+    A ordem no SQS FIFO só é garantida dentro de um grupo, e cada grupo tem no
+    máximo um lote em processamento por vez. Distribuir as mensagens em vários
+    grupos permite escalar os workers mantendo a ordem onde ela importa:
+    
+    - static: todas as mensagens em `sqs_message_group_id` (ordem global)
+    - cnes: um grupo por laboratório (ordem por laboratório)
+    - cpf_hash: N grupos pelo hash do CPF (ordem por paciente, sem expor o CPF)
+    
+    Args:
+        message: Mensagem a ser enfileirada
+    
+    Returns:
+        MessageGroupId
+    """
+    strategy = settings.sqs_message_group_strategy
+    prefix = settings.sqs_message_group_id
+    
+    if strategy == "cnes":
+        return f"{prefix}-cnes-{message.laboratory_cnes}"
+    
+    if strategy == "cpf_hash":
+        # crc32 é estável entre processos (ao contrário de hash() com PYTHONHASHSEED)
+        shard = zlib.crc32(message.patient_cpf.encode("ascii")) % settings.sqs_message_group_shards
+        return f"{prefix}-{shard:03d}"
+    
+    return prefix
+
+
 # Instância singleton do serviço de fila
 _queue_service_instance: Optional[QueueService] = None
 
@@ -158,3 +426,12 @@ def get_queue_service() -> QueueService:
     
     return _queue_service_instance
 
+
+async def close_queue_service() -> None:
+    """Envia os lotes pendentes e encerra a instância singleton do QueueService, se existir."""
+    global _queue_service_instance
+    
+    if _queue_service_instance is not None:
+        await _queue_service_instance.flush()
+        _queue_service_instance.close()
+        _queue_service_instance = None
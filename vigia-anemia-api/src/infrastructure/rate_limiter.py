@@ -0,0 +1,215 @@
+"""
+Rate limiting por laboratório (token bucket com burst).
+
+Cada chave (CNES do laboratório, `sub` do token ou, sem nenhum dos dois, o
+IP do cliente) tem um balde de RATE_LIMIT_BURST fichas, reabastecido a
+RATE_LIMIT_PER_MINUTE / 60 fichas por segundo; cada requisição consome uma ficha.
+
+- memory: baldes em processo. Não há lock: a atualização de um balde não
+  contém await, portanto é atômica no event loop. Adequado a um único nó.
+- redis: baldes no Redis, atualizados por um script Lua atômico com o
+  relógio do próprio Redis. Compartilhado por todos os nós e workers.
+"""
+import math
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from src.core.config import settings
+from src.core.logging import get_logger
+from src.infrastructure.circuit_breaker import CircuitBreaker
+from src.infrastructure.redis_client import get_async_redis
+
+try:
+    from redis.exceptions import RedisError
+except ImportError:  # pragma: no cover - dependência opcional
+    RedisError = Exception
+
+logger = get_logger(__name__)
+
+
+class RateLimitDecision(NamedTuple):
+    """Resultado da consulta ao limitador."""
+    allowed: bool
+    retry_after_s: float
+
+
+_ALLOWED = RateLimitDecision(True, 0.0)
+
+
+class RateLimiter(ABC):
+    """Limitador de requisições por chave."""
+
+    def __init__(self, per_minute: int, burst: int):
+        """
+        Args:
+            per_minute: Requisições por minuto sustentadas por chave
+            burst: Requisições permitidas em rajada (capacidade do balde)
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst)
+
+    @abstractmethod
+    async def acquire(self, key: str) -> RateLimitDecision:
+        """
+        Consome uma ficha do balde da chave.
+
+        Args:
+            key: Laboratório (CNES), sujeito do token ou IP do cliente
+
+        Returns:
+            RateLimitDecision (retry_after_s > 0 quando negado)
+        """
+
+
+class InMemoryRateLimiter(RateLimiter):
+    """Token bucket em processo (um nó)."""
+
+    # Acima deste número de chaves, baldes já cheios (inativos) são descartados
+    MAX_KEYS = 10000
+
+    def __init__(self, per_minute: int, burst: int):
+        super().__init__(per_minute, burst)
+        # chave -> [fichas, instante da última atualização]
+        self._buckets: Dict[str, List[float]] = {}
+
+    async def acquire(self, key: str) -> RateLimitDecision:
+        return self.try_acquire(key, time.monotonic())
+
+    def try_acquire(self, key: str, now: float) -> RateLimitDecision:
+        """
+        Versão síncrona de `acquire` (sem await: atômica no event loop).
+
+        Args:
+            key: Chave do balde
+            now: Instante atual (time.monotonic)
+
+        Returns:
+            RateLimitDecision
+        """
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.MAX_KEYS:
+                self._prune(now)
+            self._buckets[key] = [self.capacity - 1.0, now]
+            return _ALLOWED
+
+        tokens = min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens >= 1.0:
+            bucket[0] = tokens - 1.0
+            return _ALLOWED
+        bucket[0] = tokens
+        return RateLimitDecision(False, (1.0 - tokens) / self.rate)
+
+    def _prune(self, now: float) -> None:
+        full = [
+            key for key, (tokens, updated) in self._buckets.items()
+            if tokens + (now - updated) * self.rate >= self.capacity
+        ]
+        for key in full:
+            del self._buckets[key]
+
+
+# KEYS[1]: balde; ARGV: fichas/segundo, capacidade. Retorna {permitido, espera em segundos (texto)}
+_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {allowed, tostring(retry_after)}
+"""
+
+
+class RedisRateLimiter(RateLimiter):
+    """
+    Token bucket no Redis, compartilhado pela frota.
+
+    Uma ida ao Redis por requisição (EVALSHA). Com o Redis indisponível, as
+    requisições são permitidas (fail-open) e um circuit breaker evita somar o
+    timeout a cada requisição.
+    """
+
+    def __init__(self, per_minute: int, burst: int, client: Any = None, prefix: Optional[str] = None):
+        """
+        Args:
+            per_minute: Requisições por minuto sustentadas por chave
+            burst: Requisições permitidas em rajada
+            client: Cliente redis.asyncio (padrão: cliente compartilhado da API)
+            prefix: Prefixo das chaves no Redis
+        """
+        super().__init__(per_minute, burst)
+        self.client = client or get_async_redis()
+        self.prefix = settings.rate_limit_redis_prefix if prefix is None else prefix
+        self._script = self.client.register_script(_TOKEN_BUCKET_SCRIPT)
+        self._breaker = CircuitBreaker("redis-rate-limit")
+
+    async def acquire(self, key: str) -> RateLimitDecision:
+        if not self._breaker.allow_request():
+            return _ALLOWED
+        try:
+            allowed, retry_after = await self._script(
+                keys=[self.prefix + key], args=[self.rate, self.capacity]
+            )
+        except RedisError as e:
+            self._breaker.record_failure()
+            logger.warning("Erro no rate limit via Redis; requisição permitida", error=str(e))
+            return _ALLOWED
+        self._breaker.record_success()
+
+        if int(allowed):
+            return _ALLOWED
+        return RateLimitDecision(False, float(retry_after))
+
+
+def retry_after_header(retry_after_s: float) -> str:
+    """
+    Formata o header Retry-After (segundos inteiros, arredondados para cima).
+
+    Args:
+        retry_after_s: Espera até a próxima ficha
+
+    Returns:
+        Valor do header (mínimo 1)
+    """
+    return str(max(1, math.ceil(retry_after_s)))
+
+
+# Instância singleton do limitador
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Retorna o limitador configurado (RATE_LIMIT_BACKEND).
+
+    Returns:
+        Instância singleton do RateLimiter
+    """
+    global _rate_limiter
+
+    if _rate_limiter is None:
+        limiter_class = RedisRateLimiter if settings.rate_limit_backend == "redis" else InMemoryRateLimiter
+        _rate_limiter = limiter_class(settings.rate_limit_per_minute, settings.rate_limit_burst)
+        logger.info(
+            "Rate limiter inicializado",
+            backend=settings.rate_limit_backend,
+            per_minute=settings.rate_limit_per_minute,
+            burst=settings.rate_limit_burst
+        )
+
+    return _rate_limiter
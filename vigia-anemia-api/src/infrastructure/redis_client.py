@@ -0,0 +1,61 @@
+"""
+Cliente Redis assíncrono compartilhado pela API (cache de tokens, rate limit).
+Um único pool de conexões por processo, com timeouts curtos: as operações
+estão no caminho das requisições e falhas são tratadas por quem as chama.
+"""
+from typing import Any, Optional
+
+from src.core.config import settings
+from src.core.logging import get_logger
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - dependência opcional
+    aioredis = None
+
+logger = get_logger(__name__)
+
+# Instância singleton do cliente assíncrono
+_async_redis: Optional[Any] = None
+
+
+def get_async_redis() -> Any:
+    """
+    Retorna o cliente redis.asyncio compartilhado (pool de até REDIS_MAX_CONNECTIONS).
+
+    Returns:
+        Cliente redis.asyncio
+
+    Raises:
+        RuntimeError: Se o pacote redis não estiver instalado
+    """
+    global _async_redis
+
+    if _async_redis is None:
+        if aioredis is None:
+            raise RuntimeError("Pacote redis não instalado")
+        _async_redis = aioredis.Redis(
+            host=settings.redis_host,
+            port=settings.redis_port,
+            db=settings.redis_db,
+            password=settings.redis_password or None,
+            max_connections=settings.redis_max_connections,
+            socket_timeout=settings.redis_socket_timeout_s,
+            socket_connect_timeout=settings.redis_socket_timeout_s,
+        )
+        logger.info(
+            "Cliente Redis assíncrono criado",
+            host=settings.redis_host,
+            max_connections=settings.redis_max_connections
+        )
+
+    return _async_redis
+
+
+async def close_async_redis() -> None:
+    """Fecha o cliente compartilhado e seu pool de conexões, se existir."""
+    global _async_redis
+
+    if _async_redis is not None:
+        await _async_redis.aclose()
+        _async_redis = None
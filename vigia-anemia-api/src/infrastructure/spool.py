@@ -0,0 +1,631 @@
+"""
+Spool local em disco para mensagens que não puderam ser enviadas ao SQS.
+
+Log append-only dividido em segmentos (`<id>.seg`). Cada registro é
+`[tamanho u32][crc32 u32][payload]`, gravado com um único `write()` no
+descritor em modo append: ao retornar, o registro já está no page cache e
+sobrevive a um reinício do processo. O fsync é feito em grupo, a cada
+intervalo, limitando a janela exposta a uma queda do host. A leitura usa mmap
+e a posição consumida fica em `cursor`, gravado de forma atômica.
+A entrega é at-least-once: consumidores deduplicam pelo tracking_id.
+
+Um diretório pertence a um único processo, que mantém um flock em `lock`
+enquanto o spool está aberto. Com vários workers (gunicorn -w N) sobre o mesmo
+QUEUE_SPOOL_DIR, cada processo usa um subdirectório próprio
+(`process_spool_dir`) e o drenador adota os subdirectórios de processos
+encerrados, cujo lock está livre.
+"""
+import asyncio
+import json
+import mmap
+import os
+import socket
+import struct
+import threading
+import time
+import zlib
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from src.core.logging import get_logger
+from src.infrastructure.circuit_breaker import CircuitBreaker
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - sem flock (ex.: Windows): um processo por diretório
+    fcntl = None
+
+logger = get_logger(__name__)
+
+_HEADER = struct.Struct("<II")
+_SEGMENT_SUFFIX = ".seg"
+_CURSOR_FILE = "cursor"
+_REJECTED_FILE = "rejected.jsonl"
+_LOCK_FILE = "lock"
+
+
+class SpoolLockedError(RuntimeError):
+    """Diretório do spool já aberto por outro processo."""
+
+
+def process_spool_dir(root: str) -> Path:
+    """
+    Subdiretório do spool exclusivo deste processo.
+
+    O nome combina host e PID, de modo que contêineres com o mesmo PID
+    compartilhando o volume não disputem o mesmo diretório.
+
+    Args:
+        root: Diretório raiz do spool (QUEUE_SPOOL_DIR)
+
+    Returns:
+        Caminho `<root>/<host>-<pid>`
+    """
+    return Path(root) / f"{socket.gethostname()}-{os.getpid()}"
+
+
+def orphan_candidates(root: str, own: Path) -> Iterator[Path]:
+    """
+    Diretórios sob `root` com segmentos, exceto o do próprio processo.
+
+    Inclui a própria raiz quando ela contém segmentos (spool gravado antes dos
+    subdirectórios por processo). Se o diretório é órfão ou de um processo
+    vivo, só o lock diz.
+
+    Args:
+        root: Diretório raiz do spool
+        own: Diretório do spool deste processo
+
+    Yields:
+        Diretórios candidatos à adoção
+    """
+    root_path = Path(root)
+    if not root_path.is_dir():
+        return
+    own = own.resolve()
+    candidates = [root_path] + sorted(path for path in root_path.iterdir() if path.is_dir())
+    for directory in candidates:
+        if directory.resolve() != own and any(directory.glob(f"*{_SEGMENT_SUFFIX}")):
+            yield directory
+
+
+class SpoolPosition(NamedTuple):
+    """Posição no spool: segmento e offset dentro dele."""
+    segment: int
+    offset: int
+
+
+def _valid_end(buffer, start: int, end: int) -> int:
+    """Retorna o offset logo após o último registro íntegro entre `start` e `end`."""
+    offset = start
+    while offset + _HEADER.size <= end:
+        length, crc = _HEADER.unpack_from(buffer, offset)
+        payload_end = offset + _HEADER.size + length
+        if payload_end > end or zlib.crc32(buffer[offset + _HEADER.size:payload_end]) != crc:
+            break
+        offset = payload_end
+    return offset
+
+
+class SegmentSpool:
+    """Log de mensagens em segmentos append-only (thread-safe, um processo por diretório)."""
+
+    def __init__(self, directory: str, segment_max_bytes: int = 64 * 1024 * 1024):
+        """
+        Abre (ou cria) o spool e recupera um eventual registro incompleto no fim.
+
+        Args:
+            directory: Diretório do spool
+            segment_max_bytes: Tamanho a partir do qual um novo segmento é iniciado
+
+        Raises:
+            SpoolLockedError: Se outro processo mantém o diretório aberto
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_max_bytes = segment_max_bytes
+
+        self._lock = threading.Lock()
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._retired_fds: List[int] = []
+        self._dirty = False
+
+        self._lock_fd = self._lock_directory()
+        try:
+            self._segments = sorted(
+                int(path.stem) for path in self.directory.glob(f"*{_SEGMENT_SUFFIX}") if path.stem.isdigit()
+            ) or [1]
+            self._write_segment = self._segments[-1]
+            self._write_fd = self._open_segment(self._write_segment)
+            self._write_offset = self._recover_tail()
+            self._cursor = self._load_cursor()
+        except BaseException:
+            self._unlock_directory()
+            raise
+
+        logger.info(
+            "Spool local aberto",
+            directory=str(self.directory),
+            segments_count=len(self._segments),
+            pending=self.pending
+        )
+
+    def _lock_directory(self) -> Optional[int]:
+        # flock exclusivo e não bloqueante, liberado em close() ou na morte do processo
+        if fcntl is None:
+            return None
+        fd = os.open(self.directory / _LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            raise SpoolLockedError(f"Spool em uso por outro processo: {self.directory}") from None
+        return fd
+
+    def _unlock_directory(self) -> None:
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.directory / f"{segment:020d}{_SEGMENT_SUFFIX}"
+
+    def _open_segment(self, segment: int) -> int:
+        return os.open(self._segment_path(segment), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+
+    def _recover_tail(self) -> int:
+        # Um registro parcial (queda durante o write) é descartado por truncamento
+        path = self._segment_path(self._write_segment)
+        size = path.stat().st_size
+        if not size:
+            return 0
+        with open(path, "rb") as file, mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ) as buffer:
+            end = _valid_end(buffer, 0, size)
+        if end < size:
+            logger.warning("Registro incompleto descartado no fim do spool", segment=self._write_segment)
+            os.truncate(path, end)
+        return end
+
+    def _load_cursor(self) -> SpoolPosition:
+        try:
+            segment, offset = (self.directory / _CURSOR_FILE).read_text().split()
+            position = SpoolPosition(int(segment), int(offset))
+        except (FileNotFoundError, ValueError):
+            return SpoolPosition(self._segments[0], 0)
+        if position.segment < self._segments[0]:
+            return SpoolPosition(self._segments[0], 0)
+        return position
+
+    @property
+    def pending(self) -> bool:
+        """True se há registros ainda não consumidos."""
+        return self._cursor != SpoolPosition(self._write_segment, self._write_offset)
+
+    def append(self, payload: bytes) -> SpoolPosition:
+        """
+        Acrescenta um registro ao spool.
+
+        Args:
+            payload: Conteúdo do registro
+
+        Returns:
+            Posição em que o registro foi gravado
+        """
+        record = _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+        with self._lock:
+            if self._write_offset and self._write_offset + len(record) > self.segment_max_bytes:
+                self._roll_segment()
+            position = SpoolPosition(self._write_segment, self._write_offset)
+            os.write(self._write_fd, record)
+            self._write_offset += len(record)
+            self._dirty = True
+        return position
+
+    def _roll_segment(self) -> None:
+        # O descritor anterior é fechado pelo próximo sync(), após o fsync
+        self._retired_fds.append(self._write_fd)
+        self._write_segment += 1
+        self._segments.append(self._write_segment)
+        self._write_fd = self._open_segment(self._write_segment)
+        self._write_offset = 0
+
+    def sync(self) -> None:
+        """Faz fsync dos registros gravados desde a última chamada (group commit)."""
+        with self._lock:
+            if not self._dirty and not self._retired_fds:
+                return
+            retired, self._retired_fds = self._retired_fds, []
+            current = self._write_fd if self._dirty else None
+            self._dirty = False
+        for fd in retired:
+            os.fsync(fd)
+            os.close(fd)
+        if current is not None:
+            os.fsync(current)
+
+    def _sealed_view(self, segment: int) -> Optional[mmap.mmap]:
+        # Segmentos selados não mudam: o mapeamento é mantido até a remoção
+        if segment not in self._maps:
+            with open(self._segment_path(segment), "rb") as file:
+                size = os.fstat(file.fileno()).st_size
+                self._maps[segment] = mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ) if size else None
+        return self._maps[segment]
+
+    def _active_view(self, segment: int, size: int) -> mmap.mmap:
+        # Segmento ativo cresce: mapeado a cada leitura até o offset já gravado
+        with open(self._segment_path(segment), "rb") as file:
+            return mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ)
+
+    def read_records(
+        self,
+        position: SpoolPosition,
+        max_records: int,
+        max_bytes: int
+    ) -> Tuple[List[Tuple[bytes, SpoolPosition]], SpoolPosition]:
+        """
+        Lê registros a partir de uma posição qualquer.
+
+        Args:
+            position: Posição inicial
+            max_records: Máximo de registros
+            max_bytes: Máximo de bytes somados (o primeiro registro é sempre incluído)
+
+        Returns:
+            Tupla (lista de (registro, posição logo após ele), posição final da leitura)
+        """
+        with self._lock:
+            write_segment, write_offset = self._write_segment, self._write_offset
+        segment, offset = position
+        records: List[Tuple[bytes, SpoolPosition]] = []
+        total = 0
+        active: Optional[mmap.mmap] = None
+
+        try:
+            while len(records) < max_records:
+                if segment == write_segment:
+                    if active is None and write_offset:
+                        active = self._active_view(segment, write_offset)
+                    buffer, size = active, write_offset
+                else:
+                    buffer = self._sealed_view(segment)
+                    size = len(buffer) if buffer is not None else 0
+
+                if offset >= size:
+                    if segment >= write_segment:
+                        break
+                    segment, offset = self._next_segment(segment), 0
+                    continue
+
+                start = offset + _HEADER.size
+                length, crc = _HEADER.unpack_from(buffer, offset) if start <= size else (0, None)
+                payload = buffer[start:start + length]
+                if crc is None or start + length > size or zlib.crc32(payload) != crc:
+                    logger.error("Registro corrompido no spool; restante do segmento ignorado", segment=segment)
+                    offset = size
+                    continue
+                if records and total + length > max_bytes:
+                    break
+                total += length
+                offset = start + length
+                records.append((payload, SpoolPosition(segment, offset)))
+        finally:
+            if active is not None:
+                active.close()
+
+        return records, SpoolPosition(segment, offset)
+
+    def read_batch(self, max_records: int, max_bytes: int) -> Tuple[List[bytes], SpoolPosition]:
+        """
+        Lê registros a partir da posição consumida, sem avançá-la.
+
+        Args:
+            max_records: Máximo de registros
+            max_bytes: Máximo de bytes somados (o primeiro registro é sempre incluído)
+
+        Returns:
+            Tupla (registros, posição após o último registro lido)
+        """
+        records, position = self.read_records(self._cursor, max_records, max_bytes)
+        return [payload for payload, _ in records], position
+
+    def count_records(self, position: Optional[SpoolPosition] = None) -> int:
+        """
+        Conta os registros a partir de uma posição lendo apenas os cabeçalhos.
+
+        Args:
+            position: Posição inicial (padrão: posição consumida)
+
+        Returns:
+            Número de registros
+        """
+        with self._lock:
+            write_segment, write_offset = self._write_segment, self._write_offset
+            segments = list(self._segments)
+        segment, offset = position or self._cursor
+        count = 0
+        for current in (candidate for candidate in segments if candidate >= segment):
+            if current == write_segment:
+                if not write_offset:
+                    break
+                buffer = self._active_view(current, write_offset)
+                size = write_offset
+            else:
+                buffer = self._sealed_view(current)
+                size = len(buffer) if buffer is not None else 0
+            start = offset if current == segment else 0
+            while buffer is not None and start + _HEADER.size <= size:
+                length, _ = _HEADER.unpack_from(buffer, start)
+                start += _HEADER.size + length
+                count += 1
+            if current == write_segment and buffer is not None:
+                buffer.close()
+        return count
+
+    @property
+    def cursor(self) -> SpoolPosition:
+        """Posição consumida (persistida em `cursor`)."""
+        return self._cursor
+
+    def _next_segment(self, segment: int) -> int:
+        return next(candidate for candidate in self._segments if candidate > segment)
+
+    def commit(self, position: SpoolPosition) -> None:
+        """
+        Marca como consumido tudo antes de `position` e remove segmentos esgotados.
+
+        Args:
+            position: Posição retornada por `read_batch`
+        """
+        cursor_path = self.directory / _CURSOR_FILE
+        temporary = cursor_path.with_suffix(".tmp")
+        temporary.write_text(f"{position.segment} {position.offset}")
+        os.replace(temporary, cursor_path)
+
+        with self._lock:
+            self._cursor = position
+            consumed = [segment for segment in self._segments if segment < position.segment]
+            self._segments = [segment for segment in self._segments if segment >= position.segment]
+        for segment in consumed:
+            buffer = self._maps.pop(segment, None)
+            if buffer is not None:
+                buffer.close()
+            self._segment_path(segment).unlink(missing_ok=True)
+
+    def reject(self, payload: bytes, reason: str) -> None:
+        """
+        Move um registro recusado definitivamente para `rejected.jsonl`.
+
+        Args:
+            payload: Registro recusado
+            reason: Motivo informado pelo SQS
+        """
+        line = json.dumps({"reason": reason, "entry": json.loads(payload)}, ensure_ascii=False)
+        with open(self.directory / _REJECTED_FILE, "a", encoding="utf-8") as file:
+            file.write(line + "\n")
+
+    def _close_files(self) -> None:
+        self.sync()
+        os.close(self._write_fd)
+        for buffer in self._maps.values():
+            if buffer is not None:
+                buffer.close()
+        self._maps.clear()
+
+    def close(self) -> None:
+        """Faz o fsync pendente, fecha descritores e mapeamentos e libera o diretório."""
+        self._close_files()
+        self._unlock_directory()
+
+    def discard(self) -> None:
+        """
+        Fecha um spool esgotado removendo segmentos e cursor.
+
+        O diretório também é removido, exceto se contiver `rejected.jsonl`
+        (mantido para análise) ou outros arquivos.
+
+        Raises:
+            RuntimeError: Se ainda houver registros não consumidos
+        """
+        if self.pending:
+            raise RuntimeError(f"Spool com registros pendentes não pode ser descartado: {self.directory}")
+        self._close_files()
+        for path in self.directory.glob(f"*{_SEGMENT_SUFFIX}"):
+            path.unlink(missing_ok=True)
+        (self.directory / _CURSOR_FILE).unlink(missing_ok=True)
+        if not (self.directory / _REJECTED_FILE).exists():
+            (self.directory / _LOCK_FILE).unlink(missing_ok=True)
+            try:
+                self.directory.rmdir()
+            except OSError:
+                pass  # ex.: raiz com subdiretórios de outros processos
+        self._unlock_directory()
+
+
+class SpoolDrainer:
+    """
+    Tarefas em background do spool: fsync em grupo e reenvio ao SQS.
+
+    O reenvio respeita o circuit breaker: enquanto o circuito está aberto o
+    spool apenas acumula; ao permitir uma chamada de teste, os registros são
+    reenviados em lotes SendMessageBatch. Entradas recusadas por erro do
+    remetente vão para `rejected.jsonl`; falhas do serviço voltam ao fim do spool.
+
+    Com `orphans_root`, quando o próprio spool está vazio o drenador também
+    reenvia os spools de processos encerrados sob a mesma raiz e remove os
+    que esvaziar.
+
+    Com `preserve_order` (filas FIFO), uma falha do serviço não move a entrada
+    para o fim do spool: o cursor avança só até a entrada anterior e o lote é
+    retomado a partir dela (entradas seguintes já aceitas são reenviadas e
+    deduplicadas pelo MessageDeduplicationId).
+    """
+
+    # Intervalo mínimo entre buscas por spools órfãos
+    ADOPTION_INTERVAL_S = 30.0
+
+    def __init__(
+        self,
+        spool: SegmentSpool,
+        send_batch: Callable[[List[Dict[str, Any]]], Dict[str, Any]],
+        executor: Executor,
+        breaker: CircuitBreaker,
+        max_entries: int = 10,
+        max_bytes: int = 262144,
+        idle_interval_ms: float = 1000.0,
+        fsync_interval_ms: float = 50.0,
+        orphans_root: Optional[str] = None,
+        preserve_order: bool = False,
+    ):
+        """
+        Args:
+            spool: Spool de origem
+            send_batch: Função bloqueante que envia as entradas (SendMessageBatch)
+            executor: Executor das chamadas bloqueantes (SQS e fsync)
+            breaker: Circuit breaker do SQS
+            max_entries: Máximo de entradas por lote reenviado
+            max_bytes: Tamanho máximo somado de um lote reenviado
+            idle_interval_ms: Espera entre verificações quando não há o que reenviar
+            fsync_interval_ms: Intervalo do fsync em grupo
+            orphans_root: Raiz compartilhada com outros processos (None: sem adoção)
+            preserve_order: Mantém a ordem do spool também nas entradas com falha (FIFO)
+        """
+        self.spool = spool
+        self.send_batch = send_batch
+        self.executor = executor
+        self.breaker = breaker
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.idle_interval = idle_interval_ms / 1000.0
+        self.fsync_interval = fsync_interval_ms / 1000.0
+        self.orphans_root = orphans_root
+        self.preserve_order = preserve_order
+        self._next_adoption = 0.0
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Inicia as tarefas de fsync e reenvio no event loop corrente."""
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._sync_loop()), loop.create_task(self._drain_loop())]
+        logger.info("Drenagem do spool iniciada", pending=self.spool.pending)
+
+    async def stop(self) -> None:
+        """Interrompe as tarefas e faz o fsync final."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await asyncio.get_running_loop().run_in_executor(self.executor, self.spool.sync)
+
+    async def _sync_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.fsync_interval)
+            try:
+                await loop.run_in_executor(self.executor, self.spool.sync)
+            except OSError as e:
+                logger.error("Erro no fsync do spool", error=str(e))
+
+    async def _drain_loop(self) -> None:
+        while True:
+            try:
+                drained = await self.drain_once()
+                if not drained and self.orphans_root is not None and time.monotonic() >= self._next_adoption:
+                    self._next_adoption = time.monotonic() + self.ADOPTION_INTERVAL_S
+                    drained = await self.adopt_orphans()
+            except Exception as e:
+                logger.error("Erro inesperado na drenagem do spool", error=str(e))
+                drained = 0
+            await asyncio.sleep(0 if drained else self.idle_interval)
+
+    async def drain_once(self) -> int:
+        """
+        Reenvia um lote do spool, se houver registros e o circuito permitir.
+
+        Returns:
+            Número de registros processados
+        """
+        return await self._drain_batch(self.spool)
+
+    async def adopt_orphans(self) -> int:
+        """
+        Reenvia os spools órfãos sob `orphans_root` e descarta os que esvaziar.
+
+        Diretórios com o lock ocupado pertencem a processos vivos e são
+        ignorados; um spool órfão só é adotado por um processo de cada vez.
+
+        Returns:
+            Número de registros processados
+        """
+        total = 0
+        for directory in orphan_candidates(self.orphans_root, self.spool.directory):
+            try:
+                orphan = SegmentSpool(directory, self.spool.segment_max_bytes)
+            except SpoolLockedError:
+                continue
+            except OSError as e:
+                logger.warning("Spool órfão não pôde ser aberto", directory=str(directory), error=str(e))
+                continue
+
+            logger.info("Spool órfão adotado", directory=str(directory), pending=orphan.pending)
+            try:
+                while orphan.pending:
+                    drained = await self._drain_batch(orphan)
+                    if not drained:
+                        break
+                    total += drained
+            finally:
+                if orphan.pending:
+                    orphan.close()
+                else:
+                    orphan.discard()
+                    logger.info("Spool órfão esvaziado e removido", directory=str(directory))
+        return total
+
+    async def _drain_batch(self, spool: SegmentSpool) -> int:
+        if not spool.pending:
+            return 0
+        batch, position = spool.read_records(spool.cursor, self.max_entries, self.max_bytes)
+        if not batch:
+            spool.commit(position)
+            return 0
+        if not self.breaker.allow_request():
+            return 0
+
+        records = [record for record, _ in batch]
+        entries = [dict(json.loads(record), Id=str(index)) for index, record in enumerate(records)]
+        loop = asyncio.get_running_loop()
+        try:
+            response = await loop.run_in_executor(self.executor, self.send_batch, entries)
+        except Exception as e:
+            self.breaker.record_failure()
+            logger.warning("SQS indisponível; spool mantido", error=str(e), batch_size=len(records))
+            return 0
+        self.breaker.record_success()
+
+        failed = sorted(response.get('Failed', []), key=lambda result: int(result['Id']))
+        consumed = len(records)
+        if self.preserve_order:
+            retryable = [int(result['Id']) for result in failed if not result.get('SenderFault')]
+            if retryable:
+                # Retoma a partir da primeira falha do serviço, na mesma posição
+                consumed = retryable[0]
+                position = batch[consumed - 1][1] if consumed else spool.cursor
+                failed = [result for result in failed if int(result['Id']) < consumed]
+
+        for result in failed:
+            record = records[int(result['Id'])]
+            reason = f"{result.get('Code')}: {result.get('Message')}"
+            if result.get('SenderFault'):
+                logger.error("Mensagem do spool recusada pelo SQS", error=reason)
+                spool.reject(record, reason)
+            else:
+                spool.append(record)
+        spool.commit(position)
+
+        logger.info(
+            "Mensagens do spool reenviadas",
+            batch_size=len(records),
+            failed_count=len(failed) + len(records) - consumed
+        )
+        return consumed
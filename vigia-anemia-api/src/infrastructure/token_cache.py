@@ -0,0 +1,191 @@
+"""
+Cache de verificações de tokens JWT em dois níveis.
+
+- Local: LRU em processo, de hash do token -> payload, com expiração no `exp`
+  do token (ou em poucos segundos, para resultados negativos).
+- Compartilhado: Redis (cliente assíncrono compartilhado, com pool de
+  conexões), para que os workers do gunicorn reaproveitem as verificações uns
+  dos outros.
+
+As chaves são o SHA-256 do token: o token em si nunca é armazenado.
+"""
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from src.core.config import settings
+from src.core.logging import get_logger
+from src.infrastructure.circuit_breaker import CircuitBreaker
+from src.infrastructure.redis_client import get_async_redis
+
+try:
+    from redis.exceptions import RedisError
+except ImportError:  # pragma: no cover - dependência opcional
+    RedisError = Exception
+
+logger = get_logger(__name__)
+
+# Resultado em cache: (is_valid, payload ou None)
+CachedVerification = Tuple[bool, Optional[dict]]
+
+# Valor gravado no Redis para tokens rejeitados
+_NEGATIVE = b"0"
+
+
+def token_key(token: str) -> str:
+    """
+    Calcula a chave de cache de um token.
+
+    Args:
+        token: Token JWT
+
+    Returns:
+        SHA-256 do token em hexadecimal
+    """
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class LocalTokenCache:
+    """LRU em processo de verificações de token, com expiração por entrada."""
+
+    def __init__(self, max_entries: int):
+        """
+        Args:
+            max_entries: Máximo de tokens mantidos (os menos usados saem primeiro)
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Optional[dict]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, now: float) -> Optional[CachedVerification]:
+        """
+        Busca uma verificação ainda válida.
+
+        Args:
+            key: Chave do token (token_key)
+            now: Instante atual (epoch)
+
+        Returns:
+            (is_valid, payload) ou None se ausente ou expirada
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if expires_at <= now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return payload is not None, payload
+
+    def put(self, key: str, payload: Optional[dict], expires_at: float) -> None:
+        """
+        Armazena uma verificação.
+
+        Args:
+            key: Chave do token (token_key)
+            payload: Payload do token válido, ou None para token rejeitado
+            expires_at: Fim da validade da entrada (epoch)
+        """
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (expires_at, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove todas as entradas."""
+        self._entries.clear()
+
+
+class RedisTokenCache:
+    """
+    Verificações de token compartilhadas entre processos via Redis.
+
+    Falhas do Redis nunca rejeitam um token: a consulta vira cache miss e,
+    após falhas consecutivas, um circuit breaker deixa de consultar o Redis
+    até o tempo de recuperação (sem somar timeouts a cada requisição).
+    """
+
+    def __init__(self, client: Any = None, prefix: Optional[str] = None):
+        """
+        Args:
+            client: Cliente redis.asyncio (padrão: cliente compartilhado da API)
+            prefix: Prefixo das chaves no Redis
+
+        Raises:
+            RuntimeError: Se o pacote redis não estiver instalado
+        """
+        self.client = client or get_async_redis()
+        self.prefix = settings.auth_cache_redis_prefix if prefix is None else prefix
+        self._breaker = CircuitBreaker("redis-token-cache")
+
+    async def get(self, key: str) -> Optional[CachedVerification]:
+        """
+        Busca uma verificação no Redis.
+
+        Args:
+            key: Chave do token (token_key)
+
+        Returns:
+            (is_valid, payload) ou None se ausente ou com o Redis indisponível
+        """
+        if not self._breaker.allow_request():
+            return None
+        try:
+            value = await self.client.get(self.prefix + key)
+        except RedisError as e:
+            self._breaker.record_failure()
+            logger.warning("Erro ao consultar cache de tokens no Redis", error=str(e))
+            return None
+        self._breaker.record_success()
+
+        if value is None:
+            return None
+        if value == _NEGATIVE:
+            return False, None
+        return True, json.loads(value)
+
+    async def put(self, key: str, payload: Optional[dict], ttl_s: int) -> None:
+        """
+        Armazena uma verificação no Redis (melhor esforço).
+
+        Args:
+            key: Chave do token (token_key)
+            payload: Payload do token válido, ou None para token rejeitado
+            ttl_s: Validade da entrada em segundos
+        """
+        if ttl_s <= 0 or not self._breaker.allow_request():
+            return
+        value = _NEGATIVE if payload is None else json.dumps(payload).encode("utf-8")
+        try:
+            await self.client.set(self.prefix + key, value, ex=ttl_s)
+        except RedisError as e:
+            self._breaker.record_failure()
+            logger.warning("Erro ao gravar cache de tokens no Redis", error=str(e))
+            return
+        self._breaker.record_success()
+
+
+def entry_expiration(payload: Optional[dict], now: float) -> float:
+    """
+    Calcula até quando uma verificação pode ser reutilizada.
+
+    Args:
+        payload: Payload do token válido, ou None para token rejeitado
+        now: Instante atual (epoch)
+
+    Returns:
+        `exp` do token (limitado a REDIS_TTL); para rejeitados, now + AUTH_CACHE_NEGATIVE_TTL_S
+    """
+    if payload is None:
+        return now + settings.auth_cache_negative_ttl_s
+    limit = now + settings.redis_ttl
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        return min(float(exp), limit)
+    return limit
@@ -0,0 +1,181 @@
+"""
+Token de acesso do serviço de autorização da SES-GO, mantido em memória.
+
+Um único cliente HTTP com pool de conexões (keep-alive, um handshake TLS) é
+usado durante toda a vida da aplicação. Chamadas concorrentes sem token
+compartilham uma única busca (single-flight) e, depois da primeira busca, uma
+tarefa em background renova o token antes de `expires_in` terminar: as
+requisições só leem o token em memória.
+"""
+import asyncio
+import time
+from typing import Optional
+
+import httpx
+
+from src.core.config import settings
+from src.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class UpstreamTokenProvider:
+    """Cliente do serviço de autorização com single-flight e renovação antecipada."""
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        refresh_margin_s: Optional[float] = None,
+        retry_interval_s: Optional[float] = None,
+    ):
+        """
+        Args:
+            url: URL do serviço de autorização (padrão: AUTH_SERVICE_URL)
+            client: Cliente HTTP (padrão: cliente próprio com pool, fechado em `close`)
+            refresh_margin_s: Antecedência da renovação em relação ao fim de `expires_in`
+            retry_interval_s: Intervalo inicial entre tentativas após falha na renovação
+        """
+        self.url = url or settings.auth_service_url
+        self.refresh_margin_s = (
+            settings.auth_token_refresh_margin_s if refresh_margin_s is None else refresh_margin_s
+        )
+        self.retry_interval_s = (
+            settings.auth_token_retry_interval_s if retry_interval_s is None else retry_interval_s
+        )
+
+        self._owns_client = client is None
+        self._client = client or httpx.AsyncClient(
+            timeout=settings.auth_token_timeout_s,
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=2),
+            cert=settings.auth_client_certificate_path or None,
+        )
+
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._refresh_at = 0.0
+        self._inflight: Optional[asyncio.Task] = None
+        self._refresher: Optional[asyncio.Task] = None
+        self.fetch_count = 0
+
+    @property
+    def token(self) -> Optional[str]:
+        """Token atual, se ainda válido."""
+        if self._token is not None and time.monotonic() < self._expires_at:
+            return self._token
+        return None
+
+    async def start(self) -> Optional[str]:
+        """
+        Busca o primeiro token e inicia a renovação em background.
+
+        Chamado na inicialização da aplicação, para que nenhuma requisição
+        precise esperar pela busca.
+
+        Returns:
+            Token obtido, ou None em caso de falha (a renovação continua tentando)
+        """
+        token = await self.get_token()
+        self._ensure_refresher()
+        return token
+
+    async def get_token(self) -> Optional[str]:
+        """
+        Retorna o token atual, buscando-o apenas se ausente ou expirado.
+
+        Returns:
+            Token de acesso ou None em caso de erro
+        """
+        token = self.token
+        if token is not None:
+            return token
+        return await self._fetch_shared()
+
+    async def _fetch_shared(self) -> Optional[str]:
+        # Single-flight: chamadores concorrentes aguardam a mesma busca;
+        # shield para que o cancelamento de um chamador não cancele a busca
+        if self._inflight is None:
+            self._inflight = asyncio.get_running_loop().create_task(self._fetch())
+            self._inflight.add_done_callback(self._clear_inflight)
+        return await asyncio.shield(self._inflight)
+
+    def _clear_inflight(self, task: asyncio.Task) -> None:
+        if self._inflight is task:
+            self._inflight = None
+
+    async def _fetch(self) -> Optional[str]:
+        self.fetch_count += 1
+        try:
+            # Em produção, usar mTLS com certificado digital (AUTH_CLIENT_CERTIFICATE_PATH)
+            response = await self._client.get(self.url)
+        except httpx.HTTPError as e:
+            logger.error("Erro de rede ao obter token", error=str(e))
+            return None
+
+        if response.status_code != 200:
+            logger.error(
+                "Erro ao obter token",
+                status_code=response.status_code,
+                response=response.text
+            )
+            return None
+
+        try:
+            data = response.json()
+            token = data["access_token"]
+            expires_in = float(data.get("expires_in") or settings.token_expire_minutes * 60)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            # Ex.: corpo não-JSON, lista em vez de objeto, expires_in não numérico
+            logger.error("Resposta inválida do serviço de autorização", error=str(e))
+            return None
+
+        now = time.monotonic()
+        self._token = token
+        self._expires_at = now + expires_in
+        # Renova com REFRESH_MARGIN de antecedência (no máximo na metade da validade)
+        self._refresh_at = now + expires_in - min(self.refresh_margin_s, expires_in / 2)
+        self._ensure_refresher()
+
+        logger.info("Token obtido do serviço de autorização", expires_in=expires_in)
+        return token
+
+    def _ensure_refresher(self) -> None:
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.get_running_loop().create_task(self._refresh_loop())
+
+    async def _refresh_loop(self) -> None:
+        failures = 0
+        while True:
+            if failures:
+                delay = min(self.retry_interval_s * 2 ** (failures - 1), settings.auth_token_retry_max_s)
+            else:
+                delay = max(self._refresh_at - time.monotonic(), 0.0)
+            await asyncio.sleep(delay)
+
+            try:
+                token = await self._fetch_shared()
+            except Exception as e:
+                # Falha inesperada não pode encerrar a renovação: conta como tentativa falha
+                logger.error("Erro inesperado ao renovar token", error=str(e))
+                token = None
+            failures = 0 if token is not None else failures + 1
+            if failures:
+                logger.warning(
+                    "Falha ao renovar token do serviço de autorização",
+                    failures=failures,
+                    token_valid=self.token is not None
+                )
+
+    async def close(self) -> None:
+        """Interrompe a renovação e fecha o cliente HTTP (se próprio)."""
+        for task in (self._refresher, self._inflight):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._refresher = None
+        self._inflight = None
+        if self._owns_client:
+            await self._client.aclose()
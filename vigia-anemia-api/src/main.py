@@ -8,9 +8,18 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
-from src.api.routes import hemograma_router
+from src.api.routes import fila_router, hemograma_router
 from src.core.config import settings
 from src.core.logging import configure_logging, get_logger
+from src.core.metrics import start_metrics_server
+from src.infrastructure.auth_service import close_auth_service, get_auth_service
+from src.infrastructure.queue_backends import IN_PROCESS_BACKENDS
+from src.infrastructure.queue_monitor import close_queue_monitor, get_queue_monitor
+from src.infrastructure.queue_service import close_queue_service, get_queue_service
+from src.infrastructure.redis_client import close_async_redis
+from src.validators.fhir_validator import get_fhir_validator
+from src.validators.malote import close_validation_executor
+from src.worker.embedded import close_embedded_worker, start_embedded_worker
 
 # Configura logging
 configure_logging()
@@ -24,6 +33,12 @@ async def lifespan(app: FastAPI):
     
     Startup:
     - Configura logging
+    - Compila as regras de validação dos perfis FHIR
+    - Expõe as métricas Prometheus na porta METRICS_PORT (se habilitado)
+    - Inicia o reenvio do spool local da fila (se habilitado)
+    - Inicia o worker embutido (backends memory e file)
+    - Inicia a amostragem dos atributos da fila (se habilitado)
+    - Obtém o token do serviço de autorização e inicia sua renovação (se habilitado)
     - Inicializa conexões (Redis, SQS, etc.)
     
     Shutdown:
@@ -37,10 +52,39 @@ async def lifespan(app: FastAPI):
         version=settings.api_version
     )
     
+    # Compila as regras dos perfis FHIR e cria o validador compartilhado
+    # antes da primeira requisição
+    get_fhir_validator()
+    
+    # Métricas Prometheus em servidor HTTP próprio (fora da porta da API)
+    start_metrics_server()
+    
+    # Reenvio em background das mensagens retidas no spool local
+    if settings.queue_spool_enabled:
+        get_queue_service().start_spool_drainer()
+    
+    # Backends em processo: a fila só existe aqui, o worker roda junto com a API
+    if settings.queue_backend in IN_PROCESS_BACKENDS:
+        start_embedded_worker(get_queue_service().backend)
+    
+    # Retrato da fila em background para métricas e dimensionamento dos workers
+    if settings.queue_monitor_enabled:
+        get_queue_monitor().start()
+    
+    # Token do serviço de autorização fora do caminho das requisições
+    if settings.auth_token_prefetch:
+        await get_auth_service().token_provider.start()
+    
     yield
     
     # Shutdown
     logger.info("Encerrando VIGIA-Anemia API")
+    close_validation_executor()
+    await close_queue_monitor()
+    await close_embedded_worker()
+    await close_queue_service()
+    await close_auth_service()
+    await close_async_redis()
 
 
 # Cria aplicação FastAPI
@@ -68,6 +112,10 @@ app.include_router(
     hemograma_router,
     prefix=settings.api_prefix
 )
+app.include_router(
+    fila_router,
+    prefix=settings.api_prefix
+)
 
 
 @app.get("/")
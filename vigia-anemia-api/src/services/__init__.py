@@ -1,9 +1,12 @@
 """
 Services module - Lógica de negócio da aplicação.
 """
+from src.services.anemia_classifier import classify_anemia, classify_messages, classify_records
 from src.services.hemograma_service import HemogramaService
 
 __all__ = [
     "HemogramaService",
+    "classify_anemia",
+    "classify_messages",
+    "classify_records",
 ]
-
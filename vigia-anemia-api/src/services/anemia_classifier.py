@@ -0,0 +1,159 @@
+"""
+Classificação de anemia por lote, vetorizada com NumPy.
+
+Idade na coleta, sexo e hemoglobina (LOINC 718-7, já em g/dL) são lidos dos
+registros compactos do lote (`HemogramaRecord`) para arrays e a gravidade é
+calculada em uma única passagem sobre tabelas de limiares da OMS
+pré-calculadas por faixa etária e sexo.
+"""
+import math
+from typing import Any, Dict, List, NamedTuple, Sequence
+
+import numpy as np
+
+from src.domain.hemograma_record import RESULT_INDEX, HemogramaRecord, records_to_matrix
+from src.domain.models import AnemiaSeverity, LoincCode
+
+# Códigos de gravidade nos arrays (int8)
+SEVERITY_NOT_APPLICABLE = -1
+SEVERITY_NONE = 0
+SEVERITY_MILD = 1
+SEVERITY_MODERATE = 2
+SEVERITY_SEVERE = 3
+
+# Rótulos indexados por código + 1
+SEVERITY_LABELS = (
+    AnemiaSeverity.NOT_APPLICABLE,
+    AnemiaSeverity.NONE,
+    AnemiaSeverity.MILD,
+    AnemiaSeverity.MODERATE,
+    AnemiaSeverity.SEVERE,
+)
+
+# Faixas etárias da OMS pelo limite inferior em meses:
+# 6-59 meses, 5-11 anos, 12-14 anos e 15 anos ou mais
+_AGE_BAND_MONTHS = np.array([6.0, 60.0, 144.0, 180.0])
+
+# Limiares de Hb (g/dL) por [sexo (códigos SEX_* do registro), faixa]: (sem anemia >=, leve >=, moderada >=);
+# abaixo do último limiar a anemia é grave. Até 14 anos os limiares independem
+# do sexo; a partir de 15 anos, sem o sexo não há como classificar.
+_NO_THRESHOLDS = (np.nan, np.nan, np.nan)
+_THRESHOLDS = np.array([
+    # 6-59 meses        5-11 anos          12-14 anos         15+ anos
+    [(11.0, 10.0, 7.0), (11.5, 11.0, 8.0), (12.0, 11.0, 8.0), (12.0, 11.0, 8.0)],  # feminino
+    [(11.0, 10.0, 7.0), (11.5, 11.0, 8.0), (12.0, 11.0, 8.0), (13.0, 11.0, 8.0)],  # masculino
+    [(11.0, 10.0, 7.0), (11.5, 11.0, 8.0), (12.0, 11.0, 8.0), _NO_THRESHOLDS],     # desconhecido
+])
+
+_SECONDS_PER_DAY = 86400.0
+_DAYS_PER_MONTH = 365.25 / 12
+_HEMOGLOBIN_COLUMN = RESULT_INDEX[LoincCode.HEMOGLOBINA.value]
+
+
+class AnemiaFeatures(NamedTuple):
+    """Colunas de entrada da classificação, uma posição por mensagem."""
+    age_months: np.ndarray
+    sex: np.ndarray
+    hemoglobin_g_dl: np.ndarray
+
+
+def classify_anemia(age_months: np.ndarray, sex: np.ndarray, hemoglobin_g_dl: np.ndarray) -> np.ndarray:
+    """
+    Classifica a gravidade da anemia de um lote.
+
+    Args:
+        age_months: Idade na coleta em meses (NaN se desconhecida)
+        sex: Código de sexo (SEX_FEMALE, SEX_MALE ou SEX_UNKNOWN)
+        hemoglobin_g_dl: Hemoglobina em g/dL (NaN se ausente)
+
+    Returns:
+        Códigos de gravidade (int8, SEVERITY_*)
+    """
+    band = np.searchsorted(_AGE_BAND_MONTHS, age_months, side="right") - 1
+    # Idade < 6 meses (faixa -1) ou desconhecida: consulta a faixa 0 e descarta depois
+    thresholds = _THRESHOLDS[sex, np.maximum(band, 0)]
+
+    severity = np.full(hemoglobin_g_dl.shape, SEVERITY_SEVERE, dtype=np.int8)
+    severity[hemoglobin_g_dl >= thresholds[:, 2]] = SEVERITY_MODERATE
+    severity[hemoglobin_g_dl >= thresholds[:, 1]] = SEVERITY_MILD
+    severity[hemoglobin_g_dl >= thresholds[:, 0]] = SEVERITY_NONE
+
+    not_applicable = (
+        (band < 0)
+        | np.isnan(age_months)
+        | np.isnan(hemoglobin_g_dl)
+        | np.isnan(thresholds[:, 0])
+    )
+    severity[not_applicable] = SEVERITY_NOT_APPLICABLE
+    return severity
+
+
+def features_from_records(records: Sequence[HemogramaRecord]) -> AnemiaFeatures:
+    """
+    Monta as colunas da classificação a partir de registros compactos.
+
+    Args:
+        records: Registros do lote (ver `HemogramaRecord`)
+
+    Returns:
+        Colunas do lote (idade na data de coleta, em dias completos)
+    """
+    count = len(records)
+    collected = np.fromiter((record.collected_at for record in records), dtype=np.float64, count=count)
+    born = np.fromiter((record.birth_date for record in records), dtype=np.float64, count=count)
+    sex = np.fromiter((record.sex for record in records), dtype=np.int8, count=count)
+    # NaN em qualquer das datas se propaga para a idade
+    age_days = np.floor((collected - born) / _SECONDS_PER_DAY)
+    hemoglobin = records_to_matrix(records)[:, _HEMOGLOBIN_COLUMN]
+    return AnemiaFeatures(age_days / _DAYS_PER_MONTH, sex, hemoglobin)
+
+
+def extract_features(messages: Sequence[Dict[str, Any]]) -> AnemiaFeatures:
+    """
+    Extrai idade, sexo e hemoglobina de um lote de mensagens decodificadas.
+
+    Args:
+        messages: QueueMessages como dicionários (com `fhir_bundle`)
+
+    Returns:
+        Colunas do lote (ver `features_from_records`)
+    """
+    return features_from_records([HemogramaRecord.from_message(message) for message in messages])
+
+
+def classify_records(records: Sequence[HemogramaRecord]) -> List[Dict[str, Any]]:
+    """
+    Classifica a anemia de um lote de registros compactos.
+
+    Args:
+        records: Registros do lote (ver `HemogramaRecord`)
+
+    Returns:
+        Por registro, na mesma ordem: gravidade, hemoglobina em g/dL e idade em meses
+    """
+    features = features_from_records(records)
+    severity = classify_anemia(*features)
+
+    hemoglobin = np.round(features.hemoglobin_g_dl, 2)
+    age_months = np.round(features.age_months, 1)
+    return [
+        {
+            "severity": SEVERITY_LABELS[code + 1].value,
+            "hemoglobin_g_dl": None if math.isnan(hb) else hb,
+            "age_months": None if math.isnan(age) else age,
+        }
+        for code, hb, age in zip(severity.tolist(), hemoglobin.tolist(), age_months.tolist())
+    ]
+
+
+def classify_messages(messages: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Classifica a anemia de um lote de mensagens decodificadas.
+
+    Args:
+        messages: QueueMessages como dicionários (com `fhir_bundle`)
+
+    Returns:
+        Por mensagem, na mesma ordem: gravidade, hemoglobina em g/dL e idade em meses
+    """
+    return classify_records([HemogramaRecord.from_message(message) for message in messages])
@@ -2,14 +2,32 @@
 Serviço de processamento de hemogramas.
 Orquestra a validação FHIR e enfileiramento para processamento assíncrono.
 """
+import asyncio
+import time
 from datetime import datetime
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 from uuid import uuid4
 
+from src.core import metrics
+from src.core.config import settings
 from src.core.logging import get_logger
-from src.domain.models import HemogramaResponse, QueueMessage, ValidationError
+from src.domain.fhir_structs import Bundle
+from src.domain.models import (
+    HemogramaResponse,
+    MaloteExamResult,
+    MaloteResponse,
+    QueueMessage,
+    ValidationError,
+)
 from src.infrastructure.queue_service import QueueService
-from src.validators.fhir_validator import FHIRValidator
+from src.validators.bundle_index import BundleIndex
+from src.validators.fhir_validator import FHIRValidator, get_fhir_validator
+from src.validators.malote import (
+    PartitionOutcome,
+    get_validation_executor,
+    split_malote,
+    validate_partitions,
+)
 
 logger = get_logger(__name__)
 
@@ -17,61 +35,35 @@ logger = get_logger(__name__)
 class HemogramaService:
     """Serviço de negócio para processamento de hemogramas."""
     
-    def __init__(self, queue_service: QueueService):
+    def __init__(self, queue_service: QueueService, fhir_validator: Optional[FHIRValidator] = None):
         """
         Inicializa o serviço de hemogramas.
         
         Args:
             queue_service: Serviço de enfileiramento
+            fhir_validator: Validador FHIR (padrão: instância compartilhada do processo)
         """
         self.queue_service = queue_service
-        self.fhir_validator = FHIRValidator()
+        self.fhir_validator = fhir_validator or get_fhir_validator()
         logger.info("HemogramaService inicializado")
     
-    def extract_metadata(self, bundle: Dict[str, Any]) -> Tuple[str, str]:
+    def extract_metadata(self, index: BundleIndex) -> Tuple[str, str]:
         """
         Extrai metadados do Bundle FHIR (CNES do laboratório e CPF do paciente).
         
         Args:
-            bundle: Bundle FHIR
+            index: Índice de passagem única do Bundle
         
         Returns:
             Tupla (laboratory_cnes, patient_cpf)
         """
-        laboratory_cnes = "0000000"  # Default
-        patient_cpf = "00000000000"  # Default
-        
-        entries = bundle.get("entry", [])
-        
-        for entry in entries:
-            resource = entry.get("resource", {})
-            if resource.get("resourceType") != "Observation":
-                continue
-            
-            # Extrai CPF do paciente
-            subject = resource.get("subject", {})
-            identifier = subject.get("identifier", {})
-            if identifier.get("system") == "https://fhir.saude.go.gov.br/sid/cpf":
-                patient_cpf = identifier.get("value", patient_cpf)
-            
-            # Extrai CNES do laboratório
-            performers = resource.get("performer", [])
-            for performer in performers:
-                if performer.get("id") == "laboratorio":
-                    lab_identifier = performer.get("identifier", {})
-                    if lab_identifier.get("system") == "https://fhir.saude.go.gov.br/sid/cnes":
-                        laboratory_cnes = lab_identifier.get("value", laboratory_cnes)
-            
-            # Se já encontrou ambos, pode parar
-            if laboratory_cnes != "0000000" and patient_cpf != "00000000000":
-                break
-        
-        return laboratory_cnes, patient_cpf
+        return index.laboratory_cnes, index.patient_cpf
     
     async def process_hemograma(
         self,
-        bundle: Dict[str, Any],
-        correlation_id: str
+        bundle: Union[Dict[str, Any], Bundle],
+        correlation_id: str,
+        raw_body: Optional[bytes] = None
     ) -> Tuple[bool, HemogramaResponse | list[ValidationError]]:
         """
         Processa um hemograma completo.
@@ -83,8 +75,10 @@ class HemogramaService:
         4. Retorna resposta de aceitação
         
         Args:
-            bundle: Bundle FHIR do hemograma
+            bundle: Bundle FHIR do hemograma (dicionário ou Struct tipado)
             correlation_id: ID de correlação da requisição
+            raw_body: Bytes originais do Bundle, enfileirados sem re-serialização
+                (obrigatório para Bundle tipado)
         
         Returns:
             Tupla (success, response ou errors)
@@ -94,19 +88,30 @@ class HemogramaService:
             correlation_id=correlation_id
         )
         
-        # Passo 1: Validação FHIR
-        is_valid, errors = self.fhir_validator.validate(bundle)
+        # Passo 1: Validação FHIR (índice construído uma única vez por requisição)
+        result = self.fhir_validator.validate(bundle)
+        index = result.index
+        
+        logger.debug(
+            "Bundle indexado",
+            correlation_id=correlation_id,
+            entries_count=index.entry_count,
+            observations_count=len(index.observations)
+        )
         
-        if not is_valid:
+        if not result.is_valid:
             logger.warning(
                 "Hemograma rejeitado - validação FHIR falhou",
                 correlation_id=correlation_id,
-                error_count=len(errors)
+                error_count=len(result.errors)
             )
-            return False, errors
+            metrics.count_hemograma(index.laboratory_cnes, "rejected")
+            return False, result.errors
         
         # Passo 2: Extração de metadados
-        laboratory_cnes, patient_cpf = self.extract_metadata(bundle)
+        start = time.perf_counter()
+        laboratory_cnes, patient_cpf = self.extract_metadata(index)
+        metrics.observe_stage("metadata", time.perf_counter() - start)
         
         logger.info(
             "Metadados extraídos",
@@ -119,17 +124,23 @@ class HemogramaService:
         tracking_id = uuid4()
         received_at = datetime.utcnow()
         
+        # Os bytes originais seguem literalmente para a fila; o dicionário só é
+        # usado quando o Bundle não veio de uma requisição HTTP
+        if raw_body is None and not isinstance(bundle, dict):
+            raise ValueError("raw_body é obrigatório para Bundle tipado")
+        
         queue_message = QueueMessage(
             tracking_id=tracking_id,
-            fhir_bundle=bundle,
+            fhir_bundle=bundle if raw_body is None else None,
+            fhir_bundle_raw=raw_body,
             received_at=received_at,
             laboratory_cnes=laboratory_cnes,
             patient_cpf=patient_cpf,
             correlation_id=correlation_id
         )
         
-        # Passo 4: Enfileiramento
-        success, result = self.queue_service.send_message(queue_message)
+        # Passo 4: Enfileiramento (fora do event loop)
+        success, result = await self.queue_service.send_message_async(queue_message)
         
         if not success:
             logger.error(
@@ -138,6 +149,7 @@ class HemogramaService:
                 tracking_id=str(tracking_id),
                 error=result
             )
+            metrics.count_hemograma(laboratory_cnes, "queue_error")
             # Retorna erro de enfileiramento
             return False, [ValidationError(
                 field="queue",
@@ -146,6 +158,8 @@ class HemogramaService:
                 description=f"Falha ao enfileirar: {result}"
             )]
         
+        metrics.count_hemograma(laboratory_cnes, "accepted")
+        
         # Passo 5: Resposta de sucesso
         response = HemogramaResponse(
             status="accepted",
@@ -163,3 +177,150 @@ class HemogramaService:
         
         return True, response
 
+    async def process_malote(
+        self,
+        body: bytes,
+        correlation_id: str
+    ) -> MaloteResponse:
+        """
+        Processa um malote com vários hemogramas.
+
+        Fluxo:
+        1. Particiona o malote em um Bundle por exame composto
+        2. Valida as partições em lotes no pool de validação
+        3. Enfileira os hemogramas válidos (cada um com seu tracking ID)
+        4. Retorna o resultado por exame
+
+        Args:
+            body: Bytes JSON do malote
+            correlation_id: ID de correlação da requisição
+
+        Returns:
+            Resposta com tracking ID ou erros de cada exame
+
+        Raises:
+            ValueError: Se o JSON for malformado
+        """
+        received_at = datetime.utcnow()
+        start = time.perf_counter()
+        partitions, malote_errors = split_malote(body)
+        metrics.observe_stage("malote_split", time.perf_counter() - start)
+
+        if not partitions or len(partitions) > settings.malote_max_exams:
+            malote_errors.insert(0, ValidationError(
+                field="entry[].resource.code.coding[].code",
+                expected=f"de 1 a {settings.malote_max_exams} exames compostos",
+                received=f"{len(partitions)} exames compostos",
+                description="Quantidade de hemogramas do malote fora do limite"
+            ))
+            return MaloteResponse(
+                status="rejected",
+                received_at=received_at,
+                total_exams=len(partitions),
+                accepted=0,
+                rejected=len(partitions),
+                errors=malote_errors,
+                correlation_id=correlation_id
+            )
+
+        logger.info(
+            "Malote particionado",
+            correlation_id=correlation_id,
+            exams_count=len(partitions),
+            orphan_errors=len(malote_errors)
+        )
+
+        # Os bytes de cada partição seguem para a fila; a validação recebe
+        # esses mesmos bytes (envio barato ao pool de processos)
+        bodies = [partition.body for partition in partitions]
+        start = time.perf_counter()
+        outcomes = await self._validate_partitions(bodies)
+        metrics.observe_stage("malote_validation", time.perf_counter() - start)
+
+        pending: List[Tuple[int, QueueMessage]] = []
+        results: List[MaloteExamResult] = []
+        for partition, body, outcome in zip(partitions, bodies, outcomes):
+            if not outcome.is_valid:
+                metrics.count_hemograma(outcome.laboratory_cnes, "rejected")
+                results.append(MaloteExamResult(
+                    index=partition.index,
+                    composite_full_url=partition.composite_full_url,
+                    status="rejected",
+                    errors=outcome.errors
+                ))
+                continue
+            message = QueueMessage(
+                tracking_id=uuid4(),
+                fhir_bundle_raw=body,
+                received_at=received_at,
+                laboratory_cnes=outcome.laboratory_cnes,
+                patient_cpf=outcome.patient_cpf,
+                correlation_id=correlation_id
+            )
+            pending.append((len(results), message))
+            results.append(MaloteExamResult(
+                index=partition.index,
+                composite_full_url=partition.composite_full_url,
+                status="accepted",
+                tracking_id=message.tracking_id
+            ))
+
+        # Envios concorrentes: com SQS_BATCHING_ENABLED são agrupados em SendMessageBatch
+        sent = await asyncio.gather(*(
+            self.queue_service.send_message_async(message) for _, message in pending
+        ))
+        for (position, message), (success, result) in zip(pending, sent):
+            if success:
+                metrics.count_hemograma(message.laboratory_cnes, "accepted")
+                continue
+            metrics.count_hemograma(message.laboratory_cnes, "queue_error")
+            logger.error(
+                "Falha ao enfileirar hemograma do malote",
+                correlation_id=correlation_id,
+                tracking_id=str(message.tracking_id),
+                error=result
+            )
+            results[position] = MaloteExamResult(
+                index=results[position].index,
+                composite_full_url=results[position].composite_full_url,
+                status="rejected",
+                errors=[ValidationError(
+                    field="queue",
+                    expected="mensagem enfileirada",
+                    received="erro",
+                    description=f"Falha ao enfileirar: {result}"
+                )]
+            )
+
+        accepted = sum(1 for result in results if result.status == "accepted")
+        rejected = len(results) - accepted
+        logger.info(
+            "Malote processado",
+            correlation_id=correlation_id,
+            exams_count=len(results),
+            accepted=accepted,
+            rejected=rejected
+        )
+
+        return MaloteResponse(
+            status="accepted" if not rejected else "partially_accepted" if accepted else "rejected",
+            received_at=received_at,
+            total_exams=len(results),
+            accepted=accepted,
+            rejected=rejected,
+            exams=results,
+            errors=malote_errors or None,
+            correlation_id=correlation_id
+        )
+
+    async def _validate_partitions(self, bodies: List[bytes]) -> List[PartitionOutcome]:
+        # Lotes de MALOTE_VALIDATION_CHUNK_SIZE validados concorrentemente no
+        # pool de processos (ou no executor padrão, sem bloquear o event loop)
+        loop = asyncio.get_running_loop()
+        executor = get_validation_executor()
+        size = settings.malote_validation_chunk_size
+        chunks = await asyncio.gather(*(
+            loop.run_in_executor(executor, validate_partitions, bodies[start:start + size])
+            for start in range(0, len(bodies), size)
+        ))
+        return [outcome for chunk in chunks for outcome in chunk]
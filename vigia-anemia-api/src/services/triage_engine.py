@@ -0,0 +1,209 @@
+"""
+Triagem hematológica por lote (urgent / priority / elective).
+
+Os analitos do lote são lidos da matriz de resultados dos registros
+compactos (`HemogramaRecord`, já em g/dL, células/mm³ e %) e cada regra é
+avaliada como uma máscara sobre o lote inteiro. A prioridade de cada exame é a maior entre as regras atendidas e os
+motivos são acumulados em um bitmask (um bit por regra).
+"""
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from src.core.logging import get_logger
+from src.domain.hemograma_record import RESULT_INDEX, HemogramaRecord, records_to_matrix
+from src.domain.models import LoincCode, TriagePriority
+
+logger = get_logger(__name__)
+
+# Códigos de prioridade nos arrays (int8), em ordem crescente de gravidade
+PRIORITY_CODES = {
+    TriagePriority.ELECTIVE: 0,
+    TriagePriority.PRIORITY: 1,
+    TriagePriority.URGENT: 2,
+}
+PRIORITY_LABELS = tuple(PRIORITY_CODES)
+
+# Colunas lidas da matriz de resultados: nome -> código LOINC (unidades
+# canônicas de src.domain.units)
+_EXTRACTED_COLUMNS = {
+    "hemoglobin_g_dl": LoincCode.HEMOGLOBINA.value,
+    "leukocytes_per_mm3": LoincCode.LEUCOCITOS.value,
+    "segmented_percent": LoincCode.SEGMENTADOS.value,
+    "band_percent": LoincCode.BASTONETES.value,
+    "platelets_per_mm3": LoincCode.PLAQUETAS.value,
+    "blasts_percent": LoincCode.BLASTOS.value,
+}
+
+# Colunas disponíveis para as regras (extraídas + derivadas)
+TRIAGE_COLUMNS = frozenset([*_EXTRACTED_COLUMNS, "neutrophils_per_mm3"])
+
+_OPERATORS = {"lt": np.less, "gt": np.greater}
+
+
+class TriageRule(BaseModel):
+    """Regra de triagem: limiar sobre uma coluna e a prioridade que ela impõe."""
+    name: str = Field(..., description="Identificador da regra (emitido como motivo)")
+    column: str = Field(..., description="Coluna avaliada (ver TRIAGE_COLUMNS)")
+    operator: str = Field(..., description="Comparação com o limiar: lt ou gt")
+    threshold: float = Field(..., description="Limiar na unidade normalizada da coluna")
+    priority: TriagePriority = Field(..., description="Prioridade imposta quando a regra é atendida")
+    description: str = Field(..., description="Descrição legível do critério")
+
+
+# Critérios da proposta de previsão de demanda (urgentes) e faixas intermediárias (prioritárias)
+DEFAULT_TRIAGE_RULES = [
+    TriageRule(name="hemoglobina_critica", column="hemoglobin_g_dl", operator="lt", threshold=8.0,
+               priority=TriagePriority.URGENT, description="Hemoglobina < 8 g/dL"),
+    TriageRule(name="neutropenia_grave", column="neutrophils_per_mm3", operator="lt", threshold=1000.0,
+               priority=TriagePriority.URGENT, description="Neutrófilos < 1.000/mm³"),
+    TriageRule(name="plaquetopenia_grave", column="platelets_per_mm3", operator="lt", threshold=20000.0,
+               priority=TriagePriority.URGENT, description="Plaquetas < 20.000/mm³"),
+    TriageRule(name="blastos_presentes", column="blasts_percent", operator="gt", threshold=0.0,
+               priority=TriagePriority.URGENT, description="Blastos presentes"),
+    TriageRule(name="hemoglobina_baixa", column="hemoglobin_g_dl", operator="lt", threshold=10.0,
+               priority=TriagePriority.PRIORITY, description="Hemoglobina < 10 g/dL"),
+    TriageRule(name="neutropenia", column="neutrophils_per_mm3", operator="lt", threshold=1500.0,
+               priority=TriagePriority.PRIORITY, description="Neutrófilos < 1.500/mm³"),
+    TriageRule(name="plaquetopenia", column="platelets_per_mm3", operator="lt", threshold=100000.0,
+               priority=TriagePriority.PRIORITY, description="Plaquetas < 100.000/mm³"),
+]
+
+
+def columns_from_matrix(matrix: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Monta as colunas da triagem a partir da matriz de resultados de um lote.
+
+    Args:
+        matrix: Resultados normalizados (ver `records_to_matrix`)
+
+    Returns:
+        Coluna -> valores por exame (NaN se ausente ou unidade desconhecida)
+    """
+    columns = {name: matrix[:, RESULT_INDEX[code]] for name, code in _EXTRACTED_COLUMNS.items()}
+    # Contagem absoluta de neutrófilos: leucócitos x (segmentados + bastonetes)
+    columns["neutrophils_per_mm3"] = columns["leukocytes_per_mm3"] * (
+        columns["segmented_percent"] + np.nan_to_num(columns["band_percent"])
+    ) / 100.0
+    return columns
+
+
+def extract_columns(messages: Sequence[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Extrai os analitos da triagem de um lote de mensagens decodificadas.
+
+    Args:
+        messages: QueueMessages como dicionários (com `fhir_bundle`)
+
+    Returns:
+        Coluna -> valores normalizados por mensagem (ver `columns_from_matrix`)
+    """
+    records = [HemogramaRecord.from_message(message) for message in messages]
+    return columns_from_matrix(records_to_matrix(records))
+
+
+class TriageEngine:
+    """
+    Motor de triagem com regras compiladas uma única vez.
+
+    Cada regra vira (função de comparação, limiar, código de prioridade, bit);
+    `score()` avalia todas as regras como máscaras sobre colunas inteiras.
+    """
+
+    def __init__(self, rules: Sequence[TriageRule] = DEFAULT_TRIAGE_RULES):
+        """
+        Args:
+            rules: Regras de triagem (no máximo 64)
+
+        Raises:
+            ValueError: Se uma regra usar coluna ou operador desconhecido
+        """
+        if len(rules) > 64:
+            raise ValueError("No máximo 64 regras de triagem")
+        for rule in rules:
+            if rule.column not in TRIAGE_COLUMNS:
+                raise ValueError(f"Coluna de triagem desconhecida: {rule.column}")
+            if rule.operator not in _OPERATORS:
+                raise ValueError(f"Operador de triagem desconhecido: {rule.operator}")
+
+        self.rules = list(rules)
+        self._compiled = [
+            (rule.column, _OPERATORS[rule.operator], rule.threshold, PRIORITY_CODES[rule.priority], np.uint64(1 << bit))
+            for bit, rule in enumerate(self.rules)
+        ]
+        self._reason_cache: Dict[int, List[str]] = {0: []}
+        logger.info("Motor de triagem compilado", rules_count=len(self.rules))
+
+    def score(self, columns: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Avalia as regras sobre um lote.
+
+        Args:
+            columns: Colunas normalizadas (ver `extract_columns`)
+
+        Returns:
+            Tupla (códigos de prioridade int8, bitmask uint64 das regras atendidas)
+        """
+        size = len(next(iter(columns.values()))) if columns else 0
+        priority = np.zeros(size, dtype=np.int8)
+        reasons = np.zeros(size, dtype=np.uint64)
+
+        for column, compare, threshold, code, bit in self._compiled:
+            # Comparações com NaN (analito ausente) resultam em False
+            mask = compare(columns[column], threshold)
+            reasons[mask] |= bit
+            if code:
+                priority[mask & (priority < code)] = code
+        return priority, reasons
+
+    def reasons(self, bits: int) -> List[str]:
+        """
+        Converte o bitmask de um exame nos nomes das regras atendidas.
+
+        Args:
+            bits: Bitmask retornado por `score()`
+
+        Returns:
+            Nomes das regras, na ordem em que foram declaradas
+        """
+        cached = self._reason_cache.get(bits)
+        if cached is None:
+            cached = [rule.name for bit, rule in enumerate(self.rules) if bits >> bit & 1]
+            self._reason_cache[bits] = cached
+        return cached
+
+    def triage_records(self, records: Sequence[HemogramaRecord]) -> List[Dict[str, Any]]:
+        """
+        Faz a triagem de um lote de registros compactos.
+
+        Args:
+            records: Registros do lote (ver `HemogramaRecord`)
+
+        Returns:
+            Por registro, na mesma ordem: prioridade e motivos (nomes das regras)
+        """
+        return self._results(self.score(columns_from_matrix(records_to_matrix(records))))
+
+    def triage_messages(self, messages: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Faz a triagem de um lote de mensagens decodificadas.
+
+        Args:
+            messages: QueueMessages como dicionários (com `fhir_bundle`)
+
+        Returns:
+            Por mensagem, na mesma ordem: prioridade e motivos (nomes das regras)
+        """
+        return self._results(self.score(extract_columns(messages)))
+
+    def _results(self, scored: Tuple[np.ndarray, np.ndarray]) -> List[Dict[str, Any]]:
+        priority, reasons = scored
+        return [
+            {"priority": PRIORITY_LABELS[code].value, "reasons": self.reasons(bits)}
+            for code, bits in zip(priority.tolist(), reasons.tolist())
+        ]
+
+
+# Motor global com as regras padrão
+triage_engine = TriageEngine()
@@ -1,11 +1,21 @@
 """
 Validators module - Validadores customizados para FHIR, CPF, CNES, etc.
 """
+from src.validators.bundle_index import BundleIndex
 from src.validators.cpf_validator import CPFValidator
 from src.validators.fhir_validator import FHIRValidator
+from src.validators.plausibility import PLAUSIBLE_RANGES
+from src.validators.profile_rules import ProfileRegistry, RuleSpec, ValidationProfile
+from src.validators.profiles import profile_registry
 
 __all__ = [
+    "BundleIndex",
     "CPFValidator",
     "FHIRValidator",
+    "PLAUSIBLE_RANGES",
+    "ProfileRegistry",
+    "RuleSpec",
+    "ValidationProfile",
+    "profile_registry",
 ]
 
@@ -0,0 +1,83 @@
+"""
+Validação em massa de Bundles FHIR, sem passar pela API.
+
+Aceita diretórios, arquivos .json, .ndjson/.jsonl, suas versões .gz e arquivos
+.tar/.tar.gz/.tgz. Imprime uma linha por arquivo assim que ele termina e, ao
+final, o total de erros por campo (ValidationError.field). Sai com código 1 se
+algum Bundle for inválido.
+
+Uso:
+    python -m src.validators historico/ [--processes 8] [--chunk-size 200]
+    python -m src.validators lote.ndjson.gz --report relatorio.ndjson
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from src.validators.bulk import iter_bundles, validate_bundles
+from src.validators.fhir_validator import get_fhir_validator
+
+
+def _init_process() -> None:
+    get_fhir_validator()
+
+
+def main() -> int:
+    """Lê os argumentos, valida as entradas e imprime os relatórios."""
+    parser = argparse.ArgumentParser(description="Validação em massa de Bundles FHIR de hemograma")
+    parser.add_argument("paths", type=Path, nargs="+", help="Diretórios ou arquivos de entrada")
+    parser.add_argument("--processes", type=int, default=0, help="Processos do pool (0: um por CPU)")
+    parser.add_argument("--chunk-size", type=int, default=200, help="Bundles por lote enviado ao pool")
+    parser.add_argument("--report", type=Path, help="Arquivo NDJSON com o relatório de cada arquivo")
+    args = parser.parse_args()
+    missing = [str(path) for path in args.paths if not path.exists()]
+    if missing:
+        parser.error(f"entradas não encontradas: {', '.join(missing)}")
+
+    _init_process()
+    processes = args.processes or os.cpu_count() or 1
+    totals = Counter()
+    errors_by_field = Counter()
+    report = args.report.open("w", encoding="utf-8") if args.report else None
+    start = time.perf_counter()
+
+    try:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_process) as pool:
+            items = iter_bundles(args.paths)
+            for file_report in validate_bundles(items, pool, args.chunk_size, max_pending=processes * 4):
+                totals.update(files=1, bundles=file_report.bundles, valid=file_report.valid,
+                              invalid=file_report.invalid)
+                errors_by_field.update(file_report.errors_by_field)
+                status = "OK   " if not file_report.invalid else "FALHA"
+                print(f"{status} {file_report.source}  bundles={file_report.bundles} "
+                      f"válidos={file_report.valid} inválidos={file_report.invalid}", flush=True)
+                if report is not None:
+                    report.write(json.dumps({
+                        "source": file_report.source,
+                        "bundles": file_report.bundles,
+                        "valid": file_report.valid,
+                        "invalid": file_report.invalid,
+                        "errors_by_field": dict(file_report.errors_by_field.most_common()),
+                        "failures": [
+                            {"line": line, "error": message} for line, message in file_report.failures
+                        ],
+                    }, ensure_ascii=False) + "\n")
+    finally:
+        if report is not None:
+            report.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"\n{totals['files']} arquivos, {totals['bundles']} bundles: {totals['valid']} válidos, "
+          f"{totals['invalid']} inválidos ({totals['bundles'] / elapsed:.0f} bundles/s, {processes} processos)")
+    for field, count in errors_by_field.most_common():
+        print(f"{count:10d}  {field}")
+    return 1 if totals["invalid"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
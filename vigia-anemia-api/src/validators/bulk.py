@@ -0,0 +1,255 @@
+"""
+Validação em massa de Bundles FHIR fora da API (homologação de laboratórios).
+Lê diretórios, arquivos NDJSON e arquivos gzip (inclusive .tar.gz) em fluxo,
+distribui lotes de Bundles a um pool de processos e devolve um relatório por
+arquivo assim que ele termina, sem manter os Bundles em memória.
+"""
+import gzip
+import tarfile
+from collections import Counter, deque
+from concurrent.futures import Executor, Future
+from pathlib import Path
+from typing import IO, Deque, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from src.core.config import settings
+from src.domain.fhir_structs import decode_bundle
+from src.validators.fhir_validator import get_fhir_validator
+
+# Extensões reconhecidas em diretórios e dentro de arquivos tar
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+JSON_SUFFIXES = (".json",) + NDJSON_SUFFIXES
+ARCHIVE_SUFFIXES = (".tar.gz", ".tgz", ".tar")
+
+# Campo usado para payloads que não são JSON válido
+INVALID_JSON_FIELD = "json"
+
+# Campo usado para Bundles cuja validação falhou com exceção (estrutura inesperada)
+VALIDATION_FAILURE_FIELD = "bundle"
+
+# Falhas listadas por arquivo no relatório (as demais entram só nas contagens)
+MAX_FAILURES_PER_FILE = 20
+
+
+class BundleItem(NamedTuple):
+    """Bundle lido da entrada: origem, linha (0 para arquivo JSON único) e bytes."""
+    source: str
+    line: int
+    body: bytes
+
+
+class BundleOutcome(NamedTuple):
+    """Resultado da validação de um Bundle (executado no pool)."""
+    is_valid: bool
+    fields: List[str]
+    message: Optional[str]
+
+
+class FileReport(NamedTuple):
+    """Relatório de um arquivo de entrada."""
+    source: str
+    bundles: int
+    valid: int
+    invalid: int
+    errors_by_field: Counter
+    failures: List[Tuple[int, str]]
+
+
+def _matches(name: str, suffixes: Sequence[str]) -> bool:
+    return name.lower().endswith(tuple(suffixes))
+
+
+def _read_stream(source: str, name: str, stream: IO[bytes]) -> Iterator[BundleItem]:
+    # NDJSON linha a linha (memória constante); demais: um Bundle por arquivo
+    if _matches(name, NDJSON_SUFFIXES):
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if line:
+                yield BundleItem(source, line_number, line)
+    else:
+        yield BundleItem(source, 0, stream.read())
+
+
+def _read_archive(path: Path) -> Iterator[BundleItem]:
+    # Modo de fluxo ("r|*"): os membros são lidos em sequência, sem índice em memória
+    with tarfile.open(path, mode="r|*") as archive:
+        for member in archive:
+            if not member.isfile() or not _matches(member.name, JSON_SUFFIXES):
+                continue
+            stream = archive.extractfile(member)
+            if stream is not None:
+                yield from _read_stream(f"{path}:{member.name}", member.name, stream)
+
+
+def _read_file(path: Path) -> Iterator[BundleItem]:
+    name = path.name
+    if _matches(name, ARCHIVE_SUFFIXES):
+        yield from _read_archive(path)
+    elif _matches(name, (".gz",)):
+        # arquivo.ndjson.gz: NDJSON; arquivo.json.gz: um Bundle
+        with gzip.open(path, "rb") as stream:
+            yield from _read_stream(str(path), name[:-3], stream)
+    else:
+        with path.open("rb") as stream:
+            yield from _read_stream(str(path), name, stream)
+
+
+def iter_bundles(paths: Iterable[Path]) -> Iterator[BundleItem]:
+    """
+    Lê os Bundles das entradas, em fluxo e na ordem dos caminhos.
+
+    Diretórios são percorridos recursivamente (em ordem alfabética), considerando
+    arquivos .json, .ndjson/.jsonl, suas versões .gz e arquivos .tar/.tar.gz/.tgz.
+    Arquivos informados diretamente são lidos mesmo sem extensão conhecida
+    (como um Bundle JSON único).
+
+    Args:
+        paths: Diretórios ou arquivos de entrada
+
+    Yields:
+        Um BundleItem por Bundle
+
+    Raises:
+        FileNotFoundError: Se um caminho não existir
+    """
+    readable = JSON_SUFFIXES + ARCHIVE_SUFFIXES + tuple(f"{suffix}.gz" for suffix in JSON_SUFFIXES)
+    for path in paths:
+        if path.is_dir():
+            for child in sorted(path.rglob("*")):
+                if child.is_file() and _matches(child.name, readable):
+                    yield from _read_file(child)
+        elif path.exists():
+            yield from _read_file(path)
+        else:
+            raise FileNotFoundError(f"Entrada não encontrada: {path}")
+
+
+def validate_bodies(bodies: Sequence[bytes]) -> List[BundleOutcome]:
+    """
+    Valida um lote de Bundles serializados (executado no pool de processos).
+
+    Args:
+        bodies: Bundles em JSON
+
+    Returns:
+        Resultado por Bundle, na mesma ordem
+    """
+    validator = get_fhir_validator()
+    outcomes = []
+    for body in bodies:
+        try:
+            bundle = decode_bundle(body, typed=settings.fhir_fast_decoding)
+        except ValueError as e:
+            outcomes.append(BundleOutcome(False, [INVALID_JSON_FIELD], f"JSON malformado: {e}"))
+            continue
+        if isinstance(bundle, (list, str, int, float, bool)) or bundle is None:
+            outcomes.append(BundleOutcome(False, [INVALID_JSON_FIELD], "Payload deve ser um objeto JSON"))
+            continue
+        try:
+            errors = validator.validate(bundle).errors
+        except Exception as e:
+            # Um Bundle malformado (ex.: entry com tipo errado) não derruba o lote
+            outcomes.append(BundleOutcome(
+                False, [VALIDATION_FAILURE_FIELD], f"Falha ao validar Bundle: {type(e).__name__}: {e}"
+            ))
+            continue
+        outcomes.append(BundleOutcome(
+            not errors,
+            [error.field for error in errors],
+            f"{errors[0].field}: {errors[0].description}" if errors else None,
+        ))
+    return outcomes
+
+
+def _chunks(items: Iterator[BundleItem], chunk_size: int, chunk_bytes: int) -> Iterator[List[BundleItem]]:
+    chunk: List[BundleItem] = []
+    size = 0
+    for item in items:
+        chunk.append(item)
+        size += len(item.body)
+        if len(chunk) >= chunk_size or size >= chunk_bytes:
+            yield chunk
+            chunk, size = [], 0
+    if chunk:
+        yield chunk
+
+
+class _FileAccumulator:
+    """Contagens do arquivo em andamento."""
+
+    __slots__ = ("source", "bundles", "valid", "errors_by_field", "failures")
+
+    def __init__(self, source: str):
+        self.source = source
+        self.bundles = 0
+        self.valid = 0
+        self.errors_by_field: Counter = Counter()
+        self.failures: List[Tuple[int, str]] = []
+
+    def add(self, line: int, outcome: BundleOutcome) -> None:
+        self.bundles += 1
+        if outcome.is_valid:
+            self.valid += 1
+            return
+        self.errors_by_field.update(outcome.fields)
+        if len(self.failures) < MAX_FAILURES_PER_FILE:
+            self.failures.append((line, outcome.message or ""))
+
+    def report(self) -> FileReport:
+        return FileReport(
+            source=self.source,
+            bundles=self.bundles,
+            valid=self.valid,
+            invalid=self.bundles - self.valid,
+            errors_by_field=self.errors_by_field,
+            failures=self.failures,
+        )
+
+
+def validate_bundles(
+    items: Iterable[BundleItem],
+    executor: Executor,
+    chunk_size: int = 200,
+    chunk_bytes: int = 8 * 1024 * 1024,
+    max_pending: int = 8,
+) -> Iterator[FileReport]:
+    """
+    Valida os Bundles no pool e emite um relatório por arquivo, em ordem.
+
+    A leitura é limitada por `max_pending` lotes em voo: a memória fica em
+    torno de `max_pending * chunk_bytes`, independente do tamanho da entrada.
+    Os resultados são consumidos na ordem de envio, de modo que o relatório de
+    um arquivo é emitido assim que o primeiro Bundle do arquivo seguinte volta.
+
+    Args:
+        items: Bundles de entrada (ver iter_bundles)
+        executor: Pool que executa validate_bodies
+        chunk_size: Máximo de Bundles por lote
+        chunk_bytes: Máximo aproximado de bytes por lote
+        max_pending: Lotes enviados ao pool e ainda não consumidos
+
+    Yields:
+        FileReport de cada arquivo com ao menos um Bundle
+    """
+    pending: Deque[Tuple[List[Tuple[str, int]], Future]] = deque()
+    current: Optional[_FileAccumulator] = None
+
+    def consume() -> Iterator[FileReport]:
+        nonlocal current
+        locations, future = pending.popleft()
+        for (source, line), outcome in zip(locations, future.result()):
+            if current is None or current.source != source:
+                if current is not None:
+                    yield current.report()
+                current = _FileAccumulator(source)
+            current.add(line, outcome)
+
+    for chunk in _chunks(iter(items), chunk_size, chunk_bytes):
+        future = executor.submit(validate_bodies, [item.body for item in chunk])
+        pending.append(([(item.source, item.line) for item in chunk], future))
+        if len(pending) >= max_pending:
+            yield from consume()
+
+    while pending:
+        yield from consume()
+    if current is not None:
+        yield current.report()
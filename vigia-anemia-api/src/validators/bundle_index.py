@@ -0,0 +1,339 @@
+"""
+Índice de passagem única sobre o Bundle FHIR.
+Percorre `bundle["entry"]` uma única vez por requisição e expõe as visões
+consumidas pelo FHIRValidator e pelo HemogramaService.
+"""
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from src.domain.models import LoincCode
+from src.validators.plausibility import NUMERIC_TYPES, ImplausibleValue, RangeTable
+
+LOINC_SYSTEM = "http://loinc.org"
+CPF_SYSTEM = "https://fhir.saude.go.gov.br/sid/cpf"
+CNES_SYSTEM = "https://fhir.saude.go.gov.br/sid/cnes"
+LABORATORY_PERFORMER_ID = "laboratorio"
+
+DEFAULT_LABORATORY_CNES = "0000000"
+DEFAULT_PATIENT_CPF = "00000000000"
+
+
+class IndexOptions(NamedTuple):
+    """Sistemas de identificação e códigos que orientam a construção do índice."""
+    loinc_system: str = LOINC_SYSTEM
+    cpf_system: str = CPF_SYSTEM
+    cnes_system: str = CNES_SYSTEM
+    laboratory_performer_id: str = LABORATORY_PERFORMER_ID
+    composite_code: str = LoincCode.CBC_PANEL.value
+    # Faixas de plausibilidade por código e unidade (vazio: sem verificação)
+    plausible_ranges: RangeTable = {}
+
+
+DEFAULT_INDEX_OPTIONS = IndexOptions()
+
+
+class ContainedSpecimen(NamedTuple):
+    """Amostra (Specimen) encontrada em `contained[]` de uma Observation."""
+    type_code: Optional[str]
+    collected_at: Optional[str]
+
+
+class IndexedObservation(NamedTuple):
+    """Visão achatada de uma Observation do Bundle."""
+    position: int
+    resource: Any
+    first_code: Optional[str]
+    loinc_codes: List[str]
+    has_member: List[Optional[str]]
+    specimen_reference: Optional[str]
+    specimens: List[ContainedSpecimen]
+
+
+class BundleIndex:
+    """
+    Índice construído em uma única passagem sobre as entries do Bundle.
+
+    Reúne entries por resourceType, código LOINC -> Observation, exame
+    composto, identificadores CPF/CNES (sem repetição, na ordem do Bundle),
+    as referências de amostra de cada Observation, os resultados fora das
+    faixas de plausibilidade do perfil e, para a verificação de integridade,
+    o mapa `fullUrl` -> resourceType e o número de Observations em que cada
+    código LOINC aparece.
+    """
+
+    __slots__ = (
+        "resource_type",
+        "bundle_type",
+        "profiles",
+        "entry_count",
+        "resources_by_type",
+        "observations",
+        "loinc_index",
+        "composite",
+        "cpfs",
+        "cnes",
+        "implausible",
+        "full_urls",
+        "duplicate_full_urls",
+        "loinc_counts",
+    )
+
+    def __init__(self):
+        """Inicializa um índice vazio."""
+        self.resource_type: Optional[str] = None
+        self.bundle_type: Optional[str] = None
+        self.profiles: List[str] = []
+        self.entry_count: int = 0
+        self.resources_by_type: Dict[str, List[Any]] = {}
+        self.observations: List[IndexedObservation] = []
+        self.loinc_index: Dict[str, IndexedObservation] = {}
+        self.composite: Optional[IndexedObservation] = None
+        self.cpfs: List[str] = []
+        self.cnes: List[str] = []
+        self.implausible: List[ImplausibleValue] = []
+        self.full_urls: Dict[str, Optional[str]] = {}
+        self.duplicate_full_urls: List[str] = []
+        self.loinc_counts: Dict[str, int] = {}
+
+    @property
+    def patient_cpf(self) -> str:
+        """CPF do paciente (primeiro encontrado) ou valor padrão."""
+        return self.cpfs[0] if self.cpfs else DEFAULT_PATIENT_CPF
+
+    @property
+    def laboratory_cnes(self) -> str:
+        """CNES do laboratório (primeiro encontrado) ou valor padrão."""
+        return self.cnes[0] if self.cnes else DEFAULT_LABORATORY_CNES
+
+    @classmethod
+    def from_dict(
+        cls,
+        bundle: Dict[str, Any],
+        options: IndexOptions = DEFAULT_INDEX_OPTIONS
+    ) -> "BundleIndex":
+        """
+        Constrói o índice a partir do Bundle decodificado como dicionário.
+
+        Args:
+            bundle: Dicionário representando o Bundle FHIR
+            options: Sistemas e códigos do perfil (padrão: perfil SES-GO)
+
+        Returns:
+            Índice preenchido
+        """
+        loinc_system, cpf_system, cnes_system, performer_id, composite_code, plausible_ranges = options
+
+        index = cls()
+        index.resource_type = bundle.get("resourceType")
+        index.bundle_type = bundle.get("type")
+        index.profiles = (bundle.get("meta") or {}).get("profile") or []
+
+        entries = bundle.get("entry") or []
+        index.entry_count = len(entries)
+
+        resources_by_type = index.resources_by_type
+        loinc_index = index.loinc_index
+        implausible = index.implausible
+        full_urls = index.full_urls
+        loinc_counts = index.loinc_counts
+        seen_cpfs: Dict[str, None] = {}
+        seen_cnes: Dict[str, None] = {}
+
+        for position, entry in enumerate(entries):
+            resource = entry.get("resource") or {}
+            resource_type = resource.get("resourceType")
+            resources_by_type.setdefault(resource_type, []).append(resource)
+
+            full_url = entry.get("fullUrl")
+            if full_url:
+                if full_url in full_urls:
+                    index.duplicate_full_urls.append(full_url)
+                else:
+                    full_urls[full_url] = resource_type
+
+            if resource_type != "Observation":
+                continue
+
+            # Códigos LOINC
+            codings = (resource.get("code") or {}).get("coding") or []
+            first_code = codings[0].get("code") if codings else None
+            # Sem repetição: o mesmo código duas vezes em coding[] conta como uma ocorrência
+            loinc_codes = list(dict.fromkeys(
+                coding.get("code")
+                for coding in codings
+                if coding.get("system") == loinc_system
+            ))
+
+            # Plausibilidade do resultado, junto com a detecção do código
+            ranges = plausible_ranges.get(first_code)
+            if ranges is not None:
+                quantity = resource.get("valueQuantity")
+                if quantity.__class__ is not dict:
+                    # Ausente ou com tipo errado (ex.: "valueQuantity": "12")
+                    implausible.append(ImplausibleValue(position, first_code, None, None, None))
+                else:
+                    value = quantity.get("value")
+                    unit = quantity.get("code") or quantity.get("unit")
+                    bounds = ranges.get(unit.lower()) if unit.__class__ is str else None
+                    if bounds is None or value.__class__ not in NUMERIC_TYPES:
+                        implausible.append(ImplausibleValue(position, first_code, value, unit, None))
+                    elif not bounds[0] <= value <= bounds[1]:
+                        implausible.append(ImplausibleValue(position, first_code, value, unit, bounds))
+
+            # Identificador do paciente
+            identifier = (resource.get("subject") or {}).get("identifier") or {}
+            if identifier.get("system") == cpf_system:
+                seen_cpfs.setdefault(identifier.get("value", ""))
+
+            # Identificador do laboratório
+            for performer in resource.get("performer") or []:
+                if performer.get("id") == performer_id:
+                    lab_identifier = performer.get("identifier") or {}
+                    if lab_identifier.get("system") == cnes_system:
+                        seen_cnes.setdefault(lab_identifier.get("value", ""))
+
+            # Amostras contidas
+            specimens = []
+            for item in resource.get("contained") or []:
+                if item.get("resourceType") != "Specimen":
+                    continue
+                type_codings = (item.get("type") or {}).get("coding") or []
+                specimens.append(ContainedSpecimen(
+                    type_code=type_codings[0].get("code") if type_codings else None,
+                    collected_at=(item.get("collection") or {}).get("collectedDateTime"),
+                ))
+
+            observation = IndexedObservation(
+                position=position,
+                resource=resource,
+                first_code=first_code,
+                loinc_codes=loinc_codes,
+                has_member=[member.get("reference") for member in resource.get("hasMember") or []],
+                specimen_reference=(resource.get("specimen") or {}).get("reference"),
+                specimens=specimens,
+            )
+            index.observations.append(observation)
+
+            for loinc_code in loinc_codes:
+                loinc_index.setdefault(loinc_code, observation)
+                loinc_counts[loinc_code] = loinc_counts.get(loinc_code, 0) + 1
+
+            if index.composite is None and first_code == composite_code:
+                index.composite = observation
+
+        index.cpfs = list(seen_cpfs)
+        index.cnes = list(seen_cnes)
+        return index
+
+    @classmethod
+    def from_struct(
+        cls,
+        bundle: Any,
+        options: IndexOptions = DEFAULT_INDEX_OPTIONS
+    ) -> "BundleIndex":
+        """
+        Constrói o índice a partir do Bundle tipado (src.domain.fhir_structs).
+
+        Args:
+            bundle: Bundle decodificado em Structs
+            options: Sistemas e códigos do perfil (padrão: perfil SES-GO)
+
+        Returns:
+            Índice preenchido
+        """
+        loinc_system, cpf_system, cnes_system, performer_id, composite_code, plausible_ranges = options
+
+        index = cls()
+        index.resource_type = bundle.resource_type
+        index.bundle_type = bundle.type
+        index.profiles = bundle.meta.profile if bundle.meta is not None else []
+
+        entries = bundle.entry
+        index.entry_count = len(entries)
+
+        resources_by_type = index.resources_by_type
+        loinc_index = index.loinc_index
+        implausible = index.implausible
+        full_urls = index.full_urls
+        loinc_counts = index.loinc_counts
+        seen_cpfs: Dict[str, None] = {}
+        seen_cnes: Dict[str, None] = {}
+
+        for position, entry in enumerate(entries):
+            resource = entry.resource
+            resource_type = resource.resource_type if resource is not None else None
+            resources_by_type.setdefault(resource_type, []).append(resource)
+
+            full_url = entry.full_url
+            if full_url:
+                if full_url in full_urls:
+                    index.duplicate_full_urls.append(full_url)
+                else:
+                    full_urls[full_url] = resource_type
+
+            if resource_type != "Observation":
+                continue
+
+            # Códigos LOINC
+            codings = resource.code.coding if resource.code is not None else []
+            first_code = codings[0].code if codings else None
+            # Sem repetição: o mesmo código duas vezes em coding[] conta como uma ocorrência
+            loinc_codes = list(dict.fromkeys(coding.code for coding in codings if coding.system == loinc_system))
+
+            # Plausibilidade do resultado, junto com a detecção do código
+            ranges = plausible_ranges.get(first_code)
+            if ranges is not None:
+                quantity = resource.value_quantity
+                value = quantity.value if quantity is not None else None
+                unit = (quantity.code or quantity.unit) if quantity is not None else None
+                bounds = ranges.get(unit.lower()) if unit is not None else None
+                if bounds is None or value is None:
+                    implausible.append(ImplausibleValue(position, first_code, value, unit, None))
+                elif not bounds[0] <= value <= bounds[1]:
+                    implausible.append(ImplausibleValue(position, first_code, value, unit, bounds))
+
+            # Identificador do paciente
+            subject = resource.subject
+            identifier = subject.identifier if subject is not None else None
+            if identifier is not None and identifier.system == cpf_system:
+                seen_cpfs.setdefault(identifier.value or "")
+
+            # Identificador do laboratório
+            for performer in resource.performer:
+                if performer.id == performer_id:
+                    lab_identifier = performer.identifier
+                    if lab_identifier is not None and lab_identifier.system == cnes_system:
+                        seen_cnes.setdefault(lab_identifier.value or "")
+
+            # Amostras contidas
+            specimens = []
+            for item in resource.contained:
+                if item.resource_type != "Specimen":
+                    continue
+                type_codings = item.type.coding if item.type is not None else []
+                specimens.append(ContainedSpecimen(
+                    type_code=type_codings[0].code if type_codings else None,
+                    collected_at=item.collection.collected_date_time if item.collection is not None else None,
+                ))
+
+            specimen = resource.specimen
+            observation = IndexedObservation(
+                position=position,
+                resource=resource,
+                first_code=first_code,
+                loinc_codes=loinc_codes,
+                has_member=[member.reference for member in resource.has_member],
+                specimen_reference=specimen.reference if specimen is not None else None,
+                specimens=specimens,
+            )
+            index.observations.append(observation)
+
+            for loinc_code in loinc_codes:
+                loinc_index.setdefault(loinc_code, observation)
+                loinc_counts[loinc_code] = loinc_counts.get(loinc_code, 0) + 1
+
+            if index.composite is None and first_code == composite_code:
+                index.composite = observation
+
+        index.cpfs = list(seen_cpfs)
+        index.cnes = list(seen_cnes)
+        return index
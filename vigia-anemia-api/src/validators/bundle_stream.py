@@ -0,0 +1,283 @@
+"""
+Validação incremental do cabeçalho do Bundle FHIR durante a leitura do body.
+Analisa as chaves de primeiro nível à medida que os bytes chegam e rejeita
+o payload assim que `resourceType`, `meta.profile` ou `type` provam que ele é
+inválido, sem esperar pelo body completo nem decodificar `entry[]`.
+
+O scanner é uma máquina de estados que guarda, entre chunks, a posição dentro
+da chave ou do valor em aberto (profundidade, string, escape): cada caractere
+é visitado uma única vez. A análise termina após HEADER_SCAN_LIMIT caracteres,
+de modo que o custo por requisição é limitado mesmo para payloads malformados.
+"""
+import codecs
+import json
+import re
+from typing import Callable, List
+
+from src.domain.models import ValidationError
+
+_WHITESPACE = " \t\n\r"
+_HEADER_KEYS = frozenset({"resourceType", "meta", "type"})
+
+# Caracteres de primeiro nível analisados antes de o scanner ficar passivo
+HEADER_SCAN_LIMIT = 64 * 1024
+
+# Próximo caractere relevante dentro de uma string JSON
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+# Estados da máquina
+_START = 0          # antes do "{" inicial
+_EXPECT_KEY = 1     # após "{" ou ","
+_IN_KEY = 2         # dentro da string da chave
+_EXPECT_COLON = 3   # após a chave
+_EXPECT_VALUE = 4   # após ":"
+_IN_VALUE = 5       # dentro do valor
+_AFTER_VALUE = 6    # após o valor: "," ou "}"
+
+
+def _malformed() -> ValueError:
+    return ValueError("JSON malformado no cabeçalho do Bundle")
+
+
+class BundleHeaderScanner:
+    """
+    Scanner incremental das chaves de primeiro nível de um Bundle.
+
+    Alimentado chunk a chunk via `feed()`. Deixa de analisar (modo passivo)
+    assim que os três campos de cabeçalho foram verificados, quando encontra
+    uma chave com valor composto que não pertence ao cabeçalho (ex.: `entry`)
+    ou ao atingir `max_chars`, de modo que o custo fica restrito aos primeiros
+    bytes do payload.
+    """
+
+    def __init__(
+        self,
+        is_known_profile: Callable[[str], bool],
+        expected_profile: str,
+        expected_resource_type: str = "Bundle",
+        expected_type: str = "collection",
+        max_chars: int = HEADER_SCAN_LIMIT,
+    ):
+        """
+        Args:
+            is_known_profile: Retorna True se a referência de perfil é aceita
+            expected_profile: Perfil informado na mensagem de erro
+            expected_resource_type: resourceType esperado
+            expected_type: Bundle.type esperado
+            max_chars: Caracteres analisados antes de o scanner ficar passivo
+        """
+        self.is_known_profile = is_known_profile
+        self.expected_profile = expected_profile
+        self.expected_resource_type = expected_resource_type
+        self.expected_type = expected_type
+        self.max_chars = max_chars
+
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._consumed = 0
+        self._state = _START
+        self._seen: set = set()
+        self.active = True
+
+        # Chave ou valor em aberto: trechos já recebidos (se coletado) e estado léxico
+        self._pieces: List[str] = []
+        self._collect = False
+        self._key = ""
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: bytes) -> List[ValidationError]:
+        """
+        Processa um novo chunk do body.
+
+        Args:
+            chunk: Bytes recebidos
+
+        Returns:
+            Lista de erros de cabeçalho (vazia enquanto nada provar invalidez)
+
+        Raises:
+            ValueError: Se o início do payload não for um objeto JSON
+        """
+        if not self.active:
+            return []
+        text = self._decoder.decode(chunk)
+        if self._consumed + len(text) > self.max_chars:
+            text = text[:self.max_chars - self._consumed]
+            errors = self._scan(text)
+            # Orçamento esgotado: a decodificação completa decide
+            self.active = False
+            return errors
+        self._consumed += len(text)
+        return self._scan(text)
+
+    def _scan(self, text: str) -> List[ValidationError]:
+        length = len(text)
+        i = 0
+        # Início, no chunk atual, do token em aberto que está sendo coletado
+        token_start = 0
+
+        while i < length and self.active:
+            state = self._state
+
+            if state == _IN_KEY or (state == _IN_VALUE and self._in_string):
+                # Salta direto para a próxima aspa ou barra invertida
+                if self._escaped:
+                    self._escaped = False
+                    i += 1
+                    continue
+                match = _STRING_SPECIAL.search(text, i)
+                if match is None:
+                    i = length
+                    break
+                i = match.start()
+                if text[i] == "\\":
+                    self._escaped = True
+                    i += 1
+                    continue
+                # Aspa de fechamento
+                i += 1
+                if state == _IN_KEY:
+                    self._key = json.loads(self._take(text, token_start, i))
+                    self._state = _EXPECT_COLON
+                    continue
+                self._in_string = False
+                if self._depth == 0:
+                    errors = self._finish_value(self._take(text, token_start, i))
+                    if errors:
+                        return errors
+                continue
+
+            char = text[i]
+
+            if state == _IN_VALUE:
+                if char == '"':
+                    self._in_string = True
+                elif char in "{[":
+                    self._depth += 1
+                elif char in "}]":
+                    if self._depth == 0:
+                        # Escalar seguido do fechamento do objeto pai
+                        errors = self._finish_value(self._take(text, token_start, i))
+                        if errors:
+                            return errors
+                        continue
+                    self._depth -= 1
+                    if self._depth == 0:
+                        errors = self._finish_value(self._take(text, token_start, i + 1))
+                        if errors:
+                            return errors
+                elif self._depth == 0 and (char == "," or char in _WHITESPACE):
+                    errors = self._finish_value(self._take(text, token_start, i))
+                    if errors:
+                        return errors
+                    continue
+                i += 1
+                continue
+
+            if char in _WHITESPACE:
+                i += 1
+                continue
+
+            if state == _START:
+                if char != "{":
+                    raise ValueError("Payload deve ser um objeto JSON")
+                self._state = _EXPECT_KEY
+            elif state == _EXPECT_KEY:
+                if char == "}":
+                    self.active = False
+                    return []
+                if char != '"':
+                    raise _malformed()
+                self._begin(collect=True)
+                token_start = i
+                self._state = _IN_KEY
+            elif state == _EXPECT_COLON:
+                if char != ":":
+                    raise _malformed()
+                self._state = _EXPECT_VALUE
+            elif state == _EXPECT_VALUE:
+                is_header = self._key in _HEADER_KEYS
+                if not is_header and char in "{[":
+                    # Valor composto fora do cabeçalho (ex.: entry): encerra a análise
+                    self.active = False
+                    return []
+                self._begin(collect=is_header)
+                token_start = i
+                self._state = _IN_VALUE
+                continue
+            elif state == _AFTER_VALUE:
+                # Separador entre pares chave/valor
+                if char == ",":
+                    self._state = _EXPECT_KEY
+                elif char == "}":
+                    self.active = False
+                    return []
+                else:
+                    raise _malformed()
+            i += 1
+
+        # Token ainda aberto no fim do chunk: guarda o trecho recebido
+        if self._collect and self._state in (_IN_KEY, _IN_VALUE):
+            self._pieces.append(text[token_start:])
+        return []
+
+    def _begin(self, collect: bool) -> None:
+        self._pieces = []
+        self._collect = collect
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def _take(self, text: str, start: int, end: int) -> str:
+        if not self._collect:
+            return ""
+        token = "".join(self._pieces) + text[start:end]
+        self._pieces = []
+        return token
+
+    def _finish_value(self, raw: str) -> List[ValidationError]:
+        self._state = _AFTER_VALUE
+        key = self._key
+        if key not in _HEADER_KEYS:
+            return []
+        errors = self._check(key, json.loads(raw))
+        if errors:
+            self.active = False
+            return errors
+        self._seen.add(key)
+        if self._seen == _HEADER_KEYS:
+            self.active = False
+        return []
+
+    def _check(self, key: str, value) -> List[ValidationError]:
+        if key == "resourceType" and value != self.expected_resource_type:
+            return [ValidationError(
+                field="resourceType",
+                expected=self.expected_resource_type,
+                received=str(value if value is not None else "null"),
+                description=f"Tipo de recurso deve ser {self.expected_resource_type}"
+            )]
+
+        if key == "type" and value != self.expected_type:
+            return [ValidationError(
+                field="type",
+                expected=self.expected_type,
+                received=str(value if value is not None else "null"),
+                description=f"Tipo do Bundle deve ser '{self.expected_type}'"
+            )]
+
+        if key == "meta":
+            profiles = value.get("profile") if isinstance(value, dict) else None
+            if not profiles or not any(
+                isinstance(reference, str) and self.is_known_profile(reference)
+                for reference in profiles
+            ):
+                return [ValidationError(
+                    field="meta.profile",
+                    expected=self.expected_profile,
+                    received=str(profiles or []),
+                    description="Bundle deve conter o perfil da SES-GO"
+                )]
+
+        return []
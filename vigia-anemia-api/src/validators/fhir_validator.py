@@ -1,372 +1,126 @@
 """
 Validador de estruturas FHIR R4 para hemogramas.
-Valida conformidade com o perfil da SES-GO.
+Valida conformidade com o perfil da SES-GO usando regras compiladas por perfil.
+
+O validador não guarda estado entre chamadas (os erros voltam em um
+ValidationResult por chamada): uma única instância pré-aquecida é
+compartilhada pelo processo inteiro, inclusive entre threads de executores.
 """
-from typing import Any, Dict, List, Optional, Tuple
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Union
 
-from src.core.config import settings
+from src.core import metrics
 from src.core.logging import get_logger
-from src.domain.models import LoincCode, ValidationError
-from src.validators.cpf_validator import CPFValidator
+from src.domain.fhir_structs import Bundle
+from src.domain.models import ValidationError
+from src.validators.bundle_index import BundleIndex
+from src.validators.profile_rules import ProfileRegistry
+from src.validators.profiles import HEMOGRAMA_REQUIRED_LOINC_CODES, profile_registry
 
 logger = get_logger(__name__)
 
 
+class ValidationResult(NamedTuple):
+    """Resultado de uma validação (um objeto por chamada)."""
+    is_valid: bool
+    errors: List[ValidationError]
+    index: BundleIndex
+
+
 class FHIRValidator:
-    """Validador de Bundle FHIR para hemogramas completos."""
+    """Validador de Bundle FHIR para hemogramas completos (sem estado, reentrante)."""
     
     # Códigos LOINC obrigatórios para exames simples (24 itens)
-    REQUIRED_LOINC_CODES = {
-        LoincCode.HEMACEAS.value,
-        LoincCode.HEMOGLOBINA.value,
-        LoincCode.HEMATOCRITO.value,
-        LoincCode.VCM.value,
-        LoincCode.HCM.value,
-        LoincCode.CHCM.value,
-        LoincCode.RDW.value,
-        LoincCode.LEUCOCITOS.value,
-        LoincCode.PROMIELOCITOS.value,
-        LoincCode.MIELOCITOS.value,
-        LoincCode.METAMIELOCITOS.value,
-        LoincCode.BASTONETES.value,
-        LoincCode.SEGMENTADOS.value,
-        LoincCode.MONOCITOS.value,
-        LoincCode.EOSINOFILOS.value,
-        LoincCode.BASOFILOS.value,
-        LoincCode.LINFOCITOS.value,
-        LoincCode.LINFOCITOS_ATIPICOS.value,
-        LoincCode.PRO_LINFOCITOS.value,
-        LoincCode.BLASTOS.value,
-        LoincCode.PLAQUETAS.value,
-        LoincCode.PLAQUETOCRITO.value,
-        LoincCode.VPM.value,
-        LoincCode.PDW.value,
-    }
-    
-    def __init__(self):
-        """Inicializa o validador FHIR."""
-        self.errors: List[ValidationError] = []
-        self.cpf_validator = CPFValidator()
+    REQUIRED_LOINC_CODES = HEMOGRAMA_REQUIRED_LOINC_CODES
     
-    def validate_bundle_structure(self, bundle: Dict[str, Any]) -> bool:
+    def __init__(self, registry: ProfileRegistry = profile_registry):
         """
-        Valida a estrutura básica do Bundle FHIR.
+        Inicializa o validador FHIR.
         
         Args:
-            bundle: Dicionário representando o Bundle FHIR
-        
-        Returns:
-            True se válido, False caso contrário
+            registry: Registro de perfis compilados
         """
-        # Valida resourceType
-        if bundle.get("resourceType") != "Bundle":
-            self.errors.append(ValidationError(
-                field="resourceType",
-                expected="Bundle",
-                received=str(bundle.get("resourceType", "null")),
-                description="Tipo de recurso deve ser Bundle"
-            ))
-            return False
-        
-        # Valida meta.profile
-        meta = bundle.get("meta", {})
-        profiles = meta.get("profile", [])
-        if not profiles or settings.fhir_profile_url not in profiles:
-            self.errors.append(ValidationError(
-                field="meta.profile",
-                expected=settings.fhir_profile_url,
-                received=str(profiles),
-                description="Bundle deve conter o perfil da SES-GO"
-            ))
-            return False
-        
-        # Valida type
-        if bundle.get("type") != "collection":
-            self.errors.append(ValidationError(
-                field="type",
-                expected="collection",
-                received=str(bundle.get("type", "null")),
-                description="Tipo do Bundle deve ser 'collection'"
-            ))
-            return False
-        
-        # Valida presença de entries
-        entries = bundle.get("entry", [])
-        if not entries:
-            self.errors.append(ValidationError(
-                field="entry",
-                expected="array com 25 elementos",
-                received="array vazio",
-                description="Bundle deve conter entries"
-            ))
-            return False
-        
-        return True
+        self.registry = registry
     
-    def validate_composite_exam(self, resource: Dict[str, Any]) -> bool:
+    def build_index(self, bundle: Union[Dict[str, Any], Bundle]) -> BundleIndex:
         """
-        Valida o exame composto (CBC panel).
+        Constrói o índice do Bundle conforme o perfil declarado em `meta.profile`.
         
         Args:
-            resource: Recurso Observation do exame composto
+            bundle: Bundle FHIR como dicionário ou Struct tipado
         
         Returns:
-            True se válido, False caso contrário
+            Índice de passagem única do Bundle
         """
-        # Valida código LOINC do exame composto
-        code = resource.get("code", {})
-        codings = code.get("coding", [])
-        
-        if not codings:
-            self.errors.append(ValidationError(
-                field="code.coding",
-                expected="array com código LOINC",
-                received="array vazio",
-                description="Exame composto deve ter código LOINC"
-            ))
-            return False
+        start = time.perf_counter()
+        if isinstance(bundle, dict):
+            profiles = (bundle.get("meta") or {}).get("profile") or []
+            compiled = self.registry.resolve(profiles)
+            index = BundleIndex.from_dict(bundle, compiled.index_options)
+        else:
+            profiles = bundle.meta.profile if bundle.meta is not None else []
+            compiled = self.registry.resolve(profiles)
+            index = BundleIndex.from_struct(bundle, compiled.index_options)
         
-        loinc_code = codings[0].get("code")
-        if loinc_code != LoincCode.CBC_PANEL.value:
-            self.errors.append(ValidationError(
-                field="code.coding[0].code",
-                expected=LoincCode.CBC_PANEL.value,
-                received=str(loinc_code),
-                description="Código LOINC do exame composto deve ser 58410-2 (CBC panel)"
-            ))
-            return False
-        
-        # Valida hasMember (deve ter 24 referências)
-        has_member = resource.get("hasMember", [])
-        if len(has_member) != settings.fhir_required_exams_count:
-            self.errors.append(ValidationError(
-                field="hasMember",
-                expected=f"array com {settings.fhir_required_exams_count} elementos",
-                received=f"array com {len(has_member)} elementos",
-                description=f"Exame composto deve referenciar {settings.fhir_required_exams_count} exames simples"
-            ))
-            return False
-        
-        return True
-
-    def validate_simple_exams(self, bundle: Dict[str, Any]) -> bool:
-        """
-        Valida os 24 exames simples obrigatórios.
-
-        Args:
-            bundle: Bundle FHIR completo
-
-        Returns:
-            True se válido, False caso contrário
-        """
-        entries = bundle.get("entry", [])
-        found_loinc_codes = set()
-
-        for entry in entries:
-            resource = entry.get("resource", {})
-            if resource.get("resourceType") != "Observation":
-                continue
-
-            # Extrai código LOINC
-            code = resource.get("code", {})
-            codings = code.get("coding", [])
-
-            for coding in codings:
-                if coding.get("system") == "http://loinc.org":
-                    loinc_code = coding.get("code")
-                    if loinc_code in self.REQUIRED_LOINC_CODES:
-                        found_loinc_codes.add(loinc_code)
-
-        # Verifica se todos os códigos obrigatórios foram encontrados
-        missing_codes = self.REQUIRED_LOINC_CODES - found_loinc_codes
-        if missing_codes:
-            self.errors.append(ValidationError(
-                field="entry[].resource.code.coding[].code",
-                expected=f"24 códigos LOINC obrigatórios",
-                received=f"{len(found_loinc_codes)} códigos encontrados",
-                description=f"Códigos LOINC faltando: {', '.join(sorted(missing_codes))}"
-            ))
-            return False
-
-        return True
-
-    def validate_identifiers(self, bundle: Dict[str, Any]) -> bool:
-        """
-        Valida identificadores (CPF, CNES).
-
-        Args:
-            bundle: Bundle FHIR completo
-
-        Returns:
-            True se válido, False caso contrário
-        """
-        entries = bundle.get("entry", [])
-
-        for entry in entries:
-            resource = entry.get("resource", {})
-            if resource.get("resourceType") != "Observation":
-                continue
-
-            # Valida CPF do paciente
-            subject = resource.get("subject", {})
-            identifier = subject.get("identifier", {})
-
-            if identifier.get("system") == "https://fhir.saude.go.gov.br/sid/cpf":
-                cpf = identifier.get("value", "")
-                is_valid, error_msg = self.cpf_validator.validate(cpf)
-
-                if not is_valid:
-                    self.errors.append(ValidationError(
-                        field="subject.identifier.value",
-                        expected="CPF válido (11 dígitos com verificadores corretos)",
-                        received=cpf,
-                        description=f"CPF inválido: {error_msg}"
-                    ))
-                    return False
-
-            # Valida CNES do laboratório
-            performers = resource.get("performer", [])
-            for performer in performers:
-                if performer.get("id") == "laboratorio":
-                    lab_identifier = performer.get("identifier", {})
-                    if lab_identifier.get("system") == "https://fhir.saude.go.gov.br/sid/cnes":
-                        cnes = lab_identifier.get("value", "")
-                        if not cnes.isdigit() or len(cnes) != 7:
-                            self.errors.append(ValidationError(
-                                field="performer[laboratorio].identifier.value",
-                                expected="CNES válido (7 dígitos)",
-                                received=cnes,
-                                description="CNES deve conter exatamente 7 dígitos numéricos"
-                            ))
-                            return False
-
-        return True
-
-    def validate_specimen(self, resource: Dict[str, Any]) -> bool:
-        """
-        Valida a amostra (Specimen) contida no exame.
-
-        Args:
-            resource: Recurso Observation
-
-        Returns:
-            True se válido, False caso contrário
-        """
-        # Valida referência para amostra
-        specimen_ref = resource.get("specimen", {})
-        reference = specimen_ref.get("reference")
-
-        if not reference or not reference.startswith("#"):
-            self.errors.append(ValidationError(
-                field="specimen.reference",
-                expected="#amostra (referência interna)",
-                received=str(reference),
-                description="Exame deve referenciar amostra contida"
-            ))
-            return False
-
-        # Valida amostra em contained
-        contained = resource.get("contained", [])
-        specimen_found = False
-
-        for item in contained:
-            if item.get("resourceType") == "Specimen":
-                specimen_found = True
-
-                # Valida tipo da amostra (deve ser sangue - BLD)
-                specimen_type = item.get("type", {})
-                codings = specimen_type.get("coding", [])
-
-                if codings:
-                    code = codings[0].get("code")
-                    if code != "BLD":
-                        self.errors.append(ValidationError(
-                            field="contained[Specimen].type.coding[0].code",
-                            expected="BLD (sangue)",
-                            received=str(code),
-                            description="Tipo de amostra deve ser sangue (BLD)"
-                        ))
-                        return False
-
-                # Valida data de coleta
-                collection = item.get("collection", {})
-                if not collection.get("collectedDateTime"):
-                    self.errors.append(ValidationError(
-                        field="contained[Specimen].collection.collectedDateTime",
-                        expected="Data/hora de coleta (ISO 8601)",
-                        received="null",
-                        description="Amostra deve ter data de coleta"
-                    ))
-                    return False
-
-        if not specimen_found:
-            self.errors.append(ValidationError(
-                field="contained",
-                expected="Specimen resource",
-                received="não encontrado",
-                description="Exame deve conter amostra (Specimen) em contained[]"
-            ))
-            return False
-
-        return True
-
-    def validate(self, bundle: Dict[str, Any]) -> Tuple[bool, List[ValidationError]]:
+        metrics.observe_stage("index", time.perf_counter() - start)
+        return index
+
+    def validate(
+        self,
+        bundle: Union[Dict[str, Any], Bundle],
+        index: Optional[BundleIndex] = None
+    ) -> ValidationResult:
         """
         Valida um Bundle FHIR completo.
 
+        Executa, em ordem, as verificações compiladas do perfil declarado
+        no Bundle (ou do perfil padrão, se nenhum perfil conhecido for declarado).
+        Os erros são acumulados em uma lista local: chamadas concorrentes na
+        mesma instância não interferem entre si.
+
         Args:
-            bundle: Dicionário representando o Bundle FHIR
+            bundle: Bundle FHIR como dicionário ou Struct tipado
+            index: Índice já construído para o Bundle (evita nova passagem)
 
         Returns:
-            Tupla (is_valid, errors)
+            ValidationResult com is_valid, errors e o índice usado
         """
-        self.errors = []
+        if index is None:
+            index = self.build_index(bundle)
 
-        # Validação 1: Estrutura do Bundle
-        if not self.validate_bundle_structure(bundle):
-            return False, self.errors
+        errors: List[ValidationError] = []
+        compiled = self.registry.resolve(index.profiles)
+        for check in compiled.checks:
+            if not check(index, errors):
+                metrics.count_validation_errors(errors)
+                return ValidationResult(False, errors, index)
 
-        # Validação 2: Exames simples (24 códigos LOINC)
-        if not self.validate_simple_exams(bundle):
-            return False, self.errors
+        logger.debug("Bundle FHIR validado com sucesso",
+                     profile=compiled.canonical,
+                     total_entries=index.entry_count,
+                     loinc_codes_found=len(index.loinc_index))
 
-        # Validação 3: Identificadores (CPF, CNES)
-        if not self.validate_identifiers(bundle):
-            return False, self.errors
+        return ValidationResult(True, errors, index)
 
-        # Validação 4: Exame composto e amostra
-        entries = bundle.get("entry", [])
-        composite_found = False
 
-        for entry in entries:
-            resource = entry.get("resource", {})
-            if resource.get("resourceType") != "Observation":
-                continue
+# Instância compartilhada do processo (em pools de processos: uma por processo)
+_fhir_validator: Optional[FHIRValidator] = None
 
-            # Verifica se é exame composto
-            code = resource.get("code", {})
-            codings = code.get("coding", [])
 
-            if codings and codings[0].get("code") == LoincCode.CBC_PANEL.value:
-                composite_found = True
-                if not self.validate_composite_exam(resource):
-                    return False, self.errors
+def get_fhir_validator() -> FHIRValidator:
+    """
+    Retorna o validador compartilhado, com os perfis já compilados.
 
-            # Valida amostra em todos os exames
-            if not self.validate_specimen(resource):
-                return False, self.errors
+    Também serve de `initializer` de pools de processos, para que cada
+    processo compile os perfis antes do primeiro lote.
 
-        if not composite_found:
-            self.errors.append(ValidationError(
-                field="entry[].resource",
-                expected="Exame composto (LOINC 58410-2)",
-                received="não encontrado",
-                description="Bundle deve conter exame composto (CBC panel)"
-            ))
-            return False, self.errors
+    Returns:
+        Instância singleton do FHIRValidator
+    """
+    global _fhir_validator
 
-        logger.info("Bundle FHIR validado com sucesso",
-                   total_entries=len(entries),
-                   loinc_codes_found=len(self.REQUIRED_LOINC_CODES))
+    if _fhir_validator is None:
+        profile_registry.warm_up()
+        _fhir_validator = FHIRValidator()
 
-        return True, []
+    return _fhir_validator
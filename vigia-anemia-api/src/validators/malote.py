@@ -0,0 +1,243 @@
+"""
+Malotes: Bundles com vários hemogramas (um exame composto por hemograma).
+O malote é particionado em Bundles de um hemograma cada (exame composto +
+exames simples referenciados em `hasMember`), já serializados para a fila,
+que são validados pelo FHIRValidator em lotes, opcionalmente em um pool de
+processos.
+"""
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from src.core.config import settings
+from src.core.logging import get_logger
+from src.domain.fhir_structs import decode_bundle, decode_malote, decode_malote_entry, dumps, loads
+from src.domain.models import LoincCode, ValidationError
+from src.validators.fhir_validator import get_fhir_validator
+
+logger = get_logger(__name__)
+
+
+class MalotePartition(NamedTuple):
+    """Bundle de um único hemograma extraído do malote, já em JSON."""
+    index: int
+    composite_full_url: Optional[str]
+    body: bytes
+
+
+class _EntrySummary(NamedTuple):
+    full_url: Optional[str]
+    is_composite: bool
+    members: List[Optional[str]]
+
+
+class PartitionOutcome(NamedTuple):
+    """Resultado da validação de uma partição."""
+    is_valid: bool
+    errors: List[ValidationError]
+    laboratory_cnes: str
+    patient_cpf: str
+
+
+def _group_entries(
+    summaries: List[_EntrySummary]
+) -> Tuple[List[Tuple[int, List[int]]], List[int]]:
+    # Uma passagem para o mapa fullUrl -> posição e outra pelos compostos:
+    # cada referência de hasMember é resolvida com uma busca O(1)
+    by_full_url: Dict[str, int] = {}
+    composites: List[int] = []
+    for position, summary in enumerate(summaries):
+        if summary.full_url and summary.full_url not in by_full_url:
+            by_full_url[summary.full_url] = position
+        if summary.is_composite:
+            composites.append(position)
+
+    claimed = set(composites)
+    groups = []
+    for position in composites:
+        members = [position]
+        for reference in summaries[position].members:
+            member_position = by_full_url.get(reference)
+            if member_position is None or member_position in claimed:
+                continue
+            claimed.add(member_position)
+            members.append(member_position)
+        groups.append((position, members))
+
+    orphans = [position for position in range(len(summaries)) if position not in claimed]
+    return groups, orphans
+
+
+def _raw_partitions(malote: Any, composite_code: str) -> Tuple[List[MalotePartition], List[int]]:
+    summaries = []
+    for raw in malote.entry:
+        entry = decode_malote_entry(raw)
+        resource = entry.resource if entry is not None else None
+        if resource is None:
+            summaries.append(_EntrySummary(entry.full_url if entry is not None else None, False, []))
+            continue
+        codings = resource.code.coding if resource.code is not None else []
+        summaries.append(_EntrySummary(
+            full_url=entry.full_url,
+            is_composite=(
+                resource.resource_type == "Observation"
+                and bool(codings) and codings[0].code == composite_code
+            ),
+            members=[member.reference for member in resource.has_member],
+        ))
+
+    # Cabeçalho serializado uma vez; cada partição é a concatenação do
+    # cabeçalho com as entries brutas do seu hemograma
+    header = {
+        key: value
+        for key, value in (
+            ("resourceType", malote.resource_type),
+            ("id", malote.id),
+            ("meta", malote.meta),
+            ("identifier", malote.identifier),
+            ("type", malote.type),
+            ("timestamp", malote.timestamp),
+        )
+        if value  # None ou Raw vazio: campo ausente
+    }
+    prefix = dumps(header)[:-1] + (b',"entry":[' if header else b'"entry":[')
+
+    groups, orphans = _group_entries(summaries)
+    partitions = [
+        MalotePartition(
+            index=index,
+            composite_full_url=summaries[position].full_url,
+            body=prefix + b",".join(malote.entry[member] for member in members) + b"]}",
+        )
+        for index, (position, members) in enumerate(groups)
+    ]
+    return partitions, orphans
+
+
+def _dict_partitions(bundle: Dict[str, Any], composite_code: str) -> Tuple[List[MalotePartition], List[int]]:
+    entries = bundle.get("entry") or []
+    summaries = []
+    for entry in entries:
+        resource = entry.get("resource") or {}
+        codings = (resource.get("code") or {}).get("coding") or []
+        summaries.append(_EntrySummary(
+            full_url=entry.get("fullUrl"),
+            is_composite=(
+                resource.get("resourceType") == "Observation"
+                and bool(codings) and codings[0].get("code") == composite_code
+            ),
+            members=[member.get("reference") for member in resource.get("hasMember") or []],
+        ))
+
+    header = {key: value for key, value in bundle.items() if key != "entry"}
+    groups, orphans = _group_entries(summaries)
+    partitions = [
+        MalotePartition(
+            index=index,
+            composite_full_url=summaries[position].full_url,
+            body=dumps({**header, "entry": [entries[member] for member in members]}),
+        )
+        for index, (position, members) in enumerate(groups)
+    ]
+    return partitions, orphans
+
+
+def split_malote(
+    body: bytes,
+    composite_code: str = LoincCode.CBC_PANEL.value
+) -> Tuple[List[MalotePartition], List[ValidationError]]:
+    """
+    Divide o malote em um Bundle por exame composto.
+
+    Cada partição herda o cabeçalho do malote (resourceType, meta, type, ...)
+    e recebe o exame composto seguido dos exames simples referenciados por
+    fullUrl em `hasMember`. Com msgspec, as entries são copiadas como JSON
+    bruto (sem decodificar nem re-serializar os recursos); sem msgspec, o
+    malote é decodificado em dicionários. Uma entry referenciada por mais de
+    um composto fica apenas na primeira partição; nas demais a referência
+    aparece como não resolvida na validação.
+
+    Args:
+        body: Bytes JSON do malote
+        composite_code: Código LOINC do exame composto
+
+    Returns:
+        Tupla (partições na ordem do malote, erros do malote: entries órfãs)
+
+    Raises:
+        ValueError: Se o JSON for malformado ou não for um objeto
+    """
+    malote = decode_malote(body)
+    if malote is not None:
+        partitions, orphans = _raw_partitions(malote, composite_code)
+    else:
+        bundle = loads(body)
+        if not isinstance(bundle, dict):
+            raise ValueError("Payload deve ser um objeto JSON")
+        partitions, orphans = _dict_partitions(bundle, composite_code)
+
+    errors: List[ValidationError] = []
+    if orphans:
+        errors.append(ValidationError(
+            field="entry[]",
+            expected="entries referenciadas por um exame composto",
+            received=f"{len(orphans)} entries órfãs",
+            description=f"Entries fora de qualquer hemograma do malote (posições): "
+                        f"{', '.join(str(position) for position in orphans[:20])}"
+        ))
+    return partitions, errors
+
+
+def validate_partitions(bodies: Sequence[bytes]) -> List[PartitionOutcome]:
+    """
+    Valida partições serializadas (executado no pool de validação).
+
+    Recebe bytes para que o envio ao pool de processos custe apenas a cópia
+    do buffer, sem serializar dicionários aninhados.
+
+    Args:
+        bodies: Bundles de um hemograma em JSON
+
+    Returns:
+        Resultado por partição, na mesma ordem
+    """
+    validator = get_fhir_validator()
+    outcomes = []
+    for body in bodies:
+        result = validator.validate(decode_bundle(body, typed=settings.fhir_fast_decoding))
+        outcomes.append(PartitionOutcome(
+            result.is_valid, result.errors, result.index.laboratory_cnes, result.index.patient_cpf
+        ))
+    return outcomes
+
+
+# Pool de processos da validação de malotes (criado sob demanda)
+_validation_executor: Optional[Executor] = None
+
+
+def get_validation_executor() -> Optional[Executor]:
+    """
+    Retorna o pool de processos da validação de malotes.
+
+    Returns:
+        Pool compartilhado, ou None com MALOTE_VALIDATION_PROCESSES=0
+        (validação no executor padrão do event loop)
+    """
+    global _validation_executor
+
+    if _validation_executor is None and settings.malote_validation_processes > 0:
+        _validation_executor = ProcessPoolExecutor(
+            max_workers=settings.malote_validation_processes,
+            initializer=get_fhir_validator,
+        )
+        logger.info("Pool de validação de malotes iniciado", processes=settings.malote_validation_processes)
+
+    return _validation_executor
+
+
+def close_validation_executor() -> None:
+    """Encerra o pool de validação de malotes, se existir."""
+    global _validation_executor
+
+    if _validation_executor is not None:
+        _validation_executor.shutdown(wait=True, cancel_futures=True)
+        _validation_executor = None
@@ -0,0 +1,79 @@
+"""
+Faixas de plausibilidade biológica dos resultados do hemograma.
+As faixas são declaradas na unidade canônica de cada exame (src.domain.units)
+e pré-calculadas para cada unidade aceita, de modo que a verificação durante a
+construção do BundleIndex seja apenas uma busca em dicionário e duas comparações,
+sem conversão de unidade.
+"""
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from src.domain.models import LoincCode
+from src.domain.units import UNIT_FACTORS
+
+# Limites (mínimo, máximo) fisiologicamente possíveis, na unidade canônica.
+# São bem mais largos que os valores de referência: valores fora deles indicam
+# erro de digitação, de unidade ou de integração, não um achado clínico.
+_PERCENT = (0.0, 100.0)
+PLAUSIBLE_RANGES: Dict[str, Tuple[float, float]] = {
+    LoincCode.HEMACEAS.value: (0.5, 10.0),           # 10*6/uL
+    LoincCode.HEMOGLOBINA.value: (1.0, 25.0),        # g/dL
+    LoincCode.HEMATOCRITO.value: (3.0, 75.0),        # %
+    LoincCode.VCM.value: (40.0, 160.0),              # fL
+    LoincCode.HCM.value: (10.0, 60.0),               # pg
+    LoincCode.CHCM.value: (20.0, 45.0),              # g/dL
+    LoincCode.RDW.value: (8.0, 40.0),                # %
+    LoincCode.LEUCOCITOS.value: (100.0, 500000.0),   # /mm3
+    LoincCode.PROMIELOCITOS.value: _PERCENT,
+    LoincCode.MIELOCITOS.value: _PERCENT,
+    LoincCode.METAMIELOCITOS.value: _PERCENT,
+    LoincCode.BASTONETES.value: _PERCENT,
+    LoincCode.SEGMENTADOS.value: _PERCENT,
+    LoincCode.MONOCITOS.value: _PERCENT,
+    LoincCode.EOSINOFILOS.value: _PERCENT,
+    LoincCode.BASOFILOS.value: _PERCENT,
+    LoincCode.LINFOCITOS.value: _PERCENT,
+    LoincCode.LINFOCITOS_ATIPICOS.value: _PERCENT,
+    LoincCode.PRO_LINFOCITOS.value: _PERCENT,
+    LoincCode.BLASTOS.value: _PERCENT,
+    LoincCode.PLAQUETAS.value: (1000.0, 2000000.0),  # /mm3
+    LoincCode.PLAQUETOCRITO.value: (0.01, 2.0),      # %
+    LoincCode.VPM.value: (4.0, 20.0),                # fL
+    LoincCode.PDW.value: (5.0, 40.0),                # fL
+}
+
+# Tipos aceitos como resultado numérico (comparados por classe exata: bool não entra)
+NUMERIC_TYPES = frozenset({int, float})
+
+# Tabela pré-calculada: código LOINC -> unidade (minúscula) -> (mínimo, máximo) na própria unidade
+RangeTable = Dict[str, Dict[str, Tuple[float, float]]]
+
+
+class ImplausibleValue(NamedTuple):
+    """Resultado rejeitado pela plausibilidade (`bounds` None: valor não numérico ou unidade desconhecida)."""
+    position: int
+    code: str
+    value: object
+    unit: Optional[str]
+    bounds: Optional[Tuple[float, float]]
+
+
+def build_range_table(ranges: Dict[str, Tuple[float, float]] = PLAUSIBLE_RANGES) -> RangeTable:
+    """
+    Converte as faixas canônicas para cada unidade aceita do exame.
+
+    Args:
+        ranges: Código LOINC -> (mínimo, máximo) na unidade canônica
+
+    Returns:
+        Tabela código -> unidade (minúscula) -> (mínimo, máximo) na unidade recebida
+
+    Raises:
+        ValueError: Se uma faixa referenciar um código sem unidades conhecidas
+    """
+    table: RangeTable = {}
+    for code, (low, high) in ranges.items():
+        factors = UNIT_FACTORS.get(code)
+        if factors is None:
+            raise ValueError(f"Código LOINC sem unidades conhecidas: {code}")
+        table[code] = {unit: (low / factor, high / factor) for unit, factor in factors.items()}
+    return table
@@ -0,0 +1,490 @@
+"""
+Regras declarativas de validação por perfil FHIR.
+Cada perfil (URL + versão) é descrito como uma lista de regras que é compilada
+uma única vez em uma sequência plana de closures especializadas.
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from src.core import metrics
+from src.core.logging import get_logger
+from src.domain.models import LoincCode, ValidationError
+from src.validators.bundle_index import (
+    CNES_SYSTEM,
+    CPF_SYSTEM,
+    LABORATORY_PERFORMER_ID,
+    LOINC_SYSTEM,
+    BundleIndex,
+    IndexOptions,
+)
+from src.validators.cpf_validator import CPFValidator
+from src.validators.plausibility import build_range_table
+
+logger = get_logger(__name__)
+
+# Assinatura de uma regra compilada: recebe o índice e a lista de erros da chamada
+CompiledCheck = Callable[[BundleIndex, List[ValidationError]], bool]
+
+
+class RuleSpec(BaseModel):
+    """Regra declarativa: nome da verificação e seus parâmetros."""
+    check: str = Field(..., description="Tipo de verificação")
+    params: Dict[str, Any] = Field(default_factory=dict, description="Parâmetros da verificação")
+
+
+class ValidationProfile(BaseModel):
+    """Perfil de validação: bindings de terminologia e regras em ordem de avaliação."""
+    url: str = Field(..., description="URL canônica do StructureDefinition")
+    version: str = Field(..., description="Versão do perfil")
+    loinc_system: str = Field(default=LOINC_SYSTEM)
+    cpf_system: str = Field(default=CPF_SYSTEM)
+    cnes_system: str = Field(default=CNES_SYSTEM)
+    laboratory_performer_id: str = Field(default=LABORATORY_PERFORMER_ID)
+    composite_code: str = Field(default=LoincCode.CBC_PANEL.value)
+    plausible_ranges: Dict[str, Tuple[float, float]] = Field(
+        default_factory=dict,
+        description="Faixas de plausibilidade por código LOINC, na unidade canônica"
+    )
+    rules: List[RuleSpec] = Field(default_factory=list)
+
+    @property
+    def canonical(self) -> str:
+        """Referência canônica versionada (`url|versão`)."""
+        return f"{self.url}|{self.version}"
+
+    @property
+    def index_options(self) -> IndexOptions:
+        """Opções de construção do BundleIndex derivadas do perfil."""
+        return IndexOptions(
+            loinc_system=self.loinc_system,
+            cpf_system=self.cpf_system,
+            cnes_system=self.cnes_system,
+            laboratory_performer_id=self.laboratory_performer_id,
+            composite_code=self.composite_code,
+            plausible_ranges=build_range_table(self.plausible_ranges),
+        )
+
+
+class CompiledProfile:
+    """Perfil compilado: opções de índice e tupla de closures prontas para execução."""
+
+    __slots__ = ("url", "version", "canonical", "index_options", "checks")
+
+    def __init__(self, profile: ValidationProfile, checks: Tuple[CompiledCheck, ...]):
+        """
+        Args:
+            profile: Perfil declarativo de origem
+            checks: Verificações compiladas, na ordem de avaliação
+        """
+        self.url = profile.url
+        self.version = profile.version
+        self.canonical = profile.canonical
+        self.index_options = profile.index_options
+        self.checks = checks
+
+
+# ---------------------------------------------------------------------------
+# Construtores de verificações
+# ---------------------------------------------------------------------------
+
+def _build_resource_type(profile: ValidationProfile, expected: str = "Bundle") -> CompiledCheck:
+    def check(index: BundleIndex, errors: List[ValidationError]) -> bool:
+        if index.resource_type == expected:
+            return True
+        errors.append(ValidationError(
+            field="resourceType",
+            expected=expected,
+            received=str(index.resource_type or "null"),
+            description=f"Tipo de recurso deve ser {expected}"
+        ))
+        return False
+    return check
+
+
+def _build_meta_profile(profile: ValidationProfile) -> CompiledCheck:
+    accepted = frozenset({profile.url, profile.canonical})
+    url = profile.url
+
+    def check(index: BundleIndex, errors: List[ValidationError]) -> bool:
+        if not accepted.isdisjoint(index.profiles):
+            return True
+        errors.append(ValidationError(
+            field="meta.profile",
+            expected=url,
+            received=str(index.profiles),
+            description="Bundle deve conter o perfil da SES-GO"
+        ))
+        return False
+    return check
+
+
+def _build_bundle_type(profile: ValidationProfile, expected: str = "collection") -> CompiledCheck:
+    def check(index: BundleIndex, errors: List[ValidationError]) -> bool:
+        if index.bundle_type == expected:
+            return True
+        errors.append(ValidationError(
+            field="type",
+            expected=expected,
+            received=str(index.bundle_type or "null"),
+            description=f"Tipo do Bundle deve ser '{expected}'"
+        ))
+        return False
+    return check
+
+
+def _build_entries_present(profile: ValidationProfile, expected_count: int = 25) -> CompiledCheck:
+    def check(index: BundleIndex, errors: List[ValidationError]) -> bool:
+        if index.entry_count:
+            return True
+        errors.append(ValidationError(
+            field="entry",
+            expected=f"array com {expected_count} elementos",
+            received="array vazio",
+            description="Bundle deve conter entries"
+        ))
+        return False
+    return check
+
+
+def _build_required_codes(profile: ValidationProfile, codes: List[str]) -> CompiledCheck:
+    required = frozenset(codes)
+    total = len(required)
+
+    def check(index: BundleIndex, errors: List[ValidationError]) -> bool:
+        missing_codes = required.difference(index.loinc_index)
+        if not missing_codes:
+            return True
+        errors.append(ValidationError(
+            field="entry[].resource.code.coding[].code",
+            expected=f"{total} códigos LOINC obrigatórios",
+            received=f"{total - len(missing_codes)} códigos encontrados",
+            description=f"Códigos LOINC faltando: {', '.join(sorted(missing_codes))}"
+        ))
+        return False
+    return check
+
+
+def _build_patient_cpf(profile: ValidationProfile) -> CompiledCheck:
+    validate_cpf = CPFValidator.validate
+
+    def check(index: BundleIndex, errors: List[ValidationError]) -> bool:
+        # Cada valor distinto é validado uma única vez
+        for cpf in index.cpfs:
+            is_valid, error_msg = validate_cpf(cpf)
+            if not is_valid:
+                errors.append(ValidationError(
+                    field="subject.identifier.value",
+                    expected="CPF válido (11 dígitos com verificadores corretos)",
+                    received=cpf,
+                    description=f"CPF inválido: {error_msg}"
+                ))
+                return False
+        return True
+    return check
+
+
+def _build_laboratory_cnes(profile: ValidationProfile, length: int = 7) -> CompiledCheck:
+    field = f"performer[{profile.laboratory_performer_id}].identifier.value"
+
+    def check(index: BundleIndex, errors: List[ValidationError]) -> bool:
+        for cnes in index.cnes:
+            if not cnes.isdigit() or len(cnes) != length:
+                errors.append(ValidationError(
+                    field=field,
+                    expected=f"CNES válido ({length} dígitos)",
+                    received=cnes,
+                    description=f"CNES deve conter exatamente {length} dígitos numéricos"
+                ))
+                return False
+        return True
+    return check
+
+
+def _build_composite_exam(profile: ValidationProfile, member_count: int) -> CompiledCheck:
+    composite_code = profile.composite_code
+
+    def check(index: BundleIndex, errors: List[ValidationError]) -> bool:
+        composite = index.composite
+        if composite is None:
+            errors.append(ValidationError(
+                field="entry[].resource",
+                expected=f"Exame composto (LOINC {composite_code})",
+                received="não encontrado",
+                description="Bundle deve conter exame composto (CBC panel)"
+            ))
+            return False
+
+        has_member = composite.has_member
+        if len(has_member) != member_count:
+            errors.append(ValidationError(
+                field="hasMember",
+                expected=f"array com {member_count} elementos",
+                received=f"array com {len(has_member)} elementos",
+                description=f"Exame composto deve referenciar {member_count} exames simples"
+            ))
+            return False
+        return True
+    return check
+
+
+def _build_reference_integrity(profile: ValidationProfile, member_type: str = "Observation") -> CompiledCheck:
+    composite_code = profile.composite_code
+
+    def check(index: BundleIndex, errors: List[ValidationError]) -> bool:
+        # Tudo sobre os mapas montados pelo índice: buscas O(1), sem varreduras aninhadas
+        full_urls = index.full_urls
+        valid = True
+
+        if index.duplicate_full_urls:
+            errors.append(ValidationError(
+                field="entry[].fullUrl",
+                expected="fullUrl único por entry",
+                received=f"{len(index.duplicate_full_urls)} fullUrl repetidos",
+                description=f"fullUrl duplicados: {', '.join(sorted(set(index.duplicate_full_urls)))}"
+            ))
+            valid = False
+
+        duplicates = sorted(
+            code for code, count in index.loinc_counts.items()
+            if count > 1 and code != composite_code
+        )
+        if duplicates:
+            errors.append(ValidationError(
+                field="entry[].resource.code.coding[].code",
+                expected="cada código LOINC em um único exame",
+                received=f"{len(duplicates)} códigos repetidos",
+                description=f"Códigos LOINC duplicados: {', '.join(duplicates)}"
+            ))
+            valid = False
+
+        if index.composite is not None:
+            seen: Dict[Optional[str], None] = {}
+            unresolved: List[str] = []
+            repeated: List[str] = []
+            for reference in index.composite.has_member:
+                if reference in seen:
+                    repeated.append(str(reference))
+                    continue
+                seen[reference] = None
+                if full_urls.get(reference, "") != member_type:
+                    unresolved.append(str(reference))
+
+            if unresolved:
+                errors.append(ValidationError(
+                    field="hasMember[].reference",
+                    expected=f"fullUrl de um {member_type} do Bundle",
+                    received=f"{len(unresolved)} referências não resolvidas",
+                    description=f"Referências de hasMember não encontradas no Bundle: {', '.join(unresolved)}"
+                ))
+                valid = False
+            if repeated:
+                errors.append(ValidationError(
+                    field="hasMember[].reference",
+                    expected="cada exame simples referenciado uma única vez",
+                    received=f"{len(repeated)} referências repetidas",
+                    description=f"Referências de hasMember duplicadas: {', '.join(repeated)}"
+                ))
+                valid = False
+        return valid
+    return check
+
+
+def _build_contained_specimen(
+    profile: ValidationProfile,
+    type_code: str = "BLD",
+    reference_prefix: str = "#"
+) -> CompiledCheck:
+    def check(index: BundleIndex, errors: List[ValidationError]) -> bool:
+        for observation in index.observations:
+            # Valida referência para amostra
+            reference = observation.specimen_reference
+            if not reference or not reference.startswith(reference_prefix):
+                errors.append(ValidationError(
+                    field="specimen.reference",
+                    expected=f"{reference_prefix}amostra (referência interna)",
+                    received=str(reference),
+                    description="Exame deve referenciar amostra contida"
+                ))
+                return False
+
+            # Valida amostra em contained
+            if not observation.specimens:
+                errors.append(ValidationError(
+                    field="contained",
+                    expected="Specimen resource",
+                    received="não encontrado",
+                    description="Exame deve conter amostra (Specimen) em contained[]"
+                ))
+                return False
+
+            for specimen in observation.specimens:
+                if specimen.type_code is not None and specimen.type_code != type_code:
+                    errors.append(ValidationError(
+                        field="contained[Specimen].type.coding[0].code",
+                        expected=f"{type_code} (sangue)",
+                        received=str(specimen.type_code),
+                        description=f"Tipo de amostra deve ser sangue ({type_code})"
+                    ))
+                    return False
+
+                if not specimen.collected_at:
+                    errors.append(ValidationError(
+                        field="contained[Specimen].collection.collectedDateTime",
+                        expected="Data/hora de coleta (ISO 8601)",
+                        received="null",
+                        description="Amostra deve ter data de coleta"
+                    ))
+                    return False
+        return True
+    return check
+
+
+def _build_plausible_values(profile: ValidationProfile) -> CompiledCheck:
+    # Os achados são coletados na construção do índice (mesma passagem que
+    # detecta os códigos LOINC); aqui apenas viram erros de validação
+    def check(index: BundleIndex, errors: List[ValidationError]) -> bool:
+        if not index.implausible:
+            return True
+        for finding in index.implausible:
+            field = f"entry[{finding.position}].resource.valueQuantity"
+            if finding.bounds is None:
+                errors.append(ValidationError(
+                    field=field,
+                    expected="valor numérico em unidade UCUM reconhecida",
+                    received=f"{finding.value} {finding.unit}",
+                    description=f"Resultado do exame LOINC {finding.code} sem valor numérico ou em unidade desconhecida"
+                ))
+                continue
+            low, high = finding.bounds
+            errors.append(ValidationError(
+                field=field,
+                expected=f"entre {low:g} e {high:g} {finding.unit}",
+                received=f"{finding.value} {finding.unit}",
+                description=f"Resultado do exame LOINC {finding.code} fora da faixa biologicamente plausível"
+            ))
+        return False
+    return check
+
+
+RULE_BUILDERS: Dict[str, Callable[..., CompiledCheck]] = {
+    "resource_type": _build_resource_type,
+    "meta_profile": _build_meta_profile,
+    "bundle_type": _build_bundle_type,
+    "entries_present": _build_entries_present,
+    "required_codes": _build_required_codes,
+    "patient_cpf": _build_patient_cpf,
+    "laboratory_cnes": _build_laboratory_cnes,
+    "composite_exam": _build_composite_exam,
+    "reference_integrity": _build_reference_integrity,
+    "contained_specimen": _build_contained_specimen,
+    "plausible_values": _build_plausible_values,
+}
+
+
+def compile_profile(profile: ValidationProfile) -> CompiledProfile:
+    """
+    Compila um perfil declarativo em uma tupla de closures.
+
+    Args:
+        profile: Perfil de validação
+
+    Returns:
+        Perfil compilado
+
+    Raises:
+        ValueError: Se alguma regra referenciar uma verificação desconhecida
+    """
+    checks = []
+    for rule in profile.rules:
+        builder = RULE_BUILDERS.get(rule.check)
+        if builder is None:
+            raise ValueError(f"Regra de validação desconhecida: {rule.check}")
+        # Com métricas habilitadas, cada regra registra sua duração (rule.<check>)
+        checks.append(metrics.timed_check(f"rule.{rule.check}", builder(profile, **rule.params)))
+
+    logger.info(
+        "Perfil FHIR compilado",
+        profile=profile.canonical,
+        rules_count=len(checks)
+    )
+    return CompiledProfile(profile, tuple(checks))
+
+
+class ProfileRegistry:
+    """
+    Registro de perfis por URL e URL versionada.
+
+    A compilação acontece uma única vez por perfil; a resolução por requisição
+    é apenas uma busca em dicionário sobre `meta.profile`.
+    """
+
+    def __init__(self, default_url: str):
+        """
+        Args:
+            default_url: URL do perfil usado quando o Bundle não declara um perfil conhecido
+        """
+        self.default_url = default_url
+        self._profiles: Dict[str, ValidationProfile] = {}
+        self._latest: Dict[str, str] = {}
+        self._compiled: Dict[str, CompiledProfile] = {}
+
+    def register(self, profile: ValidationProfile, latest: bool = True) -> None:
+        """
+        Registra um perfil declarativo.
+
+        Args:
+            profile: Perfil a ser registrado
+            latest: Se True, a URL sem versão passa a apontar para este perfil
+        """
+        self._profiles[profile.canonical] = profile
+        if latest or profile.url not in self._latest:
+            self._latest[profile.url] = profile.canonical
+        self._compiled.clear()
+
+    def get(self, reference: str) -> Optional[CompiledProfile]:
+        """
+        Retorna o perfil compilado para `url` ou `url|versão` (com cache).
+
+        Args:
+            reference: Referência canônica do perfil
+
+        Returns:
+            Perfil compilado ou None se não registrado
+        """
+        compiled = self._compiled.get(reference)
+        if compiled is not None:
+            return compiled
+
+        profile = self._profiles.get(self._latest.get(reference, reference))
+        if profile is None:
+            return None
+
+        compiled = self._compiled.get(profile.canonical) or compile_profile(profile)
+        self._compiled[profile.canonical] = compiled
+        self._compiled[reference] = compiled
+        return compiled
+
+    def resolve(self, profiles: List[str]) -> CompiledProfile:
+        """
+        Seleciona o perfil compilado a partir de `meta.profile` do Bundle.
+
+        Args:
+            profiles: Lista de perfis declarados no Bundle
+
+        Returns:
+            Primeiro perfil registrado encontrado ou o perfil padrão
+        """
+        for reference in profiles:
+            compiled = self.get(reference)
+            if compiled is not None:
+                return compiled
+        return self.get(self.default_url)
+
+    def warm_up(self) -> None:
+        """
+        Compila todos os perfis registrados e as URLs sem versão (chamado na
+        inicialização); depois disso, a resolução só lê o cache.
+        """
+        for reference in (*self._profiles, *self._latest):
+            self.get(reference)
@@ -0,0 +1,61 @@
+"""
+Perfis FHIR suportados pela API, descritos como regras declarativas.
+Para suportar uma nova versão de perfil, registre um novo ValidationProfile;
+a compilação gera as verificações especializadas sem caminhos condicionais.
+"""
+from src.core.config import settings
+from src.domain.models import LoincCode
+from src.validators.plausibility import PLAUSIBLE_RANGES
+from src.validators.profile_rules import ProfileRegistry, RuleSpec, ValidationProfile
+
+# Códigos LOINC obrigatórios para exames simples (24 itens)
+HEMOGRAMA_REQUIRED_LOINC_CODES = frozenset({
+    LoincCode.HEMACEAS.value,
+    LoincCode.HEMOGLOBINA.value,
+    LoincCode.HEMATOCRITO.value,
+    LoincCode.VCM.value,
+    LoincCode.HCM.value,
+    LoincCode.CHCM.value,
+    LoincCode.RDW.value,
+    LoincCode.LEUCOCITOS.value,
+    LoincCode.PROMIELOCITOS.value,
+    LoincCode.MIELOCITOS.value,
+    LoincCode.METAMIELOCITOS.value,
+    LoincCode.BASTONETES.value,
+    LoincCode.SEGMENTADOS.value,
+    LoincCode.MONOCITOS.value,
+    LoincCode.EOSINOFILOS.value,
+    LoincCode.BASOFILOS.value,
+    LoincCode.LINFOCITOS.value,
+    LoincCode.LINFOCITOS_ATIPICOS.value,
+    LoincCode.PRO_LINFOCITOS.value,
+    LoincCode.BLASTOS.value,
+    LoincCode.PLAQUETAS.value,
+    LoincCode.PLAQUETOCRITO.value,
+    LoincCode.VPM.value,
+    LoincCode.PDW.value,
+})
+
+# Perfil "malote" da SES-GO (hemograma completo)
+SES_GO_MALOTE_V1 = ValidationProfile(
+    url=settings.fhir_profile_url,
+    version="1.0.0",
+    plausible_ranges=PLAUSIBLE_RANGES,
+    rules=[
+        RuleSpec(check="resource_type", params={"expected": "Bundle"}),
+        RuleSpec(check="meta_profile"),
+        RuleSpec(check="bundle_type", params={"expected": "collection"}),
+        RuleSpec(check="entries_present", params={"expected_count": settings.fhir_required_exams_count + 1}),
+        RuleSpec(check="required_codes", params={"codes": sorted(HEMOGRAMA_REQUIRED_LOINC_CODES)}),
+        RuleSpec(check="patient_cpf"),
+        RuleSpec(check="laboratory_cnes", params={"length": 7}),
+        RuleSpec(check="composite_exam", params={"member_count": settings.fhir_required_exams_count}),
+        RuleSpec(check="reference_integrity", params={"member_type": "Observation"}),
+        RuleSpec(check="contained_specimen", params={"type_code": "BLD", "reference_prefix": "#"}),
+        RuleSpec(check="plausible_values"),
+    ],
+)
+
+# Registro global de perfis (compilados sob demanda e mantidos em cache)
+profile_registry = ProfileRegistry(default_url=settings.fhir_profile_url)
+profile_registry.register(SES_GO_MALOTE_V1)
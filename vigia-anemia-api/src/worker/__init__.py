@@ -0,0 +1,19 @@
+"""
+Worker module - Consumo assíncrono da fila de hemogramas (RF05.1).
+"""
+from src.worker.consumer import HemogramaWorker, WorkerStats
+from src.worker.embedded import close_embedded_worker, start_embedded_worker
+from src.worker.processor import process_batch, process_message
+from src.worker.results import JsonLinesResultSink, MemoryResultSink, ResultSink
+
+__all__ = [
+    "HemogramaWorker",
+    "WorkerStats",
+    "start_embedded_worker",
+    "close_embedded_worker",
+    "process_batch",
+    "process_message",
+    "ResultSink",
+    "JsonLinesResultSink",
+    "MemoryResultSink",
+]
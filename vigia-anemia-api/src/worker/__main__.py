@@ -0,0 +1,77 @@
+"""
+Ponto de entrada do worker de hemogramas.
+
+Uso:
+    python -m src.worker [--backend sqs] [--concurrency 32] [--processes 4]
+"""
+import argparse
+import asyncio
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor
+
+from src.core.config import settings
+from src.core.logging import configure_logging, get_logger
+from src.infrastructure.queue_backends import IN_PROCESS_BACKENDS, create_queue_backend
+from src.worker.consumer import HemogramaWorker
+from src.worker.results import JsonLinesResultSink
+
+configure_logging()
+logger = get_logger(__name__)
+
+
+async def run_worker(backend_name: str, concurrency: int, processes: int) -> None:
+    """
+    Executa o worker até receber SIGTERM ou SIGINT.
+
+    Args:
+        backend_name: Backend de fila consumido
+        concurrency: Máximo de mensagens em processamento simultâneo
+        processes: Processos do pool de processamento
+    """
+    backend = create_queue_backend(backend_name)
+    sink = JsonLinesResultSink(settings.worker_results_dir)
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        worker = HemogramaWorker(
+            backend,
+            sink,
+            process_executor=pool,
+            concurrency=concurrency,
+            batch_size=settings.worker_receive_batch_size,
+            wait_time_s=settings.worker_wait_time_s,
+            visibility_timeout_s=settings.worker_visibility_timeout_s,
+            delete_interval_ms=settings.worker_delete_interval_ms,
+            report_interval_s=settings.worker_report_interval_s,
+        )
+
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, worker.stop)
+
+        logger.info("Pool de processamento iniciado", processes=processes)
+        try:
+            await worker.run()
+        finally:
+            backend.close()
+            sink.close()
+
+
+def main() -> None:
+    """Lê os argumentos (padrão: settings) e inicia o worker."""
+    parser = argparse.ArgumentParser(description="Worker de processamento de hemogramas")
+    parser.add_argument("--backend", default=settings.queue_backend)
+    parser.add_argument("--concurrency", type=int, default=settings.worker_concurrency)
+    parser.add_argument("--processes", type=int, default=settings.worker_processes)
+    args = parser.parse_args()
+    if args.backend in IN_PROCESS_BACKENDS:
+        parser.error(
+            f"o backend '{args.backend}' só é visível ao processo da API, que o consome "
+            f"com o worker embutido; use sqs ou redis para um worker separado"
+        )
+
+    processes = args.processes or os.cpu_count() or 1
+    asyncio.run(run_worker(args.backend, args.concurrency, processes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+"""
+Worker de consumo da fila de hemogramas.
+
+O event loop faz o long polling (lotes de até 10 mensagens), a remoção em lote
+e a extensão do visibility timeout; cada lote recebido é processado de uma vez
+em um pool de processos (classificação vetorizada), de modo que a decodificação
+e a análise dos Bundles não disputam o GIL com o consumo da fila. Os resultados
+são entregues ao ResultSink antes de as mensagens serem removidas.
+"""
+import asyncio
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.core.logging import get_logger
+from src.domain.models import TriagePriority
+from src.infrastructure.queue_backends.base import QueueBackend, QueueBackendError, ReceivedMessage
+from src.worker.processor import process_batch
+from src.worker.results import ResultSink
+
+logger = get_logger(__name__)
+
+# Limite de entradas por chamada em lote do SQS
+_BATCH_LIMIT = 10
+
+
+class WorkerStats:
+    """Contadores do worker para o relatório de vazão."""
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.received = 0
+        self.processed = 0
+        self.failed = 0
+        self.extended = 0
+        self.urgent = 0
+        self._last_report_at = self.started_at
+        self._last_report_processed = 0
+
+    def rate(self) -> float:
+        """
+        Calcula a vazão média desde o início.
+
+        Returns:
+            Mensagens processadas por segundo
+        """
+        elapsed = time.monotonic() - self.started_at
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+    def interval_rate(self) -> float:
+        """
+        Calcula a vazão desde a chamada anterior e reinicia o intervalo.
+
+        Returns:
+            Mensagens processadas por segundo no intervalo
+        """
+        now = time.monotonic()
+        elapsed = now - self._last_report_at
+        processed = self.processed - self._last_report_processed
+        self._last_report_at, self._last_report_processed = now, self.processed
+        return processed / elapsed if elapsed > 0 else 0.0
+
+
+class HemogramaWorker:
+    """
+    Consumidor da fila de hemogramas.
+
+    No máximo `concurrency` mensagens ficam em processamento ao mesmo tempo:
+    o worker só pede à fila tantas mensagens quantas vagas tiver. Mensagens
+    processadas com sucesso têm o resultado entregue ao sink e só então são
+    removidas em lote; mensagens com falha (no processamento ou no sink) não são
+    removidas e voltam à fila ao fim do visibility timeout (e, no SQS, vão para
+    a DLQ após o número máximo de recebimentos da redrive policy).
+    """
+
+    def __init__(
+        self,
+        backend: QueueBackend,
+        sink: ResultSink,
+        process_executor: Optional[Executor] = None,
+        process: Callable[[List[str]], List[Tuple[bool, Any]]] = process_batch,
+        concurrency: int = 32,
+        batch_size: int = _BATCH_LIMIT,
+        wait_time_s: float = 20.0,
+        visibility_timeout_s: float = 60.0,
+        delete_interval_ms: float = 500.0,
+        report_interval_s: float = 30.0,
+    ):
+        """
+        Args:
+            backend: Backend de fila consumido
+            sink: Destino dos resultados (classificação e triagem)
+            process_executor: Executor do processamento (tipicamente um
+                ProcessPoolExecutor; None processa em threads do próprio worker)
+            process: Função que processa os corpos de um lote e retorna, por
+                mensagem, (success, resultado ou erro); serializável por pickle
+                quando o executor é um pool de processos
+            concurrency: Máximo de mensagens em processamento simultâneo
+            batch_size: Máximo de mensagens por chamada de recebimento
+            wait_time_s: Espera do long polling
+            visibility_timeout_s: Visibility timeout das mensagens recebidas
+            delete_interval_ms: Espera máxima para agrupar remoções
+            report_interval_s: Intervalo do log de vazão
+        """
+        self.backend = backend
+        self.sink = sink
+        self.process_executor = process_executor or ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="worker-process"
+        )
+        self._owns_process_executor = process_executor is None
+        self.process = process
+        self.concurrency = concurrency
+        self.batch_size = min(batch_size, _BATCH_LIMIT)
+        self.wait_time_s = wait_time_s
+        self.visibility_timeout_s = visibility_timeout_s
+        self.delete_interval = delete_interval_ms / 1000.0
+        self.report_interval = report_interval_s
+        # Extensão com folga: antes de um terço do timeout restante se esgotar
+        self.heartbeat_interval = max(visibility_timeout_s / 3.0, 0.1)
+
+        self.stats = WorkerStats()
+
+        # Chamadas ao backend (long polling, remoção e visibilidade) em threads
+        # próprias, para não bloquear o event loop nem o pool de processamento
+        self._io_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="queue-consumer")
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._stopping: Optional[asyncio.Event] = None
+        # receipt_handle -> prazo (monotonic) da invisibilidade corrente
+        self._in_flight: Dict[str, float] = {}
+        self._processing: set = set()
+        self._pending_deletes: List[str] = []
+        self._delete_tasks: set = set()
+
+    async def run(self) -> None:
+        """Consome a fila até `stop()` ser chamado, aguardando as mensagens em processamento."""
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._stopping = asyncio.Event()
+        self.stats = WorkerStats()
+
+        logger.info(
+            "Worker iniciado",
+            backend=self.backend.name,
+            concurrency=self.concurrency,
+            batch_size=self.batch_size,
+            visibility_timeout_s=self.visibility_timeout_s
+        )
+
+        loop = asyncio.get_running_loop()
+        background = [
+            loop.create_task(self._delete_loop()),
+            loop.create_task(self._heartbeat_loop()),
+            loop.create_task(self._report_loop()),
+        ]
+        try:
+            await self._receive_loop()
+        finally:
+            if self._processing:
+                await asyncio.gather(*self._processing, return_exceptions=True)
+            for task in background:
+                task.cancel()
+            await asyncio.gather(*background, return_exceptions=True)
+            await self._flush_deletes()
+            if self._delete_tasks:
+                await asyncio.gather(*self._delete_tasks, return_exceptions=True)
+            self._io_executor.shutdown(wait=False)
+            if self._owns_process_executor:
+                self.process_executor.shutdown(wait=False)
+
+            logger.info(
+                "Worker encerrado",
+                processed=self.stats.processed,
+                failed=self.stats.failed,
+                messages_per_second=round(self.stats.rate(), 2)
+            )
+
+    def stop(self) -> None:
+        """Solicita o encerramento: para de receber e conclui o que está em processamento."""
+        if self._stopping is not None:
+            self._stopping.set()
+
+    async def _acquire_slots(self) -> int:
+        # Espera ao menos uma vaga e reserva as demais disponíveis, até o tamanho do lote
+        await self._slots.acquire()
+        acquired = 1
+        while acquired < self.batch_size and not self._slots.locked():
+            await self._slots.acquire()
+            acquired += 1
+        return acquired
+
+    async def _receive_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = loop.create_task(self._stopping.wait())
+        try:
+            while not self._stopping.is_set():
+                slots = await self._acquire_slots()
+                if self._stopping.is_set():
+                    for _ in range(slots):
+                        self._slots.release()
+                    break
+                receive = loop.run_in_executor(
+                    self._io_executor,
+                    self.backend.receive,
+                    slots,
+                    self.wait_time_s,
+                    self.visibility_timeout_s,
+                )
+                await asyncio.wait({receive, stopping}, return_when=asyncio.FIRST_COMPLETED)
+                try:
+                    # Um long poll em curso no encerramento ainda é aguardado:
+                    # as mensagens já recebidas são processadas normalmente
+                    messages = await receive
+                except QueueBackendError as e:
+                    logger.error("Erro ao receber mensagens", error_code=e.code, error_message=e.message)
+                    messages = []
+                    await asyncio.sleep(1.0)
+
+                for _ in range(slots - len(messages)):
+                    self._slots.release()
+
+                if not messages:
+                    continue
+                deadline = time.monotonic() + self.visibility_timeout_s
+                self.stats.received += len(messages)
+                for message in messages:
+                    self._in_flight[message.receipt_handle] = deadline
+                task = loop.create_task(self._handle(messages))
+                self._processing.add(task)
+                task.add_done_callback(self._processing.discard)
+        finally:
+            stopping.cancel()
+
+    async def _handle(self, messages: List[ReceivedMessage]) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            outcomes = await loop.run_in_executor(
+                self.process_executor, self.process, [message.body for message in messages]
+            )
+        except Exception as e:
+            outcomes = [(False, str(e))] * len(messages)
+
+        try:
+            processed: List[ReceivedMessage] = []
+            results: List[Dict[str, Any]] = []
+            for message, (success, result) in zip(messages, outcomes):
+                if not success:
+                    # Sem remoção: a mensagem volta à fila ao fim do visibility timeout
+                    self.stats.failed += 1
+                    logger.error(
+                        "Erro ao processar mensagem",
+                        message_id=message.message_id,
+                        tracking_id=message.attributes.get('TrackingId'),
+                        error=result
+                    )
+                    continue
+
+                processed.append(message)
+                results.append(result)
+                triage = result.get('triage', {})
+                if triage.get('priority') == TriagePriority.URGENT.value:
+                    # Casos urgentes também destacados no log para a via rápida de atendimento
+                    self.stats.urgent += 1
+                    logger.warning(
+                        "Hemograma urgente",
+                        message_id=message.message_id,
+                        tracking_id=result.get('tracking_id'),
+                        laboratory_cnes=result.get('laboratory_cnes'),
+                        reasons=triage.get('reasons')
+                    )
+                logger.debug(
+                    "Hemograma processado",
+                    message_id=message.message_id,
+                    tracking_id=result.get('tracking_id'),
+                    anemia=result.get('anemia', {}).get('severity'),
+                    priority=triage.get('priority')
+                )
+
+            if results:
+                try:
+                    await loop.run_in_executor(self._io_executor, self.sink.write, results)
+                except Exception as e:
+                    # Resultado não entregue: as mensagens ficam na fila e são reprocessadas
+                    self.stats.failed += len(results)
+                    logger.error(
+                        "Erro ao gravar resultados; mensagens mantidas na fila",
+                        sink=self.sink.name,
+                        error=str(e),
+                        batch_size=len(results)
+                    )
+                    processed = []
+                else:
+                    self.stats.processed += len(results)
+
+            self._pending_deletes.extend(message.receipt_handle for message in processed)
+            if len(self._pending_deletes) >= _BATCH_LIMIT:
+                self._schedule_flush()
+        finally:
+            for message in messages:
+                self._in_flight.pop(message.receipt_handle, None)
+                self._slots.release()
+
+    def _schedule_flush(self) -> None:
+        task = asyncio.get_running_loop().create_task(self._flush_deletes())
+        self._delete_tasks.add(task)
+        task.add_done_callback(self._delete_tasks.discard)
+
+    async def _flush_deletes(self) -> None:
+        if not self._pending_deletes:
+            return
+        handles, self._pending_deletes = self._pending_deletes, []
+        loop = asyncio.get_running_loop()
+        for start in range(0, len(handles), _BATCH_LIMIT):
+            chunk = handles[start:start + _BATCH_LIMIT]
+            try:
+                await loop.run_in_executor(self._io_executor, self.backend.delete_batch, chunk)
+            except QueueBackendError as e:
+                # A mensagem será entregue de novo; o processamento deve ser idempotente
+                logger.error(
+                    "Erro ao remover mensagens processadas",
+                    error_code=e.code,
+                    error_message=e.message,
+                    batch_size=len(chunk)
+                )
+
+    async def _delete_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.delete_interval)
+            await self._flush_deletes()
+
+    async def _heartbeat_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            now = time.monotonic()
+            # Mensagens cuja invisibilidade termina antes do próximo batimento (com folga)
+            expiring = [
+                handle for handle, deadline in self._in_flight.items()
+                if deadline - now < 2 * self.heartbeat_interval
+            ]
+            if not expiring:
+                continue
+
+            deadline = now + self.visibility_timeout_s
+            for start in range(0, len(expiring), _BATCH_LIMIT):
+                chunk = expiring[start:start + _BATCH_LIMIT]
+                try:
+                    await loop.run_in_executor(
+                        self._io_executor,
+                        self.backend.change_visibility_batch,
+                        chunk,
+                        self.visibility_timeout_s,
+                    )
+                except QueueBackendError as e:
+                    logger.warning(
+                        "Erro ao estender visibility timeout",
+                        error_code=e.code,
+                        error_message=e.message,
+                        batch_size=len(chunk)
+                    )
+                    continue
+                for handle in chunk:
+                    if handle in self._in_flight:
+                        self._in_flight[handle] = deadline
+                self.stats.extended += len(chunk)
+
+            logger.info("Visibility timeout estendido", messages=len(expiring))
+
+    async def _report_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.report_interval)
+            logger.info(
+                "Vazão do worker",
+                messages_per_second=round(self.stats.interval_rate(), 2),
+                processed=self.stats.processed,
+                failed=self.stats.failed,
+                urgent=self.stats.urgent,
+                in_flight=len(self._in_flight)
+            )
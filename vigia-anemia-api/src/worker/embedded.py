@@ -0,0 +1,72 @@
+"""
+Worker embutido no processo da API.
+
+Os backends `memory` e `file` só existem no processo que os abriu, de modo que
+`python -m src.worker` não os enxerga: com eles, a API inicia o consumidor no
+próprio event loop, com o processamento em um pool de processos, e o encerra
+no shutdown antes de fechar a fila.
+"""
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from src.core.config import settings
+from src.core.logging import get_logger
+from src.infrastructure.queue_backends.base import QueueBackend
+from src.worker.consumer import HemogramaWorker
+from src.worker.results import JsonLinesResultSink
+
+logger = get_logger(__name__)
+
+# Long polling curto: o encerramento aguarda o recebimento em curso
+EMBEDDED_WAIT_TIME_S = 1.0
+
+# Instância singleton do worker embutido
+_embedded_worker: Optional[HemogramaWorker] = None
+_embedded_task: Optional[asyncio.Task] = None
+_embedded_pool: Optional[ProcessPoolExecutor] = None
+
+
+def start_embedded_worker(backend: QueueBackend) -> HemogramaWorker:
+    """
+    Inicia o worker embutido sobre o backend da API, no event loop corrente.
+
+    Args:
+        backend: Backend de fila do QueueService da API
+
+    Returns:
+        Instância singleton do HemogramaWorker
+    """
+    global _embedded_worker, _embedded_task, _embedded_pool
+
+    if _embedded_worker is None:
+        processes = settings.worker_processes or os.cpu_count() or 1
+        _embedded_pool = ProcessPoolExecutor(max_workers=processes)
+        _embedded_worker = HemogramaWorker(
+            backend,
+            JsonLinesResultSink(settings.worker_results_dir),
+            process_executor=_embedded_pool,
+            concurrency=settings.worker_concurrency,
+            batch_size=settings.worker_receive_batch_size,
+            wait_time_s=min(settings.worker_wait_time_s, EMBEDDED_WAIT_TIME_S),
+            visibility_timeout_s=settings.worker_visibility_timeout_s,
+            delete_interval_ms=settings.worker_delete_interval_ms,
+            report_interval_s=settings.worker_report_interval_s,
+        )
+        _embedded_task = asyncio.get_running_loop().create_task(_embedded_worker.run())
+        logger.info("Worker embutido iniciado", backend=backend.name, processes=processes)
+
+    return _embedded_worker
+
+
+async def close_embedded_worker() -> None:
+    """Encerra o worker embutido, concluindo as mensagens em processamento."""
+    global _embedded_worker, _embedded_task, _embedded_pool
+
+    if _embedded_worker is not None:
+        _embedded_worker.stop()
+        await asyncio.gather(_embedded_task, return_exceptions=True)
+        _embedded_pool.shutdown(wait=True)
+        _embedded_worker.sink.close()
+        _embedded_worker = _embedded_task = _embedded_pool = None
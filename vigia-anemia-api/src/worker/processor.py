@@ -0,0 +1,109 @@
+"""
+Processamento de lotes de mensagens da fila de hemogramas.
+Executado nos processos do pool do worker: decodifica os envelopes, valida as
+QueueMessages, converte cada Bundle uma única vez em um registro compacto
+(`HemogramaRecord`) e classifica a anemia e faz a triagem do lote inteiro
+sobre esses registros.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.core.config import settings
+from src.domain.hemograma_record import HemogramaRecord
+from src.infrastructure.message_envelope import (
+    ENVELOPE_PREFIX,
+    EnvelopeCodec,
+    build_envelope_codec,
+    decode_message_body,
+)
+from src.services.anemia_classifier import classify_records
+from src.services.triage_engine import triage_engine
+
+# Codec do processo corrente, criado na primeira mensagem comprimida
+_codec: Optional[EnvelopeCodec] = None
+
+
+def _envelope_codec() -> Optional[EnvelopeCodec]:
+    global _codec
+    if _codec is None:
+        _codec = build_envelope_codec(
+            settings.queue_envelope_dictionary_path,
+            settings.queue_envelope_compression_level,
+        )
+    return _codec
+
+
+def _decode(body: str) -> Dict[str, Any]:
+    codec = _envelope_codec() if body.startswith(ENVELOPE_PREFIX + ":") else None
+    message = decode_message_body(body, codec)
+    if not isinstance(message, dict):
+        raise ValueError("Mensagem não é um objeto JSON")
+    if not isinstance(message.get("fhir_bundle"), dict) or "tracking_id" not in message:
+        raise ValueError("Mensagem sem tracking_id ou fhir_bundle")
+    return message
+
+
+def process_batch(bodies: List[str]) -> List[Tuple[bool, Any]]:
+    """
+    Processa os corpos de um lote de mensagens da fila.
+
+    Args:
+        bodies: Corpos recebidos (envelope zstd ou JSON da QueueMessage)
+
+    Returns:
+        Por mensagem, na mesma ordem: (success, resumo do processamento ou erro).
+        O resumo traz tracking_id, CNES, data de recebimento, resultados
+        (em unidades canônicas), a
+        classificação de anemia e a triagem (prioridade e motivos).
+    """
+    outcomes: List[Tuple[bool, Any]] = []
+    records: List[HemogramaRecord] = []
+    for body in bodies:
+        # Uma mensagem corrompida (JSON, envelope zstd ou Bundle) falha sozinha,
+        # sem derrubar as demais mensagens do lote
+        try:
+            message = _decode(body)
+            # Do Bundle só ficam o registro compacto e os campos do resumo
+            record = HemogramaRecord.from_message(message)
+        except Exception as e:
+            outcomes.append((False, str(e)))
+            continue
+        records.append(record)
+        outcomes.append((True, (message.get("correlation_id"), message.get("received_at"))))
+
+    classifications = iter(classify_records(records))
+    triages = iter(triage_engine.triage_records(records))
+    pending = iter(records)
+    for position, (success, fields) in enumerate(outcomes):
+        if not success:
+            continue
+        record = next(pending)
+        correlation_id, received_at = fields
+        outcomes[position] = (True, {
+            "tracking_id": record.tracking_id,
+            "correlation_id": correlation_id,
+            "laboratory_cnes": record.laboratory_cnes,
+            "received_at": received_at,
+            "results": record.results(),
+            "anemia": next(classifications),
+            "triage": next(triages),
+        })
+    return outcomes
+
+
+def process_message(body: str) -> Dict[str, Any]:
+    """
+    Processa o corpo de uma única mensagem da fila.
+
+    Args:
+        body: Corpo recebido (envelope zstd ou JSON da QueueMessage)
+
+    Returns:
+        Resumo do processamento (ver `process_batch`)
+
+    Raises:
+        ValueError: Se o corpo não for uma QueueMessage válida
+    """
+    success, result = process_batch([body])[0]
+    if not success:
+        raise ValueError(result)
+    return result
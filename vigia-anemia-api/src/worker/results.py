@@ -0,0 +1,107 @@
+"""
+Destino dos resultados do worker (classificação de anemia e triagem).
+
+O worker só remove uma mensagem da fila depois que o resultado foi entregue
+ao sink: se a gravação falhar, a mensagem volta à fila ao fim do visibility
+timeout e é processada de novo (o consumidor dos resultados deduplica pelo
+tracking_id).
+"""
+import json
+import os
+import socket
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+from src.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class ResultSink(ABC):
+    """Destino dos resumos de processamento (chamado fora do event loop)."""
+
+    name: str = "base"
+
+    @abstractmethod
+    def write(self, results: List[Dict[str, Any]]) -> None:
+        """
+        Entrega os resultados de um lote de forma durável.
+
+        Args:
+            results: Resumos de processamento (ver process_batch)
+
+        Raises:
+            Exception: Se os resultados não puderem ser entregues
+        """
+
+    def close(self) -> None:
+        """Libera arquivos e conexões do sink."""
+
+
+class JsonLinesResultSink(ResultSink):
+    """
+    Resultados em JSON Lines, um arquivo por dia e por processo.
+
+    Cada lote é gravado com um único `write()` seguido de fsync, de modo que
+    nenhuma mensagem é removida da fila antes de o resultado estar em disco.
+    Os arquivos `<data>.<host>-<pid>.jsonl` evitam que processos diferentes
+    intercalem linhas no mesmo arquivo.
+    """
+
+    name = "jsonl"
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: Diretório dos arquivos de resultados
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._suffix = f"{socket.gethostname()}-{os.getpid()}.jsonl"
+        self._lock = threading.Lock()
+        self._day = ""
+        self._fd = -1
+
+    def _file_for(self, day: str) -> int:
+        if day != self._day:
+            if self._fd >= 0:
+                os.close(self._fd)
+            path = self.directory / f"{day}.{self._suffix}"
+            self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o640)
+            self._day = day
+        return self._fd
+
+    def write(self, results: List[Dict[str, Any]]) -> None:
+        if not results:
+            return
+        payload = "".join(
+            json.dumps(result, ensure_ascii=False, default=str) + "\n" for result in results
+        ).encode("utf-8")
+        with self._lock:
+            fd = self._file_for(datetime.utcnow().strftime("%Y-%m-%d"))
+            os.write(fd, payload)
+            os.fsync(fd)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fd >= 0:
+                os.close(self._fd)
+                self._fd = -1
+                self._day = ""
+
+
+class MemoryResultSink(ResultSink):
+    """Resultados mantidos em memória (testes e benchmarks)."""
+
+    name = "memory"
+
+    def __init__(self):
+        self.results: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def write(self, results: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self.results.extend(results)
@@ -0,0 +1,133 @@
+"""
+Testes da classificação de anemia: limites das faixas etárias da OMS, sexo,
+limiares de hemoglobina e valores ausentes (NaN).
+"""
+import math
+
+import numpy as np
+import pytest
+
+from scripts.sample_bundles import build_sample_bundle
+from src.domain.hemograma_record import SEX_FEMALE, SEX_MALE, SEX_UNKNOWN, HemogramaRecord
+from src.domain.models import LoincCode
+from src.services.anemia_classifier import (
+    SEVERITY_MILD,
+    SEVERITY_MODERATE,
+    SEVERITY_NONE,
+    SEVERITY_NOT_APPLICABLE,
+    SEVERITY_SEVERE,
+    classify_anemia,
+    classify_messages,
+    classify_records,
+)
+
+NAN = math.nan
+JUST_BELOW = 1e-6
+
+
+def _classify(age_months: float, sex: int, hemoglobin: float) -> int:
+    return int(classify_anemia(
+        np.array([age_months]), np.array([sex], dtype=np.int8), np.array([hemoglobin])
+    )[0])
+
+
+@pytest.mark.parametrize("sex", [SEX_FEMALE, SEX_MALE, SEX_UNKNOWN])
+@pytest.mark.parametrize("age_months, expected", [
+    (6.0 - JUST_BELOW, SEVERITY_NOT_APPLICABLE),  # < 6 meses: fora das faixas
+    (6.0, SEVERITY_MILD),                          # 6-59 meses: 10.5 < 11.0
+    (60.0 - JUST_BELOW, SEVERITY_MILD),
+    (60.0, SEVERITY_MODERATE),                     # 5-11 anos: 10.5 < 11.0 (leve >= 11.0)
+    (144.0 - JUST_BELOW, SEVERITY_MODERATE),
+    (144.0, SEVERITY_MODERATE),                    # 12-14 anos: mesmos limiares inferiores
+])
+def test_pediatric_bands_ignore_sex(age_months, sex, expected):
+    assert _classify(age_months, sex, 10.5) == expected
+
+
+@pytest.mark.parametrize("age_months, hemoglobin, expected", [
+    (6.0, 11.0, SEVERITY_NONE),
+    (6.0, 11.0 - JUST_BELOW, SEVERITY_MILD),
+    (6.0, 10.0, SEVERITY_MILD),
+    (6.0, 10.0 - JUST_BELOW, SEVERITY_MODERATE),
+    (6.0, 7.0, SEVERITY_MODERATE),
+    (6.0, 7.0 - JUST_BELOW, SEVERITY_SEVERE),
+    (60.0, 11.5, SEVERITY_NONE),
+    (60.0, 11.5 - JUST_BELOW, SEVERITY_MILD),
+    (60.0, 8.0, SEVERITY_MODERATE),
+    (60.0, 8.0 - JUST_BELOW, SEVERITY_SEVERE),
+    (144.0, 12.0, SEVERITY_NONE),
+    (144.0, 12.0 - JUST_BELOW, SEVERITY_MILD),
+    (180.0 - JUST_BELOW, 12.0 - JUST_BELOW, SEVERITY_MILD),
+])
+def test_hemoglobin_thresholds_are_inclusive(age_months, hemoglobin, expected):
+    assert _classify(age_months, SEX_UNKNOWN, hemoglobin) == expected
+
+
+@pytest.mark.parametrize("sex, hemoglobin, expected", [
+    (SEX_FEMALE, 12.0, SEVERITY_NONE),
+    (SEX_FEMALE, 12.0 - JUST_BELOW, SEVERITY_MILD),
+    (SEX_MALE, 12.5, SEVERITY_MILD),               # homens: sem anemia só a partir de 13.0
+    (SEX_MALE, 13.0, SEVERITY_NONE),
+    (SEX_MALE, 11.0 - JUST_BELOW, SEVERITY_MODERATE),
+    (SEX_FEMALE, 8.0 - JUST_BELOW, SEVERITY_SEVERE),
+    (SEX_UNKNOWN, 12.5, SEVERITY_NOT_APPLICABLE),  # 15+ anos sem sexo: não classificável
+    (SEX_UNKNOWN, 5.0, SEVERITY_NOT_APPLICABLE),
+])
+def test_adult_band_depends_on_sex(sex, hemoglobin, expected):
+    assert _classify(180.0, sex, hemoglobin) == expected
+    assert _classify(600.0, sex, hemoglobin) == expected
+
+
+def test_male_threshold_starts_at_180_months():
+    assert _classify(180.0 - JUST_BELOW, SEX_MALE, 12.5) == SEVERITY_NONE
+    assert _classify(180.0, SEX_MALE, 12.5) == SEVERITY_MILD
+
+
+@pytest.mark.parametrize("age_months, hemoglobin", [(NAN, 10.0), (24.0, NAN), (NAN, NAN)])
+def test_missing_values_are_not_applicable(age_months, hemoglobin):
+    for sex in (SEX_FEMALE, SEX_MALE, SEX_UNKNOWN):
+        assert _classify(age_months, sex, hemoglobin) == SEVERITY_NOT_APPLICABLE
+
+
+def test_batch_is_classified_elementwise():
+    ages = np.array([3.0, 24.0, 200.0, 200.0, NAN])
+    sexes = np.array([SEX_FEMALE, SEX_MALE, SEX_MALE, SEX_UNKNOWN, SEX_FEMALE], dtype=np.int8)
+    hemoglobin = np.array([6.0, 6.0, 14.0, 14.0, 6.0])
+
+    assert classify_anemia(ages, sexes, hemoglobin).tolist() == [
+        SEVERITY_NOT_APPLICABLE, SEVERITY_SEVERE, SEVERITY_NONE, SEVERITY_NOT_APPLICABLE, SEVERITY_NOT_APPLICABLE
+    ]
+
+
+def _message(birth_date, gender, hemoglobin):
+    bundle = build_sample_bundle(
+        seed=5,
+        collected_at="2024-11-27T08:30:00-03:00",
+        birth_date=birth_date,
+        gender=gender,
+        values={LoincCode.HEMOGLOBINA.value: hemoglobin},
+    )
+    return {"tracking_id": "", "fhir_bundle": bundle, "laboratory_cnes": "2338424", "patient_cpf": "52998224725"}
+
+
+@pytest.mark.parametrize("birth_date, gender, hemoglobin, severity", [
+    ("2009-11-28", "male", 12.5, "none"),            # 14 anos na véspera do aniversário
+    ("2009-11-27", "male", 12.5, "mild"),            # 15 anos no dia da coleta
+    ("2009-11-27", "female", 12.5, "none"),
+    ("2009-11-27", None, 12.5, "not_applicable"),
+    ("2024-06-01", "female", 9.0, "not_applicable"),  # < 6 meses
+    (None, "female", 9.0, "not_applicable"),          # sem data de nascimento
+])
+def test_age_is_computed_at_collection(birth_date, gender, hemoglobin, severity):
+    (result,) = classify_messages([_message(birth_date, gender, hemoglobin)])
+    assert result["severity"] == severity
+    assert result["hemoglobin_g_dl"] == hemoglobin
+
+
+def test_missing_hemoglobin_is_reported_as_none():
+    record = HemogramaRecord("", "52998224725", "2338424", sex=SEX_FEMALE, collected_at=0.0, birth_date=-1e9)
+
+    (result,) = classify_records([record])
+    assert result["severity"] == "not_applicable"
+    assert result["hemoglobin_g_dl"] is None
+    assert result["age_months"] > 180
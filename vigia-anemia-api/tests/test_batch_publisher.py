@@ -0,0 +1,146 @@
+"""
+Testes do BatchPublisher: formação dos lotes (entradas, bytes e linger) e
+resultado por entrada, inclusive em falhas parciais do SendMessageBatch.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.infrastructure.batch_publisher import BatchPublisher, entry_size
+from src.infrastructure.queue_backends import QueueBackendError
+
+
+def _entry(body: str = "corpo", tracking_id: str = "t") -> dict:
+    return {
+        "MessageBody": body,
+        "MessageAttributes": {"TrackingId": {"DataType": "String", "StringValue": tracking_id}},
+    }
+
+
+class _SendBatch:
+    """SendMessageBatch falso: registra os lotes e responde conforme `respond`."""
+
+    def __init__(self, respond=None):
+        self.batches = []
+        self.respond = respond or self.all_successful
+
+    @staticmethod
+    def all_successful(entries):
+        return {"Successful": [{"Id": entry["Id"], "MessageId": f"m-{entry['MessageBody']}"} for entry in entries]}
+
+    def __call__(self, entries):
+        self.batches.append(entries)
+        return self.respond(entries)
+
+
+def _publisher(send_batch, **kwargs) -> BatchPublisher:
+    options = dict(executor=None, max_entries=10, max_bytes=262144, linger_ms=5.0)
+    options.update(kwargs)
+    return BatchPublisher(send_batch, **options)
+
+
+def test_entry_size_counts_body_and_attributes():
+    # "hemácias" tem 9 bytes em UTF-8; TrackingId + String + "t-1"
+    assert entry_size(_entry("hemácias", "t-1")) == 9 + len("TrackingId") + len("String") + 3
+    assert entry_size({"MessageBody": "abc"}) == 3
+
+
+async def test_each_submitter_gets_its_own_result():
+    send_batch = _SendBatch()
+    publisher = _publisher(send_batch)
+
+    results = await asyncio.gather(*(publisher.submit(_entry(f"b{n}"), f"t{n}") for n in range(3)))
+
+    assert results == [(True, "m-b0"), (True, "m-b1"), (True, "m-b2")]
+    assert len(send_batch.batches) == 1
+    assert [entry["Id"] for entry in send_batch.batches[0]] == ["0", "1", "2"]
+
+
+async def test_full_batch_is_sent_without_waiting_for_linger():
+    send_batch = _SendBatch()
+    publisher = _publisher(send_batch, max_entries=2, linger_ms=60_000)
+
+    futures = [publisher.submit(_entry(f"b{n}"), f"t{n}") for n in range(5)]
+    await asyncio.gather(*futures[:4])
+    assert [len(batch) for batch in send_batch.batches] == [2, 2]
+    # A quinta entrada aguarda o linger (ou o drain)
+    assert not futures[4].done()
+
+    await publisher.drain()
+    assert futures[4].result() == (True, "m-b4")
+
+
+async def test_entry_that_would_exceed_max_bytes_starts_a_new_batch():
+    send_batch = _SendBatch()
+    size = entry_size(_entry("x" * 100))
+    publisher = _publisher(send_batch, max_bytes=size * 2 + 10, linger_ms=60_000)
+
+    futures = [publisher.submit(_entry("x" * 100), f"t{n}") for n in range(3)]
+    await asyncio.gather(*futures[:2])
+    assert [len(batch) for batch in send_batch.batches] == [2]
+
+    await publisher.drain()
+    assert [len(batch) for batch in send_batch.batches] == [2, 1]
+
+
+async def test_partial_failure_resolves_each_entry():
+    def respond(entries):
+        return {
+            "Successful": [{"Id": "0", "MessageId": "m-0"}, {"Id": "2", "MessageId": "m-2"}],
+            "Failed": [{"Id": "1", "Code": "InvalidMessageContents", "Message": "corpo inválido", "SenderFault": True}],
+        }
+
+    publisher = _publisher(_SendBatch(respond))
+    results = await asyncio.gather(*(publisher.submit(_entry(f"b{n}"), f"t{n}") for n in range(3)))
+
+    assert results == [(True, "m-0"), (False, "InvalidMessageContents: corpo inválido"), (True, "m-2")]
+
+
+async def test_entries_missing_from_response_fail():
+    def respond(entries):
+        return {"Successful": [{"Id": "0", "MessageId": "m-0"}]}
+
+    publisher = _publisher(_SendBatch(respond))
+    first, second = await asyncio.gather(*(publisher.submit(_entry(f"b{n}"), f"t{n}") for n in range(2)))
+
+    assert first == (True, "m-0")
+    assert second[0] is False and "sem resultado" in second[1]
+
+
+@pytest.mark.parametrize("error, expected", [
+    (QueueBackendError("ServiceUnavailable", "fila indisponível"), "ServiceUnavailable: fila indisponível"),
+    (RuntimeError("conexão perdida"), "conexão perdida"),
+])
+async def test_batch_error_fails_every_entry(error, expected):
+    def respond(entries):
+        raise error
+
+    publisher = _publisher(_SendBatch(respond))
+    results = await asyncio.gather(*(publisher.submit(_entry(f"b{n}"), f"t{n}") for n in range(3)))
+
+    assert results == [(False, expected)] * 3
+
+
+async def test_cancelled_submitter_does_not_break_the_batch():
+    publisher = _publisher(_SendBatch())
+    cancelled = publisher.submit(_entry("b0"), "t0")
+    kept = publisher.submit(_entry("b1"), "t1")
+    cancelled.cancel()
+
+    assert await kept == (True, "m-b1")
+
+
+async def test_send_batch_runs_in_executor():
+    threads = []
+
+    def respond(entries):
+        threads.append(threading.current_thread().name)
+        return _SendBatch.all_successful(entries)
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="lote") as executor:
+        publisher = _publisher(_SendBatch(respond), executor=executor)
+        assert await publisher.submit(_entry("b0"), "t0") == (True, "m-b0")
+
+    assert threads and threads[0].startswith("lote")
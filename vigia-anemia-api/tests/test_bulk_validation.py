@@ -0,0 +1,150 @@
+"""
+Testes da validação em massa: leitura de JSON, NDJSON, gzip e tar em fluxo e
+relatórios por arquivo emitidos em ordem.
+"""
+import functools
+import gzip
+import io
+import json
+import tarfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from scripts.sample_bundles import build_sample_bundle
+from src.validators.bulk import (
+    INVALID_JSON_FIELD,
+    MAX_FAILURES_PER_FILE,
+    VALIDATION_FAILURE_FIELD,
+    iter_bundles,
+    validate_bundles,
+)
+
+
+# fullUrls aleatórios: cada Bundle é gerado uma vez para comparar os bytes lidos
+@functools.lru_cache(maxsize=None)
+def _valid(seed: int) -> bytes:
+    return json.dumps(build_sample_bundle(seed=seed)).encode("utf-8")
+
+
+@functools.lru_cache(maxsize=None)
+def _invalid(seed: int) -> bytes:
+    bundle = build_sample_bundle(seed=seed)
+    bundle["type"] = "batch"
+    return json.dumps(bundle).encode("utf-8")
+
+
+def _ndjson(*bodies: bytes) -> bytes:
+    return b"".join(body + b"\n" for body in bodies)
+
+
+def _tar(path: Path, members: dict, mode: str = "w:gz") -> None:
+    with tarfile.open(path, mode) as archive:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+
+@pytest.fixture
+def inputs(tmp_path) -> Path:
+    (tmp_path / "a.json").write_bytes(_valid(1))
+    (tmp_path / "b.ndjson").write_bytes(_ndjson(_valid(2), _invalid(3)) + b"\n   \n" + _valid(4) + b"\n")
+    (tmp_path / "c.ndjson.gz").write_bytes(gzip.compress(_ndjson(_valid(5), b"{nao-json")))
+    (tmp_path / "d.json.gz").write_bytes(gzip.compress(_invalid(6)))
+    _tar(tmp_path / "e.tar.gz", {
+        "lote/x.json": _valid(7),
+        "lote/y.jsonl": _ndjson(_valid(8), _valid(9)),
+        "lote/leia-me.txt": b"ignorado",
+    })
+    (tmp_path / "notas.txt").write_text("ignorado")
+    return tmp_path
+
+
+def _relative(source: str, root: Path) -> str:
+    return source[len(str(root)) + 1:]
+
+
+def test_iter_bundles_reads_every_format_in_order(inputs):
+    items = list(iter_bundles([inputs]))
+
+    assert [(_relative(item.source, inputs), item.line) for item in items] == [
+        ("a.json", 0),
+        ("b.ndjson", 1), ("b.ndjson", 2), ("b.ndjson", 5),
+        ("c.ndjson.gz", 1), ("c.ndjson.gz", 2),
+        ("d.json.gz", 0),
+        ("e.tar.gz:lote/x.json", 0),
+        ("e.tar.gz:lote/y.jsonl", 1), ("e.tar.gz:lote/y.jsonl", 2),
+    ]
+    assert items[0].body == _valid(1)
+    assert items[5].body == b"{nao-json"
+    assert items[6].body == _invalid(6)
+
+
+def test_iter_bundles_reads_plain_tar_and_files_without_extension(tmp_path):
+    _tar(tmp_path / "lote.tar", {"x.ndjson": _ndjson(_valid(1))}, mode="w")
+    (tmp_path / "sem-extensao").write_bytes(_valid(2))
+
+    items = list(iter_bundles([tmp_path / "sem-extensao", tmp_path / "lote.tar"]))
+
+    assert [(item.line, item.body) for item in items] == [(0, _valid(2)), (1, _valid(1))]
+
+
+def test_iter_bundles_rejects_missing_path(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        list(iter_bundles([tmp_path / "inexistente.ndjson"]))
+
+
+@pytest.mark.parametrize("chunk_size, max_pending", [(200, 8), (1, 1), (3, 2)])
+def test_validate_bundles_reports_each_file(inputs, chunk_size, max_pending):
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        reports = list(validate_bundles(iter_bundles([inputs]), executor, chunk_size, max_pending=max_pending))
+
+    summary = [(_relative(report.source, inputs), report.bundles, report.valid, report.invalid)
+               for report in reports]
+    assert summary == [
+        ("a.json", 1, 1, 0),
+        ("b.ndjson", 3, 2, 1),
+        ("c.ndjson.gz", 2, 1, 1),
+        ("d.json.gz", 1, 0, 1),
+        ("e.tar.gz:lote/x.json", 1, 1, 0),
+        ("e.tar.gz:lote/y.jsonl", 2, 2, 0),
+    ]
+
+    b_report, c_report = reports[1], reports[2]
+    assert b_report.errors_by_field == {"type": 1}
+    assert b_report.failures[0][0] == 2
+    assert c_report.errors_by_field == {INVALID_JSON_FIELD: 1}
+    assert c_report.failures[0][1].startswith("JSON malformado")
+
+
+def test_non_object_and_broken_bundles_are_reported(tmp_path):
+    broken = build_sample_bundle(seed=1)
+    broken["entry"][1] = "nao-e-objeto"
+    (tmp_path / "ruins.ndjson").write_bytes(_ndjson(b"[1, 2]", b'"texto"', json.dumps(broken).encode("utf-8")))
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        (report,) = validate_bundles(iter_bundles([tmp_path]), executor)
+
+    assert report.invalid == 3
+    assert report.errors_by_field == {INVALID_JSON_FIELD: 2, VALIDATION_FAILURE_FIELD: 1}
+
+
+def test_failures_listed_per_file_are_capped(tmp_path):
+    (tmp_path / "muitos.ndjson").write_bytes(_ndjson(*[b"{"] * (MAX_FAILURES_PER_FILE + 5)))
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        (report,) = validate_bundles(iter_bundles([tmp_path]), executor, chunk_size=7)
+
+    assert report.invalid == MAX_FAILURES_PER_FILE + 5
+    assert report.errors_by_field[INVALID_JSON_FIELD] == MAX_FAILURES_PER_FILE + 5
+    assert [line for line, _ in report.failures] == list(range(1, MAX_FAILURES_PER_FILE + 1))
+
+
+def test_validate_bundles_in_process_pool(inputs):
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        reports = list(validate_bundles(iter_bundles([inputs]), executor, chunk_size=2))
+
+    assert sum(report.bundles for report in reports) == 10
+    assert sum(report.valid for report in reports) == 7
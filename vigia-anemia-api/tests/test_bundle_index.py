@@ -0,0 +1,178 @@
+"""
+Testes do BundleIndex: cada regra do perfil SES-GO (aprovação e recusa) e
+paridade da extração de metadados com a implementação anterior ao índice.
+"""
+import json
+from typing import Any, Dict, Tuple
+
+import pytest
+
+from scripts.sample_bundles import build_sample_bundle
+from src.core.config import settings
+from src.domain.fhir_structs import decode_bundle
+from src.domain.models import LoincCode
+from src.validators.fhir_validator import get_fhir_validator
+from src.validators.profile_rules import RuleSpec, ValidationProfile, compile_profile
+
+HEMOGLOBINA = LoincCode.HEMOGLOBINA.value
+
+
+def _decoded(bundle: dict, typed: bool):
+    return decode_bundle(json.dumps(bundle).encode("utf-8"), typed=typed)
+
+
+def _observations(bundle: dict):
+    return [entry["resource"] for entry in bundle["entry"] if entry["resource"]["resourceType"] == "Observation"]
+
+
+def _simple(bundle: dict, code: str) -> dict:
+    return next(
+        resource for resource in _observations(bundle)
+        if resource["code"]["coding"][0]["code"] == code
+    )
+
+
+def _set_cpf(bundle: dict, cpf: str) -> None:
+    for resource in _observations(bundle):
+        resource["subject"]["identifier"]["value"] = cpf
+
+
+def _set_cnes(bundle: dict, cnes: str) -> None:
+    for resource in _observations(bundle):
+        resource["performer"][0]["identifier"]["value"] = cnes
+
+
+def _drop_entry(bundle: dict, code: str) -> None:
+    bundle["entry"] = [
+        entry for entry in bundle["entry"]
+        if entry["resource"]["code"]["coding"][0]["code"] != code
+    ]
+
+
+def _specimen(bundle: dict) -> dict:
+    return _simple(bundle, HEMOGLOBINA)["contained"][0]
+
+
+# Alteração que faz cada regra falhar -> campo do primeiro erro
+RULE_FAILURES = {
+    "resource_type": (lambda b: b.update(resourceType="Parameters"), "resourceType"),
+    "meta_profile": (lambda b: b["meta"].update(profile=["http://outro.perfil/Bundle"]), "meta.profile"),
+    "bundle_type": (lambda b: b.update(type="batch"), "type"),
+    "entries_present": (lambda b: b.update(entry=[]), "entry"),
+    "required_codes": (lambda b: _drop_entry(b, HEMOGLOBINA), "entry[].resource.code.coding[].code"),
+    "patient_cpf": (lambda b: _set_cpf(b, "12345678900"), "subject.identifier.value"),
+    "laboratory_cnes": (lambda b: _set_cnes(b, "12AB"), "performer[laboratorio].identifier.value"),
+    "composite_exam": (
+        lambda b: b["entry"][0]["resource"]["code"]["coding"][0].update(code="00000-0"), "entry[].resource"
+    ),
+    "composite_exam_members": (lambda b: b["entry"][0]["resource"]["hasMember"].pop(), "hasMember"),
+    "reference_integrity": (
+        lambda b: b["entry"][0]["resource"]["hasMember"][0].update(reference="urn:uuid:x"), "hasMember[].reference"
+    ),
+    "specimen_reference": (
+        lambda b: _simple(b, HEMOGLOBINA).update(specimen={"reference": "amostra"}), "specimen.reference"
+    ),
+    "specimen_contained": (lambda b: _simple(b, HEMOGLOBINA).update(contained=[]), "contained"),
+    "specimen_type": (
+        lambda b: _specimen(b)["type"]["coding"][0].update(code="SER"), "contained[Specimen].type.coding[0].code"
+    ),
+    "specimen_collected_at": (
+        lambda b: _specimen(b).update(collection={}), "contained[Specimen].collection.collectedDateTime"
+    ),
+    "plausible_values": (
+        lambda b: _simple(b, HEMOGLOBINA)["valueQuantity"].update(value=200.0), "entry[2].resource.valueQuantity"
+    ),
+}
+
+
+@pytest.mark.parametrize("typed", [True, False])
+def test_sample_bundle_passes_every_rule(typed):
+    result = get_fhir_validator().validate(_decoded(build_sample_bundle(seed=4), typed))
+    assert result.is_valid, result.errors
+
+
+@pytest.mark.parametrize("typed", [True, False])
+@pytest.mark.parametrize("rule", sorted(RULE_FAILURES))
+def test_each_rule_rejects_its_violation(rule, typed):
+    mutate, field = RULE_FAILURES[rule]
+    bundle = build_sample_bundle(seed=4)
+    mutate(bundle)
+
+    result = get_fhir_validator().validate(_decoded(bundle, typed))
+
+    assert not result.is_valid
+    # As regras param na primeira falha: um único erro, o da regra alterada
+    assert [error.field for error in result.errors] == [field]
+
+
+def test_versioned_profile_reference_is_accepted():
+    bundle = build_sample_bundle(seed=4)
+    bundle["meta"]["profile"] = [f"{settings.fhir_profile_url}|1.0.0"]
+    assert get_fhir_validator().validate(bundle).is_valid
+
+
+def test_unknown_rule_fails_at_compile_time():
+    profile = ValidationProfile(url="http://teste/perfil", version="1", rules=[RuleSpec(check="inexistente")])
+    with pytest.raises(ValueError, match="inexistente"):
+        compile_profile(profile)
+
+
+def _baseline_extract_metadata(bundle: Dict[str, Any]) -> Tuple[str, str]:
+    """HemogramaService.extract_metadata anterior ao BundleIndex (referência da paridade)."""
+    laboratory_cnes = "0000000"
+    patient_cpf = "00000000000"
+    for entry in bundle.get("entry", []):
+        resource = entry.get("resource", {})
+        if resource.get("resourceType") != "Observation":
+            continue
+        identifier = resource.get("subject", {}).get("identifier", {})
+        if identifier.get("system") == "https://fhir.saude.go.gov.br/sid/cpf":
+            patient_cpf = identifier.get("value", patient_cpf)
+        for performer in resource.get("performer", []):
+            if performer.get("id") == "laboratorio":
+                lab_identifier = performer.get("identifier", {})
+                if lab_identifier.get("system") == "https://fhir.saude.go.gov.br/sid/cnes":
+                    laboratory_cnes = lab_identifier.get("value", laboratory_cnes)
+        if laboratory_cnes != "0000000" and patient_cpf != "00000000000":
+            break
+    return laboratory_cnes, patient_cpf
+
+
+def _without_identifiers_on_first(bundle: dict) -> dict:
+    first = bundle["entry"][0]["resource"]
+    del first["subject"]
+    first["performer"] = first["performer"][1:]
+    return bundle
+
+
+def _without_any_identifier(bundle: dict) -> dict:
+    for resource in _observations(bundle):
+        resource["subject"]["identifier"]["system"] = "urn:outro"
+        resource["performer"][0]["id"] = "outro"
+    return bundle
+
+
+def _with_foreign_patient(bundle: dict) -> dict:
+    bundle["entry"].insert(0, {"resource": {
+        "resourceType": "Patient",
+        "subject": {"identifier": {"system": "https://fhir.saude.go.gov.br/sid/cpf", "value": "11144477735"}},
+    }})
+    return bundle
+
+
+PARITY_CASES = {
+    "amostra": lambda seed: build_sample_bundle(seed=seed, cnes=f"{seed:07d}"),
+    "primeira_sem_identificadores": lambda seed: _without_identifiers_on_first(build_sample_bundle(seed=seed)),
+    "sem_identificadores": lambda seed: _without_any_identifier(build_sample_bundle(seed=seed)),
+    "patient_fora_de_observation": lambda seed: _with_foreign_patient(build_sample_bundle(seed=seed)),
+}
+
+
+@pytest.mark.parametrize("typed", [True, False])
+@pytest.mark.parametrize("case", sorted(PARITY_CASES))
+def test_metadata_matches_baseline_extraction(case, typed):
+    validator = get_fhir_validator()
+    for seed in range(5):
+        bundle = PARITY_CASES[case](seed)
+        index = validator.build_index(_decoded(bundle, typed))
+        assert (index.laboratory_cnes, index.patient_cpf) == _baseline_extract_metadata(bundle)
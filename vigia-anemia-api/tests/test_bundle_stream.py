@@ -0,0 +1,103 @@
+"""
+Testes do scanner incremental do cabeçalho do Bundle.
+"""
+import json
+import time
+
+import pytest
+
+from src.validators.bundle_stream import BundleHeaderScanner
+
+PROFILE = "https://fhir.saude.go.gov.br/r4/exame/StructureDefinition/exame-hemograma"
+
+
+def _scanner(**kwargs) -> BundleHeaderScanner:
+    return BundleHeaderScanner(lambda reference: reference == PROFILE, PROFILE, **kwargs)
+
+
+def _feed(payload: bytes, chunk_size: int, scanner=None):
+    """Alimenta o payload em chunks até o scanner concluir; retorna (erros, scanner)."""
+    scanner = scanner or _scanner()
+    for start in range(0, len(payload), chunk_size):
+        errors = scanner.feed(payload[start:start + chunk_size])
+        if errors or not scanner.active:
+            return errors, scanner
+    return [], scanner
+
+
+def _bundle(**header) -> bytes:
+    bundle = {
+        "resourceType": "Bundle",
+        "meta": {"profile": [PROFILE]},
+        "type": "collection",
+        **header,
+        "entry": [{"resource": {"resourceType": "Observation"}}],
+    }
+    return json.dumps(bundle, ensure_ascii=False).encode("utf-8")
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 4096])
+@pytest.mark.parametrize(
+    "payload, fields",
+    [
+        (_bundle(), []),
+        (_bundle(resourceType="Patient"), ["resourceType"]),
+        (_bundle(type="batch"), ["type"]),
+        (_bundle(meta={"profile": ["http://outro"]}), ["meta.profile"]),
+        (_bundle(meta={"profile": [PROFILE], "tag": [{"code": "]}\\\""}]}), []),
+        (_bundle(resourceType="Pacientê"), ["resourceType"]),
+        (b' {"id" : "a\\"b}" , "total": 12, "resourceType":"Patient"}', ["resourceType"]),
+    ],
+)
+def test_result_does_not_depend_on_chunking(payload, fields, chunk_size):
+    errors, scanner = _feed(payload, chunk_size)
+
+    assert [error.field for error in errors] == fields
+    assert not scanner.active
+
+
+def test_stops_at_first_non_header_compound_value():
+    errors, scanner = _feed(b'{"resourceType":"Bundle","entry":[', 4096)
+
+    assert errors == []
+    assert not scanner.active
+
+
+@pytest.mark.parametrize("payload", [b"[1, 2]", b'{"resourceType" "Bundle"}', b'{"a": 1 "b": 2}'])
+def test_malformed_start_raises_value_error(payload):
+    with pytest.raises(ValueError):
+        _feed(payload, 1)
+
+
+@pytest.mark.parametrize("key", ["resourceType", "id"])
+def test_large_scalar_in_small_chunks_is_bounded(key):
+    # Valor escalar de 4 MB enviado em chunks de 64 bytes
+    payload = b'{"' + key.encode() + b'": "' + b"A" * (4 * 1024 * 1024) + b'"}'
+
+    start = time.perf_counter()
+    errors, scanner = _feed(payload, 64)
+    elapsed = time.perf_counter() - start
+
+    assert errors == []
+    assert not scanner.active
+    assert elapsed < 0.5
+
+
+def test_each_chunk_is_scanned_once():
+    # Sem orçamento, o custo continua linear no tamanho do valor
+    payload = b'{"id": "' + b"A" * (2 * 1024 * 1024) + b'", "resourceType": "Patient"}'
+    scanner = _scanner(max_chars=len(payload))
+
+    start = time.perf_counter()
+    errors, _ = _feed(payload, 64, scanner)
+    elapsed = time.perf_counter() - start
+
+    assert [error.field for error in errors] == ["resourceType"]
+    assert elapsed < 1.0
+
+
+def test_header_budget_makes_scanner_passive():
+    errors, scanner = _feed(b'{"id": "' + b"A" * 100 + b'"}', 8, _scanner(max_chars=32))
+
+    assert errors == []
+    assert not scanner.active
@@ -0,0 +1,142 @@
+"""
+Testes da decodificação tipada (msgspec) e da paridade com o caminho de
+dicionários: mesmo índice e mesmos erros de validação nos dois caminhos.
+"""
+import json
+
+import pytest
+
+from scripts.sample_bundles import build_sample_bundle
+from src.domain import fhir_structs
+from src.domain.fhir_structs import decode_bundle, dumps, loads
+from src.validators.fhir_validator import get_fhir_validator
+
+requires_msgspec = pytest.mark.skipif(not fhir_structs.FAST_DECODING_AVAILABLE, reason="msgspec ausente")
+
+INDEX_FIELDS = (
+    "resource_type", "bundle_type", "profiles", "entry_count", "cpfs", "cnes",
+    "implausible", "full_urls", "duplicate_full_urls", "loinc_counts",
+)
+
+
+def _body(bundle: dict) -> bytes:
+    return json.dumps(bundle).encode("utf-8")
+
+
+def _index_fields(index) -> dict:
+    fields = {name: getattr(index, name) for name in INDEX_FIELDS}
+    fields["loinc_index"] = sorted(index.loinc_index)
+    fields["resources_by_type"] = {key: len(value) for key, value in index.resources_by_type.items()}
+    fields["composite"] = index.composite is not None
+    return fields
+
+
+def _first_observation(bundle: dict) -> dict:
+    return bundle["entry"][1]["resource"]
+
+
+# Alterações de conteúdo (o caminho tipado continua sendo usado)
+CONTENT_CASES = {
+    "valido": lambda b: None,
+    "tipo_do_bundle": lambda b: b.update(type="batch"),
+    "sem_perfil": lambda b: b.pop("meta"),
+    "sem_entries": lambda b: b.update(entry=[]),
+    "cpf_invalido": lambda b: _first_observation(b)["subject"]["identifier"].update(value="123"),
+    "valor_implausivel": lambda b: _first_observation(b)["valueQuantity"].update(value=1e6),
+    "campos_desconhecidos": lambda b: _first_observation(b).update(status="final", issued="2024-11-27"),
+    "full_url_duplicada": lambda b: b["entry"][2].update(fullUrl=b["entry"][1]["fullUrl"]),
+}
+
+# Divergências de tipo reportadas pelo validador: o caminho tipado recai em dicionários
+TYPE_MISMATCH_CASES = {
+    "valor_texto": lambda b: _first_observation(b)["valueQuantity"].update(value="12,5"),
+    "perfil_nao_array": lambda b: b["meta"].update(profile="http://perfil"),
+}
+
+# Divergências estruturais: só a recaída em dicionários é verificada
+STRUCTURAL_MISMATCH_CASES = {
+    "coding_nao_array": lambda b: _first_observation(b)["code"].update(coding={"code": "718-7"}),
+    "entry_nao_array": lambda b: b.update(entry={"resource": {}}),
+}
+
+PARITY_CASES = {**CONTENT_CASES, **TYPE_MISMATCH_CASES}
+FALLBACK_CASES = {**TYPE_MISMATCH_CASES, **STRUCTURAL_MISMATCH_CASES}
+
+
+@requires_msgspec
+def test_typed_decoding_maps_camel_case_fields():
+    bundle = build_sample_bundle(seed=1)
+    decoded = decode_bundle(_body(bundle))
+
+    assert isinstance(decoded, fhir_structs.Bundle)
+    assert decoded.resource_type == "Bundle"
+    assert decoded.meta.profile == bundle["meta"]["profile"]
+    composite = decoded.entry[0].resource
+    assert len(composite.has_member) == len(bundle["entry"][0]["resource"]["hasMember"])
+    observation = decoded.entry[1].resource
+    assert observation.value_quantity.value == bundle["entry"][1]["resource"]["valueQuantity"]["value"]
+    assert observation.contained[0].collection.collected_date_time is not None
+
+
+def test_untyped_decoding_returns_dict():
+    bundle = build_sample_bundle(seed=1)
+    assert decode_bundle(_body(bundle), typed=False) == bundle
+
+
+@requires_msgspec
+@pytest.mark.parametrize("case", sorted(FALLBACK_CASES))
+def test_type_mismatch_falls_back_to_dict(case):
+    bundle = build_sample_bundle(seed=1)
+    FALLBACK_CASES[case](bundle)
+    assert decode_bundle(_body(bundle)) == bundle
+
+
+@pytest.mark.parametrize("typed", [True, False])
+@pytest.mark.parametrize("body", [b'{"resourceType": "Bundle",', b"", b"nao-json"])
+def test_malformed_json_raises_value_error(body, typed):
+    with pytest.raises(ValueError):
+        decode_bundle(body, typed=typed)
+
+
+@pytest.mark.parametrize("case", sorted(PARITY_CASES))
+def test_typed_and_dict_paths_agree(case):
+    mutate = PARITY_CASES[case]
+    validator = get_fhir_validator()
+    for seed in range(3):
+        bundle = build_sample_bundle(seed=seed)
+        mutate(bundle)
+        body = _body(bundle)
+
+        typed = validator.validate(decode_bundle(body, typed=True))
+        untyped = validator.validate(decode_bundle(body, typed=False))
+
+        assert typed.is_valid == untyped.is_valid
+        assert [error.model_dump() for error in typed.errors] == [error.model_dump() for error in untyped.errors]
+        assert _index_fields(typed.index) == _index_fields(untyped.index)
+
+
+def test_dict_fallback_without_msgspec(monkeypatch):
+    monkeypatch.setattr(fhir_structs, "_bundle_decoder", None)
+    monkeypatch.setattr(fhir_structs, "_generic_decoder", None)
+    monkeypatch.setattr(fhir_structs, "_generic_encoder", None)
+    bundle = build_sample_bundle(seed=1)
+
+    decoded = decode_bundle(_body(bundle))
+    assert decoded == bundle
+    assert get_fhir_validator().validate(decoded).is_valid
+
+
+@pytest.mark.parametrize("fast", ["msgspec", "orjson", "json"])
+def test_loads_and_dumps_round_trip(fast, monkeypatch):
+    if fast != "msgspec":
+        monkeypatch.setattr(fhir_structs, "_generic_decoder", None)
+        monkeypatch.setattr(fhir_structs, "_generic_encoder", None)
+    if fast == "json":
+        monkeypatch.setattr(fhir_structs, "orjson", None)
+    value = {"texto": "Hemácias", "lista": [1, 2.5, None, True], "aninhado": {"a": "b"}}
+
+    encoded = dumps(value)
+    assert isinstance(encoded, bytes)
+    assert b" " not in encoded.replace("Hemácias".encode("utf-8"), b"")
+    assert loads(encoded) == value
+    assert json.loads(encoded) == value
@@ -0,0 +1,80 @@
+"""
+Testes da API de resultado do FHIRValidator (ValidationResult).
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from scripts.sample_bundles import build_sample_bundle
+from src.domain.fhir_structs import decode_bundle
+from src.validators import fhir_validator as fhir_validator_module
+from src.validators.bundle_index import BundleIndex
+from src.validators.fhir_validator import FHIRValidator, ValidationResult, get_fhir_validator
+
+
+def _decoded(bundle: dict, typed: bool):
+    return decode_bundle(json.dumps(bundle).encode("utf-8"), typed=typed)
+
+
+def _invalid_bundle() -> dict:
+    bundle = build_sample_bundle(seed=2)
+    bundle["type"] = "transaction"
+    return bundle
+
+
+@pytest.mark.parametrize("typed", [True, False])
+def test_valid_bundle_result(typed):
+    result = get_fhir_validator().validate(_decoded(build_sample_bundle(seed=2), typed))
+
+    assert isinstance(result, ValidationResult)
+    is_valid, errors, index = result
+    assert is_valid is True and result.is_valid is True
+    assert errors == [] and result.errors == []
+    assert isinstance(index, BundleIndex)
+    assert index.laboratory_cnes and index.patient_cpf
+
+
+@pytest.mark.parametrize("typed", [True, False])
+def test_invalid_bundle_result(typed):
+    result = get_fhir_validator().validate(_decoded(_invalid_bundle(), typed))
+
+    assert not result.is_valid
+    assert [error.field for error in result.errors] == ["type"]
+    assert result.errors[0].received == "transaction"
+    # O índice acompanha também o resultado inválido (ex.: CNES para métricas)
+    assert isinstance(result.index, BundleIndex)
+
+
+def test_prebuilt_index_is_reused():
+    validator = FHIRValidator()
+    bundle = build_sample_bundle(seed=2)
+    index = validator.build_index(bundle)
+
+    result = validator.validate(bundle, index)
+    assert result.index is index
+
+
+def test_results_are_independent_across_calls():
+    validator = FHIRValidator()
+    bundles = [build_sample_bundle(seed=seed) if seed % 2 else _invalid_bundle() for seed in range(40)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(validator.validate, bundles))
+
+    assert [result.is_valid for result in results] == [bool(seed % 2) for seed in range(40)]
+    assert all(len(result.errors) == (0 if result.is_valid else 1) for result in results)
+    error_lists = [id(result.errors) for result in results]
+    assert len(set(error_lists)) == len(error_lists)
+
+
+def test_success_is_logged_at_debug(monkeypatch):
+    levels = []
+
+    class _Recorder:
+        def __getattr__(self, level):
+            return lambda event, **fields: levels.append(level)
+
+    monkeypatch.setattr(fhir_validator_module, "logger", _Recorder())
+    assert FHIRValidator().validate(build_sample_bundle(seed=2)).is_valid
+    assert levels == ["debug"]
@@ -0,0 +1,99 @@
+"""
+Testes do backend de fila em log local (QUEUE_BACKEND=file).
+"""
+import asyncio
+
+import pytest
+
+from src.infrastructure.queue_backends import IN_PROCESS_BACKENDS, FileLogQueueBackend, InMemoryQueueBackend
+from src.infrastructure.spool import SpoolLockedError
+from src.worker.consumer import HemogramaWorker
+from src.worker.results import MemoryResultSink
+
+
+def _entry(number: int) -> dict:
+    return {
+        "MessageBody": f"corpo-{number}",
+        "MessageAttributes": {"TrackingId": {"DataType": "String", "StringValue": f"t-{number}"}},
+    }
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = FileLogQueueBackend(str(tmp_path), fsync_interval_ms=10)
+    yield backend
+    backend.close()
+
+
+def test_send_runs_off_the_event_loop():
+    # Escrita em disco: o QueueService chama send no executor
+    assert FileLogQueueBackend.blocking
+    assert IN_PROCESS_BACKENDS == {"memory", "file"}
+
+
+def test_send_receive_delete(backend):
+    for number in range(3):
+        backend.send(_entry(number))
+
+    messages = backend.receive(10, 0, 30)
+    assert [message.body for message in messages] == ["corpo-0", "corpo-1", "corpo-2"]
+    assert messages[0].attributes == {"TrackingId": "t-0"}
+
+    backend.delete_batch([message.receipt_handle for message in messages])
+    assert backend.get_attributes()["ApproximateNumberOfMessages"] == "0"
+    assert backend.get_attributes()["ApproximateNumberOfMessagesNotVisible"] == "0"
+
+
+def test_unconfirmed_messages_are_redelivered_after_reopen(tmp_path):
+    backend = FileLogQueueBackend(str(tmp_path))
+    for number in range(3):
+        backend.send(_entry(number))
+    first, second, third = backend.receive(10, 0, 30)
+    # Só o prefixo contínuo de removidas é confirmado
+    backend.delete_batch([first.receipt_handle, third.receipt_handle])
+    backend.close()
+
+    reopened = FileLogQueueBackend(str(tmp_path))
+    assert [message.body for message in reopened.receive(10, 0, 30)] == ["corpo-1", "corpo-2"]
+    reopened.close()
+
+
+def test_expired_visibility_redelivers(backend):
+    backend.send(_entry(0))
+    backend.receive(1, 0, 0)
+
+    assert [message.body for message in backend.receive(1, 0, 30)] == ["corpo-0"]
+
+
+def test_second_process_cannot_open_the_log(backend, tmp_path):
+    with pytest.raises(SpoolLockedError, match="único processo"):
+        FileLogQueueBackend(str(tmp_path))
+
+
+async def test_worker_consumes_in_process_backend():
+    backend = InMemoryQueueBackend()
+    for number in range(12):
+        backend.send(_entry(number))
+
+    worker = HemogramaWorker(
+        backend,
+        MemoryResultSink(),
+        process=lambda bodies: [(True, {"body": body}) for body in bodies],
+        wait_time_s=0.05,
+        delete_interval_ms=10,
+    )
+    task = asyncio.get_running_loop().create_task(worker.run())
+    for _ in range(200):
+        if worker.stats.processed == 12:
+            break
+        await asyncio.sleep(0.01)
+    worker.stop()
+    await task
+
+    assert worker.stats.processed == 12
+    assert backend.get_attributes() == {
+        "ApproximateNumberOfMessages": "0",
+        "ApproximateNumberOfMessagesNotVisible": "0",
+        "ApproximateNumberOfMessagesDelayed": "0",
+        "NumberOfMessagesAdded": "12",
+    }
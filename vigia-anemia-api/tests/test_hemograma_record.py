@@ -0,0 +1,134 @@
+"""
+Testes do HemogramaRecord: construção a partir do Bundle e round-trip do
+layout binário (to_bytes/from_bytes e leitura em lote).
+"""
+import math
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from scripts.sample_bundles import build_sample_bundle
+from src.domain.hemograma_record import (
+    FORMAT_VERSION,
+    RECORD_DTYPE,
+    RECORD_SIZE,
+    RESULT_CODES,
+    SEX_FEMALE,
+    SEX_MALE,
+    SEX_UNKNOWN,
+    HemogramaRecord,
+    parse_timestamp,
+    read_record_batch,
+    records_to_matrix,
+)
+from src.domain.models import LoincCode
+
+
+def _record(seed: int, gender=None, birth_date=None) -> HemogramaRecord:
+    bundle = build_sample_bundle(seed=seed, birth_date=birth_date, gender=gender)
+    return HemogramaRecord.from_bundle(
+        bundle,
+        tracking_id=str(uuid4()),
+        patient_cpf="52998224725",
+        laboratory_cnes="2338424",
+        received_at="2024-11-27T11:31:00Z",
+    )
+
+
+def _same(left: HemogramaRecord, right: HemogramaRecord) -> None:
+    assert left.tracking_id == right.tracking_id
+    assert left.patient_cpf == right.patient_cpf
+    assert left.laboratory_cnes == right.laboratory_cnes
+    assert left.sex == right.sex
+    for field in ("collected_at", "received_at", "birth_date"):
+        np.testing.assert_equal(getattr(left, field), getattr(right, field))
+    np.testing.assert_array_equal(np.array(left.values), np.array(right.values))
+
+
+def test_from_bundle_normalizes_units_and_reads_patient():
+    bundle = build_sample_bundle(seed=6, birth_date="1990-05-17", gender="female")
+    for entry in bundle["entry"]:
+        quantity = entry["resource"].get("valueQuantity")
+        if entry["resource"]["code"]["coding"][0]["code"] == LoincCode.HEMOGLOBINA.value:
+            quantity.update(value=125.0, unit="g/L", code="g/L")
+        if entry["resource"]["code"]["coding"][0]["code"] == LoincCode.RDW.value:
+            quantity.update(unit="furlong", code="furlong")
+
+    record = HemogramaRecord.from_bundle(bundle, str(uuid4()), "52998224725", "2338424")
+
+    assert record.value(LoincCode.HEMOGLOBINA.value) == pytest.approx(12.5)
+    # Unidade não reconhecida: resultado ausente
+    assert math.isnan(record.value(LoincCode.RDW.value))
+    assert record.sex == SEX_FEMALE
+    assert record.birth_date == parse_timestamp("1990-05-17")
+    assert record.collected_at == parse_timestamp("2024-11-27T08:30:00-03:00")
+    assert len(record.results()) == len(RESULT_CODES) - 1
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2024", "2024-01-01"),
+    ("2024-03", "2024-03-01"),
+    ("2024-03-05", "2024-03-05"),
+    ("2024-03-05T10:00:00Z", "2024-03-05T10:00:00+00:00"),
+])
+def test_partial_fhir_dates_are_completed(value, expected):
+    assert parse_timestamp(value) == parse_timestamp(expected)
+
+
+@pytest.mark.parametrize("value", [None, "", "ontem", "2024-13-01"])
+def test_invalid_dates_are_nan(value):
+    assert math.isnan(parse_timestamp(value))
+
+
+@pytest.mark.parametrize("gender, birth_date, sex", [
+    ("female", "1990-05-17", SEX_FEMALE),
+    ("male", "2019-01-02", SEX_MALE),
+    (None, None, SEX_UNKNOWN),
+])
+def test_bytes_round_trip(gender, birth_date, sex):
+    record = _record(seed=7, gender=gender, birth_date=birth_date)
+    record.values[3] = math.nan
+
+    data = record.to_bytes()
+    assert len(data) == RECORD_SIZE
+    restored = HemogramaRecord.from_bytes(data)
+
+    assert restored.sex == sex
+    _same(record, restored)
+
+
+def test_empty_tracking_id_round_trips():
+    record = HemogramaRecord("", "52998224725", "2338424")
+    restored = HemogramaRecord.from_bytes(record.to_bytes())
+    assert restored.tracking_id == ""
+    _same(record, restored)
+
+
+def test_from_bytes_rejects_wrong_size_and_version():
+    data = _record(seed=8).to_bytes()
+    with pytest.raises(ValueError, match="bytes"):
+        HemogramaRecord.from_bytes(data[:-1])
+    with pytest.raises(ValueError, match="Versão"):
+        HemogramaRecord.from_bytes(bytes([FORMAT_VERSION + 1]) + data[1:])
+
+
+def test_read_record_batch_matches_records():
+    records = [_record(seed, gender="male", birth_date="2000-01-01") for seed in range(3)]
+    records.append(HemogramaRecord("", "52998224725", "2338424"))
+
+    batch = read_record_batch(b"".join(record.to_bytes() for record in records))
+
+    assert batch.dtype == RECORD_DTYPE and RECORD_DTYPE.itemsize == RECORD_SIZE
+    assert len(batch) == len(records)
+    np.testing.assert_array_equal(batch["values"], records_to_matrix(records))
+    np.testing.assert_array_equal(batch["sex"], [record.sex for record in records])
+    np.testing.assert_array_equal(batch["birth_date"], [record.birth_date for record in records])
+    assert [cnes.decode() for cnes in batch["laboratory_cnes"]] == ["2338424"] * len(records)
+    # Cada linha do lote reconstrói o mesmo registro
+    for row, record in zip(batch, records):
+        _same(HemogramaRecord.from_bytes(row.tobytes()), record)
+
+
+def test_records_to_matrix_of_empty_batch():
+    assert records_to_matrix([]).shape == (0, len(RESULT_CODES))
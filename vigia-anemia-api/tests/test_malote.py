@@ -0,0 +1,87 @@
+"""
+Regressão: particionamento de malotes em um Bundle por hemograma.
+"""
+import json
+
+import pytest
+
+from scripts.sample_bundles import build_sample_bundle, build_sample_malote
+from src.validators import malote as malote_module
+from src.validators.malote import split_malote, validate_partitions
+
+# Entries por hemograma do exemplo: exame composto + exames simples
+ENTRIES_PER_EXAM = len(build_sample_bundle(seed=0)["entry"])
+
+
+@pytest.fixture(params=["raw", "dict"])
+def decoding(request, monkeypatch):
+    """Executa cada teste com entries brutas (msgspec) e com dicionários."""
+    if request.param == "dict":
+        monkeypatch.setattr(malote_module, "decode_malote", lambda body: None)
+    return request.param
+
+
+def _encode(bundle: dict) -> bytes:
+    return json.dumps(bundle).encode("utf-8")
+
+
+def test_split_yields_one_valid_bundle_per_exam(decoding):
+    malote = build_sample_malote(3, seed=5)
+
+    partitions, errors = split_malote(_encode(malote))
+
+    assert errors == []
+    assert [partition.index for partition in partitions] == [0, 1, 2]
+    for number, partition in enumerate(partitions):
+        bundle = json.loads(partition.body)
+        expected = malote["entry"][number * ENTRIES_PER_EXAM:(number + 1) * ENTRIES_PER_EXAM]
+        assert bundle["entry"] == expected
+        assert partition.composite_full_url == expected[0]["fullUrl"]
+        assert bundle["meta"] == malote["meta"]
+        assert bundle["type"] == malote["type"]
+
+    outcomes = validate_partitions([partition.body for partition in partitions])
+    assert [outcome.is_valid for outcome in outcomes] == [True] * 3
+    assert len({outcome.patient_cpf for outcome in outcomes}) == 3
+
+
+def test_orphan_entries_are_reported(decoding):
+    malote = build_sample_malote(2, seed=1)
+    malote["entry"].append({"fullUrl": "urn:uuid:orfa", "resource": {"resourceType": "Observation"}})
+
+    partitions, errors = split_malote(_encode(malote))
+
+    assert len(partitions) == 2
+    assert len(errors) == 1
+    assert errors[0].field == "entry[]"
+    assert errors[0].received == "1 entries órfãs"
+    assert str(2 * ENTRIES_PER_EXAM) in errors[0].description
+
+
+def test_member_shared_by_two_composites_stays_in_first(decoding):
+    malote = build_sample_malote(2, seed=1)
+    first_member = malote["entry"][0]["resource"]["hasMember"][0]["reference"]
+    malote["entry"][ENTRIES_PER_EXAM]["resource"]["hasMember"].append({"reference": first_member})
+
+    partitions, errors = split_malote(_encode(malote))
+
+    assert errors == []
+    urls = [[entry["fullUrl"] for entry in json.loads(partition.body)["entry"]] for partition in partitions]
+    assert first_member in urls[0]
+    assert first_member not in urls[1]
+
+
+def test_malote_without_composite_has_only_orphans(decoding):
+    malote = build_sample_malote(1)
+    malote["entry"] = malote["entry"][1:]
+
+    partitions, errors = split_malote(_encode(malote))
+
+    assert partitions == []
+    assert errors[0].received == f"{ENTRIES_PER_EXAM - 1} entries órfãs"
+
+
+@pytest.mark.parametrize("body", [b"{", b"[]", b"null"])
+def test_invalid_payload_raises_value_error(decoding, body):
+    with pytest.raises(ValueError):
+        split_malote(body)
@@ -0,0 +1,128 @@
+"""
+Testes do envelope zstd das mensagens de fila: ida e volta, cabeçalho
+versionado, troca de dicionário e integração com o QueueService.
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from scripts.sample_bundles import build_sample_bundle
+from src.core.config import settings
+from src.domain.models import QueueMessage
+from src.infrastructure.message_envelope import (
+    CONTENT_ENCODING,
+    DEFAULT_DICTIONARY_PATH,
+    EnvelopeCodec,
+    build_envelope_codec,
+    decode_message_body,
+    load_dictionary,
+)
+from src.infrastructure.queue_backends import InMemoryQueueBackend
+from src.infrastructure.queue_service import QueueService
+
+zstandard = pytest.importorskip("zstandard")
+
+
+def _message(seed: int = 1) -> QueueMessage:
+    bundle = build_sample_bundle(seed=seed)
+    return QueueMessage(
+        tracking_id=uuid4(),
+        fhir_bundle_raw=json.dumps(bundle).encode("utf-8"),
+        received_at=datetime.utcnow(),
+        laboratory_cnes="2338424",
+        patient_cpf="52998224725",
+        correlation_id=f"c-{seed}",
+    )
+
+
+@pytest.fixture(scope="module")
+def codec() -> EnvelopeCodec:
+    return build_envelope_codec()
+
+
+@pytest.fixture(scope="module")
+def other_dictionary():
+    samples = [_message(seed).to_json().encode("utf-8") for seed in range(200, 300)]
+    return zstandard.train_dictionary(4096, samples)
+
+
+def test_round_trip_with_distributed_dictionary(codec):
+    body = _message().to_json()
+    envelope = codec.encode(body)
+
+    prefix, version, dict_id, _ = envelope.split(":", 3)
+    assert (prefix, int(version), int(dict_id)) == ("zstd", 1, load_dictionary(DEFAULT_DICTIONARY_PATH).dict_id())
+    assert codec.decode(envelope) == body
+
+
+def test_dictionary_improves_compression(codec):
+    body = _message(seed=7).to_json()
+    without_dictionary = EnvelopeCodec([], level=codec.level)
+
+    assert len(codec.encode(body)) < len(without_dictionary.encode(body)) < len(body)
+    assert without_dictionary.decode(without_dictionary.encode(body)) == body
+
+
+def test_plain_json_passes_through(codec):
+    body = _message().to_json()
+    assert codec.decode(body) == body
+    assert decode_message_body(body) == json.loads(body)
+
+
+def test_decode_message_body_requires_codec_for_envelopes(codec):
+    body = _message().to_json()
+    envelope = codec.encode(body)
+
+    assert decode_message_body(envelope, codec) == json.loads(body)
+    with pytest.raises(ValueError, match="codec"):
+        decode_message_body(envelope)
+
+
+def test_unknown_version_and_dictionary_are_rejected(codec):
+    _, _, dict_id, payload = codec.encode("{}").split(":", 3)
+
+    with pytest.raises(ValueError, match="Versão"):
+        codec.decode(f"zstd:2:{dict_id}:{payload}")
+    with pytest.raises(ValueError, match="Dicionário"):
+        codec.decode(f"zstd:1:{int(dict_id) + 1}:{payload}")
+
+
+def test_previous_dictionary_still_decodes_after_rotation(codec, other_dictionary):
+    old_envelope = codec.encode(_message().to_json())
+    rotated = EnvelopeCodec([other_dictionary, load_dictionary(DEFAULT_DICTIONARY_PATH)])
+
+    # Novas mensagens usam o novo dicionário; as já enfileiradas continuam legíveis
+    assert rotated.dict_id == other_dictionary.dict_id() != codec.dict_id
+    assert rotated.decode(old_envelope) == codec.decode(old_envelope)
+    new_envelope = rotated.encode("{}")
+    assert new_envelope.startswith(f"zstd:1:{other_dictionary.dict_id()}:")
+    with pytest.raises(ValueError, match="Dicionário"):
+        codec.decode(new_envelope)
+
+
+def test_codec_is_safe_across_threads(codec):
+    bodies = [_message(seed).to_json() for seed in range(16)]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        decoded = list(executor.map(lambda body: codec.decode(codec.encode(body)), bodies * 4))
+
+    assert decoded == bodies * 4
+
+
+def test_queue_service_sends_compressed_envelope(monkeypatch, codec):
+    monkeypatch.setattr(settings, "queue_envelope_compression", True)
+    monkeypatch.setattr(settings, "queue_envelope_dictionary_path", "")
+    monkeypatch.setattr(settings, "queue_spool_enabled", False)
+    service = QueueService(InMemoryQueueBackend())
+    message = _message()
+    try:
+        entry = service._build_entry(message)
+    finally:
+        service.close()
+
+    assert entry["MessageAttributes"]["ContentEncoding"]["StringValue"] == CONTENT_ENCODING
+    assert entry["MessageBody"].startswith("zstd:1:")
+    assert decode_message_body(entry["MessageBody"], codec) == json.loads(message.to_json())
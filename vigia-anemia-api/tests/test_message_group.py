@@ -0,0 +1,111 @@
+"""
+Testes do MessageGroupId FIFO: estratégias static, cnes e cpf_hash.
+"""
+import zlib
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+from pydantic import ValidationError
+
+from src.core.config import Settings, settings
+from src.domain.models import QueueMessage
+from src.infrastructure.queue_backends import InMemoryQueueBackend
+from src.infrastructure.queue_service import QueueService, message_group_id
+
+PREFIX = "hemograma-processing"
+
+# CPFs válidos (dígitos verificadores corretos)
+CPFS = ["52998224725", "11144477735", "39053344705", "16899535009", "86288366757"]
+
+
+def _message(cnes: str = "2338424", cpf: str = CPFS[0]) -> QueueMessage:
+    return QueueMessage(
+        tracking_id=uuid4(),
+        fhir_bundle={"resourceType": "Bundle"},
+        received_at=datetime.utcnow(),
+        laboratory_cnes=cnes,
+        patient_cpf=cpf,
+        correlation_id="c-1",
+    )
+
+
+@pytest.fixture
+def strategy(monkeypatch):
+    monkeypatch.setattr(settings, "sqs_message_group_id", PREFIX)
+    monkeypatch.setattr(settings, "sqs_message_group_shards", 16)
+
+    def use(name: str) -> None:
+        monkeypatch.setattr(settings, "sqs_message_group_strategy", name)
+
+    return use
+
+
+def test_static_uses_single_group(strategy):
+    strategy("static")
+    groups = {message_group_id(_message(cnes, cpf)) for cnes in ("2338424", "0000001") for cpf in CPFS}
+    assert groups == {PREFIX}
+
+
+def test_cnes_groups_by_laboratory(strategy):
+    strategy("cnes")
+    assert message_group_id(_message("2338424", CPFS[0])) == f"{PREFIX}-cnes-2338424"
+    assert message_group_id(_message("2338424", CPFS[1])) == f"{PREFIX}-cnes-2338424"
+    assert message_group_id(_message("0000001")) == f"{PREFIX}-cnes-0000001"
+
+
+def test_cpf_hash_is_stable_and_hides_the_cpf(strategy):
+    strategy("cpf_hash")
+    group = message_group_id(_message(cpf=CPFS[0]))
+
+    # crc32 não depende de PYTHONHASHSEED: o mesmo grupo em todos os processos
+    assert group == f"{PREFIX}-{zlib.crc32(CPFS[0].encode('ascii')) % 16:03d}"
+    assert CPFS[0] not in group
+    # O mesmo paciente cai no mesmo grupo, com ou sem formatação do CPF
+    assert message_group_id(_message(cnes="0000001", cpf="529.982.247-25")) == group
+
+
+def test_cpf_hash_spreads_patients_across_shards(strategy, monkeypatch):
+    strategy("cpf_hash")
+    monkeypatch.setattr(settings, "sqs_message_group_shards", 4)
+    cpfs = [f"{number:011d}" for number in range(0, 4000, 7)]
+
+    groups = [message_group_id(_message(cpf=cpf)) for cpf in cpfs]
+
+    assert set(groups) == {f"{PREFIX}-{shard:03d}" for shard in range(4)}
+    # Distribuição aproximadamente uniforme
+    assert min(groups.count(group) for group in set(groups)) > len(cpfs) / 4 * 0.7
+
+
+def test_single_shard_collapses_to_one_group(strategy, monkeypatch):
+    strategy("cpf_hash")
+    monkeypatch.setattr(settings, "sqs_message_group_shards", 1)
+    assert {message_group_id(_message(cpf=cpf)) for cpf in CPFS} == {f"{PREFIX}-000"}
+
+
+def test_unknown_strategy_is_rejected():
+    with pytest.raises(ValidationError, match="MessageGroupId"):
+        Settings(sqs_message_group_strategy="aleatorio")
+
+
+class _FifoBackend(InMemoryQueueBackend):
+    fifo = True
+
+
+@pytest.mark.parametrize("backend_class, fifo", [(_FifoBackend, True), (InMemoryQueueBackend, False)])
+def test_group_is_set_only_on_fifo_queues(strategy, monkeypatch, backend_class, fifo):
+    strategy("cnes")
+    monkeypatch.setattr(settings, "queue_spool_enabled", False)
+    monkeypatch.setattr(settings, "queue_envelope_compression", False)
+    service = QueueService(backend_class())
+    message = _message()
+    try:
+        entry = service._build_entry(message)
+    finally:
+        service.close()
+
+    if fifo:
+        assert entry["MessageGroupId"] == f"{PREFIX}-cnes-2338424"
+        assert entry["MessageDeduplicationId"] == str(message.tracking_id)
+    else:
+        assert "MessageGroupId" not in entry and "MessageDeduplicationId" not in entry
@@ -0,0 +1,116 @@
+"""
+Testes das métricas Prometheus: rótulos de etapa, rótulo de CNES e no-op com
+as métricas desabilitadas.
+"""
+import json
+from contextlib import nullcontext
+
+import pytest
+
+from scripts.sample_bundles import build_sample_bundle
+from src.core import metrics
+from src.domain.fhir_structs import decode_bundle
+from src.validators.fhir_validator import FHIRValidator
+from src.validators.profile_rules import compile_profile
+from src.validators.profiles import SES_GO_MALOTE_V1
+
+prometheus_client = pytest.importorskip("prometheus_client")
+REGISTRY = prometheus_client.REGISTRY
+
+pytestmark = pytest.mark.skipif(not metrics.ENABLED, reason="métricas desabilitadas")
+
+
+def _value(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def _stage_count(stage: str) -> float:
+    return _value("vigia_ingestion_stage_seconds_count", stage=stage)
+
+
+def _hemogramas(cnes: str, outcome: str) -> float:
+    return _value("vigia_hemogramas_total", cnes=cnes, outcome=outcome)
+
+
+def test_observe_stage_records_under_stage_label():
+    before = _stage_count("json_parse")
+    metrics.observe_stage("json_parse", 0.002)
+    metrics.observe_stage("json_parse", 0.003)
+
+    assert _stage_count("json_parse") == before + 2
+    assert _value("vigia_ingestion_stage_seconds_sum", stage="json_parse") >= 0.005
+
+
+def test_timed_check_records_each_rule_under_its_label():
+    compiled = compile_profile(SES_GO_MALOTE_V1)
+    stages = [f"rule.{rule.check}" for rule in SES_GO_MALOTE_V1.rules]
+    before = {stage: _stage_count(stage) for stage in stages}
+    index_before = _stage_count("index")
+
+    validator = FHIRValidator()
+    bundle = decode_bundle(json.dumps(build_sample_bundle(seed=3)).encode("utf-8"))
+    index = validator.build_index(bundle)
+    errors = []
+    assert all(check(index, errors) for check in compiled.checks)
+
+    assert _stage_count("index") == index_before + 1
+    assert {stage: _stage_count(stage) - before[stage] for stage in stages} == dict.fromkeys(stages, 1)
+
+
+def test_timed_check_preserves_result_and_errors():
+    calls = []
+
+    def check(index, errors):
+        calls.append(index)
+        errors.append("erro")
+        return False
+
+    before = _stage_count("rule.teste")
+    errors = []
+    assert metrics.timed_check("rule.teste", check)("indice", errors) is False
+    assert calls == ["indice"] and errors == ["erro"]
+    assert _stage_count("rule.teste") == before + 1
+
+
+@pytest.mark.parametrize("cnes", [None, "", "123456", "12345678", "23384a4", " 233842"])
+def test_malformed_cnes_collapses_to_unknown(cnes):
+    before = _hemogramas(metrics.UNKNOWN_CNES, "rejected")
+    metrics.count_hemograma(cnes, "rejected")
+
+    assert _hemogramas(metrics.UNKNOWN_CNES, "rejected") == before + 1
+    if cnes:
+        assert REGISTRY.get_sample_value(
+            "vigia_hemogramas_total", {"cnes": cnes, "outcome": "rejected"}
+        ) is None
+
+
+def test_valid_cnes_is_kept():
+    before = _hemogramas("2338424", "accepted")
+    metrics.count_hemograma("2338424", "accepted")
+    assert _hemogramas("2338424", "accepted") == before + 1
+
+
+def test_disabled_metrics_are_noops(monkeypatch):
+    monkeypatch.setattr(metrics, "ENABLED", False)
+
+    def check(index, errors):
+        return True
+
+    async def endpoint():
+        return "ok"
+
+    # Sem instrumentação: as regras e endpoints originais são devolvidos
+    assert metrics.timed_check("rule.desabilitada", check) is check
+    assert metrics.track_in_flight("desabilitado")(endpoint) is endpoint
+    assert isinstance(metrics.queue_sends_in_flight(), nullcontext)
+    assert metrics.start_metrics_server() is False
+
+    stage_before = _stage_count("desabilitada")
+    hemogramas_before = _hemogramas("2338424", "accepted")
+    metrics.observe_stage("desabilitada", 1.0)
+    metrics.count_hemograma("2338424", "accepted")
+    metrics.observe_queue_send("memory", True, 1.0)
+
+    assert _stage_count("desabilitada") == stage_before
+    assert _hemogramas("2338424", "accepted") == hemogramas_before
+    assert "desabilitada" not in metrics._stage_series
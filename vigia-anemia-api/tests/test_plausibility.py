@@ -0,0 +1,88 @@
+"""
+Regressão: plausibilidade dos resultados durante a construção do BundleIndex.
+"""
+import json
+
+import pytest
+
+from scripts.sample_bundles import build_sample_bundle
+from src.domain.fhir_structs import decode_bundle
+from src.domain.models import LoincCode
+from src.validators.fhir_validator import get_fhir_validator
+
+HEMOGLOBINA = LoincCode.HEMOGLOBINA.value
+
+
+def _bundle_with(loinc_code: str, **changes) -> dict:
+    """Bundle válido com o valueQuantity do exame `loinc_code` alterado."""
+    bundle = build_sample_bundle(seed=1)
+    for entry in bundle["entry"]:
+        resource = entry["resource"]
+        if resource["code"]["coding"][0]["code"] == loinc_code:
+            for key, value in changes.items():
+                if key == "valueQuantity":
+                    resource["valueQuantity"] = value
+                else:
+                    resource["valueQuantity"][key] = value
+    return bundle
+
+
+def _validate(bundle: dict, typed: bool):
+    body = json.dumps(bundle).encode("utf-8")
+    return get_fhir_validator().validate(decode_bundle(body, typed=typed))
+
+
+@pytest.mark.parametrize("typed", [True, False])
+def test_sample_bundle_is_plausible(typed):
+    result = _validate(build_sample_bundle(seed=1), typed)
+    assert result.is_valid
+    assert result.index.implausible == []
+
+
+@pytest.mark.parametrize("typed", [True, False])
+@pytest.mark.parametrize("quantity", ["12", 12, [], None])
+def test_value_quantity_with_wrong_type_is_rejected(typed, quantity):
+    result = _validate(_bundle_with(HEMOGLOBINA, valueQuantity=quantity), typed)
+
+    assert not result.is_valid
+    (finding,) = result.index.implausible
+    assert finding.code == HEMOGLOBINA
+    assert finding.bounds is None
+    assert result.errors[0].field == f"entry[{finding.position}].resource.valueQuantity"
+
+
+@pytest.mark.parametrize("typed", [True, False])
+@pytest.mark.parametrize("value", [None, "12.5", True])
+def test_missing_or_non_numeric_value_is_rejected(typed, value):
+    result = _validate(_bundle_with(HEMOGLOBINA, value=value), typed)
+
+    assert not result.is_valid
+    (finding,) = result.index.implausible
+    assert finding.bounds is None
+
+
+@pytest.mark.parametrize("typed", [True, False])
+def test_unknown_unit_is_rejected(typed):
+    bundle = _bundle_with(HEMOGLOBINA, unit="furlongs", code="furlongs")
+    result = _validate(bundle, typed)
+
+    assert not result.is_valid
+    (finding,) = result.index.implausible
+    assert finding.unit == "furlongs"
+    assert finding.bounds is None
+
+
+@pytest.mark.parametrize("typed", [True, False])
+def test_value_out_of_range_reports_bounds(typed):
+    result = _validate(_bundle_with(HEMOGLOBINA, value=125.0), typed)
+
+    assert not result.is_valid
+    (finding,) = result.index.implausible
+    assert finding.value == 125.0
+    assert finding.bounds == (1.0, 25.0)
+
+
+def test_unit_conversion_keeps_value_plausible():
+    # 125 g/L == 12.5 g/dL
+    result = _validate(_bundle_with(HEMOGLOBINA, value=125.0, unit="g/L", code="g/L"), typed=False)
+    assert result.index.implausible == []
@@ -0,0 +1,80 @@
+"""
+Testes da serialização do QueueMessage: bytes originais do Bundle embutidos
+literalmente no corpo da fila, sem re-serialização.
+"""
+import json
+from datetime import datetime
+from uuid import UUID
+
+import pytest
+from pydantic import ValidationError
+
+from scripts.sample_bundles import build_sample_bundle
+from src.domain.models import QueueMessage
+
+TRACKING_ID = UUID("6f1c2d3e-4b5a-4c6d-8e7f-9a0b1c2d3e4f")
+
+
+def _message(**kwargs) -> QueueMessage:
+    fields = dict(
+        tracking_id=TRACKING_ID,
+        received_at=datetime(2024, 11, 27, 8, 30),
+        laboratory_cnes="2338424",
+        patient_cpf="529.982.247-25",
+        correlation_id="c-1",
+    )
+    fields.update(kwargs)
+    return QueueMessage(**fields)
+
+
+def test_raw_body_matches_decoded_serialization():
+    bundle = build_sample_bundle(seed=1)
+    raw = json.dumps(bundle, indent=2).encode("utf-8")
+
+    spliced = json.loads(_message(fhir_bundle_raw=raw).to_json())
+    decoded = json.loads(_message(fhir_bundle=bundle).to_json())
+
+    assert spliced == decoded
+    assert spliced["patient_cpf"] == "52998224725"
+
+
+def test_raw_bytes_are_embedded_verbatim():
+    # Espaços, ordem das chaves e escapes do cliente são preservados
+    raw = '{ "type":"collection",\n  "resourceType" : "Bundle", "nota": "hemácias \\u00e9" }'.encode("utf-8")
+    body = _message(fhir_bundle_raw=raw).to_json()
+
+    assert body.endswith(',"fhir_bundle":' + raw.decode("utf-8") + "}")
+    assert json.loads(body)["fhir_bundle"] == json.loads(raw)
+
+
+def test_raw_takes_precedence_and_key_is_not_duplicated():
+    raw = b'{"resourceType":"Bundle","id":"bruto"}'
+    body = _message(fhir_bundle={"id": "decodificado"}, fhir_bundle_raw=raw).to_json()
+
+    assert body.count('"fhir_bundle"') == 1
+    assert json.loads(body)["fhir_bundle"]["id"] == "bruto"
+
+
+def test_raw_bytes_stay_out_of_dumps_and_repr():
+    message = _message(fhir_bundle_raw=b'{"resourceType":"Bundle"}')
+
+    assert "fhir_bundle_raw" not in message.model_dump()
+    assert "fhir_bundle_raw" not in message.model_dump_json()
+    assert "resourceType" not in repr(message)
+
+
+def test_round_trip_through_model():
+    bundle = build_sample_bundle(seed=2)
+    message = _message(fhir_bundle_raw=json.dumps(bundle).encode("utf-8"))
+
+    restored = QueueMessage.model_validate_json(message.to_json())
+
+    assert restored.fhir_bundle == bundle
+    assert restored.fhir_bundle_raw is None
+    assert restored.tracking_id == TRACKING_ID
+    assert restored.received_at == message.received_at
+
+
+def test_bundle_is_required():
+    with pytest.raises(ValidationError, match="fhir_bundle"):
+        _message()
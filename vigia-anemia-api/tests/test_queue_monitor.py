@@ -0,0 +1,231 @@
+"""
+Testes do monitor da fila: taxas, tempo para esvaziar, workers recomendados e
+origem da vazão de entrada (contador da fila, contador compartilhado ou local).
+"""
+import pytest
+
+from src.core.config import settings
+from src.infrastructure import queue_monitor
+from src.infrastructure.queue_backends import InMemoryQueueBackend
+from src.infrastructure.queue_monitor import QueueMonitor, QueueSample, recommend_workers, summarize
+
+try:
+    from redis.exceptions import RedisError
+except ImportError:  # pragma: no cover - dependência opcional
+    RedisError = Exception
+
+
+def _sample(at: float, visible: int = 0, in_flight: int = 0, delayed: int = 0, sent: int = 0) -> QueueSample:
+    return QueueSample(at=at, visible=visible, in_flight=in_flight, delayed=delayed, sent=sent)
+
+
+@pytest.fixture
+def sizing(monkeypatch):
+    monkeypatch.setattr(settings, "worker_throughput_per_s", 10.0)
+    monkeypatch.setattr(settings, "queue_target_drain_s", 60.0)
+    monkeypatch.setattr(settings, "worker_min_replicas", 1)
+    monkeypatch.setattr(settings, "worker_max_replicas", 20)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(queue_monitor.time, "monotonic", clock)
+    return clock
+
+
+class _QueueService:
+    """Stub do QueueService: atributos fixos e contador local de envios."""
+
+    def __init__(self, attributes=None):
+        self.attributes = attributes or {}
+        self.sent_count = 0
+
+    def get_queue_attributes(self):
+        return self.attributes
+
+
+class _SharedCounter:
+    """Cliente Redis falso com INCRBY assíncrono."""
+
+    def __init__(self):
+        self.values = {}
+        self.down = False
+
+    async def incrby(self, key, amount):
+        if self.down:
+            raise RedisError("conexão recusada")
+        self.values[key] = self.values.get(key, 0) + amount
+        return self.values[key]
+
+
+# ---------------------------------------------------------------------------
+# recommend_workers
+# ---------------------------------------------------------------------------
+
+def test_recommend_workers_covers_inflow_and_backlog():
+    # (5/s + 600/60s) / 10 por worker = 1.5 -> 2
+    assert recommend_workers(5.0, 600, 10.0, 60.0, 1, 20) == 2
+
+
+def test_recommend_workers_rounds_up():
+    assert recommend_workers(10.1, 0, 10.0, 60.0, 1, 20) == 2
+    assert recommend_workers(10.0, 0, 10.0, 60.0, 1, 20) == 1
+
+
+def test_recommend_workers_clamps_to_limits():
+    assert recommend_workers(0.0, 0, 10.0, 60.0, 2, 20) == 2
+    assert recommend_workers(1000.0, 100000, 10.0, 60.0, 1, 20) == 20
+
+
+# ---------------------------------------------------------------------------
+# summarize
+# ---------------------------------------------------------------------------
+
+def test_summarize_single_sample_has_zero_rates(sizing):
+    sample = _sample(10.0, visible=30, sent=100)
+    snapshot = summarize(sample, sample)
+    assert snapshot.inflow_per_s == 0.0
+    assert snapshot.outflow_per_s == 0.0
+    # Backlog sem saída medida: não esvazia
+    assert snapshot.drain_time_s is None
+
+
+def test_summarize_rates_and_drain_time(sizing):
+    # 10 s: 50 entraram e o total caiu de 200 para 150 -> saíram 100
+    oldest = _sample(0.0, visible=180, in_flight=20, sent=1000)
+    newest = _sample(10.0, visible=130, in_flight=20, sent=1050)
+    snapshot = summarize(oldest, newest)
+
+    assert snapshot.inflow_per_s == pytest.approx(5.0)
+    assert snapshot.outflow_per_s == pytest.approx(10.0)
+    # Backlog de 130 esvaziando a 5/s líquidos
+    assert snapshot.drain_time_s == pytest.approx(26.0)
+    assert snapshot.backlog == 130
+    # (5 + 130/60) / 10 = 0.72 -> 1
+    assert snapshot.recommended_workers == 1
+
+
+def test_summarize_growing_queue_never_drains(sizing):
+    oldest = _sample(0.0, visible=100, sent=0)
+    newest = _sample(10.0, visible=200, sent=150)
+    snapshot = summarize(oldest, newest)
+
+    assert snapshot.inflow_per_s == pytest.approx(15.0)
+    assert snapshot.outflow_per_s == pytest.approx(5.0)
+    assert snapshot.drain_time_s is None
+
+
+def test_summarize_empty_backlog_drains_immediately(sizing):
+    oldest = _sample(0.0, in_flight=5, sent=0)
+    newest = _sample(10.0, in_flight=5, sent=100)
+    snapshot = summarize(oldest, newest)
+
+    assert snapshot.drain_time_s == 0.0
+    assert snapshot.outflow_per_s == pytest.approx(10.0)
+
+
+def test_summarize_counter_reset_is_not_negative_inflow(sizing):
+    snapshot = summarize(_sample(0.0, sent=500), _sample(10.0, sent=3))
+    assert snapshot.inflow_per_s == 0.0
+    assert snapshot.outflow_per_s == 0.0
+
+
+# ---------------------------------------------------------------------------
+# QueueMonitor: origem da vazão de entrada
+# ---------------------------------------------------------------------------
+
+async def test_queue_side_counter_takes_precedence(sizing, clock):
+    service = _QueueService({"ApproximateNumberOfMessages": "0", "NumberOfMessagesAdded": "100"})
+    counter = _SharedCounter()
+    monitor = QueueMonitor(service, window_s=60, shared_counter=counter, counter_key="k")
+    await monitor.sample()
+
+    clock.now += 10
+    service.attributes = {"ApproximateNumberOfMessages": "0", "NumberOfMessagesAdded": "180"}
+    # Contador local ignorado: a fila já conta a entrada de todos os processos
+    service.sent_count = 5
+    snapshot = await monitor.sample()
+
+    assert snapshot.inflow_per_s == pytest.approx(8.0)
+    assert counter.values == {}
+
+
+async def test_local_count_without_shared_counter(sizing, clock):
+    service = _QueueService({"ApproximateNumberOfMessages": "0"})
+    monitor = QueueMonitor(service, window_s=60)
+    await monitor.sample()
+
+    clock.now += 10
+    service.sent_count = 40
+    snapshot = await monitor.sample()
+    assert snapshot.inflow_per_s == pytest.approx(4.0)
+
+
+async def test_shared_counter_aggregates_processes(sizing, clock):
+    counter = _SharedCounter()
+    first = _QueueService({"ApproximateNumberOfMessages": "0"})
+    second = _QueueService({"ApproximateNumberOfMessages": "0"})
+    monitors = [
+        QueueMonitor(service, window_s=60, shared_counter=counter, counter_key="vigia:queue:sent")
+        for service in (first, second)
+    ]
+    for monitor in monitors:
+        await monitor.sample()
+
+    clock.now += 10
+    first.sent_count = 30
+    second.sent_count = 70
+    for monitor in monitors:
+        await monitor.sample()
+
+    # Cada processo soma só o próprio delta; o segundo já enxerga a entrada total
+    assert counter.values == {"vigia:queue:sent": 100}
+    assert monitors[1].snapshot.inflow_per_s == pytest.approx(10.0)
+
+    clock.now += 10
+    first.sent_count = 50
+    snapshot = await monitors[0].sample()
+    # 120 no total em 20 s
+    assert counter.values["vigia:queue:sent"] == 120
+    assert snapshot.inflow_per_s == pytest.approx(6.0)
+
+
+async def test_shared_counter_failure_keeps_previous_snapshot(sizing, clock):
+    counter = _SharedCounter()
+    service = _QueueService({"ApproximateNumberOfMessages": "0"})
+    monitor = QueueMonitor(service, window_s=60, shared_counter=counter, counter_key="k")
+    await monitor.sample()
+    clock.now += 10
+    service.sent_count = 20
+    previous = await monitor.sample()
+
+    counter.down = True
+    clock.now += 10
+    service.sent_count = 50
+    assert await monitor.sample() is previous
+
+    # O delta não publicado entra na próxima amostra
+    counter.down = False
+    clock.now += 10
+    await monitor.sample()
+    assert counter.values["k"] == 50
+
+
+def test_memory_backend_reports_messages_added():
+    backend = InMemoryQueueBackend()
+    for number in range(3):
+        backend.send({"MessageBody": f"corpo-{number}", "MessageAttributes": {}})
+    backend.delete_batch([message.receipt_handle for message in backend.receive(10, 0, 30)])
+
+    attributes = backend.get_attributes()
+    assert attributes["ApproximateNumberOfMessages"] == "0"
+    assert attributes["NumberOfMessagesAdded"] == "3"
@@ -0,0 +1,150 @@
+"""
+Testes da publicação fora do event loop: backends bloqueantes rodam no
+executor dedicado, com vários envios em voo e o loop livre durante a espera.
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from src.core.config import settings
+from src.domain.models import QueueMessage
+from src.infrastructure.queue_backends import InMemoryQueueBackend, QueueBackendError
+from src.infrastructure.queue_service import QueueService
+
+MAX_WORKERS = 4
+
+
+class _BlockingBackend(InMemoryQueueBackend):
+    """Fila em memória com envio lento e bloqueante (como boto3)."""
+
+    name = "blocking-test"
+    blocking = True
+
+    def __init__(self, delay_s: float = 0.05):
+        super().__init__()
+        self.delay_s = delay_s
+        self.fail = False
+        self.threads = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def send(self, entry):
+        with self._lock:
+            self.threads.add(threading.current_thread().name)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay_s)
+            if self.fail:
+                raise QueueBackendError("ServiceUnavailable", "fila indisponível")
+            return super().send(entry)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class _DirectBackend(InMemoryQueueBackend):
+    """Fila em memória não bloqueante que registra a thread do envio."""
+
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+
+    def send(self, entry):
+        self.threads.add(threading.current_thread().name)
+        return super().send(entry)
+
+
+def _message(number: int = 0) -> QueueMessage:
+    return QueueMessage(
+        tracking_id=uuid4(),
+        fhir_bundle={"resourceType": "Bundle", "id": f"b-{number}"},
+        received_at=datetime.utcnow(),
+        laboratory_cnes="2338424",
+        patient_cpf="52998224725",
+        correlation_id=f"c-{number}",
+    )
+
+
+@pytest.fixture(autouse=True)
+def direct_publishing(monkeypatch):
+    monkeypatch.setattr(settings, "sqs_batching_enabled", False)
+    monkeypatch.setattr(settings, "queue_spool_enabled", False)
+    monkeypatch.setattr(settings, "queue_envelope_compression", False)
+    monkeypatch.setattr(settings, "sqs_publisher_max_workers", MAX_WORKERS)
+
+
+@pytest.fixture
+def blocking():
+    backend = _BlockingBackend()
+    service = QueueService(backend)
+    yield backend, service
+    service.close()
+
+
+async def test_blocking_send_runs_in_publisher_threads(blocking):
+    backend, service = blocking
+    success, message_id = await service.send_message_async(_message())
+
+    assert success and message_id
+    assert backend.threads and all(name.startswith("queue-publisher") for name in backend.threads)
+
+
+async def test_event_loop_stays_responsive_while_publishing(blocking):
+    backend, service = blocking
+    backend.delay_s = 0.2
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    try:
+        assert (await service.send_message_async(_message()))[0]
+    finally:
+        task.cancel()
+    # Com o envio no event loop, o ticker ficaria parado durante os 200 ms
+    assert ticks >= 5
+
+
+async def test_concurrent_sends_are_bounded_by_executor(blocking):
+    backend, service = blocking
+    start = time.perf_counter()
+    results = await asyncio.gather(*(service.send_message_async(_message(n)) for n in range(MAX_WORKERS * 2)))
+    elapsed = time.perf_counter() - start
+
+    assert all(success for success, _ in results)
+    assert backend.max_in_flight == MAX_WORKERS
+    # Duas "ondas" de envios paralelos, não oito envios em série
+    assert elapsed < backend.delay_s * MAX_WORKERS
+    assert service.sent_count == MAX_WORKERS * 2
+
+
+async def test_failed_send_is_reported_and_not_counted(blocking):
+    backend, service = blocking
+    backend.fail = True
+
+    success, error = await service.send_message_async(_message())
+
+    assert not success
+    assert error == "ServiceUnavailable: fila indisponível"
+    assert service.sent_count == 0
+
+
+async def test_non_blocking_backend_is_called_on_the_loop():
+    backend = _DirectBackend()
+    service = QueueService(backend)
+    try:
+        assert (await service.send_message_async(_message()))[0]
+    finally:
+        service.close()
+
+    assert backend.threads == {threading.current_thread().name}
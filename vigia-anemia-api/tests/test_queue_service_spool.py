@@ -0,0 +1,125 @@
+"""
+Testes do desvio para o spool no QueueService: gravação fora do event loop e
+ordem FIFO preservada enquanto há backlog no spool.
+"""
+import asyncio
+import json
+import threading
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from src.core.config import settings
+from src.domain.models import QueueMessage
+from src.infrastructure.queue_backends import InMemoryQueueBackend, QueueBackendError
+from src.infrastructure.queue_service import QueueService
+
+
+class _FifoBackend(InMemoryQueueBackend):
+    """Fila FIFO em memória que pode ser derrubada (`down`)."""
+
+    name = "fifo-test"
+    fifo = True
+
+    def __init__(self):
+        super().__init__()
+        self.down = False
+
+    def send(self, entry):
+        if self.down:
+            raise QueueBackendError("ServiceUnavailable", "fila indisponível")
+        return super().send(entry)
+
+    def send_batch(self, entries):
+        if self.down:
+            raise QueueBackendError("ServiceUnavailable", "fila indisponível")
+        return super().send_batch(entries)
+
+
+def _message(number: int) -> QueueMessage:
+    return QueueMessage(
+        tracking_id=uuid4(),
+        fhir_bundle={"resourceType": "Bundle", "id": f"b-{number}"},
+        received_at=datetime.utcnow(),
+        laboratory_cnes="2338424",
+        patient_cpf="52998224725",
+        correlation_id=f"c-{number}",
+    )
+
+
+@pytest.fixture
+def spool_settings(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "queue_spool_enabled", True)
+    monkeypatch.setattr(settings, "queue_spool_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "queue_spool_drain_interval_ms", 10.0)
+    monkeypatch.setattr(settings, "sqs_batching_enabled", False)
+
+
+def _order(backend: InMemoryQueueBackend) -> list:
+    return [json.loads(message.body)["correlation_id"] for message in backend.receive(100, 0, 30)]
+
+
+async def test_spool_write_runs_off_the_event_loop(spool_settings):
+    backend = _FifoBackend()
+    service = QueueService(backend=backend)
+    threads = []
+    append = service._spool.append
+
+    def recording_append(payload):
+        threads.append(threading.current_thread())
+        return append(payload)
+
+    service._spool.append = recording_append
+    backend.down = True
+    success, result = await service.send_message_async(_message(0))
+
+    assert success and result.startswith("spool:")
+    assert threads and threads[0] is not threading.main_thread()
+    assert threads[0].name.startswith("queue-spool")
+    service.close()
+
+
+async def test_fifo_messages_queue_behind_spool_backlog(spool_settings):
+    backend = _FifoBackend()
+    service = QueueService(backend=backend)
+
+    backend.down = True
+    for number in range(3):
+        assert (await service.send_message_async(_message(number)))[0]
+    backend.down = False
+
+    # Fila de volta, mas o spool ainda não drenou: as novas entram atrás do backlog
+    for number in range(3, 5):
+        success, result = await service.send_message_async(_message(number))
+        assert success and result.startswith("spool:")
+
+    service.start_spool_drainer()
+    for _ in range(200):
+        if not service.spool_pending:
+            break
+        await asyncio.sleep(0.01)
+    assert not service.spool_pending
+
+    # Spool vazio: envio direto volta a ser usado
+    success, result = await service.send_message_async(_message(5))
+    assert success and not result.startswith("spool:")
+
+    assert _order(backend) == [f"c-{number}" for number in range(6)]
+    await service.flush()
+    service.close()
+
+
+async def test_standard_queue_sends_directly_despite_backlog(spool_settings):
+    backend = _FifoBackend()
+    backend.fifo = False
+    service = QueueService(backend=backend)
+
+    backend.down = True
+    await service.send_message_async(_message(0))
+    backend.down = False
+    success, result = await service.send_message_async(_message(1))
+
+    assert success and not result.startswith("spool:")
+    assert service.spool_pending
+    service.close()
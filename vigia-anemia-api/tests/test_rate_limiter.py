@@ -0,0 +1,125 @@
+"""
+Testes do token bucket em processo e da chave de rate limit por laboratório.
+"""
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from src.api import dependencies
+from src.api.dependencies import enforce_rate_limit, rate_limit_key
+from src.core.config import settings
+from src.infrastructure.rate_limiter import InMemoryRateLimiter
+
+# 60/min: uma ficha por segundo, balde de 3
+PER_MINUTE = 60
+BURST = 3
+
+
+@pytest.fixture
+def limiter():
+    return InMemoryRateLimiter(PER_MINUTE, BURST)
+
+
+def test_burst_is_allowed_then_denied(limiter):
+    decisions = [limiter.try_acquire("cnes:1234567", 100.0) for _ in range(BURST + 1)]
+
+    assert [decision.allowed for decision in decisions] == [True] * BURST + [False]
+    assert decisions[-1].retry_after_s == pytest.approx(1.0)
+
+
+def test_refill_follows_rate(limiter):
+    for _ in range(BURST):
+        limiter.try_acquire("cnes:1234567", 100.0)
+
+    denied = limiter.try_acquire("cnes:1234567", 100.5)
+    assert not denied.allowed
+    assert denied.retry_after_s == pytest.approx(0.5)
+
+    assert limiter.try_acquire("cnes:1234567", 101.0).allowed
+    assert not limiter.try_acquire("cnes:1234567", 101.0).allowed
+
+
+def test_refill_is_capped_at_burst(limiter):
+    limiter.try_acquire("cnes:1234567", 100.0)
+
+    # Muito tempo parado não acumula mais que BURST fichas
+    decisions = [limiter.try_acquire("cnes:1234567", 10000.0) for _ in range(BURST + 1)]
+    assert [decision.allowed for decision in decisions] == [True] * BURST + [False]
+
+
+def test_buckets_are_independent_per_key(limiter):
+    for _ in range(BURST):
+        limiter.try_acquire("cnes:1234567", 100.0)
+
+    assert not limiter.try_acquire("cnes:1234567", 100.0).allowed
+    assert limiter.try_acquire("cnes:7654321", 100.0).allowed
+
+
+def test_prune_drops_only_full_buckets(limiter, monkeypatch):
+    monkeypatch.setattr(InMemoryRateLimiter, "MAX_KEYS", 2)
+    limiter.try_acquire("idle", 0.0)
+    for _ in range(BURST):
+        limiter.try_acquire("busy", 100.0)
+
+    # "idle" reabasteceu por completo; "busy" segue vazio e é mantido
+    limiter.try_acquire("new", 100.0)
+
+    assert set(limiter._buckets) == {"busy", "new"}
+    assert not limiter.try_acquire("busy", 100.0).allowed
+
+
+@pytest.mark.parametrize(
+    "payload, expected",
+    [
+        ({"cnes": "1234567", "sub": "lab"}, "cnes:1234567"),
+        ({"sub": "lab"}, "sub:lab"),
+        ({"cnes": "", "sub": "lab"}, "sub:lab"),
+        ({}, "ip:10.0.0.1"),
+        ({"cnes": None, "sub": ""}, "ip:10.0.0.1"),
+    ],
+)
+def test_rate_limit_key(payload, expected):
+    assert rate_limit_key(payload, "10.0.0.1") == expected
+
+
+def test_rate_limit_key_without_client_address():
+    assert rate_limit_key({}) == "ip:desconhecido"
+
+
+def test_rate_limit_is_enabled_by_default():
+    assert type(settings).model_fields["rate_limit_enabled"].default is True
+
+
+def _request(host: str) -> Request:
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": [], "client": (host, 50000)})
+
+
+@pytest.fixture
+def single_token_limiter(monkeypatch):
+    limiter = InMemoryRateLimiter(PER_MINUTE, 1)
+    monkeypatch.setattr(settings, "rate_limit_enabled", True)
+    monkeypatch.setattr(dependencies, "get_rate_limiter", lambda: limiter)
+    return limiter
+
+
+async def test_claimless_tokens_are_limited_per_client_address(single_token_limiter):
+    await enforce_rate_limit(_request("10.0.0.1"), {})
+    with pytest.raises(HTTPException) as excinfo:
+        await enforce_rate_limit(_request("10.0.0.1"), {})
+    assert excinfo.value.status_code == 429
+    assert excinfo.value.headers["Retry-After"] == "1"
+
+    # Outro cliente sem claims não divide o balde do primeiro
+    await enforce_rate_limit(_request("10.0.0.2"), {"sub": ""})
+
+
+async def test_laboratory_bucket_is_shared_across_addresses(single_token_limiter):
+    await enforce_rate_limit(_request("10.0.0.1"), {"cnes": "1234567"})
+    with pytest.raises(HTTPException):
+        await enforce_rate_limit(_request("10.0.0.2"), {"cnes": "1234567"})
+
+
+async def test_disabled_rate_limit_allows_everything(single_token_limiter, monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    for _ in range(3):
+        await enforce_rate_limit(_request("10.0.0.1"), {})
@@ -0,0 +1,99 @@
+"""
+Testes da verificação de integridade de referências (fullUrl, hasMember e
+códigos LOINC repetidos) sobre o BundleIndex.
+"""
+import json
+
+import pytest
+
+from scripts.sample_bundles import build_sample_bundle
+from src.domain.fhir_structs import decode_bundle
+from src.domain.models import LoincCode
+from src.validators.bundle_index import BundleIndex
+from src.validators.fhir_validator import get_fhir_validator
+
+HEMOGLOBINA = LoincCode.HEMOGLOBINA.value
+HEMATOCRITO = LoincCode.HEMATOCRITO.value
+LOINC = "http://loinc.org"
+
+
+def _observation(bundle: dict, code: str) -> dict:
+    return next(
+        entry["resource"] for entry in bundle["entry"]
+        if entry["resource"]["code"]["coding"][0]["code"] == code
+    )
+
+
+def _decoded(bundle: dict, typed: bool):
+    return decode_bundle(json.dumps(bundle).encode("utf-8"), typed=typed)
+
+
+def _index(bundle: dict, typed: bool) -> BundleIndex:
+    return get_fhir_validator().build_index(_decoded(bundle, typed))
+
+
+def _errors(bundle: dict, typed: bool) -> list:
+    return get_fhir_validator().validate(_decoded(bundle, typed)).errors
+
+
+@pytest.mark.parametrize("typed", [True, False])
+def test_repeated_coding_in_one_observation_counts_once(typed):
+    bundle = build_sample_bundle(seed=3)
+    coding = _observation(bundle, HEMOGLOBINA)["code"]["coding"]
+    coding.append(dict(coding[0], display="Hemoglobina (repetido)"))
+
+    index = _index(bundle, typed)
+    assert index.loinc_counts[HEMOGLOBINA] == 1
+    assert index.loinc_index[HEMOGLOBINA].loinc_codes == [HEMOGLOBINA]
+    assert _errors(bundle, typed) == []
+
+
+@pytest.mark.parametrize("typed", [True, False])
+def test_code_in_two_observations_is_rejected(typed):
+    bundle = build_sample_bundle(seed=3)
+    _observation(bundle, HEMATOCRITO)["code"]["coding"].append({"system": LOINC, "code": HEMOGLOBINA})
+
+    assert _index(bundle, typed).loinc_counts[HEMOGLOBINA] == 2
+    errors = _errors(bundle, typed)
+    assert [error.field for error in errors] == ["entry[].resource.code.coding[].code"]
+    assert HEMOGLOBINA in errors[0].description
+
+
+@pytest.mark.parametrize("typed", [True, False])
+def test_duplicate_full_url_is_rejected(typed):
+    bundle = build_sample_bundle(seed=3)
+    bundle["entry"][2]["fullUrl"] = bundle["entry"][1]["fullUrl"]
+
+    fields = [error.field for error in _errors(bundle, typed)]
+    assert "entry[].fullUrl" in fields
+
+
+@pytest.mark.parametrize("typed", [True, False])
+def test_unresolved_has_member_is_rejected(typed):
+    bundle = build_sample_bundle(seed=3)
+    bundle["entry"][0]["resource"]["hasMember"][0]["reference"] = "urn:uuid:inexistente"
+
+    errors = _errors(bundle, typed)
+    assert [error.field for error in errors] == ["hasMember[].reference"]
+    assert "urn:uuid:inexistente" in errors[0].description
+
+
+@pytest.mark.parametrize("typed", [True, False])
+def test_repeated_has_member_is_rejected(typed):
+    bundle = build_sample_bundle(seed=3)
+    members = bundle["entry"][0]["resource"]["hasMember"]
+    members[1] = dict(members[0])
+
+    errors = _errors(bundle, typed)
+    assert [error.received for error in errors] == ["1 referências repetidas"]
+
+
+@pytest.mark.parametrize("typed", [True, False])
+def test_has_member_must_reference_an_observation(typed):
+    bundle = build_sample_bundle(seed=3)
+    patient_url = "urn:uuid:paciente"
+    bundle["entry"].append({"fullUrl": patient_url, "resource": {"resourceType": "Patient"}})
+    bundle["entry"][0]["resource"]["hasMember"][0]["reference"] = patient_url
+
+    errors = _errors(bundle, typed)
+    assert [error.field for error in errors] == ["hasMember[].reference"]
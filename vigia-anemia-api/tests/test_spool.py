@@ -0,0 +1,218 @@
+"""
+Testes do spool local: ciclo append/leitura/cursor, recuperação e adoção de
+spools de processos encerrados.
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.infrastructure.circuit_breaker import CircuitBreaker
+from src.infrastructure.spool import (
+    SegmentSpool,
+    SpoolDrainer,
+    SpoolLockedError,
+    SpoolPosition,
+    process_spool_dir,
+)
+
+
+def _entry(number: int) -> bytes:
+    return json.dumps({"MessageBody": f"mensagem-{number}"}).encode("utf-8")
+
+
+def _drain_all(spool: SegmentSpool) -> list:
+    records, position = spool.read_batch(1000, 1 << 30)
+    spool.commit(position)
+    return records
+
+
+def test_append_read_commit_cycle(tmp_path):
+    spool = SegmentSpool(str(tmp_path))
+    assert not spool.pending
+
+    positions = [spool.append(_entry(number)) for number in range(3)]
+    assert positions[0] == SpoolPosition(1, 0)
+    assert spool.pending
+    assert spool.count_records() == 3
+
+    records, position = spool.read_batch(2, 1 << 20)
+    assert records == [_entry(0), _entry(1)]
+    # Ler não consome: só o commit avança o cursor
+    assert spool.cursor == SpoolPosition(1, 0)
+
+    spool.commit(position)
+    assert spool.cursor == position
+    assert _drain_all(spool) == [_entry(2)]
+    assert not spool.pending
+    spool.close()
+
+
+def test_cursor_survives_reopen(tmp_path):
+    spool = SegmentSpool(str(tmp_path))
+    for number in range(4):
+        spool.append(_entry(number))
+    records, position = spool.read_batch(1, 1 << 20)
+    spool.commit(position)
+    spool.close()
+
+    reopened = SegmentSpool(str(tmp_path))
+    assert reopened.cursor == position
+    assert _drain_all(reopened) == [_entry(1), _entry(2), _entry(3)]
+    reopened.close()
+
+
+def test_segments_roll_and_consumed_ones_are_removed(tmp_path):
+    spool = SegmentSpool(str(tmp_path), segment_max_bytes=64)
+    for number in range(6):
+        spool.append(_entry(number))
+    assert len(list(tmp_path.glob("*.seg"))) > 1
+
+    assert _drain_all(spool) == [_entry(number) for number in range(6)]
+    assert len(list(tmp_path.glob("*.seg"))) == 1
+    spool.close()
+
+
+def test_torn_tail_is_truncated_on_reopen(tmp_path):
+    spool = SegmentSpool(str(tmp_path))
+    spool.append(_entry(0))
+    end = spool.append(_entry(1))
+    spool.close()
+
+    # Queda no meio do write: metade do último registro no disco
+    segment = next(tmp_path.glob("*.seg"))
+    os.truncate(segment, end.offset + 5)
+
+    reopened = SegmentSpool(str(tmp_path))
+    assert _drain_all(reopened) == [_entry(0)]
+    reopened.append(_entry(2))
+    assert _drain_all(reopened) == [_entry(2)]
+    reopened.close()
+
+
+def test_directory_is_exclusive_while_open(tmp_path):
+    spool = SegmentSpool(str(tmp_path))
+    with pytest.raises(SpoolLockedError):
+        SegmentSpool(str(tmp_path))
+    spool.close()
+
+    SegmentSpool(str(tmp_path)).close()
+
+
+def test_process_spool_dir_is_per_process(tmp_path):
+    directory = process_spool_dir(str(tmp_path))
+    assert directory.parent == tmp_path
+    assert directory.name.endswith(f"-{os.getpid()}")
+
+
+class _RecordingSender:
+    """send_batch que registra as entradas e aceita todas."""
+
+    def __init__(self):
+        self.bodies = []
+
+    def __call__(self, entries):
+        self.bodies.extend(entry["MessageBody"] for entry in entries)
+        return {"Successful": [{"Id": entry["Id"]} for entry in entries], "Failed": []}
+
+
+def _drainer(spool: SegmentSpool, sender: _RecordingSender, root) -> SpoolDrainer:
+    return SpoolDrainer(
+        spool=spool,
+        send_batch=sender,
+        executor=ThreadPoolExecutor(max_workers=1),
+        breaker=CircuitBreaker("test", failure_threshold=3, reset_timeout_s=1.0),
+        orphans_root=str(root),
+    )
+
+
+async def test_drainer_adopts_orphaned_spools_only(tmp_path):
+    orphan = SegmentSpool(str(tmp_path / "host-111"))
+    for number in range(3):
+        orphan.append(_entry(number))
+    orphan.close()
+
+    live = SegmentSpool(str(tmp_path / "host-222"))
+    live.append(_entry(99))
+
+    own = SegmentSpool(str(tmp_path / "host-333"))
+    sender = _RecordingSender()
+
+    assert await _drainer(own, sender, tmp_path).adopt_orphans() == 3
+    assert sender.bodies == ["mensagem-0", "mensagem-1", "mensagem-2"]
+    assert not (tmp_path / "host-111").exists()
+    # O spool de um processo vivo (lock ocupado) não é tocado
+    assert live.count_records() == 1
+
+    live.close()
+    own.close()
+
+
+async def test_drainer_adopts_legacy_root_spool(tmp_path):
+    legacy = SegmentSpool(str(tmp_path))
+    legacy.append(_entry(0))
+    legacy.close()
+
+    own = SegmentSpool(str(process_spool_dir(str(tmp_path))))
+    sender = _RecordingSender()
+
+    assert await _drainer(own, sender, tmp_path).adopt_orphans() == 1
+    assert sender.bodies == ["mensagem-0"]
+    assert not list(tmp_path.glob("*.seg"))
+    own.close()
+
+
+class _FlakySender(_RecordingSender):
+    """send_batch que recusa (falha do serviço) a entrada de índice 1 na primeira chamada."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def __call__(self, entries):
+        self.calls += 1
+        if self.calls > 1:
+            return super().__call__(entries)
+        accepted = [entry for entry in entries if entry["Id"] != "1"]
+        self.bodies.extend(entry["MessageBody"] for entry in accepted)
+        return {
+            "Successful": [{"Id": entry["Id"]} for entry in accepted],
+            "Failed": [{"Id": "1", "Code": "ServiceUnavailable", "Message": "x", "SenderFault": False}],
+        }
+
+
+async def _drain(spool: SegmentSpool, sender, preserve_order: bool) -> None:
+    drainer = SpoolDrainer(
+        spool=spool,
+        send_batch=sender,
+        executor=ThreadPoolExecutor(max_workers=1),
+        breaker=CircuitBreaker("test", failure_threshold=3, reset_timeout_s=1.0),
+        preserve_order=preserve_order,
+    )
+    while spool.pending:
+        await drainer.drain_once()
+
+
+async def test_drainer_requeues_failed_entry_at_the_end(tmp_path):
+    spool = SegmentSpool(str(tmp_path))
+    for number in range(3):
+        spool.append(_entry(number))
+    sender = _FlakySender()
+
+    await _drain(spool, sender, preserve_order=False)
+    assert sender.bodies == ["mensagem-0", "mensagem-2", "mensagem-1"]
+    spool.close()
+
+
+async def test_drainer_preserving_order_resumes_from_failed_entry(tmp_path):
+    spool = SegmentSpool(str(tmp_path))
+    for number in range(3):
+        spool.append(_entry(number))
+    sender = _FlakySender()
+
+    await _drain(spool, sender, preserve_order=True)
+    # mensagem-2 é reenviada (deduplicada pelo SQS FIFO), mas mensagem-1 nunca a ultrapassa
+    assert sender.bodies == ["mensagem-0", "mensagem-2", "mensagem-1", "mensagem-2"]
+    assert spool.count_records() == 0
+    spool.close()
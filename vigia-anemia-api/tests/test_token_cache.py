@@ -0,0 +1,236 @@
+"""
+Testes do cache de verificações de tokens JWT: LRU local com expiração,
+resultados negativos, camada Redis e integração com o AuthService.
+"""
+import json
+import time
+from datetime import timedelta
+
+import pytest
+
+from src.core.config import settings
+from src.infrastructure import auth_service as auth_service_module
+from src.infrastructure.auth_service import AuthService
+from src.infrastructure.token_cache import LocalTokenCache, RedisTokenCache, entry_expiration, token_key
+
+try:
+    from redis.exceptions import RedisError
+except ImportError:  # pragma: no cover - dependência opcional
+    RedisError = Exception
+
+NOW = 1_700_000_000.0
+
+
+class _FakeRedis:
+    """Cliente redis.asyncio falso (GET/SET com TTL)."""
+
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+        self.calls = 0
+        self.down = False
+
+    async def get(self, key):
+        self.calls += 1
+        if self.down:
+            raise RedisError("conexão recusada")
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.calls += 1
+        if self.down:
+            raise RedisError("conexão recusada")
+        self.values[key] = value
+        self.ttls[key] = ex
+
+
+# ---------------------------------------------------------------------------
+# LocalTokenCache
+# ---------------------------------------------------------------------------
+
+def test_local_hit_and_miss():
+    cache = LocalTokenCache(10)
+    cache.put("a", {"sub": "lab"}, NOW + 60)
+
+    assert cache.get("a", NOW) == (True, {"sub": "lab"})
+    assert cache.get("b", NOW) is None
+
+
+def test_local_entry_expires_at_deadline():
+    cache = LocalTokenCache(10)
+    cache.put("a", {"sub": "lab"}, NOW + 60)
+
+    assert cache.get("a", NOW + 59.9) is not None
+    assert cache.get("a", NOW + 60) is None
+    # A entrada expirada é removida na consulta
+    assert len(cache) == 0
+
+
+def test_local_negative_entry():
+    cache = LocalTokenCache(10)
+    cache.put("a", None, NOW + 30)
+    assert cache.get("a", NOW) == (False, None)
+
+
+def test_local_evicts_least_recently_used():
+    cache = LocalTokenCache(2)
+    cache.put("a", {"sub": "a"}, NOW + 60)
+    cache.put("b", {"sub": "b"}, NOW + 60)
+    # Consultar "a" o torna o mais recente: "b" sai ao inserir "c"
+    cache.get("a", NOW)
+    cache.put("c", {"sub": "c"}, NOW + 60)
+
+    assert len(cache) == 2
+    assert cache.get("b", NOW) is None
+    assert cache.get("a", NOW) and cache.get("c", NOW)
+
+
+def test_local_cache_disabled_with_zero_entries():
+    cache = LocalTokenCache(0)
+    cache.put("a", {"sub": "a"}, NOW + 60)
+    assert len(cache) == 0 and cache.get("a", NOW) is None
+
+
+# ---------------------------------------------------------------------------
+# entry_expiration
+# ---------------------------------------------------------------------------
+
+def test_negative_entries_use_negative_ttl(monkeypatch):
+    monkeypatch.setattr(settings, "auth_cache_negative_ttl_s", 30.0)
+    assert entry_expiration(None, NOW) == NOW + 30.0
+
+
+def test_valid_entries_expire_with_token_capped_by_redis_ttl(monkeypatch):
+    monkeypatch.setattr(settings, "redis_ttl", 3300)
+
+    assert entry_expiration({"exp": NOW + 600}, NOW) == NOW + 600
+    assert entry_expiration({"exp": NOW + 86400}, NOW) == NOW + 3300
+    assert entry_expiration({"sub": "sem-exp"}, NOW) == NOW + 3300
+
+
+# ---------------------------------------------------------------------------
+# RedisTokenCache
+# ---------------------------------------------------------------------------
+
+async def test_redis_round_trip_without_storing_the_token():
+    client = _FakeRedis()
+    cache = RedisTokenCache(client, prefix="jwt:")
+    token = "header.payload.assinatura"
+    key = token_key(token)
+
+    await cache.put(key, {"sub": "lab"}, 60)
+    await cache.put(token_key("rejeitado"), None, 30)
+
+    assert await cache.get(key) == (True, {"sub": "lab"})
+    assert await cache.get(token_key("rejeitado")) == (False, None)
+    assert await cache.get(token_key("outro")) is None
+    assert client.ttls == {f"jwt:{key}": 60, f"jwt:{token_key('rejeitado')}": 30}
+    assert all(token not in stored for stored in client.values)
+    assert json.loads(client.values[f"jwt:{key}"]) == {"sub": "lab"}
+
+
+async def test_redis_skips_non_positive_ttl():
+    client = _FakeRedis()
+    await RedisTokenCache(client, prefix="").put("k", {"sub": "lab"}, 0)
+    assert client.values == {}
+
+
+async def test_redis_failures_are_misses_and_open_the_circuit():
+    client = _FakeRedis()
+    client.down = True
+    cache = RedisTokenCache(client, prefix="")
+
+    for _ in range(cache._breaker.failure_threshold):
+        assert await cache.get("k") is None
+    calls = client.calls
+
+    # Circuito aberto: nem consulta nem grava no Redis
+    assert await cache.get("k") is None
+    await cache.put("k", {"sub": "lab"}, 60)
+    assert client.calls == calls
+
+
+# ---------------------------------------------------------------------------
+# AuthService
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def cached_auth(monkeypatch):
+    monkeypatch.setattr(settings, "auth_cache_enabled", True)
+    monkeypatch.setattr(settings, "auth_cache_redis_enabled", False)
+    monkeypatch.setattr(settings, "auth_cache_negative_ttl_s", 30.0)
+    monkeypatch.setattr(settings, "auth_cache_max_entries", 100)
+
+    clock = {"now": time.time()}
+    monkeypatch.setattr(auth_service_module.time, "time", lambda: clock["now"])
+
+    def build(shared_cache=None):
+        service = AuthService(shared_cache=shared_cache)
+        verifications = []
+        verify = service._verify
+
+        def counting_verify(token):
+            verifications.append(token)
+            return verify(token)
+
+        monkeypatch.setattr(service, "_verify", counting_verify)
+        return service, verifications
+
+    return build, clock
+
+
+async def test_valid_token_is_verified_once(cached_auth):
+    build, _ = cached_auth
+    service, verifications = build()
+    token = service.create_access_token({"sub": "lab"})
+
+    first = await service.validate_token(token)
+    second = await service.validate_token(token)
+
+    assert first == second and first[0] is True
+    assert first[1]["sub"] == "lab"
+    assert verifications == [token]
+
+
+async def test_rejected_token_is_cached_for_negative_ttl(cached_auth):
+    build, clock = cached_auth
+    service, verifications = build()
+
+    assert await service.validate_token("nao-e-jwt") == (False, None)
+    clock["now"] += 29
+    assert await service.validate_token("nao-e-jwt") == (False, None)
+    assert len(verifications) == 1
+
+    # Passado o TTL negativo, o token é verificado de novo
+    clock["now"] += 2
+    assert await service.validate_token("nao-e-jwt") == (False, None)
+    assert len(verifications) == 2
+
+
+async def test_cached_token_expires_with_its_exp(cached_auth):
+    build, clock = cached_auth
+    service, verifications = build()
+    token = service.create_access_token({"sub": "lab"}, expires_delta=timedelta(seconds=120))
+    clock["now"] = time.time()
+
+    assert (await service.validate_token(token))[0] is True
+    clock["now"] += 121
+    # Entrada expirada: nova verificação, que rejeita o token vencido
+    assert await service.validate_token(token) == (False, None)
+    assert len(verifications) == 2
+
+
+async def test_shared_cache_hit_fills_local_cache(cached_auth):
+    build, _ = cached_auth
+    client = _FakeRedis()
+    producer, _ = build(RedisTokenCache(client, prefix=""))
+    token = producer.create_access_token({"sub": "lab"})
+    assert (await producer.validate_token(token))[0] is True
+
+    # Outro processo: encontra a verificação no Redis sem verificar a assinatura
+    consumer, verifications = build(RedisTokenCache(client, prefix=""))
+    assert (await consumer.validate_token(token))[0] is True
+    assert verifications == []
+    calls = client.calls
+    assert (await consumer.validate_token(token))[0] is True
+    assert client.calls == calls
@@ -0,0 +1,116 @@
+"""
+Testes da triagem hematológica: limites de cada regra, contagem de
+neutrófilos derivada dos leucócitos e analitos ausentes.
+"""
+import math
+
+import pytest
+
+from src.domain.hemograma_record import RESULT_INDEX, HemogramaRecord
+from src.domain.models import LoincCode, TriagePriority
+from src.services.triage_engine import TriageEngine, TriageRule, triage_engine
+
+# Hemograma sem achados (unidades canônicas)
+NORMAL = {
+    LoincCode.HEMOGLOBINA.value: 13.5,
+    LoincCode.LEUCOCITOS.value: 7000.0,
+    LoincCode.SEGMENTADOS.value: 55.0,
+    LoincCode.BASTONETES.value: 3.0,
+    LoincCode.PLAQUETAS.value: 250000.0,
+    LoincCode.BLASTOS.value: 0.0,
+}
+
+
+def _record(**changes) -> HemogramaRecord:
+    record = HemogramaRecord("", "52998224725", "2338424")
+    values = dict(NORMAL)
+    values.update({getattr(LoincCode, name.upper()).value: value for name, value in changes.items()})
+    for code, value in values.items():
+        record.values[RESULT_INDEX[code]] = value
+    return record
+
+
+def _triage(**changes) -> dict:
+    (result,) = triage_engine.triage_records([_record(**changes)])
+    return result
+
+
+def test_normal_exam_is_elective():
+    assert _triage() == {"priority": "elective", "reasons": []}
+
+
+@pytest.mark.parametrize("hemoglobin, priority, reasons", [
+    (8.0 - 1e-9, "urgent", ["hemoglobina_critica", "hemoglobina_baixa"]),
+    (8.0, "priority", ["hemoglobina_baixa"]),
+    (10.0 - 1e-9, "priority", ["hemoglobina_baixa"]),
+    (10.0, "elective", []),
+])
+def test_hemoglobin_rules(hemoglobin, priority, reasons):
+    assert _triage(hemoglobina=hemoglobin) == {"priority": priority, "reasons": reasons}
+
+
+@pytest.mark.parametrize("platelets, priority, reasons", [
+    (19999.0, "urgent", ["plaquetopenia_grave", "plaquetopenia"]),
+    (20000.0, "priority", ["plaquetopenia"]),
+    (99999.0, "priority", ["plaquetopenia"]),
+    (100000.0, "elective", []),
+])
+def test_platelet_rules(platelets, priority, reasons):
+    assert _triage(plaquetas=platelets) == {"priority": priority, "reasons": reasons}
+
+
+@pytest.mark.parametrize("blasts, priority", [(0.0, "elective"), (0.1, "urgent"), (math.nan, "elective")])
+def test_any_blast_is_urgent(blasts, priority):
+    result = _triage(blastos=blasts)
+    assert result["priority"] == priority
+    assert ("blastos_presentes" in result["reasons"]) == (priority == "urgent")
+
+
+@pytest.mark.parametrize("leukocytes, segmented, band, priority, reasons", [
+    # Neutrófilos = leucócitos x (segmentados + bastonetes) / 100
+    (2000.0, 45.0, 4.0, "urgent", ["neutropenia_grave", "neutropenia"]),  # 980/mm³
+    (2000.0, 46.0, 4.0, "priority", ["neutropenia"]),                     # 1000/mm³
+    (3000.0, 46.0, 4.0, "elective", []),                                  # 1500/mm³
+    (3000.0, 45.0, 4.0, "priority", ["neutropenia"]),                     # 1470/mm³
+    (2000.0, 49.0, math.nan, "urgent", ["neutropenia_grave", "neutropenia"]),  # bastonetes ausentes: 0
+    (2000.0, math.nan, 4.0, "elective", []),                              # segmentados ausentes: sem contagem
+    (math.nan, 10.0, 0.0, "elective", []),
+])
+def test_neutrophil_count_is_derived_from_leukocytes(leukocytes, segmented, band, priority, reasons):
+    result = _triage(leucocitos=leukocytes, segmentados=segmented, bastonetes=band)
+    assert result == {"priority": priority, "reasons": reasons}
+
+
+def test_highest_priority_wins_and_reasons_accumulate():
+    result = _triage(hemoglobina=9.0, plaquetas=15000.0, blastos=2.0)
+    assert result["priority"] == "urgent"
+    assert result["reasons"] == ["plaquetopenia_grave", "blastos_presentes", "hemoglobina_baixa", "plaquetopenia"]
+
+
+def test_missing_analytes_trigger_no_rule():
+    record = HemogramaRecord("", "52998224725", "2338424")
+    assert triage_engine.triage_records([record]) == [{"priority": "elective", "reasons": []}]
+
+
+def test_batch_results_keep_order():
+    records = [_record(), _record(hemoglobina=7.0), _record(plaquetas=50000.0)]
+    assert [result["priority"] for result in triage_engine.triage_records(records)] == [
+        "elective", "urgent", "priority"
+    ]
+
+
+def _rule(**changes) -> TriageRule:
+    fields = dict(name="regra", column="hemoglobin_g_dl", operator="lt", threshold=1.0,
+                  priority=TriagePriority.PRIORITY, description="teste")
+    fields.update(changes)
+    return TriageRule(**fields)
+
+
+@pytest.mark.parametrize("rules, message", [
+    ([_rule(column="ferritina")], "Coluna"),
+    ([_rule(operator="le")], "Operador"),
+    ([_rule(name=f"r{number}") for number in range(65)], "64"),
+])
+def test_invalid_rules_are_rejected(rules, message):
+    with pytest.raises(ValueError, match=message):
+        TriageEngine(rules)
@@ -0,0 +1,137 @@
+"""
+Testes do UpstreamTokenProvider contra um serviço de autorização simulado
+(httpx.MockTransport): single-flight, renovação antecipada, backoff e close().
+"""
+import asyncio
+import time
+
+import httpx
+
+from src.infrastructure.upstream_token import UpstreamTokenProvider
+
+
+class _AuthStub:
+    """Serviço de autorização em memória; `responses` define as respostas em ordem."""
+
+    def __init__(self, expires_in: float = 3600.0, delay_s: float = 0.0, responses=None):
+        self.expires_in = expires_in
+        self.delay_s = delay_s
+        self.responses = list(responses or [])
+        self.calls = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls.append(time.monotonic())
+        if self.delay_s:
+            await asyncio.sleep(self.delay_s)
+        if self.responses:
+            return self.responses.pop(0)
+        return httpx.Response(
+            200, json={"access_token": f"token-{len(self.calls)}", "expires_in": self.expires_in}
+        )
+
+
+def _provider(stub: _AuthStub, **kwargs) -> UpstreamTokenProvider:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(stub))
+    return UpstreamTokenProvider(url="http://auth.local/token", client=client, **kwargs)
+
+
+async def test_concurrent_callers_share_a_single_fetch():
+    stub = _AuthStub(delay_s=0.05)
+    provider = _provider(stub)
+    try:
+        tokens = await asyncio.gather(*(provider.get_token() for _ in range(50)))
+        assert set(tokens) == {"token-1"}
+        assert len(stub.calls) == 1
+        assert provider.fetch_count == 1
+
+        # Token válido em memória: nenhuma nova busca
+        assert await provider.get_token() == "token-1"
+        assert len(stub.calls) == 1
+    finally:
+        await provider.close()
+
+
+async def test_cancelled_caller_does_not_cancel_shared_fetch():
+    stub = _AuthStub(delay_s=0.05)
+    provider = _provider(stub)
+    try:
+        impatient = asyncio.ensure_future(provider.get_token())
+        patient = asyncio.ensure_future(provider.get_token())
+        await asyncio.sleep(0.01)
+        impatient.cancel()
+        assert await patient == "token-1"
+        assert len(stub.calls) == 1
+    finally:
+        await provider.close()
+
+
+async def test_token_is_refreshed_before_expiry():
+    stub = _AuthStub(expires_in=0.4)
+    provider = _provider(stub, refresh_margin_s=0.2)
+    try:
+        assert await provider.start() == "token-1"
+        observed = set()
+        deadline = time.monotonic() + 0.35
+        while time.monotonic() < deadline:
+            # O token nunca fica indisponível para as requisições
+            observed.add(provider.token)
+            await asyncio.sleep(0.01)
+        assert None not in observed
+        assert "token-2" in observed
+        # Renovação por volta de expires_in - margem, antes da expiração
+        assert 0.15 <= stub.calls[1] - stub.calls[0] < 0.4
+    finally:
+        await provider.close()
+
+
+async def test_failed_refresh_backs_off_exponentially():
+    failures = [httpx.Response(503, text="indisponível") for _ in range(4)]
+    stub = _AuthStub(responses=failures)
+    provider = _provider(stub, retry_interval_s=0.04)
+    try:
+        assert await provider.start() is None
+        deadline = time.monotonic() + 2.0
+        while provider.token is None and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+
+        assert provider.token == "token-5"
+        gaps = [later - earlier for earlier, later in zip(stub.calls, stub.calls[1:])]
+        # Falha no start(): a renovação tenta de imediato e depois dobra o intervalo
+        assert len(gaps) == 4
+        assert gaps[0] < 0.03
+        for gap, expected in zip(gaps[1:], (0.04, 0.08, 0.16)):
+            assert expected * 0.9 <= gap < expected + 0.1
+    finally:
+        await provider.close()
+
+
+async def test_invalid_payload_counts_as_failure():
+    stub = _AuthStub(responses=[httpx.Response(200, json=["não", "é", "objeto"])])
+    provider = _provider(stub, retry_interval_s=0.02)
+    try:
+        assert await provider.get_token() is None
+        assert await provider.get_token() == "token-2"
+    finally:
+        await provider.close()
+
+
+async def test_close_cancels_background_tasks():
+    stub = _AuthStub(delay_s=10.0)
+    provider = _provider(stub)
+    starter = asyncio.ensure_future(provider.start())
+    await asyncio.sleep(0.01)
+    inflight = provider._inflight
+    assert inflight is not None and not inflight.done()
+
+    await provider.close()
+    assert inflight.cancelled()
+    assert provider._inflight is None and provider._refresher is None
+    starter.cancel()
+
+    stub = _AuthStub(expires_in=3600.0)
+    provider = _provider(stub)
+    await provider.start()
+    refresher = provider._refresher
+    assert refresher is not None and not refresher.done()
+    await provider.close()
+    assert refresher.cancelled()
@@ -0,0 +1,149 @@
+"""
+Testes do consumidor da fila: recebimento, entrega ao sink, remoção em lote e
+extensão do visibility timeout.
+"""
+import asyncio
+import time
+
+import pytest
+
+from src.infrastructure.queue_backends import InMemoryQueueBackend
+from src.worker import consumer as consumer_module
+from src.worker.consumer import HemogramaWorker
+from src.worker.results import JsonLinesResultSink, MemoryResultSink, ResultSink
+
+
+class _SpyBackend(InMemoryQueueBackend):
+    """Backend em memória que registra remoções e extensões de visibilidade."""
+
+    def __init__(self):
+        super().__init__()
+        self.deleted = []
+        self.extended = []
+
+    def delete_batch(self, receipt_handles):
+        self.deleted.append(list(receipt_handles))
+        super().delete_batch(receipt_handles)
+
+    def change_visibility_batch(self, receipt_handles, visibility_timeout_s):
+        self.extended.extend(receipt_handles)
+        super().change_visibility_batch(receipt_handles, visibility_timeout_s)
+
+
+class _FailingSink(ResultSink):
+    name = "failing"
+
+    def write(self, results):
+        raise OSError("disco cheio")
+
+
+class _RecordingLogger:
+    def __init__(self):
+        self.events = []
+
+    def __getattr__(self, level):
+        return lambda event, **fields: self.events.append((level, event, fields))
+
+
+def _send(backend, count: int) -> None:
+    for number in range(count):
+        backend.send({
+            "MessageBody": f"corpo-{number}",
+            "MessageAttributes": {"TrackingId": {"DataType": "String", "StringValue": f"t-{number}"}},
+        })
+
+
+def _summaries(bodies):
+    return [(True, {"tracking_id": body, "triage": {"priority": "elective"}}) for body in bodies]
+
+
+async def _run_until(worker: HemogramaWorker, condition, timeout_s: float = 5.0) -> None:
+    task = asyncio.get_running_loop().create_task(worker.run())
+    deadline = time.monotonic() + timeout_s
+    while not condition() and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+    worker.stop()
+    await task
+
+
+def _worker(backend, sink, process=_summaries, **kwargs) -> HemogramaWorker:
+    options = {"wait_time_s": 0.05, "delete_interval_ms": 10, "report_interval_s": 3600}
+    options.update(kwargs)
+    return HemogramaWorker(backend, sink, process=process, **options)
+
+
+async def test_results_reach_sink_before_batch_delete():
+    backend = _SpyBackend()
+    _send(backend, 25)
+    sink = MemoryResultSink()
+    worker = _worker(backend, sink)
+
+    await _run_until(worker, lambda: sum(map(len, backend.deleted)) == 25)
+
+    assert sorted(result["tracking_id"] for result in sink.results) == sorted(f"corpo-{n}" for n in range(25))
+    assert worker.stats.processed == 25
+    # Remoções em lotes de no máximo 10
+    assert all(len(chunk) <= 10 for chunk in backend.deleted)
+    assert backend.get_attributes()["ApproximateNumberOfMessagesNotVisible"] == "0"
+
+
+async def test_sink_failure_keeps_messages_in_queue():
+    backend = _SpyBackend()
+    _send(backend, 3)
+    worker = _worker(backend, _FailingSink())
+
+    await _run_until(worker, lambda: worker.stats.failed == 3)
+
+    assert backend.deleted == []
+    assert worker.stats.processed == 0
+    assert backend.get_attributes()["ApproximateNumberOfMessagesNotVisible"] == "3"
+
+
+async def test_processing_failure_logs_tracking_id(monkeypatch):
+    recorder = _RecordingLogger()
+    monkeypatch.setattr(consumer_module, "logger", recorder)
+    backend = _SpyBackend()
+    _send(backend, 1)
+    worker = _worker(backend, MemoryResultSink(), process=lambda bodies: [(False, "Bundle inválido")] * len(bodies))
+
+    await _run_until(worker, lambda: worker.stats.failed == 1)
+
+    errors = [fields for level, event, fields in recorder.events if event == "Erro ao processar mensagem"]
+    assert errors[0]["tracking_id"] == "t-0"
+    assert backend.deleted == []
+
+
+async def test_heartbeat_extends_visibility_of_slow_messages():
+    backend = _SpyBackend()
+    _send(backend, 2)
+
+    def slow(bodies):
+        time.sleep(0.6)
+        return _summaries(bodies)
+
+    sink = MemoryResultSink()
+    worker = _worker(backend, sink, process=slow, visibility_timeout_s=0.3)
+
+    await _run_until(worker, lambda: sum(map(len, backend.deleted)) == 2)
+
+    # Sem extensão, as mensagens voltariam à fila e seriam recebidas de novo
+    assert backend.extended
+    assert worker.stats.received == 2
+    assert len(sink.results) == 2
+
+
+def test_jsonl_sink_appends_one_line_per_result(tmp_path):
+    sink = JsonLinesResultSink(str(tmp_path))
+    sink.write([{"tracking_id": "a"}, {"tracking_id": "b"}])
+    sink.write([{"tracking_id": "c"}])
+    sink.close()
+
+    (path,) = tmp_path.glob("*.jsonl")
+    assert path.read_text(encoding="utf-8").splitlines() == [
+        '{"tracking_id": "a"}', '{"tracking_id": "b"}', '{"tracking_id": "c"}'
+    ]
+
+
+def test_worker_requires_a_sink():
+    with pytest.raises(TypeError):
+        HemogramaWorker(InMemoryQueueBackend())
@@ -0,0 +1,73 @@
+"""
+Regressão: mensagens corrompidas (poison messages) no processamento em lote do worker.
+"""
+import asyncio
+import json
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from scripts.sample_bundles import build_sample_bundle
+from src.domain.models import QueueMessage
+from src.infrastructure.queue_backends import InMemoryQueueBackend
+from src.infrastructure.queue_service import QueueService
+from src.worker.processor import process_batch, process_message
+
+
+def _queue_bodies(count: int) -> list:
+    """Corpos no formato publicado pela API (passando pelo QueueService)."""
+    backend = InMemoryQueueBackend()
+    service = QueueService(backend=backend)
+
+    async def fill():
+        for seed in range(count):
+            success, _ = await service.send_message_async(QueueMessage(
+                tracking_id=uuid4(),
+                fhir_bundle_raw=json.dumps(build_sample_bundle(seed=seed)).encode("utf-8"),
+                received_at=datetime.utcnow(),
+                laboratory_cnes="2338424",
+                patient_cpf="52998224725",
+                correlation_id=str(uuid4()),
+            ))
+            assert success
+
+    asyncio.run(fill())
+    service.close()
+    return [message.body for message in backend.receive(count, 0, 30)]
+
+
+@pytest.fixture(scope="module")
+def good_bodies():
+    return _queue_bodies(3)
+
+
+def test_good_batch_is_processed(good_bodies):
+    outcomes = process_batch(good_bodies)
+    assert [success for success, _ in outcomes] == [True, True, True]
+    assert all(result["laboratory_cnes"] == "2338424" for _, result in outcomes)
+
+
+@pytest.mark.parametrize("poison", [
+    "[]",
+    "null",
+    "42",
+    "{not json",
+    "zstd:1:0:AAAA",
+    json.dumps({"tracking_id": "x"}),
+    json.dumps({"tracking_id": "x", "fhir_bundle": {"entry": "nope"}}),
+])
+def test_poison_message_fails_alone(good_bodies, poison):
+    bodies = [good_bodies[0], poison, good_bodies[1], good_bodies[2]]
+
+    outcomes = process_batch(bodies)
+
+    assert [success for success, _ in outcomes] == [True, False, True, True]
+    assert isinstance(outcomes[1][1], str)
+    tracking_ids = [result["tracking_id"] for success, result in outcomes if success]
+    assert len(set(tracking_ids)) == 3
+
+
+def test_process_message_raises_value_error_for_poison():
+    with pytest.raises(ValueError):
+        process_message("[]")